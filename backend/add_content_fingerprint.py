@@ -0,0 +1,41 @@
+import os
+import sys
+
+# Add the current directory to sys.path so we can import 'app'
+sys.path.append(os.getcwd())
+
+# One-off script: no background jobs, and it alters existing tables itself
+os.environ.setdefault("RUN_SCHEDULER", "false")
+os.environ.setdefault("AUTO_CREATE_TABLES", "false")
+
+print("Creating app...")
+from app.main import create_app
+from app.extensions import db
+from sqlalchemy import inspect, text
+
+app = create_app()
+print("App created. Entering app context...")
+with app.app_context():
+    print("In app context. Adding content_scripts.request_fingerprint...")
+    try:
+        inspector = inspect(db.engine)
+        if "request_fingerprint" in {c["name"] for c in inspector.get_columns("content_scripts")}:
+            print("Column 'request_fingerprint' already exists.")
+        else:
+            db.session.execute(text("ALTER TABLE content_scripts ADD COLUMN request_fingerprint VARCHAR(64) NULL"))
+            db.session.commit()
+            print("Successfully added request_fingerprint column")
+
+        if "ix_content_scripts_fingerprint_created" in {i["name"] for i in inspector.get_indexes("content_scripts")}:
+            print("Index 'ix_content_scripts_fingerprint_created' already exists.")
+        else:
+            db.session.execute(text(
+                "CREATE INDEX ix_content_scripts_fingerprint_created ON content_scripts (request_fingerprint, created_at)"
+            ))
+            db.session.commit()
+            print("Successfully added ix_content_scripts_fingerprint_created index")
+        # Packages generated before this have no fingerprint and are never reused
+    except Exception as e:
+        print(f'Error: {e}')
+        db.session.rollback()
+print("Done.")
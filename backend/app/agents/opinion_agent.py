@@ -1,6 +1,7 @@
-from app.services.youtube_service import YouTubeService
-from app.services.llm_service import LLMService
+from app.services.youtube_service import AsyncYouTubeService, YouTubeService
+from app.services.llm_service import AsyncLLMService, LLMService
 from app.repositories.opinion_repository import OpinionRepository
+from app.utils.aio import run_sync
 
 class OpinionAgent:
 
@@ -14,11 +15,7 @@ class OpinionAgent:
         # Extract text content from video dictionaries for sentiment analysis
         content = [video.get('content_for_ai', '') for video in videos if video.get('content_for_ai')]
         sentiment = self.llm.analyze_opinions(content)
-
-        summary = (
-            f"Public opinion on '{topic}' is mostly positive "
-            f"({sentiment['positive']}%)."
-        )
+        summary = self._summary(topic, sentiment)
 
         self.repo.create(
             topic=topic,
@@ -32,3 +29,31 @@ class OpinionAgent:
             "summary": summary,
             "sentiment": sentiment
         }
+
+    def _summary(self, topic: str, sentiment: dict) -> str:
+        return (
+            f"Public opinion on '{topic}' is mostly positive "
+            f"({sentiment['positive']}%)."
+        )
+
+
+class AsyncOpinionAgent(OpinionAgent):
+
+    def __init__(self):
+        self.youtube = AsyncYouTubeService()
+        self.llm = AsyncLLMService()
+        self.repo = OpinionRepository()
+
+    async def run(self, topic: str, user_id: int):
+        videos = await self.youtube.search_videos(topic)
+        content = [video.get('content_for_ai', '') for video in videos if video.get('content_for_ai')]
+        sentiment = await self.llm.analyze_opinions(content)
+        summary = self._summary(topic, sentiment)
+
+        await run_sync(self.repo.create, topic=topic, summary=summary, sentiment=sentiment, user_id=user_id)
+
+        return {
+            "topic": topic,
+            "summary": summary,
+            "sentiment": sentiment
+        }
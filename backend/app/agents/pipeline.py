@@ -0,0 +1,118 @@
+"""
+Lazy agent pipelines.
+
+An agent declares its work as named stages and what each stage needs:
+
+    pipeline = Pipeline("trend")
+    pipeline.add("videos", search, requires=["topic"])
+    pipeline.add("summary", summarize, requires=["topic", "videos"])
+    pipeline.add("clusters", cluster, requires=["videos"])
+
+run() is given the outputs the caller actually consumes (response fields,
+persistence) and executes only the stages those outputs depend on, each at
+most once. Asking for ["summary"] above never computes clusters.
+
+arun() does the same from a coroutine: coroutine-function stages are
+awaited, independent stages run concurrently, and stages added with
+blocking=True (database writes, CPU-heavy work) run on a worker thread.
+"""
+import asyncio
+import inspect
+import time
+from app.utils.aio import run_sync
+from app.utils.telemetry import HistogramMetric
+
+agent_stage_duration = HistogramMetric(
+    "agent_stage_duration_seconds", "Duration of agent pipeline stages", ("pipeline", "stage")
+)
+
+
+class Stage:
+    def __init__(self, name: str, func, requires: list, blocking: bool = False):
+        self.name = name
+        self.func = func
+        self.requires = list(requires)
+        self.blocking = blocking
+
+
+class Pipeline:
+    def __init__(self, name: str):
+        self.name = name
+        self.stages = {}
+
+    def add(self, name: str, func, requires: list = (), blocking: bool = False) -> "Pipeline":
+        """
+        Declare a stage. `func` is called with the outputs named in
+        `requires` (other stages or run() inputs), in that order.
+        `blocking` only matters to arun().
+        """
+        self.stages[name] = Stage(name, func, requires, blocking)
+        return self
+
+    @property
+    def outputs(self) -> list:
+        return list(self.stages)
+
+    def run(self, wanted: list, **inputs) -> dict:
+        """
+        Compute the `wanted` outputs, running only the stages they depend on.
+
+        Returns:
+            The wanted outputs plus every intermediate output that was computed
+        """
+        results = dict(inputs)
+        resolving = set()
+
+        def resolve(name: str):
+            if name in results:
+                return results[name]
+            stage = self.stages.get(name)
+            if stage is None:
+                raise ValueError(f"Pipeline '{self.name}' has no stage or input named '{name}'")
+            if name in resolving:
+                raise ValueError(f"Pipeline '{self.name}' has a dependency cycle at '{name}'")
+            resolving.add(name)
+            args = [resolve(dependency) for dependency in stage.requires]
+            start = time.perf_counter()
+            results[name] = stage.func(*args)
+            agent_stage_duration.observe(time.perf_counter() - start, pipeline=self.name, stage=name)
+            resolving.discard(name)
+            return results[name]
+
+        for name in wanted:
+            resolve(name)
+        return results
+
+    async def arun(self, wanted: list, **inputs) -> dict:
+        """run() for coroutines; returns the same dict."""
+        results = dict(inputs)
+        tasks = {}
+
+        async def execute(stage: Stage):
+            args = await asyncio.gather(*(resolve(dependency) for dependency in stage.requires))
+            start = time.perf_counter()
+            if inspect.iscoroutinefunction(stage.func):
+                value = await stage.func(*args)
+            elif stage.blocking:
+                value = await run_sync(stage.func, *args)
+            else:
+                value = stage.func(*args)
+            agent_stage_duration.observe(time.perf_counter() - start, pipeline=self.name, stage=stage.name)
+            results[stage.name] = value
+            return value
+
+        def resolve(name: str):
+            if name in tasks:
+                return tasks[name]
+            if name in results:
+                future = asyncio.get_running_loop().create_future()
+                future.set_result(results[name])
+                return future
+            stage = self.stages.get(name)
+            if stage is None:
+                raise ValueError(f"Pipeline '{self.name}' has no stage or input named '{name}'")
+            tasks[name] = asyncio.ensure_future(execute(stage))
+            return tasks[name]
+
+        await asyncio.gather(*(resolve(name) for name in wanted))
+        return results
@@ -1,29 +1,21 @@
-from app.services.youtube_service import YouTubeService
-from app.services.embedding_service import EmbeddingService
-from app.services.quiz_service import QuizService
+from app.services.youtube_service import AsyncYouTubeService, YouTubeService
+from app.services.quiz_service import AsyncQuizService, QuizService
 from app.repositories.skill_repository import SkillRepository
+from app.utils.aio import run_sync
 
 class SkillAgent:
 
     def __init__(self):
         self.youtube = YouTubeService()
-        self.embedder = EmbeddingService()
         self.quiz = QuizService()
         self.repo = SkillRepository()
 
     def run(self, skill: str, user_id: int):
         videos = self.youtube.search_videos(skill)
-        # Extract text content for embeddings
-        texts = [v.get('content_for_ai', '') for v in videos if v.get('content_for_ai')]
-        embeddings = self.embedder.embed(texts)
 
-        steps = []
-        for video in videos[:3]:
-            steps.append({
-                "title": video['title'],
-                "description": video['description'][:200],
-                "quiz": self.quiz.generate_quiz(video['title'])
-            })
+        # Cached quizzes are reused; the rest come from one batched LLM call
+        quizzes = self.quiz.generate_quizzes([video['title'] for video in videos[:3]])
+        steps = self._steps(videos[:3], quizzes)
 
         self.repo.create(
             skill_name=skill,
@@ -35,3 +27,33 @@ class SkillAgent:
             "skill": skill,
             "steps": steps
         }
+
+    def _steps(self, videos: list, quizzes: list) -> list:
+        steps = []
+        for video, quiz in zip(videos, quizzes):
+            steps.append({
+                "title": video['title'],
+                "description": video['description'][:200],
+                "quiz": quiz
+            })
+        return steps
+
+
+class AsyncSkillAgent(SkillAgent):
+
+    def __init__(self):
+        self.youtube = AsyncYouTubeService()
+        self.quiz = AsyncQuizService()
+        self.repo = SkillRepository()
+
+    async def run(self, skill: str, user_id: int):
+        videos = await self.youtube.search_videos(skill)
+        quizzes = await self.quiz.generate_quizzes([video['title'] for video in videos[:3]])
+        steps = self._steps(videos[:3], quizzes)
+
+        await run_sync(self.repo.create, skill_name=skill, steps=steps, user_id=user_id)
+
+        return {
+            "skill": skill,
+            "steps": steps
+        }
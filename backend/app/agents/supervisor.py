@@ -9,8 +9,8 @@ class SupervisorAgent:
         self.skill_agent = SkillAgent()
         self.opinion_agent = OpinionAgent()
 
-    def handle_trend_request(self, topic: str, user_id: int):
-        return self.trend_agent.run(topic, user_id)
+    def handle_trend_request(self, topic: str, user_id: int, fields: list = None):
+        return self.trend_agent.run(topic, user_id, fields=fields)
 
     def handle_skill_request(self, skill: str, user_id: int):
         return self.skill_agent.run(skill, user_id)
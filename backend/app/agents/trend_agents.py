@@ -1,8 +1,11 @@
-from app.services.youtube_service import YouTubeService
-from app.services.embedding_service import EmbeddingService
+from app.services.youtube_service import AsyncYouTubeService, YouTubeService
+from app.services.embedding_service import AsyncEmbeddingService, EmbeddingService
 from app.services.clustering_service import ClusteringService
 from app.repositories.trend_repository import TrendRepository
-from app.services.llm_service import LLMService # Add this import
+from app.services.llm_service import AsyncLLMService, LLMService # Add this import
+from app.agents.pipeline import Pipeline
+
+RESPONSE_FIELDS = ["summary", "clusters", "virality_score", "video_count", "videos"]
 
 class TrendAgent:
     def __init__(self):
@@ -11,39 +14,42 @@ class TrendAgent:
         self.clusterer = ClusteringService()
         self.llm = LLMService() # Add this
         self.repo = TrendRepository()
-    def run(self, topic: str, user_id: int):
-        videos_data = self.youtube.search_videos(topic)
-        ai_input_texts = [v['content_for_ai'] for v in videos_data]
-        
-        # Calculate Virality Score
-        virality_score = self._calculate_virality(videos_data)
-        
-        # Get AI Deep Summary
-        dynamic_summary = self.llm.summarize_trends(topic, ai_input_texts)
-        
-        # Get Clusters
-        embeddings = self.embedder.embed(ai_input_texts)
-        clusters = self.clusterer.cluster(embeddings)
-        
-        # Save to DB
-        self.repo.create(topic=topic, summary=dynamic_summary, user_id=user_id)
-        
-        return {
-            "topic": topic,
-            "summary": dynamic_summary,
-            "clusters": clusters,
-            "virality_score": virality_score,
-            "video_count": len(videos_data),
-            "videos": [
-                {
-                    "id": v['id'],
-                    "title": v['title'],
-                    "url": v['url'],
-                    "thumbnail": v['thumbnail'],
-                    "stats": v.get('stats', {})
-                } for v in videos_data
-            ]
-        }
+        self.pipeline = self._build_pipeline()
+
+    def _build_pipeline(self) -> Pipeline:
+        return (
+            Pipeline("trend")
+            .add("search_results", self.youtube.search_videos, requires=["topic"])
+            .add("texts", lambda videos: [v['content_for_ai'] for v in videos], requires=["search_results"])
+            .add("virality_score", self._calculate_virality, requires=["search_results"])
+            .add("summary", self.llm.summarize_trends, requires=["topic", "texts"])
+            .add("embeddings", self.embedder.embed, requires=["texts"])
+            .add("clusters", self.clusterer.cluster, requires=["embeddings"], blocking=True)
+            .add("video_count", len, requires=["search_results"])
+            .add("videos", self._video_cards, requires=["search_results"])
+            .add("saved", self.repo.create, requires=["topic", "summary", "user_id"], blocking=True)
+        )
+
+    def run(self, topic: str, user_id: int, fields: list = None, persist: bool = True):
+        """
+        Analyse a topic. Only the stages behind the requested response
+        `fields` (all of RESPONSE_FIELDS by default) run, plus the summary
+        when the analysis is persisted.
+        """
+        fields = list(fields or RESPONSE_FIELDS)
+        results = self.pipeline.run(fields + (["saved"] if persist else []), topic=topic, user_id=user_id)
+        return {"topic": topic, **{field: results[field] for field in fields}}
+
+    def _video_cards(self, videos_data: list[dict]) -> list[dict]:
+        return [
+            {
+                "id": v['id'],
+                "title": v['title'],
+                "url": v['url'],
+                "thumbnail": v['thumbnail'],
+                "stats": v.get('stats', {})
+            } for v in videos_data
+        ]
 
     def _calculate_virality(self, videos_data: list[dict]) -> int:
         """
@@ -83,4 +89,21 @@ class TrendAgent:
             total_score += (eng_score + vel_score)
             
         avg_score = total_score / len(videos_data)
-        return int(min(100, avg_score))
\ No newline at end of file
+        return int(min(100, avg_score))
+
+
+class AsyncTrendAgent(TrendAgent):
+    """TrendAgent on the async services; the summary and the clusters are computed concurrently."""
+
+    def __init__(self):
+        self.youtube = AsyncYouTubeService()
+        self.embedder = AsyncEmbeddingService()
+        self.clusterer = ClusteringService()
+        self.llm = AsyncLLMService()
+        self.repo = TrendRepository()
+        self.pipeline = self._build_pipeline()
+
+    async def run(self, topic: str, user_id: int, fields: list = None, persist: bool = True):
+        fields = list(fields or RESPONSE_FIELDS)
+        results = await self.pipeline.arun(fields + (["saved"] if persist else []), topic=topic, user_id=user_id)
+        return {"topic": topic, **{field: results[field] for field in fields}}
@@ -1,7 +1,9 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.utils.conditional import conditional
 from app.services.analytics_service import AnalyticsService
 from app.services.groq_llm_service import GroqLLMService
+from app.services.budget_service import BudgetExceeded
 from app.models.sql.content_performance import ContentPerformance, ABTest
 from app.extensions import db
 
@@ -169,6 +171,8 @@ g with AI predictions.
             "success": True,
             "score": score_result
         }), 200
+    except BudgetExceeded:
+        raise
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -210,8 +214,11 @@ def get_weekly_report():
                 ]
             }
             
-            ai_insights = llm_service.generate_weekly_insights(performance_data)
-            report["ai_insights"] = ai_insights
+            try:
+                report["ai_insights"] = llm_service.generate_weekly_insights(performance_data)
+            except BudgetExceeded:
+                # The report is still useful without the AI insights
+                report["ai_insights"] = None
         
         return jsonify({
             "success": True,
@@ -225,7 +232,7 @@ def get_weekly_report():
 @jwt_required()
 def create_ab_test():
     """
-    Create a new A/B test comparing two content pieces.
+    Create a new A/B/n test comparing two or more content pieces.
     ---
     tags:
       - Analytics & ROI
@@ -239,8 +246,6 @@ def create_ab_test():
           type: object
           required:
             - test_name
-            - content_a_id
-            - content_b_id
           properties:
             test_name:
               type: string
@@ -253,6 +258,11 @@ def create_ab_test():
               type: integer
             content_b_id:
               type: integer
+            variant_content_ids:
+              type: array
+              items:
+                type: integer
+              description: "Content IDs for an A/B/n test (first is the control). Replaces content_a_id/content_b_id."
     responses:
       200:
         description: A/B test created
@@ -262,8 +272,10 @@ def create_ab_test():
     user_id = get_jwt_identity()
     data = request.get_json()
     
-    if not data.get("test_name") or not data.get("content_a_id") or not data.get("content_b_id"):
-        return jsonify({"error": "test_name, content_a_id, and content_b_id are required"}), 400
+    has_two_way = data.get("content_a_id") and data.get("content_b_id")
+    has_variants = len(data.get("variant_content_ids") or []) >= 2
+    if not data.get("test_name") or not (has_two_way or has_variants):
+        return jsonify({"error": "test_name and either content_a_id and content_b_id, or at least two variant_content_ids are required"}), 400
     
     try:
         service = get_analytics_service()
@@ -278,7 +290,7 @@ def create_ab_test():
 @jwt_required()
 def get_ab_test(test_id):
     """
-    Get A/B test results.
+    Get A/B/n test results (significance and win probabilities, refreshed by a background job).
     ---
     tags:
       - Analytics & ROI
@@ -378,6 +390,8 @@ def suggest_ab_tests():
             "success": True,
             "suggestions": suggestions
         }), 200
+    except BudgetExceeded:
+        raise
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -418,6 +432,7 @@ def get_revenue_attribution():
 
 @analytics_bp.route("/history", methods=["GET"])
 @jwt_required()
+@conditional("analytics")
 def get_content_history():
     """
     Get tracked content history.
@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify, Response
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.utils.conditional import conditional
 from app.models.sql.calendar_event import CalendarEvent
 from app.services.scheduler_service import SchedulerService
 from app.extensions import db
@@ -9,6 +10,7 @@ calendar_bp = Blueprint("calendar", __name__)
 
 @calendar_bp.route("/events", methods=["GET"])
 @jwt_required()
+@conditional("calendar")
 def get_calendar_events():
     user_id = get_jwt_identity()
     start_date = request.args.get("start_date") # ISO format
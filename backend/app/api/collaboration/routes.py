@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.services.collaboration_service import CollaborationService
 from app.services.groq_llm_service import GroqLLMService
+from app.services.budget_service import BudgetExceeded
 from app.models.sql.creator_profile import CreatorProfile, CollabRequest
 from app.extensions import db
 
@@ -172,6 +173,14 @@ def find_matches():
         in: query
         type: string
         description: Filter by niche
+      - name: sub_niche
+        in: query
+        type: string
+        description: Only creators with this niche or sub-niche (exact, case-insensitive)
+      - name: platform
+        in: query
+        type: string
+        description: Only creators on this platform (e.g. youtube)
       - name: min_audience
         in: query
         type: integer
@@ -204,6 +213,10 @@ def find_matches():
     filters = {}
     if request.args.get("niche"):
         filters["niche"] = request.args.get("niche")
+    if request.args.get("sub_niche"):
+        filters["sub_niche"] = request.args.get("sub_niche")
+    if request.args.get("platform"):
+        filters["platform"] = request.args.get("platform")
     if request.args.get("min_audience"):
         filters["min_audience"] = request.args.get("min_audience", type=int)
     if request.args.get("max_audience"):
@@ -215,7 +228,7 @@ def find_matches():
     
     try:
         service = get_collaboration_service()
-        matches = service.find_matches(user_id, filters)[:limit]
+        matches = service.find_matches(user_id, filters, limit)
         
         return jsonify({
             "success": True,
@@ -271,6 +284,8 @@ def get_compatibility(profile_id):
             "match_score": score_data,
             "ai_analysis": ai_analysis
         }), 200
+    except BudgetExceeded:
+        raise
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -512,6 +527,8 @@ def generate_pitch():
             "success": True,
             "pitch": pitch
         }), 200
+    except BudgetExceeded:
+        raise
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -568,5 +585,7 @@ def generate_ideas():
             "success": True,
             "ideas": ideas
         }), 200
+    except BudgetExceeded:
+        raise
     except Exception as e:
         return jsonify({"error": str(e)}), 500
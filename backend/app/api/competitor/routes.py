@@ -1,9 +1,12 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.utils.conditional import conditional
 from app.services.competitor_service import CompetitorService
 from app.services.groq_llm_service import GroqLLMService
+from app.services.budget_service import BudgetExceeded
 from app.models.sql.competitor import Competitor, CompetitorVideo
 from app.extensions import db
+from sqlalchemy.orm import load_only, undefer_group
 
 competitor_bp = Blueprint("competitor", __name__)
 
@@ -70,6 +73,7 @@ def add_competitor():
 
 @competitor_bp.route("/list", methods=["GET"])
 @jwt_required()
+@conditional("competitor")
 def list_competitors():
     """
     Get all tracked competitor channels.
@@ -99,6 +103,7 @@ def list_competitors():
 
 @competitor_bp.route("/<int:competitor_id>", methods=["GET"])
 @jwt_required()
+@conditional("competitor")
 def get_competitor(competitor_id):
     """
     Get detailed competitor information with videos.
@@ -244,7 +249,8 @@ def analyze_viral_video(competitor_id, video_id):
     if not competitor:
         return jsonify({"error": "Competitor not found"}), 404
     
-    video = CompetitorVideo.query.filter_by(id=video_id, competitor_id=competitor_id).first()
+    video = CompetitorVideo.query.options(undefer_group("details"))\
+        .filter_by(id=video_id, competitor_id=competitor_id).first()
     if not video:
         return jsonify({"error": "Video not found"}), 404
     
@@ -271,6 +277,8 @@ def analyze_viral_video(competitor_id, video_id):
             "video": video.to_dict(),
             "analysis": analysis
         }), 200
+    except BudgetExceeded:
+        raise
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -301,7 +309,8 @@ def get_content_gaps():
             
             # Get user's content topics (from ContentScript model)
             from app.models.sql.content_script import ContentScript
-            user_content = ContentScript.query.filter_by(user_id=user_id).limit(20).all()
+            user_content = ContentScript.query.options(load_only(ContentScript.topic))\
+                .filter_by(user_id=user_id).limit(20).all()
             user_topics = [c.topic for c in user_content]
             
             competitor_topics = [t["title"] for t in gaps_data.get("top_competitor_content", [])]
@@ -313,6 +322,8 @@ def get_content_gaps():
             "success": True,
             "gaps": gaps_data
         }), 200
+    except BudgetExceeded:
+        raise
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
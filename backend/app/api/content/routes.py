@@ -1,10 +1,18 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.utils.conditional import conditional
 from app.services.groq_llm_service import GroqLLMService
+from app.services.budget_service import BudgetExceeded
 from app.models.sql.content_script import ContentScript
+from app.repositories.content_repository import ContentRepository
 from app.extensions import db
+from datetime import datetime, timedelta
+from sqlalchemy.orm import undefer_group
+import hashlib
 import json
 
+FINGERPRINT_VERSION = 1  # Bump when prompts change so older packages aren't reused
+
 content_bp = Blueprint("content", __name__)
 
 
@@ -13,6 +21,75 @@ def get_llm_service():
     return GroqLLMService()
 
 
+def request_fingerprint(topic: str, platform: str, duration, style: str, niche: str) -> str:
+    """
+    Fingerprint of a /content/generate request: the same for requests that
+    differ only in case and whitespace.
+    """
+    def canonical(value):
+        return " ".join(str(value or "").lower().split())
+
+    try:
+        duration = int(duration)
+    except (TypeError, ValueError):
+        duration = canonical(duration)
+    key = [FINGERPRINT_VERSION, canonical(topic), canonical(platform), duration, canonical(style), canonical(niche)]
+    return hashlib.sha256(json.dumps(key).encode()).hexdigest()
+
+
+def reuse_content_package(user_id, fingerprint: str):
+    """
+    A package generated for the same request within
+    CONTENT_DEDUPE_WINDOW_MINUTES, as (content_id, content_package), or None.
+    With CONTENT_DEDUPE_SCOPE "global", another user's package is copied
+    into this user's history.
+    """
+    window = current_app.config["CONTENT_DEDUPE_WINDOW_MINUTES"]
+    if window <= 0:
+        return None
+    repo = ContentRepository()
+    any_user = current_app.config["CONTENT_DEDUPE_SCOPE"] == "global"
+    content = repo.find_recent(fingerprint, datetime.utcnow() - timedelta(minutes=window), user_id, any_user)
+    if content is None:
+        return None
+    if str(content.user_id) != str(user_id):
+        content = repo.clone(content, user_id)
+
+    package = content.to_dict()
+    return content.id, {
+        "hooks": package["hooks"],
+        "script": package["full_script"],
+        "captions": package["captions"],
+        "hashtags": package["hashtags"],
+        "thumbnails": package["thumbnail_titles"]
+    }
+
+
+def save_content_package(user_id, topic: str, platform: str, style: str, duration: int, niche: str,
+                         content_package: dict, fingerprint: str = None) -> int:
+    """Store a generated content package; returns its id."""
+    content = ContentScript(
+        user_id=user_id,
+        topic=topic,
+        platform=platform,
+        content_style=style,
+        duration=duration,
+        niche=niche,
+        request_fingerprint=fingerprint,
+        generation_status="completed"
+    )
+    
+    content.set_hooks(content_package.get("hooks"))
+    content.set_full_script(content_package.get("script"))
+    content.set_captions(content_package.get("captions"))
+    content.set_hashtags(content_package.get("hashtags"))
+    content.set_thumbnail_titles(content_package.get("thumbnails"))
+    
+    db.session.add(content)
+    db.session.commit()
+    return content.id
+
+
 @content_bp.route("/generate", methods=["POST"])
 @jwt_required()
 def generate_complete_content():
@@ -51,9 +128,13 @@ def generate_complete_content():
             niche:
               type: string
               description: Specific niche/industry for better targeting
+            regenerate:
+              type: boolean
+              description: Generate a new package even if the same request was generated recently
+              default: false
     responses:
       200:
-        description: Complete content package generated successfully
+        description: Complete content package generated successfully (deduplicated is true when a recent package for the same request was returned)
       400:
         description: Missing required fields
       500:
@@ -70,8 +151,21 @@ def generate_complete_content():
     duration = data.get("duration", 60)
     style = data.get("style", "engaging")
     niche = data.get("niche", "")
+    fingerprint = request_fingerprint(topic, platform, duration, style, niche)
     
     try:
+        reused = None if data.get("regenerate") else reuse_content_package(user_id, fingerprint)
+        if reused:
+            content_id, content_package = reused
+            return jsonify({
+                "success": True,
+                "content_id": content_id,
+                "topic": topic,
+                "estimated_time_saved": "4-6 hours",
+                "content_package": content_package,
+                "deduplicated": True
+            }), 200
+
         llm_service = get_llm_service()
         result = llm_service.generate_complete_content(
             topic=topic,
@@ -82,33 +176,16 @@ def generate_complete_content():
         )
         
         if result.get("success"):
-            # Save to database
-            content = ContentScript(
-                user_id=user_id,
-                topic=topic,
-                platform=platform,
-                content_style=style,
-                duration=duration,
-                niche=niche,
-                generation_status="completed"
-            )
-            
             content_package = result.get("content_package", {})
-            content.set_hooks(content_package.get("hooks"))
-            content.set_full_script(content_package.get("script"))
-            content.set_captions(content_package.get("captions"))
-            content.set_hashtags(content_package.get("hashtags"))
-            content.set_thumbnail_titles(content_package.get("thumbnails"))
-            
-            db.session.add(content)
-            db.session.commit()
+            content_id = save_content_package(user_id, topic, platform, style, duration, niche, content_package, fingerprint)
             
             return jsonify({
                 "success": True,
-                "content_id": content.id,
+                "content_id": content_id,
                 "topic": topic,
                 "estimated_time_saved": "4-6 hours",
-                "content_package": content_package
+                "content_package": content_package,
+                "deduplicated": False
             }), 200
         else:
             return jsonify({
@@ -116,6 +193,8 @@ def generate_complete_content():
                 "error": result.get("error", "Generation failed")
             }), 500
             
+    except BudgetExceeded:
+        raise
     except Exception as e:
         return jsonify({
             "success": False,
@@ -168,6 +247,8 @@ def generate_hook():
         llm_service = get_llm_service()
         result = llm_service.generate_hook(topic, platform, style)
         return jsonify({"success": True, "hooks": result}), 200
+    except BudgetExceeded:
+        raise
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
@@ -222,6 +303,8 @@ def generate_script():
         llm_service = get_llm_service()
         result = llm_service.generate_full_script(topic, duration, platform, style)
         return jsonify({"success": True, "script": result}), 200
+    except BudgetExceeded:
+        raise
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
@@ -271,6 +354,8 @@ def generate_captions():
         llm_service = get_llm_service()
         result = llm_service.generate_captions(topic, content_summary, tone)
         return jsonify({"success": True, "captions": result}), 200
+    except BudgetExceeded:
+        raise
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
@@ -320,6 +405,8 @@ def generate_hashtags():
         llm_service = get_llm_service()
         result = llm_service.generate_hashtags(topic, platform, niche)
         return jsonify({"success": True, "hashtags": result}), 200
+    except BudgetExceeded:
+        raise
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
@@ -369,12 +456,15 @@ def generate_thumbnails():
         llm_service = get_llm_service()
         result = llm_service.generate_thumbnail_titles(topic, video_type, target_emotion)
         return jsonify({"success": True, "thumbnails": result}), 200
+    except BudgetExceeded:
+        raise
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
 
 @content_bp.route("/history", methods=["GET"])
 @jwt_required()
+@conditional("content")
 def get_content_history():
     """
     Get user's content generation history.
@@ -406,7 +496,8 @@ def get_content_history():
     limit = min(max(1, limit), 100)
     offset = max(0, offset)
     
-    contents = ContentScript.query.filter_by(user_id=user_id)\
+    # Summary columns only: the generated content stays in the database
+    contents = ContentScript.summary_query().filter_by(user_id=user_id)\
         .order_by(ContentScript.created_at.desc())\
         .offset(offset)\
         .limit(limit)\
@@ -414,22 +505,9 @@ def get_content_history():
     
     total = ContentScript.query.filter_by(user_id=user_id).count()
     
-    # Return summary without full content (for performance)
-    history = []
-    for content in contents:
-        history.append({
-            "id": content.id,
-            "topic": content.topic,
-            "platform": content.platform,
-            "content_style": content.content_style,
-            "duration": content.duration,
-            "generation_status": content.generation_status,
-            "created_at": content.created_at.isoformat() if content.created_at else None
-        })
-    
     return jsonify({
         "success": True,
-        "contents": history,
+        "contents": [content.to_summary_dict() for content in contents],
         "total": total,
         "limit": limit,
         "offset": offset
@@ -460,7 +538,8 @@ def get_content_by_id(content_id):
     """
     user_id = get_jwt_identity()
     
-    content = ContentScript.query.filter_by(id=content_id, user_id=user_id).first()
+    content = ContentScript.query.options(undefer_group("generated"))\
+        .filter_by(id=content_id, user_id=user_id).first()
     
     if not content:
         return jsonify({"error": "Content not found"}), 404
@@ -526,6 +605,8 @@ def test_llm_connection():
         llm_service = get_llm_service()
         result = llm_service.test_connection()
         return jsonify(result), 200
+    except BudgetExceeded:
+        raise
     except Exception as e:
         return jsonify({
             "success": False,
@@ -0,0 +1,57 @@
+import hmac
+from flask import Blueprint, Response, current_app, jsonify, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from app.utils.telemetry import render_metrics
+
+metrics_bp = Blueprint("metrics", __name__)
+
+
+def _scrape_allowed() -> bool:
+    """
+    The METRICS_TOKEN bearer token (what Prometheus sends), or an admin's
+    JWT (ADMIN_USER_IDS). With neither configured, nobody may scrape.
+    """
+    token = current_app.config.get("METRICS_TOKEN")
+    auth = request.headers.get("Authorization", "")
+    if token and auth.startswith("Bearer ") and hmac.compare_digest(auth[7:].strip().encode(), token.encode()):
+        return True
+    admins = current_app.config.get("ADMIN_USER_IDS") or set()
+    if not admins:
+        return False
+    try:
+        verify_jwt_in_request(optional=True)
+        return get_jwt_identity() in admins
+    except Exception:
+        return False
+
+
+@metrics_bp.route("", methods=["GET"])
+def metrics():
+    """
+    Prometheus metrics for this worker process (METRICS_TOKEN or admins only)
+    ---
+    tags:
+      - Health
+    security:
+      - Bearer: []
+    produces:
+      - text/plain
+    description: |
+      Scrape with the METRICS_TOKEN as a bearer token, e.g.
+
+          scrape_configs:
+            - job_name: insight-sphere
+              metrics_path: /metrics
+              authorization:
+                credentials_file: /etc/prometheus/metrics_token
+              static_configs:
+                - targets: ["backend:5001"]
+    responses:
+      200:
+        description: Request, database and upstream latency metrics in the Prometheus text format
+      403:
+        description: Missing or wrong METRICS_TOKEN and not an admin
+    """
+    if not _scrape_allowed():
+        return jsonify({"error": "Metrics access required"}), 403
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
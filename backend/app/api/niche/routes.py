@@ -1,8 +1,11 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.utils.conditional import conditional
 from app.services.groq_llm_service import GroqLLMService
+from app.services.budget_service import BudgetExceeded
 from app.models.sql.niche import Niche
 from app.extensions import db
+from sqlalchemy.orm import undefer_group
 
 niche_bp = Blueprint("niche", __name__)
 
@@ -95,6 +98,8 @@ def analyze_niche():
             "analysis": analysis
         }), 200
         
+    except BudgetExceeded:
+        raise
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -121,6 +126,8 @@ def explore_niches():
             "success": True,
             "trending": trending
         }), 200
+    except BudgetExceeded:
+        raise
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -167,6 +174,8 @@ def find_micro_niches():
             "success": True,
             "micro_niches": micro_niches
         }), 200
+    except BudgetExceeded:
+        raise
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -211,6 +220,8 @@ def find_related_niches():
             "success": True,
             "related": related
         }), 200
+    except BudgetExceeded:
+        raise
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -238,7 +249,7 @@ def get_niche(niche_id):
     """
     user_id = get_jwt_identity()
     
-    niche = Niche.query.filter_by(id=niche_id, user_id=user_id).first()
+    niche = Niche.query.options(undefer_group("analysis")).filter_by(id=niche_id, user_id=user_id).first()
     
     if not niche:
         return jsonify({"error": "Niche not found"}), 404
@@ -251,6 +262,7 @@ def get_niche(niche_id):
 
 @niche_bp.route("/history", methods=["GET"])
 @jwt_required()
+@conditional("niche")
 def get_niche_history():
     """
     Get user's niche research history.
@@ -290,7 +302,7 @@ def get_niche_history():
     
     return jsonify({
         "success": True,
-        "niches": [n.to_dict() for n in niches],
+        "niches": [n.to_dict(include_analysis=False) for n in niches],
         "total": total,
         "limit": limit,
         "offset": offset
@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.utils.conditional import conditional
 from app.agents.supervisor import SupervisorAgent
 from app.models.sql.skill_path import SkillPath
 from app.models.sql.certificate import Certificate
@@ -28,6 +29,7 @@ def build_skill_path():
 
 @skills_bp.route("/history", methods=["GET"])
 @jwt_required()
+@conditional("skills")
 def get_skill_history():
     user_id = get_jwt_identity()
     paths = SkillPath.query.filter_by(user_id=user_id).all()
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.agents.supervisor import SupervisorAgent
+from app.agents.trend_agents import RESPONSE_FIELDS
 
 trends_bp = Blueprint("trends", __name__)
 
@@ -11,10 +12,17 @@ def analyze_trends():
     topic = data.get("topic")
     user_id = get_jwt_identity()
 
+    # Optional subset of the analysis, e.g. ["summary", "virality_score"] to skip clustering
+    fields = data.get("fields")
+    if fields is not None:
+        if not isinstance(fields, list) or not fields or any(field not in RESPONSE_FIELDS for field in fields):
+            return jsonify({"error": f"fields must be a non-empty list of: {', '.join(RESPONSE_FIELDS)}"}), 400
+
     supervisor = SupervisorAgent()
     result = supervisor.handle_trend_request(
         topic=topic,
-        user_id=user_id
+        user_id=user_id,
+        fields=fields
     )
 
     return jsonify(result), 200
@@ -0,0 +1,45 @@
+from flask import Blueprint, current_app, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.services.budget_service import budget_manager
+
+usage_bp = Blueprint("usage", __name__)
+
+
+@usage_bp.route("/me", methods=["GET"])
+@jwt_required()
+def get_my_usage():
+    """
+    Get today's upstream API usage against the current user's budgets
+    ---
+    tags:
+      - Usage
+    security:
+      - Bearer: []
+    responses:
+      200:
+        description: Per-service usage (YouTube quota units, Groq and Gemini tokens) since UTC midnight
+    """
+    user_id = get_jwt_identity()
+    return jsonify({"success": True, "usage": budget_manager.user_usage(user_id)}), 200
+
+
+@usage_bp.route("/burn-rate", methods=["GET"])
+@jwt_required()
+def get_burn_rate():
+    """
+    Get global burn rates and projected budget exhaustion (admins only)
+    ---
+    tags:
+      - Usage
+    security:
+      - Bearer: []
+    responses:
+      200:
+        description: Usage today, last-hour rate, projected daily usage, hours to exhaustion and heaviest users per service
+      403:
+        description: Not an admin
+    """
+    if get_jwt_identity() not in (current_app.config.get("ADMIN_USER_IDS") or set()):
+        return jsonify({"error": "Admin access required"}), 403
+
+    return jsonify({"success": True, "burn_rates": budget_manager.burn_rates()}), 200
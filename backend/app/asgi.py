@@ -0,0 +1,362 @@
+"""
+ASGI entry point:
+
+    uvicorn app.asgi:application --host 0.0.0.0 --port 5000
+
+The agent and content generation routes are served natively on the event
+loop by the Async* agents and services, so one process keeps many upstream
+calls in flight without a thread per request. Every other route (and CORS
+preflights) goes to the Flask app on a bounded thread pool, so the API is
+the same as under a WSGI server.
+
+The native routes answer exactly like their Flask counterparts, including
+the JWT and budget error bodies.
+"""
+import asyncio
+import io
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from flask_jwt_extended import decode_token
+from jwt import ExpiredSignatureError
+from app.main import create_app
+from app.agents.trend_agents import AsyncTrendAgent, RESPONSE_FIELDS
+from app.agents.skill_agents import AsyncSkillAgent
+from app.agents.opinion_agent import AsyncOpinionAgent
+from app.api.content.routes import request_fingerprint, reuse_content_package, save_content_package
+from app.services.budget_service import BudgetExceeded, budget_user_id
+from app.services.groq_llm_service import AsyncGroqLLMService
+from app.utils.compression import choose_encoding, compress
+from app.utils.aio import bind_app, close_http_client, run_sync
+from app.utils.telemetry import http_request_duration, wait_for_upstreams
+
+WSGI_THREADS = int(os.getenv("WSGI_THREADS", 16))
+LLM_DRAIN_TIMEOUT = float(os.getenv("LLM_DRAIN_TIMEOUT", 15))
+
+flask_app = create_app()
+bind_app(flask_app)
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, body: dict):
+        super().__init__(body.get("error"))
+        self.status = status
+        self.body = body
+
+
+# ============ REQUEST HELPERS ============
+
+def _header(scope, name: bytes) -> str:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            break
+    return b"".join(chunks)
+
+
+def _json_body(body: bytes) -> dict:
+    try:
+        data = flask_app.json.loads(body or b"null")
+    except ValueError:
+        raise HTTPError(400, {"error": "Request body must be JSON"})
+    if not isinstance(data, dict):
+        raise HTTPError(400, {"error": "Request body must be a JSON object"})
+    return data
+
+
+def _authenticate(scope) -> str:
+    """The JWT identity of the request, rejected the way the Flask error loaders do."""
+    authorization = _header(scope, b"authorization") or ""
+    if not authorization.startswith("Bearer "):
+        raise HTTPError(401, {
+            "error": "authorization_required",
+            "message": "Request does not contain an access token (Bearer prefix might be missing)"
+        })
+    try:
+        with flask_app.app_context():
+            decoded = decode_token(authorization[len("Bearer "):])
+    except ExpiredSignatureError:
+        raise HTTPError(401, {"error": "token_expired", "message": "The token has expired"})
+    except Exception as e:
+        raise HTTPError(422, {"error": "invalid_token", "message": f"Signature verification failed: {e}"})
+    if decoded.get("type") != "access":
+        raise HTTPError(422, {"error": "invalid_token", "message": "Signature verification failed: Only access tokens are allowed"})
+    return decoded["sub"]
+
+
+# ============ NATIVE ROUTES ============
+
+async def analyze_trends(user_id: str, data: dict) -> dict:
+    fields = data.get("fields")
+    if fields is not None:
+        if not isinstance(fields, list) or not fields or any(field not in RESPONSE_FIELDS for field in fields):
+            raise HTTPError(400, {"error": f"fields must be a non-empty list of: {', '.join(RESPONSE_FIELDS)}"})
+    return await AsyncTrendAgent().run(data.get("topic"), user_id, fields=fields)
+
+
+async def build_skill_path(user_id: str, data: dict) -> dict:
+    return await AsyncSkillAgent().run(data.get("skill"), user_id)
+
+
+async def analyze_opinion(user_id: str, data: dict) -> dict:
+    return await AsyncOpinionAgent().run(data.get("topic"), user_id)
+
+
+async def generate_complete_content(user_id: str, data: dict) -> dict:
+    topic = _required_topic(data)
+    platform = data.get("platform", "all")
+    duration = data.get("duration", 60)
+    style = data.get("style", "engaging")
+    niche = data.get("niche", "")
+    fingerprint = request_fingerprint(topic, platform, duration, style, niche)
+
+    try:
+        reused = None if data.get("regenerate") else await run_sync(reuse_content_package, user_id, fingerprint)
+        if reused:
+            content_id, content_package = reused
+            return {
+                "success": True,
+                "content_id": content_id,
+                "topic": topic,
+                "estimated_time_saved": "4-6 hours",
+                "content_package": content_package,
+                "deduplicated": True
+            }
+
+        result = await AsyncGroqLLMService().generate_complete_content(topic, platform, duration, style, niche)
+        if not result.get("success"):
+            raise HTTPError(500, {"success": False, "error": result.get("error", "Generation failed")})
+
+        content_package = result.get("content_package", {})
+        content_id = await run_sync(
+            save_content_package, user_id, topic, platform, style, duration, niche, content_package, fingerprint
+        )
+        return {
+            "success": True,
+            "content_id": content_id,
+            "topic": topic,
+            "estimated_time_saved": "4-6 hours",
+            "content_package": content_package,
+            "deduplicated": False
+        }
+    except (BudgetExceeded, HTTPError):
+        raise
+    except Exception as e:
+        raise HTTPError(500, {"success": False, "error": str(e)})
+
+
+def _required_topic(data: dict) -> str:
+    topic = data.get("topic")
+    if not topic:
+        raise HTTPError(400, {"error": "Topic is required"})
+    return topic
+
+
+def _content_route(method: str, key: str, arguments):
+    """A single-part content route: `arguments(data)` builds the generator's arguments after the topic."""
+
+    async def handler(user_id: str, data: dict) -> dict:
+        topic = _required_topic(data)
+        try:
+            result = await getattr(AsyncGroqLLMService(), method)(topic, *arguments(data))
+        except BudgetExceeded:
+            raise
+        except Exception as e:
+            raise HTTPError(500, {"success": False, "error": str(e)})
+        return {"success": True, key: result}
+
+    return handler
+
+
+ROUTES = {
+    ("POST", "/trends/"): analyze_trends,
+    ("POST", "/skills/"): build_skill_path,
+    ("POST", "/opinions/"): analyze_opinion,
+    ("POST", "/content/generate"): generate_complete_content,
+    ("POST", "/content/hook"): _content_route(
+        "generate_hook", "hooks",
+        lambda data: (data.get("platform", "tiktok"), data.get("style", "engaging"))
+    ),
+    ("POST", "/content/script"): _content_route(
+        "generate_full_script", "script",
+        lambda data: (data.get("duration", 60), data.get("platform", "tiktok"), data.get("style", "engaging"))
+    ),
+    ("POST", "/content/captions"): _content_route(
+        "generate_captions", "captions",
+        lambda data: (data.get("content_summary", ""), data.get("tone", "engaging"))
+    ),
+    ("POST", "/content/hashtags"): _content_route(
+        "generate_hashtags", "hashtags",
+        lambda data: (data.get("platform", "all"), data.get("niche", ""))
+    ),
+    ("POST", "/content/thumbnails"): _content_route(
+        "generate_thumbnail_titles", "thumbnails",
+        lambda data: (data.get("video_type", "educational"), data.get("target_emotion", "curiosity"))
+    ),
+}
+
+
+async def _send_json(send, status: int, body, headers: list = (), accept_encoding: str = None):
+    # Same serializer and compression as the Flask routes
+    payload = flask_app.json.dumps(body).encode()
+    headers = list(headers)
+    config = flask_app.config
+    if config["COMPRESS_RESPONSES"] and len(payload) >= config["COMPRESS_MIN_SIZE"]:
+        headers.append((b"vary", b"Accept-Encoding"))
+        encoding = choose_encoding(accept_encoding)
+        if encoding:
+            payload = compress(payload, encoding, config)
+            headers.append((b"content-encoding", encoding.encode()))
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(payload)).encode()),
+            (b"access-control-allow-origin", b"*"),
+            *headers
+        ]
+    })
+    await send({"type": "http.response.body", "body": payload})
+
+
+async def _serve_native(handler, route: str, scope, receive, send):
+    start = time.perf_counter()
+    headers = []
+    token = None
+    try:
+        user_id = _authenticate(scope)
+        token = budget_user_id.set(int(user_id) if str(user_id).isdigit() else None)
+        status, body = 200, await handler(user_id, _json_body(await _read_body(receive)))
+    except HTTPError as e:
+        status, body = e.status, e.body
+    except BudgetExceeded as e:
+        status = 429
+        body = {
+            "success": False,
+            "error": "budget_exceeded",
+            "message": str(e),
+            "service": e.service,
+            "scope": e.scope,
+            "retry_after": e.retry_after
+        }
+        headers.append((b"retry-after", str(e.retry_after).encode()))
+    except Exception as e:
+        print(f"ASGI {route} failed: {e}")
+        status, body = 500, {"success": False, "error": str(e)}
+    finally:
+        if token is not None:
+            budget_user_id.reset(token)
+
+    elapsed = time.perf_counter() - start
+    http_request_duration.observe(elapsed, method=scope["method"], route=route, status=status)
+    headers.append((b"server-timing", f"app;dur={elapsed * 1000:.1f}".encode()))
+    await _send_json(send, status, body, headers, _header(scope, b"accept-encoding"))
+
+
+# ============ WSGI FALLBACK ============
+
+class WSGIBridge:
+    """
+    Serves a WSGI app from ASGI. Requests run on a thread pool, so several
+    can be in flight at once, unlike asgiref's WsgiToAsgi, which runs every
+    request on the same thread. Response bodies are buffered.
+    """
+
+    def __init__(self, wsgi_app, threads: int = WSGI_THREADS):
+        self.wsgi_app = wsgi_app
+        self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="wsgi")
+
+    async def __call__(self, scope, receive, send):
+        body = await _read_body(receive)
+        environ = self._environ(scope, body)
+        status, headers, payload = await asyncio.get_running_loop().run_in_executor(self.pool, self._run, environ)
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": payload})
+
+    def _run(self, environ: dict) -> tuple:
+        started = {}
+
+        def start_response(status, response_headers, exc_info=None):
+            started["status"] = int(status.split(" ", 1)[0])
+            started["headers"] = [
+                (name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in response_headers
+            ]
+
+        iterable = self.wsgi_app(environ, start_response)
+        try:
+            payload = b"".join(iterable)
+        finally:
+            if hasattr(iterable, "close"):
+                iterable.close()
+        return started["status"], started["headers"], payload
+
+    def _environ(self, scope, body: bytes) -> dict:
+        server = scope.get("server") or ("localhost", 80)
+        client = scope.get("client") or ("", 0)
+        environ = {
+            "REQUEST_METHOD": scope["method"],
+            "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+            "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+            "QUERY_STRING": scope["query_string"].decode("latin-1"),
+            "SERVER_NAME": server[0],
+            "SERVER_PORT": str(server[1]),
+            "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+            "REMOTE_ADDR": client[0],
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": scope.get("scheme", "http"),
+            "wsgi.input": io.BytesIO(body),
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": True,
+            "wsgi.run_once": False,
+            "CONTENT_LENGTH": str(len(body))
+        }
+        for key, value in scope["headers"]:
+            name = key.decode("latin-1").upper().replace("-", "_")
+            value = value.decode("latin-1")
+            if name == "CONTENT_TYPE":
+                environ["CONTENT_TYPE"] = value
+            elif name != "CONTENT_LENGTH":
+                name = f"HTTP_{name}"
+                environ[name] = f"{environ[name]},{value}" if name in environ else value
+        return environ
+
+
+wsgi_fallback = WSGIBridge(flask_app)
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                # Hedged and batched LLM calls may outlive their requests
+                await asyncio.to_thread(wait_for_upstreams, LLM_DRAIN_TIMEOUT)
+                await close_http_client()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    if scope["type"] != "http":
+        return
+
+    route = scope["path"]
+    handler = ROUTES.get((scope["method"], route))
+    if handler is None:
+        await wsgi_fallback(scope, receive, send)
+        return
+    await _serve_native(handler, route, scope, receive, send)
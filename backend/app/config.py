@@ -10,4 +10,57 @@ class Config:
     JWT_SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-key")  # Flask-JWT-Extended uses this
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", "sqlite:///app.db")
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
\ No newline at end of file
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Connection pools (see app/utils/database.py). Keep DB_POOL_RECYCLE below the
+    # server's wait_timeout; pre-ping replaces connections the server has closed.
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 30))  # seconds to wait for a connection
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))  # seconds
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+    # Scheduler jobs get a pool of their own (0: they share the request pool)
+    DB_BACKGROUND_POOL_SIZE = int(os.getenv("DB_BACKGROUND_POOL_SIZE", 2))
+    DB_BACKGROUND_MAX_OVERFLOW = int(os.getenv("DB_BACKGROUND_MAX_OVERFLOW", 2))
+    # End read-only transactions before upstream calls so waiting requests don't hold connections
+    DB_RELEASE_BEFORE_UPSTREAM = os.getenv("DB_RELEASE_BEFORE_UPSTREAM", "true").lower() in ("1", "true", "yes")
+
+    # Run the background jobs in this process. Web workers under gunicorn
+    # turn this off; `python -m app.scheduler_main` runs them instead.
+    RUN_SCHEDULER = os.getenv("RUN_SCHEDULER", "true").lower() in ("1", "true", "yes")
+
+    # Create missing tables on startup. Turn off where the schema is managed
+    # by migrations: it saves a round of metadata queries on every boot.
+    AUTO_CREATE_TABLES = os.getenv("AUTO_CREATE_TABLES", "true").lower() in ("1", "true", "yes")
+
+    # Prebuilt OpenAPI spec (python -m app.utils.apispec PATH); empty: built on first request
+    APISPEC_FILE = os.getenv("APISPEC_FILE", "")
+    # Drop the route YAML docstrings once the spec is built (see app/utils/apispec.py)
+    APISPEC_STRIP_DOCSTRINGS = os.getenv("APISPEC_STRIP_DOCSTRINGS", "false").lower() in ("1", "true", "yes")
+
+    # JSON provider for jsonify/get_json: "orjson" or "default" (see app/utils/json_provider.py)
+    JSON_PROVIDER = os.getenv("JSON_PROVIDER", "orjson")
+
+    # Response compression (see app/utils/compression.py); turn off when a proxy in front compresses
+    COMPRESS_RESPONSES = os.getenv("COMPRESS_RESPONSES", "true").lower() in ("1", "true", "yes")
+    COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", 1024))  # bytes
+    COMPRESS_GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", 6))
+    COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", 4))
+
+    # Compressed text columns (see app/models/sql/types.py): codec for new values, "zlib" or "zstd"
+    STORAGE_COMPRESSION_CODEC = os.getenv("STORAGE_COMPRESSION_CODEC", "zlib")
+    STORAGE_COMPRESSION_LEVEL = int(os.getenv("STORAGE_COMPRESSION_LEVEL", 3 if STORAGE_COMPRESSION_CODEC == "zstd" else 6))
+    STORAGE_COMPRESSION_MIN_SIZE = int(os.getenv("STORAGE_COMPRESSION_MIN_SIZE", 256))  # bytes
+
+    # /content/generate returns a package generated for the same request within this
+    # window instead of generating it again (0 turns it off). Scope "global" also
+    # reuses (copies) other users' packages; "user" only the user's own.
+    CONTENT_DEDUPE_WINDOW_MINUTES = int(os.getenv("CONTENT_DEDUPE_WINDOW_MINUTES", 60))
+    CONTENT_DEDUPE_SCOPE = os.getenv("CONTENT_DEDUPE_SCOPE", "user")
+
+    # Bearer token Prometheus sends to scrape /metrics (admins can read it with their JWT);
+    # empty: admins only
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+    # Comma-separated user IDs allowed to request ?profile=1 sample profiles
+    ADMIN_USER_IDS = {uid.strip() for uid in os.getenv("ADMIN_USER_IDS", "").split(",") if uid.strip()}
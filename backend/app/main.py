@@ -19,12 +19,23 @@ from app.api.competitor.routes import competitor_bp
 from app.api.niche.routes import niche_bp
 from app.api.analytics.routes import analytics_bp
 from app.api.collaboration.routes import collaboration_bp
+from app.api.metrics.routes import metrics_bp
+from app.api.usage.routes import usage_bp
 from app.utils.scheduler import init_scheduler
+from app.utils.telemetry import init_telemetry
+from app.services.budget_service import init_budgets
+from app.utils.apispec import init_apispec
+from app.utils.conditional import init_data_versions
+from app.utils.json_provider import init_json
+from app.utils.compression import init_compression
+from app.utils.database import init_database
+from app.models.sql.types import init_storage_compression
 
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
+    init_json(app)
     
     # Enable CORS
     CORS(app, resources={r"/*": {"origins": "*"}})  # ← NEW
@@ -62,10 +73,17 @@ def create_app():
         }
     }
 
-    Swagger(app, config=swagger_config, template=swagger_template)
+    swagger = Swagger(app, config=swagger_config, template=swagger_template)
     # Initialize extensions
+    init_database(app)
     db.init_app(app)
     jwt.init_app(app)
+    # Registered first so it runs last, on the final body (after_request runs in reverse)
+    init_compression(app)
+    init_storage_compression(app)
+    init_telemetry(app)
+    init_budgets(app)
+    init_data_versions(app)
 
     # JWT Error Handlers for debugging
     @jwt.invalid_token_loader
@@ -105,15 +123,22 @@ def create_app():
     app.register_blueprint(niche_bp, url_prefix="/niche")
     app.register_blueprint(analytics_bp, url_prefix="/analytics")
     app.register_blueprint(collaboration_bp, url_prefix="/collaboration")
+    app.register_blueprint(metrics_bp, url_prefix="/metrics")
+    app.register_blueprint(usage_bp, url_prefix="/usage")
 
-    # Initialize Scheduler
-    init_scheduler(app)
+    # Serve /apispec.json precomputed (needs every route registered)
+    init_apispec(app, swagger)
 
-    # Create database tables
-    with app.app_context():
-        # Import all models so they're registered with SQLAlchemy
-        from app.models.sql import user, trend_analysis, skill_path, opinion_analysis, content_script, alert_rule, certificate, calendar_event, competitor, niche, content_performance, creator_profile
-        db.create_all()
+    # Initialize Scheduler (off in web workers, see RUN_SCHEDULER)
+    if app.config["RUN_SCHEDULER"]:
+        init_scheduler(app)
+
+    # Create database tables (unless migrations manage them, see AUTO_CREATE_TABLES)
+    if app.config["AUTO_CREATE_TABLES"]:
+        with app.app_context():
+            # Import all models so they're registered with SQLAlchemy
+            from app.models.sql import user, trend_analysis, skill_path, opinion_analysis, content_script, alert_rule, certificate, calendar_event, competitor, niche, content_performance, creator_profile, upstream_usage, quiz_cache, data_version
+            db.create_all()
 
     return app
 
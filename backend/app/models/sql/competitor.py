@@ -1,5 +1,6 @@
 from app.extensions import db
 from datetime import datetime
+from sqlalchemy.orm import deferred
 import json
 
 
@@ -57,7 +58,8 @@ class Competitor(db.Model):
             "updated_at": self.updated_at.isoformat() if self.updated_at else None
         }
         if include_videos:
-            data["videos"] = [v.to_dict() for v in self.videos.order_by(CompetitorVideo.published_at.desc()).limit(20)]
+            videos = self.videos.order_by(CompetitorVideo.published_at.desc()).limit(20)
+            data["videos"] = [v.to_dict(include_details=False) for v in videos]
         return data
 
     def __repr__(self):
@@ -77,7 +79,7 @@ class CompetitorVideo(db.Model):
     # Video information
     video_id = db.Column(db.String(100), nullable=False)
     title = db.Column(db.String(500), nullable=False)
-    description = db.Column(db.Text, nullable=True)
+    description = deferred(db.Column(db.Text, nullable=True), group="details")
     thumbnail_url = db.Column(db.String(500), nullable=True)
     video_url = db.Column(db.String(500), nullable=True)
     duration = db.Column(db.String(50), nullable=True)
@@ -92,20 +94,22 @@ class CompetitorVideo(db.Model):
     
     # AI Analysis
     viral_score = db.Column(db.Integer, default=0)  # 0-100
-    ai_analysis = db.Column(db.Text, nullable=True)  # JSON - why this went viral
+    ai_analysis = deferred(db.Column(db.Text, nullable=True), group="details")  # JSON - why this went viral
     
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    def to_dict(self):
-        """Convert model to dictionary for API responses."""
-        return {
+    def to_dict(self, include_details=True):
+        """
+        Convert model to dictionary for API responses.
+        include_details adds the description and AI analysis (deferred, query with undefer_group("details")).
+        """
+        data = {
             "id": self.id,
             "competitor_id": self.competitor_id,
             "video_id": self.video_id,
             "title": self.title,
-            "description": self.description[:200] if self.description else None,
             "thumbnail_url": self.thumbnail_url,
             "video_url": self.video_url,
             "duration": self.duration,
@@ -116,9 +120,12 @@ class CompetitorVideo(db.Model):
             "shares": self.shares,
             "engagement_rate": round(self.engagement_rate, 2),
             "viral_score": self.viral_score,
-            "ai_analysis": json.loads(self.ai_analysis) if self.ai_analysis else None,
             "created_at": self.created_at.isoformat() if self.created_at else None
         }
+        if include_details:
+            data["description"] = self.description[:200] if self.description else None
+            data["ai_analysis"] = json.loads(self.ai_analysis) if self.ai_analysis else None
+        return data
 
     def set_ai_analysis(self, analysis_dict):
         """Set AI analysis from dictionary."""
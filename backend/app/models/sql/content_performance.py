@@ -1,5 +1,7 @@
 from app.extensions import db
 from datetime import datetime
+from sqlalchemy import exc, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
 import json
 
 
@@ -164,6 +166,8 @@ class ABTest(db.Model):
     # Relationships
     content_a = db.relationship("ContentPerformance", foreign_keys=[content_a_id])
     content_b = db.relationship("ContentPerformance", foreign_keys=[content_b_id])
+    variants = db.relationship("ABTestVariant", backref="ab_test", order_by="ABTestVariant.id",
+                               cascade="all, delete-orphan")
 
     def to_dict(self):
         """Convert model to dictionary for API responses."""
@@ -177,6 +181,7 @@ class ABTest(db.Model):
             "content_b_id": self.content_b_id,
             "content_a": self.content_a.to_dict() if self.content_a else None,
             "content_b": self.content_b.to_dict() if self.content_b else None,
+            "variants": [v.to_dict() for v in self.variants],
             "winner": self.winner,
             "confidence_level": round(self.confidence_level, 2) if self.confidence_level else None,
             "results_summary": json.loads(self.results_summary) if self.results_summary else None,
@@ -190,5 +195,154 @@ class ABTest(db.Model):
         """Set results summary from dictionary."""
         self.results_summary = json.dumps(results) if results else None
 
+    def get_variant_contents(self) -> list:
+        """
+        Get (label, ContentPerformance) pairs for every variant in the test.
+        Tests created before variants existed fall back to content A and B.
+        """
+        if self.variants:
+            return [(v.label, v.content) for v in self.variants]
+        return [(label, content) for label, content in (("A", self.content_a), ("B", self.content_b)) if content]
+
     def __repr__(self):
         return f"<ABTest {self.id}: {self.test_name}>"
+
+
+class ABTestVariant(db.Model):
+    """
+    A single arm of an A/B/n test. Variant "A" is the control.
+    """
+    __tablename__ = "ab_test_variants"
+
+    id = db.Column(db.Integer, primary_key=True)
+    ab_test_id = db.Column(db.Integer, db.ForeignKey("ab_tests.id", ondelete="CASCADE"), nullable=False, index=True)
+    content_performance_id = db.Column(db.Integer, db.ForeignKey("content_performances.id"), nullable=False)
+    label = db.Column(db.String(10), nullable=False)  # A, B, C, ...
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Relationships
+    content = db.relationship("ContentPerformance")
+
+    @staticmethod
+    def label_for(index: int) -> str:
+        """Get the variant label for a zero-based position (A, B, ..., Z, AA, AB, ...)."""
+        label = ""
+        index += 1
+        while index:
+            index, remainder = divmod(index - 1, 26)
+            label = chr(ord("A") + remainder) + label
+        return label
+
+    def to_dict(self):
+        """Convert model to dictionary for API responses."""
+        return {
+            "id": self.id,
+            "label": self.label,
+            "content_performance_id": self.content_performance_id,
+            "content": self.content.to_dict() if self.content else None
+        }
+
+    def __repr__(self):
+        return f"<ABTestVariant {self.ab_test_id}/{self.label}>"
+
+
+class ContentPerformanceDaily(db.Model):
+    """
+    Pre-aggregated daily rollup of content performance.
+    One row per user, day, platform, suggestion type and suggestion usage, kept
+    in sync by AnalyticsService so analytics reads scale with days, not content.
+    """
+    __tablename__ = "content_performance_daily"
+    __table_args__ = (
+        db.UniqueConstraint(
+            "user_id", "day", "platform", "suggestion_type", "used_platform_suggestion",
+            name="uq_content_performance_daily_bucket"
+        ),
+        db.Index("ix_content_performance_daily_user_day", "user_id", "day"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    day = db.Column(db.Date, nullable=False)
+
+    # Rollup dimensions
+    platform = db.Column(db.String(50), nullable=False, default="youtube")
+    suggestion_type = db.Column(db.String(100), nullable=False, default="none")  # "none" when not set
+    used_platform_suggestion = db.Column(db.Boolean, nullable=False, default=False)
+
+    # Aggregates
+    content_count = db.Column(db.Integer, default=0)
+    total_views = db.Column(db.BigInteger, default=0)
+    total_likes = db.Column(db.BigInteger, default=0)
+    total_comments = db.Column(db.BigInteger, default=0)
+    total_revenue = db.Column(db.Float, default=0.0)
+    total_engagement = db.Column(db.Float, default=0.0)  # Sum of engagement_rate, divide by content_count for avg
+
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @staticmethod
+    def bucket_for(performance) -> dict:
+        """Get the rollup bucket key a ContentPerformance row belongs to."""
+        created_at = performance.created_at or datetime.utcnow()
+        return {
+            "user_id": performance.user_id,
+            "day": created_at.date(),
+            "platform": performance.platform or "youtube",
+            "suggestion_type": performance.suggestion_type or "none",
+            "used_platform_suggestion": bool(performance.used_platform_suggestion)
+        }
+
+    @staticmethod
+    def contribution_of(performance) -> dict:
+        """Get the values a ContentPerformance row adds to its rollup bucket."""
+        return {
+            "content_count": 1,
+            "total_views": performance.views or 0,
+            "total_likes": performance.likes or 0,
+            "total_comments": performance.comments or 0,
+            "total_revenue": performance.estimated_revenue or 0.0,
+            "total_engagement": performance.engagement_rate or 0.0
+        }
+
+    @classmethod
+    def apply(cls, connection, bucket: dict, contribution: dict, sign: int = 1):
+        """
+        Add (or with sign=-1, remove) a row's contribution to a bucket,
+        creating the bucket row if needed. A single upsert adding to the
+        stored totals, so concurrent tracking neither loses updates nor
+        fails inserting the same new bucket.
+        """
+        table = cls.__table__
+        now = datetime.utcnow()
+        deltas = {field: sign * value for field, value in contribution.items()}
+        row = {**bucket, **deltas, "updated_at": now}
+        dialect = connection.dialect.name
+
+        if dialect == "mysql":
+            statement = mysql.insert(table).values(row)
+            connection.execute(statement.on_duplicate_key_update(
+                updated_at=now, **{field: table.c[field] + delta for field, delta in deltas.items()}
+            ))
+        elif dialect in ("postgresql", "sqlite"):
+            statement = (postgresql if dialect == "postgresql" else sqlite).insert(table).values(row)
+            connection.execute(statement.on_conflict_do_update(
+                index_elements=[table.c[key] for key in bucket],
+                set_={"updated_at": now, **{field: table.c[field] + delta for field, delta in deltas.items()}}
+            ))
+        else:
+            where = [table.c[key] == value for key, value in bucket.items()]
+            increment = update(table).where(*where).values(
+                updated_at=now, **{field: table.c[field] + delta for field, delta in deltas.items()}
+            )
+            if connection.execute(increment).rowcount:
+                return
+            try:
+                with connection.begin_nested():
+                    connection.execute(table.insert().values(row))
+            except exc.IntegrityError:
+                # Another transaction created the bucket first
+                connection.execute(increment)
+
+    def __repr__(self):
+        return f"<ContentPerformanceDaily {self.user_id} {self.day} {self.platform}/{self.suggestion_type}>"
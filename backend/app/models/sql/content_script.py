@@ -1,5 +1,7 @@
 from app.extensions import db
 from datetime import datetime
+from sqlalchemy.orm import deferred, load_only
+from app.models.sql.types import CompressedText
 import json
 
 
@@ -9,6 +11,10 @@ class ContentScript(db.Model):
     Tracks user content history for the AI Content Script Generator feature.
     """
     __tablename__ = "content_scripts"
+    __table_args__ = (
+        # Recent packages for the same request (see app/repositories/content_repository.py)
+        db.Index("ix_content_scripts_fingerprint_created", "request_fingerprint", "created_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, nullable=False, index=True)
@@ -19,13 +25,15 @@ class ContentScript(db.Model):
     content_style = db.Column(db.String(50), default="engaging")
     duration = db.Column(db.Integer, default=60)  # Video duration in seconds
     niche = db.Column(db.String(255), nullable=True)
+    request_fingerprint = db.Column(db.String(64), nullable=True)  # sha256 of the canonical request
     
-    # Generated content (stored as JSON text for flexibility)
-    hooks = db.Column(db.Text, nullable=True)  # JSON string
-    full_script = db.Column(db.Text, nullable=True)  # JSON string
-    captions = db.Column(db.Text, nullable=True)  # JSON string
-    hashtags = db.Column(db.Text, nullable=True)  # JSON string
-    thumbnail_titles = db.Column(db.Text, nullable=True)  # JSON string
+    # Generated content (stored as compressed JSON text for flexibility).
+    # Deferred: loaded only by queries with undefer_group("generated")
+    hooks = deferred(db.Column(CompressedText, nullable=True), group="generated")  # JSON string
+    full_script = deferred(db.Column(CompressedText, nullable=True), group="generated")  # JSON string
+    captions = deferred(db.Column(CompressedText, nullable=True), group="generated")  # JSON string
+    hashtags = deferred(db.Column(CompressedText, nullable=True), group="generated")  # JSON string
+    thumbnail_titles = deferred(db.Column(CompressedText, nullable=True), group="generated")  # JSON string
     
     # Status tracking
     generation_status = db.Column(db.String(50), default="completed")  # pending, completed, failed
@@ -35,8 +43,27 @@ class ContentScript(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    @classmethod
+    def summary_query(cls):
+        """Query loading only the columns to_summary_dict() reads."""
+        return cls.query.options(load_only(
+            cls.id, cls.topic, cls.platform, cls.content_style, cls.duration, cls.generation_status, cls.created_at
+        ))
+
+    def to_summary_dict(self):
+        """History list entry, without the generated content."""
+        return {
+            "id": self.id,
+            "topic": self.topic,
+            "platform": self.platform,
+            "content_style": self.content_style,
+            "duration": self.duration,
+            "generation_status": self.generation_status,
+            "created_at": self.created_at.isoformat() if self.created_at else None
+        }
+
     def to_dict(self):
-        """Convert model to dictionary for API responses."""
+        """Convert model to dictionary for API responses (query with undefer_group("generated"))."""
         return {
             "id": self.id,
             "user_id": self.user_id,
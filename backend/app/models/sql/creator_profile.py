@@ -20,16 +20,16 @@ class CreatorProfile(db.Model):
     
     # Niche & Content
     niche = db.Column(db.String(100), nullable=False)  # Primary niche
-    sub_niches = db.Column(db.Text, nullable=True)  # JSON array
+    sub_niches = db.Column(db.JSON, nullable=True)  # ["tech reviews", "gadgets"]
     content_style = db.Column(db.String(50), nullable=True)  # educational, entertainment, vlogs, etc.
     
     # Audience
     audience_size = db.Column(db.Integer, default=0)  # Total followers across platforms
-    platforms = db.Column(db.Text, nullable=True)  # JSON: {"youtube": 10000, "tiktok": 5000}
+    platforms = db.Column(db.JSON, nullable=True)  # {"youtube": 10000, "tiktok": 5000}
     
     # Collaboration Preferences
     is_open_to_collabs = db.Column(db.Boolean, default=True)
-    collab_interests = db.Column(db.Text, nullable=True)  # JSON array of collab types
+    collab_interests = db.Column(db.JSON, nullable=True)  # Array of collab types
     preferred_min_audience = db.Column(db.Integer, default=0)
     preferred_max_audience = db.Column(db.Integer, nullable=True)
     
@@ -40,47 +40,87 @@ class CreatorProfile(db.Model):
     # Relationships
     sent_requests = db.relationship("CollabRequest", foreign_keys="CollabRequest.sender_id", backref="sender", lazy="dynamic")
     received_requests = db.relationship("CollabRequest", foreign_keys="CollabRequest.receiver_id", backref="receiver", lazy="dynamic")
+    
+    # Normalized copies of niche/sub_niches and platforms for indexed SQL filtering
+    niche_terms = db.relationship("CreatorSubNiche", backref="profile", cascade="all, delete-orphan")
+    platform_entries = db.relationship("CreatorPlatform", backref="profile", cascade="all, delete-orphan")
+
+    @staticmethod
+    def _json_value(value, default):
+        """
+        Return a JSON column value as a Python object.
+        The JSON type decodes values once when the row is loaded; rows written
+        before the column was converted may still hold an encoded string.
+        """
+        if isinstance(value, str):
+            try:
+                value = json.loads(value)
+            except ValueError:
+                return default
+        return value if isinstance(value, type(default)) else default
 
     def get_sub_niches(self) -> list:
         """Get sub-niches as a list."""
-        if self.sub_niches:
-            try:
-                return json.loads(self.sub_niches)
-            except:
-                return []
-        return []
+        return self._json_value(self.sub_niches, [])
 
     def set_sub_niches(self, niches: list):
-        """Set sub-niches from a list."""
-        self.sub_niches = json.dumps(niches)
+        """Set sub-niches from a list (None clears them)."""
+        self.sub_niches = list(niches or [])
 
     def get_platforms(self) -> dict:
         """Get platforms as a dict."""
-        if self.platforms:
-            try:
-                return json.loads(self.platforms)
-            except:
-                return {}
-        return {}
+        return self._json_value(self.platforms, {})
 
     def set_platforms(self, platforms: dict):
-        """Set platforms from a dict."""
-        self.platforms = json.dumps(platforms)
+        """Set platforms from a dict (None clears them)."""
+        self.platforms = dict(platforms or {})
         # Update total audience size
-        self.audience_size = sum(platforms.values())
+        self.audience_size = sum(self.platforms.values())
 
     def get_collab_interests(self) -> list:
         """Get collaboration interests as a list."""
-        if self.collab_interests:
-            try:
-                return json.loads(self.collab_interests)
-            except:
-                return []
-        return []
+        return self._json_value(self.collab_interests, [])
 
     def set_collab_interests(self, interests: list):
-        """Set collaboration interests from a list."""
-        self.collab_interests = json.dumps(interests)
+        """Set collaboration interests from a list (None clears them)."""
+        self.collab_interests = list(interests or [])
+
+    def sync_lookup_tables(self):
+        """
+        Bring the creator_sub_niches and creator_platforms rows in line with
+        niche, sub_niches and platforms. Call once after changing them.
+        """
+        self._sync_niche_terms()
+        self._sync_platforms()
+
+    def _sync_niche_terms(self):
+        """
+        Keep creator_sub_niches in step with niche + sub_niches.
+        Existing rows are reused so unchanged terms are not deleted and re-inserted.
+        """
+        terms = {}
+        if self.niche:
+            terms[self.niche.lower()] = True
+        for name in self.get_sub_niches():
+            terms.setdefault(str(name).lower(), False)
+        
+        existing = {term.name: term for term in self.niche_terms}
+        synced = []
+        for name, is_primary in terms.items():
+            term = existing.get(name) or CreatorSubNiche(name=name)
+            term.is_primary = is_primary
+            synced.append(term)
+        self.niche_terms = synced
+
+    def _sync_platforms(self):
+        """Keep creator_platforms in step with platforms."""
+        existing = {entry.platform: entry for entry in self.platform_entries}
+        synced = []
+        for platform, followers in self.get_platforms().items():
+            entry = existing.get(platform) or CreatorPlatform(platform=platform)
+            entry.followers = followers or 0
+            synced.append(entry)
+        self.platform_entries = synced
 
     def to_dict(self, include_contact: bool = False) -> dict:
         """Convert to dictionary for API response."""
@@ -105,6 +145,38 @@ class CreatorProfile(db.Model):
         return data
 
 
+class CreatorSubNiche(db.Model):
+    """
+    One lowercased niche term of a creator profile (the primary niche or a sub-niche).
+    Maintained by CreatorProfile.sync_lookup_tables so niche overlap can be queried with an index.
+    """
+    __tablename__ = "creator_sub_niches"
+    __table_args__ = (
+        db.UniqueConstraint("profile_id", "name", name="uq_creator_sub_niche"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    profile_id = db.Column(db.Integer, db.ForeignKey("creator_profiles.id", ondelete="CASCADE"), nullable=False, index=True)
+    name = db.Column(db.String(100), nullable=False, index=True)  # Lowercased
+    is_primary = db.Column(db.Boolean, default=False)
+
+
+class CreatorPlatform(db.Model):
+    """
+    One platform a creator is on, with its follower count.
+    Maintained by CreatorProfile.sync_lookup_tables so platform filters can use an index.
+    """
+    __tablename__ = "creator_platforms"
+    __table_args__ = (
+        db.UniqueConstraint("profile_id", "platform", name="uq_creator_platform"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    profile_id = db.Column(db.Integer, db.ForeignKey("creator_profiles.id", ondelete="CASCADE"), nullable=False, index=True)
+    platform = db.Column(db.String(50), nullable=False, index=True)
+    followers = db.Column(db.Integer, default=0)
+
+
 class CollabRequest(db.Model):
     """
     Collaboration request between creators.
@@ -173,3 +245,50 @@ class CollabRequest(db.Model):
         if self.expires_at and datetime.utcnow() > self.expires_at:
             return True
         return False
+
+
+class CollabMatchList(db.Model):
+    """
+    Cached top-N collaboration matches for a user.
+    Marked stale when the user's profile or a listed candidate changes,
+    and refreshed on demand or by the background job.
+    """
+    __tablename__ = "collab_match_lists"
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), unique=True, nullable=False)
+    is_stale = db.Column(db.Boolean, default=False, index=True)
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    # Relationships
+    entries = db.relationship("CollabMatchEntry", backref="match_list", order_by="CollabMatchEntry.rank",
+                              cascade="all, delete-orphan")
+
+    def is_expired(self, max_age) -> bool:
+        """Check if the list is stale or older than max_age (a timedelta)."""
+        return self.is_stale or not self.computed_at or datetime.utcnow() - self.computed_at > max_age
+
+
+class CollabMatchEntry(db.Model):
+    """
+    One ranked match in a cached match list.
+    Indexed by profile so lists containing a changed profile can be invalidated.
+    """
+    __tablename__ = "collab_match_entries"
+
+    id = db.Column(db.Integer, primary_key=True)
+    match_list_id = db.Column(db.Integer, db.ForeignKey("collab_match_lists.id", ondelete="CASCADE"), nullable=False, index=True)
+    profile_id = db.Column(db.Integer, db.ForeignKey("creator_profiles.id", ondelete="CASCADE"), nullable=False, index=True)
+    rank = db.Column(db.Integer, nullable=False)
+
+    match_score = db.Column(db.Float, nullable=False)
+    score_breakdown = db.Column(db.Text, nullable=True)  # JSON
+    compatibility_level = db.Column(db.String(50), nullable=True)
+
+    def get_score_breakdown(self) -> dict:
+        """Get the score breakdown as a dict."""
+        return json.loads(self.score_breakdown) if self.score_breakdown else {}
+
+    def set_score_breakdown(self, breakdown: dict):
+        """Set the score breakdown from a dict."""
+        self.score_breakdown = json.dumps(breakdown)
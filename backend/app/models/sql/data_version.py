@@ -0,0 +1,16 @@
+from datetime import datetime
+from app.extensions import db
+
+
+class DataVersion(db.Model):
+    """
+    A counter per user and data scope ("content", "calendar", ...), bumped in
+    the same transaction as every write to that user's rows in the scope.
+    Read endpoints derive their ETag from it (see app/utils/conditional.py).
+    """
+    __tablename__ = "data_versions"
+
+    user_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    scope = db.Column(db.String(30), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=1)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)  # UTC, for Last-Modified
@@ -1,5 +1,7 @@
 from app.extensions import db
 from datetime import datetime
+from sqlalchemy.orm import deferred
+from app.models.sql.types import CompressedText
 import json
 
 
@@ -34,16 +36,16 @@ class Niche(db.Model):
     related_niches = db.Column(db.Text, nullable=True)  # JSON array of related niches
     keywords = db.Column(db.Text, nullable=True)  # JSON array of relevant keywords
     
-    # AI Analysis
-    ai_analysis = db.Column(db.Text, nullable=True)  # JSON - detailed AI analysis
+    # AI Analysis (deferred: loaded only by queries with undefer_group("analysis"))
+    ai_analysis = deferred(db.Column(CompressedText, nullable=True), group="analysis")  # JSON - detailed AI analysis
     
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    def to_dict(self):
-        """Convert model to dictionary for API responses."""
-        return {
+    def to_dict(self, include_analysis=True):
+        """Convert model to dictionary for API responses; history lists leave out the AI analysis."""
+        data = {
             "id": self.id,
             "user_id": self.user_id,
             "niche_name": self.niche_name,
@@ -59,10 +61,12 @@ class Niche(db.Model):
             "micro_niches": json.loads(self.micro_niches) if self.micro_niches else [],
             "related_niches": json.loads(self.related_niches) if self.related_niches else [],
             "keywords": json.loads(self.keywords) if self.keywords else [],
-            "ai_analysis": json.loads(self.ai_analysis) if self.ai_analysis else None,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None
         }
+        if include_analysis:
+            data["ai_analysis"] = json.loads(self.ai_analysis) if self.ai_analysis else None
+        return data
 
     def set_example_channels(self, channels):
         """Set example channels from list."""
@@ -0,0 +1,19 @@
+from datetime import datetime
+from app.extensions import db
+
+
+class QuizCache(db.Model):
+    """
+    Generated quizzes keyed by normalised video title, shared across users
+    so popular tutorials reuse the quiz generated for the first learner.
+    """
+    __tablename__ = "quiz_cache"
+
+    id = db.Column(db.Integer, primary_key=True)
+    title_key = db.Column(db.String(255), nullable=False, unique=True, index=True)
+    topic = db.Column(db.String(500), nullable=False)  # The title the quiz was generated for
+    quiz = db.Column(db.Text, nullable=False)  # stored as JSON string
+    hits = db.Column(db.Integer, default=0)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    last_used_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -1,4 +1,5 @@
 from app.extensions import db
+from app.models.sql.types import CompressedText
 from datetime import datetime
 
 class TrendAnalysis(db.Model):
@@ -6,6 +7,6 @@ class TrendAnalysis(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     topic = db.Column(db.String(255), nullable=False)
-    summary = db.Column(db.Text, nullable=True)
+    summary = db.Column(CompressedText, nullable=True)
     user_id = db.Column(db.Integer, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -0,0 +1,129 @@
+"""
+Column types shared by the models.
+
+CompressedText stores a str compressed in a binary column (MEDIUMBLOB on
+MySQL, BYTEA on PostgreSQL, BLOB on SQLite); models read and write plain
+strings. Each value starts with a version byte naming its encoding:
+
+    0x00  stored as is (UTF-8): values under STORAGE_COMPRESSION_MIN_SIZE,
+          or that don't get smaller
+    0x01  zlib
+    0x02  zstd (pip install zstandard)
+
+STORAGE_COMPRESSION_CODEC picks the codec for new values ("zlib", or
+"zstd"); values are read by their version byte whatever the setting, so
+switching only affects new writes (zstd values need zstandard installed
+wherever they are read). zstandard is optional: init_storage_compression
+checks the codec at startup and falls back to zlib, with a warning, when
+it is unknown or zstandard can't be imported.
+
+Values written before a column was converted are read as plain text:
+legacy TEXT values converted to a binary column start with a printable
+character, never one of the version bytes, and SQLite returns unconverted
+values as str. compress_stored_content.py converts the columns and
+rewrites those rows.
+"""
+import os
+import zlib
+from sqlalchemy import LargeBinary
+from sqlalchemy.dialects import mysql
+from sqlalchemy.types import TypeDecorator
+from app.config import Config
+
+STORED = 0x00
+ZLIB = 0x01
+ZSTD = 0x02
+
+VERSION_BYTES = (STORED, ZLIB, ZSTD)
+
+_zstd = {}
+
+
+def _zstandard():
+    # Imported on first use: only needed when zstd values are written or read
+    if "module" not in _zstd:
+        import zstandard
+        _zstd["module"] = zstandard
+        _zstd["compressor"] = zstandard.ZstdCompressor(level=Config.STORAGE_COMPRESSION_LEVEL)
+        _zstd["decompressor"] = zstandard.ZstdDecompressor()
+    return _zstd
+
+
+def init_storage_compression(app):
+    """Check STORAGE_COMPRESSION_CODEC, falling back to zlib when it can't be used."""
+    codec = app.config.get("STORAGE_COMPRESSION_CODEC")
+    if codec == "zlib":
+        return
+    if codec == "zstd":
+        try:
+            _zstandard()
+            return
+        except ImportError:
+            reason = "zstandard is not installed"
+        except Exception as e:  # e.g. a level zstd doesn't support
+            reason = f"zstd can't be used ({e})"
+    else:
+        reason = "it is not a known codec"
+
+    # zstd's default level is 3; zlib's is 6, and zlib only has levels 0-9
+    level = Config.STORAGE_COMPRESSION_LEVEL if os.getenv("STORAGE_COMPRESSION_LEVEL") else 6
+    level = min(max(level, 0), 9)
+    print(f"STORAGE_COMPRESSION_CODEC={codec} but {reason}; compressing with zlib (level {level})")
+    Config.STORAGE_COMPRESSION_CODEC = app.config["STORAGE_COMPRESSION_CODEC"] = "zlib"
+    Config.STORAGE_COMPRESSION_LEVEL = app.config["STORAGE_COMPRESSION_LEVEL"] = level
+
+
+def compress_text(text: str, codec: str = None) -> bytes:
+    data = text.encode("utf-8")
+    if len(data) >= Config.STORAGE_COMPRESSION_MIN_SIZE:
+        codec = codec or Config.STORAGE_COMPRESSION_CODEC
+        if codec == "zstd":
+            packed = bytes([ZSTD]) + _zstandard()["compressor"].compress(data)
+        else:
+            packed = bytes([ZLIB]) + zlib.compress(data, Config.STORAGE_COMPRESSION_LEVEL)
+        if len(packed) < len(data):
+            return packed
+    return bytes([STORED]) + data
+
+
+def decompress_text(value) -> str:
+    if isinstance(value, str):  # Not converted yet (SQLite keeps the old TEXT value)
+        return value
+    value = bytes(value)  # memoryview on PostgreSQL
+    if not value:
+        return ""
+    version, payload = value[0], value[1:]
+    if version == STORED:
+        return payload.decode("utf-8")
+    if version == ZLIB:
+        return zlib.decompress(payload).decode("utf-8")
+    if version == ZSTD:
+        return _zstandard()["decompressor"].decompress(payload).decode("utf-8")
+    return value.decode("utf-8")  # Legacy TEXT value converted to binary
+
+
+def is_compressed_format(value) -> bool:
+    """Whether a raw column value is already in CompressedText's format."""
+    return isinstance(value, (bytes, bytearray, memoryview)) and len(value) > 0 and value[0] in VERSION_BYTES
+
+
+class CompressedText(TypeDecorator):
+    """Text stored compressed in a binary column (see the module docstring)."""
+    impl = LargeBinary
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "mysql":
+            # BLOB tops out at 64KB like the TEXT columns it replaces; a value stored as is takes a byte more
+            return dialect.type_descriptor(mysql.MEDIUMBLOB())
+        return dialect.type_descriptor(LargeBinary())
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return compress_text(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return decompress_text(value)
@@ -0,0 +1,28 @@
+from datetime import datetime
+from app.extensions import db
+
+
+class UpstreamUsage(db.Model):
+    """
+    Upstream API consumption per user, service and hour.
+    Units are YouTube Data API quota units or LLM tokens, depending on the service.
+    User 0 is the system (background jobs); global usage is the sum over all users.
+    """
+    __tablename__ = "upstream_usage"
+    __table_args__ = (
+        db.UniqueConstraint("hour", "user_id", "service", name="uq_upstream_usage_hour"),
+        db.Index("ix_upstream_usage_user_hour", "user_id", "hour"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    hour = db.Column(db.DateTime, nullable=False, index=True)  # UTC, truncated to the hour
+    user_id = db.Column(db.Integer, nullable=False, default=0)
+    service = db.Column(db.String(30), nullable=False)  # youtube, groq, gemini
+
+    calls = db.Column(db.Integer, default=0)
+    units = db.Column(db.BigInteger, default=0)
+    degraded_calls = db.Column(db.Integer, default=0)  # Served with reduced output or from stale cache
+    rejected_calls = db.Column(db.Integer, default=0)  # Refused by admission control
+
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
@@ -0,0 +1,46 @@
+from datetime import datetime
+from sqlalchemy import case
+from sqlalchemy.orm import undefer_group
+from app.models.sql.content_script import ContentScript
+from app.extensions import db
+
+class ContentRepository:
+
+    def find_recent(self, fingerprint: str, since: datetime, user_id, any_user: bool = False):
+        """
+        Newest completed package with this request fingerprint created since
+        `since`: the user's own, or with any_user also another user's (own
+        packages first).
+        """
+        query = ContentScript.query.options(undefer_group("generated")).filter(
+            ContentScript.request_fingerprint == fingerprint,
+            ContentScript.created_at >= since,
+            ContentScript.generation_status == "completed"
+        )
+        if any_user:
+            query = query.order_by(case((ContentScript.user_id == user_id, 0), else_=1), ContentScript.created_at.desc())
+        else:
+            query = query.filter(ContentScript.user_id == user_id).order_by(ContentScript.created_at.desc())
+        return query.first()
+
+    def clone(self, content: ContentScript, user_id) -> ContentScript:
+        """Copy another user's package into the user's history."""
+        copy = ContentScript(
+            user_id=user_id,
+            topic=content.topic,
+            platform=content.platform,
+            content_style=content.content_style,
+            duration=content.duration,
+            niche=content.niche,
+            request_fingerprint=content.request_fingerprint,
+            hooks=content.hooks,
+            full_script=content.full_script,
+            captions=content.captions,
+            hashtags=content.hashtags,
+            thumbnail_titles=content.thumbnail_titles,
+            generation_status="completed",
+            created_at=content.created_at  # When it was generated, so clones don't extend the dedupe window
+        )
+        db.session.add(copy)
+        db.session.commit()
+        return copy
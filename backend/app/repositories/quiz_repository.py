@@ -0,0 +1,55 @@
+import json
+from datetime import datetime, timedelta
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
+from app.models.sql.quiz_cache import QuizCache
+from app.extensions import db
+from app.utils.database import current_engine
+
+class QuizRepository:
+
+    def get_many(self, title_keys: list, max_age_days: int) -> dict:
+        """Cached quizzes younger than max_age_days, by title key; counts a hit for each."""
+        if not title_keys:
+            return {}
+        cutoff = datetime.utcnow() - timedelta(days=max_age_days)
+        rows = QuizCache.query.filter(
+            QuizCache.title_key.in_(title_keys),
+            QuizCache.created_at >= cutoff
+        ).all()
+        quizzes = {row.title_key: json.loads(row.quiz) for row in rows}
+        if quizzes:
+            self._count_hits(sorted(quizzes))
+        return quizzes
+
+    def _count_hits(self, title_keys: list):
+        """
+        One UPDATE on a connection of its own: the caller's session isn't
+        committed (expiring its objects), and popular rows are locked only
+        for the statement. Hit counts are best effort.
+        """
+        try:
+            with current_engine().begin() as conn:
+                conn.execute(
+                    update(QuizCache.__table__)
+                    .where(QuizCache.__table__.c.title_key.in_(title_keys))
+                    .values(hits=func.coalesce(QuizCache.__table__.c.hits, 0) + 1, last_used_at=datetime.utcnow())
+                )
+        except Exception as e:
+            print(f"Quiz cache hit count failed: {e}")
+
+    def save(self, title_key: str, topic: str, quiz: dict):
+        """Insert or replace the cached quiz for a title key."""
+        row = QuizCache.query.filter_by(title_key=title_key).first()
+        if row is None:
+            row = QuizCache(title_key=title_key)
+            db.session.add(row)
+        row.topic = topic[:500]
+        row.quiz = json.dumps(quiz)
+        row.created_at = datetime.utcnow()
+        row.last_used_at = row.created_at
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Another request cached the same title first; its quiz is as good as ours
+            db.session.rollback()
@@ -0,0 +1,42 @@
+"""
+Background job process:
+
+    python -m app.scheduler_main
+
+Runs the APScheduler jobs (trend alerts, A/B test evaluation, collaboration
+match refresh) in one process of their own, so they don't run once per web
+worker. Web workers start with RUN_SCHEDULER=false (see gunicorn.conf.py).
+
+On SIGTERM/SIGINT the scheduler stops taking new runs, waits for the
+running jobs and then for any upstream call still in flight.
+"""
+import os
+import signal
+import threading
+from app.main import create_app
+from app.utils.scheduler import init_scheduler, scheduler
+from app.utils.telemetry import wait_for_upstreams
+
+DRAIN_TIMEOUT = float(os.getenv("LLM_DRAIN_TIMEOUT", 30))
+
+
+def main():
+    app = create_app()
+    if not app.config["RUN_SCHEDULER"]:
+        init_scheduler(app)
+
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopping.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: stopping.set())
+    print(f"Scheduler running jobs: {', '.join(job.id for job in scheduler.get_jobs())}")
+
+    stopping.wait()
+    print("Scheduler stopping, waiting for running jobs...")
+    scheduler.shutdown(wait=True)
+    remaining = wait_for_upstreams(DRAIN_TIMEOUT)
+    if remaining:
+        print(f"Scheduler exiting with {remaining} upstream calls still in flight")
+
+
+if __name__ == "__main__":
+    main()
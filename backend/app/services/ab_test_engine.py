@@ -0,0 +1,187 @@
+from datetime import datetime
+import numpy as np
+from app.utils.lazy import lazy_attr
+
+ndtr = lazy_attr("scipy.special", "ndtr")
+
+
+class ABTestEngine:
+    """
+    Vectorized A/B/n test evaluation.
+
+    Each variant's engagement is modelled as a binomial proportion
+    (engagements out of views). Every challenger is compared with the control
+    (variant A) using a two-proportion z-test, and a Beta-Binomial posterior
+    gives the probability that each variant is the best. All tests in a batch
+    are padded into (tests, variants) arrays and evaluated together.
+    """
+
+    SIGNIFICANCE_LEVEL = 0.05
+    WIN_PROBABILITY_THRESHOLD = 0.95
+    MIN_VIEWS_PER_VARIANT = 1000
+    POSTERIOR_SAMPLES = 20000
+    MAX_SAMPLES_PER_CHUNK = 4_000_000  # Bounds memory used by posterior draws
+    RANDOM_SEED = 42
+
+    def evaluate(self, tests: list) -> dict:
+        """
+        Evaluate a batch of tests in one vectorized pass.
+
+        Args:
+            tests: List of ABTest models
+
+        Returns:
+            Dict of test ID to evaluation result (see _summarize); tests with
+            fewer than two variants get an insufficient-data result
+        """
+        results = {}
+        entries = []
+        for test in tests:
+            variants = test.get_variant_contents()
+            if len(variants) >= 2:
+                entries.append((test, variants))
+            else:
+                results[test.id] = self._insufficient_variants([label for label, _ in variants])
+        if not entries:
+            return results
+
+        num_tests = len(entries)
+        num_variants = max(len(variants) for _, variants in entries)
+
+        views = np.zeros((num_tests, num_variants), dtype=np.int64)
+        engagements = np.zeros((num_tests, num_variants), dtype=np.int64)
+        present = np.zeros((num_tests, num_variants), dtype=bool)
+
+        for t, (_, variants) in enumerate(entries):
+            for v, (_, content) in enumerate(variants):
+                views[t, v] = content.views or 0
+                engagements[t, v] = (content.likes or 0) + (content.comments or 0) + (content.shares or 0)
+                present[t, v] = True
+
+        # An engagement rate above 100% is not a valid proportion
+        engagements = np.minimum(engagements, views)
+
+        z_scores, p_values = self._z_test_against_control(views, engagements)
+        prob_best, prob_beat_control = self._posterior_win_probabilities(views, engagements, present)
+
+        for t, (test, variants) in enumerate(entries):
+            results[test.id] = self._summarize(
+                [label for label, _ in variants],
+                views[t], engagements[t], z_scores[t], p_values[t], prob_best[t], prob_beat_control[t]
+            )
+        return results
+
+    def _z_test_against_control(self, views: np.ndarray, engagements: np.ndarray) -> tuple:
+        """Two-proportion z-test of every variant against the control in column 0."""
+        n0 = views[:, :1].astype(float)
+        s0 = engagements[:, :1].astype(float)
+        n = views.astype(float)
+        s = engagements.astype(float)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            p0 = np.where(n0 > 0, s0 / n0, 0.0)
+            p = np.where(n > 0, s / n, 0.0)
+            pooled = np.where(n0 + n > 0, (s0 + s) / (n0 + n), 0.0)
+            standard_error = np.sqrt(pooled * (1 - pooled) * (1 / n0 + 1 / n))
+            z_scores = np.where(standard_error > 0, (p - p0) / standard_error, 0.0)
+
+        z_scores = np.nan_to_num(z_scores)
+        p_values = 2 * ndtr(-np.abs(z_scores))
+        return z_scores, p_values
+
+    def _posterior_win_probabilities(self, views: np.ndarray, engagements: np.ndarray, present: np.ndarray) -> tuple:
+        """
+        Monte Carlo estimate of P(variant is best) and P(variant beats control)
+        under independent Beta(1 + engagements, 1 + views - engagements) posteriors.
+        """
+        num_tests, num_variants = views.shape
+        rng = np.random.default_rng(self.RANDOM_SEED)
+        prob_best = np.zeros((num_tests, num_variants))
+        prob_beat_control = np.zeros((num_tests, num_variants))
+
+        alpha = 1 + engagements
+        beta = 1 + views - engagements
+        chunk = max(1, self.MAX_SAMPLES_PER_CHUNK // (num_variants * self.POSTERIOR_SAMPLES))
+
+        for start in range(0, num_tests, chunk):
+            end = min(start + chunk, num_tests)
+            draws = rng.beta(
+                alpha[start:end, :, None],
+                beta[start:end, :, None],
+                size=(end - start, num_variants, self.POSTERIOR_SAMPLES)
+            )
+            # Padding columns can never win
+            draws[~present[start:end]] = -np.inf
+
+            best = draws.argmax(axis=1)
+            prob_best[start:end] = (best[:, None, :] == np.arange(num_variants)[None, :, None]).mean(axis=2)
+            prob_beat_control[start:end] = (draws > draws[:, :1, :]).mean(axis=2)
+
+        return prob_best, prob_beat_control
+
+    def _summarize(self, labels: list, views, engagements, z_scores, p_values, prob_best, prob_beat_control) -> dict:
+        """Turn one test's arrays into winner, confidence and a per-variant summary."""
+        count = len(labels)
+        best = int(np.argmax(prob_best[:count]))
+
+        if best == 0:
+            # The control wins only if it significantly beats every challenger
+            p_value = float(p_values[1:count].max())
+        else:
+            p_value = float(p_values[best])
+
+        significant = (
+            p_value < self.SIGNIFICANCE_LEVEL and
+            prob_best[best] >= self.WIN_PROBABILITY_THRESHOLD
+        )
+        has_enough_data = bool((views[:count] >= self.MIN_VIEWS_PER_VARIANT).all())
+
+        if significant:
+            winner = labels[best]
+        elif has_enough_data:
+            winner = "tie"
+        else:
+            winner = None
+
+        variants = {}
+        for v, label in enumerate(labels):
+            variants[label] = {
+                "views": int(views[v]),
+                "engagements": int(engagements[v]),
+                "engagement_rate": round(float(engagements[v] / views[v] * 100), 2) if views[v] else 0,
+                "z_score": round(float(z_scores[v]), 3) if v else None,
+                "p_value": round(float(p_values[v]), 4) if v else None,
+                "probability_to_beat_control": round(float(prob_beat_control[v]), 4) if v else None,
+                "probability_to_be_best": round(float(prob_best[v]), 4)
+            }
+
+        return {
+            "winner": winner,
+            "confidence_level": (1 - p_value) * 100,
+            "is_complete": has_enough_data,
+            "results_summary": {
+                "method": "two-proportion z-test vs control + beta-binomial posterior",
+                "metric": "engagement (likes + comments + shares per view)",
+                "control": labels[0],
+                "leader": labels[best],
+                "significant": bool(significant),
+                "significance_level": self.SIGNIFICANCE_LEVEL,
+                "variants": variants,
+                "evaluated_at": datetime.utcnow().isoformat()
+            }
+        }
+
+    def _insufficient_variants(self, labels: list) -> dict:
+        """Result for a test with nothing to compare (fewer than two variants)."""
+        return {
+            "winner": None,
+            "confidence_level": None,
+            "is_complete": False,
+            "results_summary": {
+                "method": "two-proportion z-test vs control + beta-binomial posterior",
+                "status": "insufficient_data",
+                "reason": "An A/B test needs at least two variants with content",
+                "variants": labels,
+                "evaluated_at": datetime.utcnow().isoformat()
+            }
+        }
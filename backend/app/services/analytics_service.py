@@ -1,7 +1,10 @@
-from datetime import datetime, timedelta
+from datetime import datetime, date, timedelta
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload, selectinload
 from app.extensions import db
-from app.models.sql.content_performance import ContentPerformance, ABTest
+from app.models.sql.content_performance import ContentPerformance, ABTest, ABTestVariant, ContentPerformanceDaily
 from app.models.sql.content_script import ContentScript
+from app.services.ab_test_engine import ABTestEngine
 
 
 class AnalyticsService:
@@ -16,15 +19,20 @@ class AnalyticsService:
         """
         # Check if already tracking this content
         existing = None
+        previous_bucket = None
+        previous_contribution = None
         if data.get("video_id"):
+            # Locked, so the contribution removed from the rollups is the one stored
             existing = ContentPerformance.query.filter_by(
                 user_id=user_id,
                 video_id=data["video_id"]
-            ).first()
+            ).with_for_update().first()
         
         if existing:
             # Update existing record
             performance = existing
+            previous_bucket = ContentPerformanceDaily.bucket_for(performance)
+            previous_contribution = ContentPerformanceDaily.contribution_of(performance)
             performance.views = data.get("views", performance.views)
             performance.likes = data.get("likes", performance.likes)
             performance.comments = data.get("comments", performance.comments)
@@ -72,6 +80,10 @@ class AnalyticsService:
         performance.calculate_estimated_revenue(data.get("cpm", 4.0))
         performance.calculate_actual_score()
         
+        # Flush so created_at is populated before picking the rollup bucket
+        db.session.flush()
+        self._update_daily_rollup(performance, previous_bucket, previous_contribution)
+        
         db.session.commit()
         
         return {
@@ -79,28 +91,127 @@ class AnalyticsService:
             "performance": performance.to_dict()
         }
 
-    def get_roi_analysis(self, user_id: int, days: int = 30) -> dict:
+    # ============ DAILY ROLLUPS ============
+
+    def _update_daily_rollup(self, performance: ContentPerformance, previous_bucket: dict = None,
+                             previous_contribution: dict = None):
         """
-        Calculate ROI by comparing content using platform suggestions vs not.
+        Incrementally apply a tracked content change to the daily rollups.
+        Removes the row's previous contribution (if it was already tracked) and adds the new one.
+        Runs in the session's transaction, so the rollups commit with the performance row.
         """
-        cutoff_date = datetime.utcnow() - timedelta(days=days)
+        connection = db.session.connection()
+        if previous_bucket:
+            ContentPerformanceDaily.apply(connection, previous_bucket, previous_contribution, sign=-1)
         
-        # Get content with platform suggestions
-        with_suggestions = ContentPerformance.query.filter(
-            ContentPerformance.user_id == user_id,
-            ContentPerformance.used_platform_suggestion == True,
-            ContentPerformance.created_at >= cutoff_date
-        ).all()
+        bucket = ContentPerformanceDaily.bucket_for(performance)
+        ContentPerformanceDaily.apply(connection, bucket, ContentPerformanceDaily.contribution_of(performance))
+
+    def _rollup_totals(self, user_id: int, start_day: date, end_day: date = None, group_by=None) -> list:
+        """
+        Sum rollup rows for a user over [start_day, end_day).
+        Returns one row per group_by value (or a single row when group_by is None).
+        """
+        columns = [
+            func.coalesce(func.sum(ContentPerformanceDaily.content_count), 0).label("content_count"),
+            func.coalesce(func.sum(ContentPerformanceDaily.total_views), 0).label("total_views"),
+            func.coalesce(func.sum(ContentPerformanceDaily.total_likes), 0).label("total_likes"),
+            func.coalesce(func.sum(ContentPerformanceDaily.total_comments), 0).label("total_comments"),
+            func.coalesce(func.sum(ContentPerformanceDaily.total_revenue), 0.0).label("total_revenue"),
+            func.coalesce(func.sum(ContentPerformanceDaily.total_engagement), 0.0).label("total_engagement")
+        ]
+        if group_by is not None:
+            columns.insert(0, group_by.label("group_key"))
+        
+        query = db.session.query(*columns).filter(
+            ContentPerformanceDaily.user_id == user_id,
+            ContentPerformanceDaily.day >= start_day
+        )
+        if end_day:
+            query = query.filter(ContentPerformanceDaily.day < end_day)
+        if group_by is not None:
+            query = query.group_by(group_by)
         
-        # Get content without platform suggestions
-        without_suggestions = ContentPerformance.query.filter(
-            ContentPerformance.user_id == user_id,
-            ContentPerformance.used_platform_suggestion == False,
-            ContentPerformance.created_at >= cutoff_date
+        return query.all()
+
+    def rebuild_daily_rollups(self, user_id: int = None) -> dict:
+        """
+        Rebuild daily rollups from raw ContentPerformance rows.
+        Used for the initial backfill and to repair drift; rebuilds all users when user_id is None.
+        """
+        delete_query = ContentPerformanceDaily.query
+        source_filter = [ContentPerformance.created_at.isnot(None)]
+        if user_id is not None:
+            delete_query = delete_query.filter_by(user_id=user_id)
+            source_filter.append(ContentPerformance.user_id == user_id)
+        delete_query.delete(synchronize_session=False)
+        
+        day = func.date(ContentPerformance.created_at)
+        platform = func.coalesce(ContentPerformance.platform, "youtube")
+        suggestion_type = func.coalesce(ContentPerformance.suggestion_type, "none")
+        used_suggestion = func.coalesce(ContentPerformance.used_platform_suggestion, False)
+        
+        rows = db.session.query(
+            ContentPerformance.user_id,
+            day,
+            platform,
+            suggestion_type,
+            used_suggestion,
+            func.count(ContentPerformance.id),
+            func.coalesce(func.sum(ContentPerformance.views), 0),
+            func.coalesce(func.sum(ContentPerformance.likes), 0),
+            func.coalesce(func.sum(ContentPerformance.comments), 0),
+            func.coalesce(func.sum(ContentPerformance.estimated_revenue), 0.0),
+            func.coalesce(func.sum(ContentPerformance.engagement_rate), 0.0)
+        ).filter(*source_filter).group_by(
+            ContentPerformance.user_id, day, platform, suggestion_type, used_suggestion
         ).all()
         
-        def calculate_averages(contents):
-            if not contents:
+        rollups = []
+        for row in rows:
+            row_day = row[1]
+            if isinstance(row_day, str):  # SQLite returns DATE() as text
+                row_day = date.fromisoformat(row_day)
+            rollups.append({
+                "user_id": row[0],
+                "day": row_day,
+                "platform": row[2],
+                "suggestion_type": row[3],
+                "used_platform_suggestion": bool(row[4]),
+                "content_count": row[5],
+                "total_views": row[6],
+                "total_likes": row[7],
+                "total_comments": row[8],
+                "total_revenue": row[9],
+                "total_engagement": row[10]
+            })
+        
+        # One executemany insert; the backfill can produce millions of rows
+        if rollups:
+            db.session.execute(ContentPerformanceDaily.__table__.insert(), rollups)
+        
+        db.session.commit()
+        
+        return {
+            "success": True,
+            "rollup_rows": len(rows)
+        }
+
+    def get_roi_analysis(self, user_id: int, days: int = 30) -> dict:
+        """
+        Calculate ROI by comparing content using platform suggestions vs not.
+        Reads daily rollups, so the window is whole days starting at the cutoff day.
+        """
+        cutoff_day = (datetime.utcnow() - timedelta(days=days)).date()
+        
+        # Aggregate daily rollups split by whether platform suggestions were used
+        totals_by_usage = {
+            bool(row.group_key): row
+            for row in self._rollup_totals(user_id, cutoff_day, group_by=ContentPerformanceDaily.used_platform_suggestion)
+        }
+        
+        def calculate_averages(totals):
+            if not totals or not totals.content_count:
                 return {
                     "count": 0,
                     "avg_views": 0,
@@ -109,16 +220,17 @@ class AnalyticsService:
                     "total_revenue": 0
                 }
             
+            count = totals.content_count
             return {
-                "count": len(contents),
-                "avg_views": sum(c.views for c in contents) // len(contents),
-                "avg_engagement": round(sum(c.engagement_rate for c in contents) / len(contents), 2),
-                "avg_revenue": round(sum(c.estimated_revenue for c in contents) / len(contents), 2),
-                "total_revenue": round(sum(c.estimated_revenue for c in contents), 2)
+                "count": count,
+                "avg_views": int(totals.total_views) // count,
+                "avg_engagement": round(totals.total_engagement / count, 2),
+                "avg_revenue": round(totals.total_revenue / count, 2),
+                "total_revenue": round(totals.total_revenue, 2)
             }
         
-        with_stats = calculate_averages(with_suggestions)
-        without_stats = calculate_averages(without_suggestions)
+        with_stats = calculate_averages(totals_by_usage.get(True))
+        without_stats = calculate_averages(totals_by_usage.get(False))
         
         # Calculate improvement percentages
         improvement = {}
@@ -151,21 +263,12 @@ class AnalyticsService:
         week_ago = datetime.utcnow() - timedelta(days=7)
         two_weeks_ago = datetime.utcnow() - timedelta(days=14)
         
-        # This week's content
-        this_week = ContentPerformance.query.filter(
-            ContentPerformance.user_id == user_id,
-            ContentPerformance.created_at >= week_ago
-        ).all()
-        
-        # Last week's content (for comparison)
-        last_week = ContentPerformance.query.filter(
-            ContentPerformance.user_id == user_id,
-            ContentPerformance.created_at >= two_weeks_ago,
-            ContentPerformance.created_at < week_ago
-        ).all()
+        # Weekly totals come from daily rollups; only the top content list touches raw rows
+        this_week_totals = self._rollup_totals(user_id, week_ago.date())[0]
+        last_week_totals = self._rollup_totals(user_id, two_weeks_ago.date(), week_ago.date())[0]
         
-        def week_stats(contents):
-            if not contents:
+        def week_stats(totals):
+            if not totals.content_count:
                 return {
                     "content_count": 0,
                     "total_views": 0,
@@ -176,25 +279,38 @@ class AnalyticsService:
                 }
             
             return {
-                "content_count": len(contents),
-                "total_views": sum(c.views for c in contents),
-                "total_likes": sum(c.likes for c in contents),
-                "total_comments": sum(c.comments for c in contents),
-                "avg_engagement": round(sum(c.engagement_rate for c in contents) / len(contents), 2),
-                "estimated_revenue": round(sum(c.estimated_revenue for c in contents), 2)
+                "content_count": totals.content_count,
+                "total_views": int(totals.total_views),
+                "total_likes": int(totals.total_likes),
+                "total_comments": int(totals.total_comments),
+                "avg_engagement": round(totals.total_engagement / totals.content_count, 2),
+                "estimated_revenue": round(totals.total_revenue, 2)
             }
         
-        this_week_stats = week_stats(this_week)
-        last_week_stats = week_stats(last_week)
+        this_week_stats = week_stats(this_week_totals)
+        last_week_stats = week_stats(last_week_totals)
+        
+        this_week_filter = [
+            ContentPerformance.user_id == user_id,
+            ContentPerformance.created_at >= week_ago
+        ]
         
         # Find top performing content
-        top_content = sorted(this_week, key=lambda x: x.views, reverse=True)[:5]
+        top_content = ContentPerformance.query.filter(*this_week_filter)\
+            .order_by(ContentPerformance.views.desc())\
+            .limit(5)\
+            .all()
         
         # Find content score accuracy
-        scored_content = [c for c in this_week if c.content_score and c.actual_score]
-        avg_accuracy = 0
-        if scored_content:
-            avg_accuracy = sum(c.score_accuracy or 0 for c in scored_content) / len(scored_content)
+        avg_accuracy = db.session.query(
+            func.avg(func.coalesce(ContentPerformance.score_accuracy, 0))
+        ).filter(
+            *this_week_filter,
+            ContentPerformance.content_score.isnot(None),
+            ContentPerformance.content_score != 0,
+            ContentPerformance.actual_score.isnot(None),
+            ContentPerformance.actual_score != 0
+        ).scalar() or 0
         
         return {
             "report_period": {
@@ -223,33 +339,36 @@ class AnalyticsService:
 
     def create_ab_test(self, user_id: int, data: dict) -> dict:
         """
-        Create a new A/B test comparing two content pieces.
+        Create a new A/B/n test comparing two or more content pieces.
+        Variants come from variant_content_ids, or content_a_id/content_b_id for two-way tests.
+        The first variant ("A") is the control.
         """
+        content_ids = data.get("variant_content_ids") or [
+            content_id for content_id in (data.get("content_a_id"), data.get("content_b_id")) if content_id
+        ]
+        
         ab_test = ABTest(
             user_id=user_id,
             test_name=data.get("test_name", "Untitled Test"),
             test_description=data.get("test_description"),
             test_variable=data.get("test_variable"),
-            content_a_id=data.get("content_a_id"),
-            content_b_id=data.get("content_b_id"),
+            content_a_id=content_ids[0] if len(content_ids) > 0 else None,
+            content_b_id=content_ids[1] if len(content_ids) > 1 else None,
             status="running",
             started_at=datetime.utcnow()
         )
+        db.session.add(ab_test)
+        db.session.flush()  # Assign ab_test.id before tagging content
         
         # Mark the content items with their A/B test groups
-        if data.get("content_a_id"):
-            content_a = ContentPerformance.query.get(data["content_a_id"])
-            if content_a and content_a.user_id == user_id:
-                content_a.ab_test_group = "A"
-                content_a.ab_test_id = str(ab_test.id)
-        
-        if data.get("content_b_id"):
-            content_b = ContentPerformance.query.get(data["content_b_id"])
-            if content_b and content_b.user_id == user_id:
-                content_b.ab_test_group = "B"
-                content_b.ab_test_id = str(ab_test.id)
+        for index, content_id in enumerate(content_ids):
+            content = ContentPerformance.query.get(content_id)
+            if content and str(content.user_id) == str(user_id):
+                label = ABTestVariant.label_for(index)
+                content.ab_test_group = label
+                content.ab_test_id = str(ab_test.id)
+                ab_test.variants.append(ABTestVariant(label=label, content=content))
         
-        db.session.add(ab_test)
         db.session.commit()
         
         return {
@@ -259,92 +378,78 @@ class AnalyticsService:
 
     def get_ab_test_results(self, test_id: int, user_id: int) -> dict:
         """
-        Get A/B test results with comparison.
+        Get A/B/n test results.
+        Results are computed by the batch job (evaluate_running_ab_tests); a test
+        that has never been evaluated is evaluated once on demand.
         """
         ab_test = ABTest.query.filter_by(id=test_id, user_id=user_id).first()
         
         if not ab_test:
             return None
         
-        content_a = ab_test.content_a
-        content_b = ab_test.content_b
+        if not ab_test.results_summary:
+            self._apply_ab_test_results([ab_test])
+            db.session.commit()
         
-        if not content_a or not content_b:
-            return ab_test.to_dict()
+        return ab_test.to_dict()
+
+    def evaluate_running_ab_tests(self) -> dict:
+        """
+        Evaluate all running A/B tests in one vectorized batch.
+        Called periodically by the scheduler.
+        """
+        running = ABTest.query.filter_by(status="running")\
+            .options(
+                selectinload(ABTest.variants).joinedload(ABTestVariant.content),
+                joinedload(ABTest.content_a),
+                joinedload(ABTest.content_b)
+            ).all()
+        
+        evaluated = self._apply_ab_test_results(running)
+        db.session.commit()
         
-        # Compare metrics
-        comparison = {
-            "views": {
-                "A": content_a.views,
-                "B": content_b.views,
-                "winner": "A" if content_a.views > content_b.views else "B",
-                "difference": abs(content_a.views - content_b.views)
-            },
-            "engagement": {
-                "A": content_a.engagement_rate,
-                "B": content_b.engagement_rate,
-                "winner": "A" if content_a.engagement_rate > content_b.engagement_rate else "B",
-                "difference": round(abs(content_a.engagement_rate - content_b.engagement_rate), 2)
-            },
-            "likes": {
-                "A": content_a.likes,
-                "B": content_b.likes,
-                "winner": "A" if content_a.likes > content_b.likes else "B",
-                "difference": abs(content_a.likes - content_b.likes)
-            }
+        return {
+            "success": True,
+            "running_tests": len(running),
+            "evaluated_tests": evaluated
         }
+
+    def _apply_ab_test_results(self, tests: list) -> int:
+        """Run the A/B engine over tests and store winner, confidence and summary on each."""
+        results = ABTestEngine().evaluate(tests)
+        
+        for ab_test in tests:
+            result = results.get(ab_test.id)
+            if not result:
+                continue
+            
+            ab_test.winner = result["winner"]
+            ab_test.confidence_level = result["confidence_level"]
+            ab_test.set_results_summary(result["results_summary"])
+            
+            # Mark as completed once every variant has enough data
+            if result["is_complete"] and ab_test.status == "running":
+                ab_test.status = "completed"
+                ab_test.completed_at = datetime.utcnow()
         
-        # Determine overall winner (based on views primarily)
-        a_wins = sum(1 for metric in comparison.values() if metric["winner"] == "A")
-        b_wins = sum(1 for metric in comparison.values() if metric["winner"] == "B")
-        
-        if a_wins > b_wins:
-            ab_test.winner = "A"
-        elif b_wins > a_wins:
-            ab_test.winner = "B"
-        else:
-            ab_test.winner = "tie"
-        
-        # Calculate confidence (simplified - based on difference magnitude)
-        view_diff_pct = (abs(content_a.views - content_b.views) / max(content_a.views, content_b.views, 1)) * 100
-        ab_test.confidence_level = min(view_diff_pct, 99)
-        
-        ab_test.set_results_summary(comparison)
-        
-        # Mark as completed if enough data
-        if content_a.views >= 1000 and content_b.views >= 1000:
-            ab_test.status = "completed"
-            ab_test.completed_at = datetime.utcnow()
-        
-        db.session.commit()
-        
-        return ab_test.to_dict()
+        return len(results)
 
     def get_revenue_attribution(self, user_id: int, days: int = 30) -> dict:
         """
         Break down revenue by suggestion type.
         """
-        cutoff_date = datetime.utcnow() - timedelta(days=days)
-        
-        contents = ContentPerformance.query.filter(
-            ContentPerformance.user_id == user_id,
-            ContentPerformance.created_at >= cutoff_date
-        ).all()
+        cutoff_day = (datetime.utcnow() - timedelta(days=days)).date()
         
-        # Group by suggestion type
+        # Group daily rollups by suggestion type
         by_type = {}
-        for content in contents:
-            suggestion_type = content.suggestion_type or "none"
-            if suggestion_type not in by_type:
-                by_type[suggestion_type] = {
-                    "count": 0,
-                    "total_revenue": 0,
-                    "total_views": 0
-                }
-            
-            by_type[suggestion_type]["count"] += 1
-            by_type[suggestion_type]["total_revenue"] += content.estimated_revenue
-            by_type[suggestion_type]["total_views"] += content.views
+        for row in self._rollup_totals(user_id, cutoff_day, group_by=ContentPerformanceDaily.suggestion_type):
+            if not row.content_count:
+                continue
+            by_type[row.group_key] = {
+                "count": row.content_count,
+                "total_revenue": row.total_revenue,
+                "total_views": int(row.total_views)
+            }
         
         # Round values
         for key in by_type:
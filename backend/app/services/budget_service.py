@@ -0,0 +1,390 @@
+"""
+Upstream quota and token budget accounting.
+
+Every upstream call is recorded per user, service and hour in upstream_usage
+(YouTube Data API quota units, Groq/Gemini tokens). Before a call, admit()
+checks the caller against two budgets:
+
+- a daily cap per user and a global daily cap per service, read from
+  upstream_usage so they hold across worker processes
+- a token bucket per user and per service that holds BUDGET_BURST_FRACTION
+  of the daily cap (a quarter by default, and for Groq at least two
+  content packages) and refills at the daily cap spread over 24 hours, so
+  a burst can't spend the whole day at once. A call is admitted once the
+  bucket holds its estimated cost
+
+When less than DEGRADE_THRESHOLD of a budget is left the call is admitted
+but degraded: callers serve stale cached results or ask for fewer tokens.
+When a budget is exhausted the call is refused with BudgetExceeded, which
+the app turns into a 429 with Retry-After.
+
+Token buckets live in process memory; the daily caps are the cross-process limit.
+"""
+import os
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from flask import has_request_context, jsonify
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+from app.extensions import db
+from app.models.sql.upstream_usage import UpstreamUsage
+from app.utils.database import current_engine, release_request_connection
+from app.utils.telemetry import CounterMetric, GaugeMetric
+
+SYSTEM_USER_ID = 0  # Background jobs
+
+# Set by request handlers that run outside a Flask request (app/asgi.py)
+budget_user_id = ContextVar("budget_user_id", default=None)
+
+# Daily budgets: (global, per user)
+DEFAULT_BUDGETS = {
+    "youtube": ("YOUTUBE_DAILY_UNITS", 10000, "YOUTUBE_USER_DAILY_UNITS", 1000),
+    "groq": ("GROQ_DAILY_TOKENS", 500000, "GROQ_USER_DAILY_TOKENS", 50000),
+    "gemini": ("GEMINI_DAILY_TOKENS", 1000000, "GEMINI_USER_DAILY_TOKENS", 100000),
+}
+
+# YouTube Data API quota cost per method; everything else costs 1 unit
+YOUTUBE_UNIT_COSTS = {"search.list": 100}
+
+# Prompt plus completion allowance across the five generate_complete_content prompts
+COMPLETE_CONTENT_TOKENS = 13000
+
+BURST_FRACTION = float(os.getenv("BUDGET_BURST_FRACTION", 0.25))  # Token bucket capacity as a share of the daily budget
+# Smallest bucket per service: a user can generate a full content package and follow-up edits
+MIN_BURST = {"groq": 2 * COMPLETE_CONTENT_TOKENS}
+DEGRADE_THRESHOLD = 0.2  # Degrade when less than 20% of a budget is left
+USAGE_CACHE_SECONDS = 30
+
+upstream_units = CounterMetric(
+    "upstream_units_total", "Upstream quota units and tokens consumed", ("service",)
+)
+budget_admissions = CounterMetric(
+    "budget_admissions_total", "Budget admission decisions", ("service", "decision")
+)
+
+
+class BudgetExceeded(Exception):
+    def __init__(self, service: str, scope: str, retry_after: int):
+        super().__init__(f"{service} {scope} budget exhausted, retry in {retry_after}s")
+        self.service = service
+        self.scope = scope
+        self.retry_after = retry_after
+
+
+class Admission:
+    def __init__(self, allowed: bool, degraded: bool = False, retry_after: int = 0, reason: str = None):
+        self.allowed = allowed
+        self.degraded = degraded
+        self.retry_after = retry_after
+        self.reason = reason
+
+    def raise_for_denial(self, service: str):
+        if not self.allowed:
+            raise BudgetExceeded(service, self.reason, self.retry_after)
+
+
+class TokenBucket:
+    """
+    Refills continuously at `rate` per second up to `capacity`.
+    Calls are admitted once the level covers their estimated cost and
+    debited by their actual cost afterwards, so concurrent calls can take
+    the level negative; the debt is the next caller's wait time.
+    """
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.level = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def check(self, cost: float = 0) -> tuple:
+        """(fraction of capacity left, seconds until the level covers `cost`)."""
+        with self._lock:
+            self._refill()
+            # A call larger than the whole bucket goes ahead once it is full
+            needed = max(min(cost, self.capacity), 1e-9)
+            fraction = max(self.level, 0.0) / self.capacity
+            if self.level >= needed:
+                return fraction, 0
+            return fraction, int((needed - self.level) / self.rate) + 1
+
+    def debit(self, amount: float):
+        with self._lock:
+            self._refill()
+            self.level -= amount
+
+
+class BudgetManager:
+    def __init__(self):
+        self.budgets = {
+            service: (int(os.getenv(global_key, global_default)), int(os.getenv(user_key, user_default)))
+            for service, (global_key, global_default, user_key, user_default) in DEFAULT_BUDGETS.items()
+        }
+        self._buckets = {}
+        self._usage_cache = {}  # (service, user_id or None, day) -> [units, fetched_at]
+        self._lock = threading.Lock()
+
+    # ============ ADMISSION ============
+
+    def admit(self, service: str, cost: int, user_id: int = None) -> Admission:
+        """Decide whether a call costing roughly `cost` units may go ahead for this user."""
+        # The usage lookups take a connection of their own; don't hold the session's meanwhile
+        release_request_connection()
+        user_id = self._current_user_id() if user_id is None else int(user_id)
+        global_budget, user_budget = self.budgets[service]
+
+        scopes = [("global", None, global_budget)]
+        if user_id != SYSTEM_USER_ID:
+            scopes.append(("user", user_id, user_budget))
+
+        degraded = False
+        for scope, scope_user, budget in scopes:
+            remaining = budget - self._used_today(service, scope_user)
+            if remaining < cost:
+                return self._deny(service, scope, user_id, self._seconds_until_tomorrow())
+
+            fraction, wait = self._bucket(service, scope_user, budget).check(cost)
+            if wait:
+                return self._deny(service, scope, user_id, wait)
+            if remaining / budget < DEGRADE_THRESHOLD or fraction < DEGRADE_THRESHOLD:
+                degraded = True
+
+        budget_admissions.inc(service=service, decision="degraded" if degraded else "allowed")
+        return Admission(True, degraded=degraded)
+
+    def _deny(self, service: str, scope: str, user_id: int, retry_after: int) -> Admission:
+        budget_admissions.inc(service=service, decision="rejected")
+        self.record_rejection(service, user_id)
+        return Admission(False, retry_after=retry_after, reason=scope)
+
+    def degraded_max_tokens(self, max_tokens: int) -> int:
+        """Shorter completions for degraded calls."""
+        return max(256, max_tokens // 2)
+
+    # ============ ACCOUNTING ============
+
+    def record(self, service: str, units: int, user_id: int = None, degraded: bool = False):
+        """Debit the buckets and add the call to this hour's usage row."""
+        user_id = self._current_user_id() if user_id is None else int(user_id)
+        units = max(0, int(units or 0))
+        upstream_units.inc(units, service=service)
+
+        global_budget, user_budget = self.budgets[service]
+        self._bucket(service, None, global_budget).debit(units)
+        if user_id != SYSTEM_USER_ID:
+            self._bucket(service, user_id, user_budget).debit(units)
+
+        with self._lock:
+            day = self._today()
+            for scope_user in (None, user_id):
+                cached = self._usage_cache.get((service, scope_user, day))
+                if cached:
+                    cached[0] += units
+
+        self._upsert(service, user_id, calls=1, units=units, degraded_calls=1 if degraded else 0)
+
+    def record_rejection(self, service: str, user_id: int = None):
+        user_id = self._current_user_id() if user_id is None else int(user_id)
+        self._upsert(service, user_id, rejected_calls=1)
+
+    def _upsert(self, service: str, user_id: int, **increments):
+        """
+        Add to the (hour, user, service) row in its own transaction, so
+        accounting never commits or rolls back the caller's session.
+        """
+        table = UpstreamUsage.__table__
+        hour = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        where = (table.c.hour == hour) & (table.c.user_id == user_id) & (table.c.service == service)
+        values = {name: table.c[name] + amount for name, amount in increments.items()}
+        values["updated_at"] = datetime.utcnow()
+
+        try:
+            for _ in range(2):
+                try:
+                    with current_engine().begin() as conn:
+                        if conn.execute(update(table).where(where).values(**values)).rowcount:
+                            return
+                        row = {"calls": 0, "units": 0, "degraded_calls": 0, "rejected_calls": 0}
+                        row.update(increments)
+                        conn.execute(table.insert().values(
+                            hour=hour, user_id=user_id, service=service, updated_at=datetime.utcnow(), **row
+                        ))
+                        return
+                except IntegrityError:
+                    continue  # Another worker inserted the row first; update it instead
+        except Exception as e:
+            print(f"Budget accounting error: {e}")
+
+    # ============ USAGE ============
+
+    def _used_today(self, service: str, user_id: int = None) -> int:
+        """Units used since UTC midnight, globally (user_id None) or by one user; cached briefly."""
+        day = self._today()
+        key = (service, user_id, day)
+        with self._lock:
+            cached = self._usage_cache.get(key)
+            if cached and time.monotonic() - cached[1] < USAGE_CACHE_SECONDS:
+                return cached[0]
+
+        query = select(func.coalesce(func.sum(UpstreamUsage.units), 0)).where(
+            UpstreamUsage.service == service, UpstreamUsage.hour >= day
+        )
+        if user_id is not None:
+            query = query.where(UpstreamUsage.user_id == user_id)
+        try:
+            with current_engine().connect() as conn:
+                used = int(conn.execute(query).scalar() or 0)
+        except Exception as e:
+            print(f"Budget usage lookup error: {e}")
+            return cached[0] if cached else 0
+
+        with self._lock:
+            self._usage_cache[key] = [used, time.monotonic()]
+        return used
+
+    def user_usage(self, user_id: int) -> dict:
+        """Today's usage against budgets for one user."""
+        day = self._today()
+        rows = db.session.query(
+            UpstreamUsage.service,
+            func.sum(UpstreamUsage.calls),
+            func.sum(UpstreamUsage.units),
+            func.sum(UpstreamUsage.degraded_calls),
+            func.sum(UpstreamUsage.rejected_calls)
+        ).filter(
+            UpstreamUsage.user_id == int(user_id), UpstreamUsage.hour >= day
+        ).group_by(UpstreamUsage.service).all()
+        by_service = {row[0]: row[1:] for row in rows}
+
+        usage = {}
+        for service, (_, user_budget) in self.budgets.items():
+            calls, units, degraded, rejected = (int(v or 0) for v in by_service.get(service, (0, 0, 0, 0)))
+            usage[service] = {
+                "used": units,
+                "budget": user_budget,
+                "remaining": max(0, user_budget - units),
+                "calls": calls,
+                "degraded_calls": degraded,
+                "rejected_calls": rejected
+            }
+        return {"date": day.date().isoformat(), "services": usage}
+
+    def burn_rates(self, top_users: int = 5) -> dict:
+        """Global consumption today, the last hour's rate and when each budget runs out at that rate."""
+        now = datetime.utcnow()
+        day = self._today()
+        last_hour = now - timedelta(hours=1)
+        hours_left_today = self._seconds_until_tomorrow() / 3600
+
+        services = {}
+        for service, (global_budget, _) in self.budgets.items():
+            base = db.session.query(func.coalesce(func.sum(UpstreamUsage.units), 0)).filter(
+                UpstreamUsage.service == service
+            )
+            used = int(base.filter(UpstreamUsage.hour >= day).scalar())
+            # Hourly rows: the current hour plus the previous one cover the last 60 minutes
+            recent = int(base.filter(UpstreamUsage.hour >= last_hour.replace(minute=0, second=0, microsecond=0)).scalar())
+            elapsed_hours = max((now - last_hour.replace(minute=0, second=0, microsecond=0)).total_seconds() / 3600, 1)
+            per_hour = recent / elapsed_hours
+
+            heavy = db.session.query(
+                UpstreamUsage.user_id, func.sum(UpstreamUsage.units).label("units")
+            ).filter(
+                UpstreamUsage.service == service, UpstreamUsage.hour >= day
+            ).group_by(UpstreamUsage.user_id).order_by(func.sum(UpstreamUsage.units).desc()).limit(top_users).all()
+
+            remaining = max(0, global_budget - used)
+            services[service] = {
+                "used_today": used,
+                "budget": global_budget,
+                "remaining": remaining,
+                "per_hour": round(per_hour, 1),
+                "projected_today": int(used + per_hour * hours_left_today),
+                "hours_to_exhaustion": round(remaining / per_hour, 1) if per_hour else None,
+                "top_users": [{"user_id": user_id, "used": int(units)} for user_id, units in heavy]
+            }
+        return {"as_of": now.isoformat(), "services": services, "buckets": self.bucket_levels()}
+
+    def bucket_levels(self) -> dict:
+        """This process's global bucket level per service, as a fraction of capacity."""
+        levels = {}
+        with self._lock:
+            buckets = {key[0]: bucket for key, bucket in self._buckets.items() if key[1] is None}
+        for service, bucket in buckets.items():
+            fraction, _ = bucket.check()
+            levels[service] = round(fraction, 3)
+        return levels
+
+    # ============ HELPERS ============
+
+    def _bucket(self, service: str, user_id: int, daily_budget: int) -> TokenBucket:
+        key = (service, user_id)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                capacity = min(daily_budget, max(daily_budget * BURST_FRACTION, MIN_BURST.get(service, 0)))
+                bucket = self._buckets[key] = TokenBucket(capacity, daily_budget / 86400)
+            return bucket
+
+    def _today(self) -> datetime:
+        return datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    def _seconds_until_tomorrow(self) -> int:
+        return int((self._today() + timedelta(days=1) - datetime.utcnow()).total_seconds()) + 1
+
+    def _current_user_id(self) -> int:
+        """The authenticated user for request-driven calls, the system user otherwise."""
+        if budget_user_id.get() is not None:
+            return budget_user_id.get()
+        if not has_request_context():
+            return SYSTEM_USER_ID
+        from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+        try:
+            verify_jwt_in_request(optional=True)
+            identity = get_jwt_identity()
+            return int(identity) if identity is not None else SYSTEM_USER_ID
+        except Exception:
+            return SYSTEM_USER_ID
+
+
+def youtube_cost(operation: str) -> int:
+    return YOUTUBE_UNIT_COSTS.get(operation, 1)
+
+
+def estimate_tokens(prompt: str, max_tokens: int = 0) -> int:
+    """Rough token estimate (~4 characters per token) plus the completion allowance."""
+    return len(prompt or "") // 4 + max_tokens
+
+
+budget_manager = BudgetManager()
+
+bucket_level = GaugeMetric(
+    "budget_bucket_level_ratio", "Global token bucket level as a fraction of capacity (this process)", ("service",),
+    callback=lambda: {(service,): level for service, level in budget_manager.bucket_levels().items()}
+)
+
+
+def init_budgets(app):
+    """Turn BudgetExceeded into 429 Too Many Requests with Retry-After."""
+
+    @app.errorhandler(BudgetExceeded)
+    def budget_exceeded(error):
+        response = jsonify({
+            "success": False,
+            "error": "budget_exceeded",
+            "message": str(error),
+            "service": error.service,
+            "scope": error.scope,
+            "retry_after": error.retry_after
+        })
+        response.status_code = 429
+        response.headers["Retry-After"] = str(error.retry_after)
+        return response
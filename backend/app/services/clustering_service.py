@@ -1,5 +1,7 @@
-from sklearn.cluster import KMeans
 import numpy as np
+from app.utils.lazy import lazy_attr
+
+KMeans = lazy_attr("sklearn.cluster", "KMeans")
 
 class ClusteringService:
        def cluster(self, embeddings: list[list[float]], n_clusters: int = 5) -> dict:
@@ -0,0 +1,188 @@
+import threading
+import numpy as np
+from sqlalchemy import func
+from app.extensions import db
+from app.models.sql.creator_profile import CreatorProfile
+
+
+class ProfileSnapshot:
+    """
+    Lightweight, session-independent copy of the CreatorProfile fields used for matching.
+    Exposes the same getters the matching engine reads from CreatorProfile.
+    """
+
+    __slots__ = ("id", "user_id", "niche", "sub_niches", "content_style", "audience_size", "platforms",
+                 "is_open_to_collabs", "preferred_min_audience", "preferred_max_audience", "updated_at")
+
+    def __init__(self, profile: CreatorProfile):
+        self.id = profile.id
+        self.user_id = profile.user_id
+        self.niche = profile.niche
+        self.sub_niches = profile.get_sub_niches()
+        self.content_style = profile.content_style
+        self.audience_size = profile.audience_size
+        self.platforms = profile.get_platforms()
+        self.is_open_to_collabs = bool(profile.is_open_to_collabs)
+        self.preferred_min_audience = profile.preferred_min_audience
+        self.preferred_max_audience = profile.preferred_max_audience
+        self.updated_at = profile.updated_at
+
+    def get_sub_niches(self) -> list:
+        return self.sub_niches
+
+    def get_platforms(self) -> dict:
+        return self.platforms
+
+
+class CollabCandidateIndex:
+    """
+    In-process inverted index over creator niche terms and platforms.
+
+    Holds encoded features for every profile open to collabs and posting
+    lists from each lowercased niche/sub-niche term and platform to feature
+    rows, so a query only scores creators sharing at least one of them.
+    Kept current by a cheap watermark query (row count + latest updated_at):
+    changed profiles go to a small delta segment that shadows the base
+    segment until it grows large enough to warrant a full rebuild.
+    """
+
+    REBUILD_DELTA_SIZE = 1000
+
+    def __init__(self, engine_factory):
+        self._engine_factory = engine_factory
+        self._lock = threading.Lock()
+        self._base = None
+        self._delta = {}
+        self._delta_segment = None
+        self._watermark = None
+
+    # ============ MAINTENANCE ============
+
+    def refresh(self):
+        """Bring the index up to date with the creator_profiles table."""
+        count, latest = db.session.query(
+            func.count(CreatorProfile.id),
+            func.max(CreatorProfile.updated_at)
+        ).one()
+
+        with self._lock:
+            if self._watermark == (count, latest):
+                return
+
+            previous = self._watermark
+            if self._base is None or previous is None or count < previous[0] or previous[1] is None:
+                self._rebuild(CreatorProfile.query.all())
+            else:
+                changed = CreatorProfile.query.filter(CreatorProfile.updated_at >= previous[1]).all()
+                for profile in changed:
+                    self._delta[profile.id] = ProfileSnapshot(profile)
+                if len(self._delta) > self.REBUILD_DELTA_SIZE:
+                    self._rebuild(None)
+                else:
+                    self._delta_segment = self._build_segment(list(self._delta.values()), with_postings=False)
+
+            self._watermark = (count, latest)
+
+    def _rebuild(self, profiles: list = None):
+        """Rebuild the base segment from profiles (or by merging the delta into the current base)."""
+        if profiles is None:
+            snapshots = {s.id: s for s in self._base["features"].profiles}
+            snapshots.update(self._delta)
+            snapshots = list(snapshots.values())
+        else:
+            snapshots = [ProfileSnapshot(p) for p in profiles]
+
+        self._base = self._build_segment([s for s in snapshots if s.is_open_to_collabs], with_postings=True)
+        self._delta = {}
+        self._delta_segment = None
+
+    def _build_segment(self, snapshots: list, with_postings: bool) -> dict:
+        features = self._engine_factory().encode(snapshots)
+        segment = {
+            "features": features,
+            "row_of_id": {s.id: row for row, s in enumerate(snapshots)},
+            "user_ids": np.asarray([int(s.user_id) for s in snapshots], dtype=np.int64),
+            "open": np.asarray([s.is_open_to_collabs for s in snapshots], dtype=bool)
+        }
+        if with_postings:
+            segment["term_postings"] = self._postings(features.term_ids, features.term_rows)
+            platform_rows, platform_ids = [], []
+            for row, snapshot in enumerate(snapshots):
+                for platform in snapshot.get_platforms().keys():
+                    platform_rows.append(row)
+                    platform_ids.append(features.platform_vocab[platform])
+            segment["platform_postings"] = self._postings(
+                np.asarray(platform_ids, dtype=np.int64), np.asarray(platform_rows, dtype=np.int64)
+            )
+        return segment
+
+    @staticmethod
+    def _postings(keys: np.ndarray, rows: np.ndarray) -> dict:
+        """Group rows by key into {key: sorted row array}."""
+        if len(keys) == 0:
+            return {}
+        order = np.lexsort((rows, keys))
+        keys, rows = keys[order], rows[order]
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        return {int(k): r for k, r in zip(keys[starts], np.split(rows, starts[1:]))}
+
+    # ============ QUERIES ============
+
+    def rank(self, profile, limit: int) -> list:
+        """
+        Rank candidates for a profile using posting-list pruning.
+        Falls back to scoring every open profile when pruning leaves fewer than `limit` candidates.
+
+        Returns:
+            List of (snapshot, total_score, breakdown) tuples, best first
+        """
+        with self._lock:
+            base, delta_segment, delta_ids = self._base, self._delta_segment, set(self._delta)
+
+        engine = self._engine_factory()
+        user_id = int(profile.user_id)
+        groups = []
+
+        if base and base["features"].size:
+            eligible = base["open"] & (base["user_ids"] != user_id)
+            shadowed = [base["row_of_id"][i] for i in delta_ids if i in base["row_of_id"]]
+            eligible[shadowed] = False
+
+            pruned = self._matching_rows(base, profile)
+            rows = pruned[eligible[pruned]]
+            if len(rows) < limit:
+                rows = np.flatnonzero(eligible)
+            groups.append(base["features"].subset(rows))
+
+        if delta_segment and delta_segment["features"].size:
+            eligible = delta_segment["open"] & (delta_segment["user_ids"] != user_id)
+            groups.append(delta_segment["features"].subset(np.flatnonzero(eligible)))
+
+        snapshots, totals, breakdowns = [], [], []
+        for features in groups:
+            if not features.size:
+                continue
+            scores = engine.score(profile, features)
+            for index in engine.top_k(scores["total_score"], limit):
+                snapshots.append(features.profiles[index])
+                totals.append(float(scores["total_score"][index]))
+                breakdowns.append(engine.breakdown(scores, index))
+
+        order = engine.top_k(np.asarray(totals, dtype=float), limit)
+        return [(snapshots[i], totals[i], breakdowns[i]) for i in order]
+
+    def _matching_rows(self, segment: dict, profile) -> np.ndarray:
+        """Rows sharing a niche term or platform with the profile."""
+        features = segment["features"]
+        niche = (profile.niche or "").lower()
+        terms = {niche} | {n.lower() for n in profile.get_sub_niches()}
+
+        postings = [segment["term_postings"].get(features.term_vocab[t]) for t in terms if t in features.term_vocab]
+        postings += [
+            segment["platform_postings"].get(features.platform_vocab[p])
+            for p in profile.get_platforms().keys() if p in features.platform_vocab
+        ]
+        postings = [p for p in postings if p is not None]
+        if not postings:
+            return np.zeros(0, dtype=np.int64)
+        return np.unique(np.concatenate(postings))
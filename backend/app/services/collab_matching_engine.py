@@ -0,0 +1,303 @@
+from datetime import datetime, timedelta
+import numpy as np
+
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECONDS_PER_DAY = 86_400_000_000
+
+
+def _to_microseconds(dt: datetime) -> int:
+    """Exact integer microseconds since the epoch for a naive UTC datetime."""
+    return (dt - EPOCH) // timedelta(microseconds=1)
+
+
+class ProfileFeatures:
+    """
+    Column-oriented encoding of a set of CreatorProfiles for vectorized scoring.
+    Row i of every array describes profiles[i].
+    """
+
+    def __init__(self, profiles: list):
+        self.profiles = profiles
+        self.size = len(profiles)
+
+        # Vocabularies shared by all rows (lowercased niche terms, lowercased styles, platform keys)
+        self.term_vocab = {}
+        self.style_vocab = {}
+        self.platform_vocab = {}
+
+        self.profile_ids = np.zeros(self.size, dtype=np.int64)
+        self.niche_ids = np.zeros(self.size, dtype=np.int64)
+        self.audience = np.zeros(self.size, dtype=np.int64)
+        self.preferred_min = np.zeros(self.size, dtype=np.int64)  # 0 means no preference
+        self.preferred_max = np.zeros(self.size, dtype=np.int64)  # 0 means no preference
+        self.style_ids = np.full(self.size, -1, dtype=np.int64)  # -1 means unknown style
+        self.updated_us = np.zeros(self.size, dtype=np.int64)
+        self.has_updated = np.zeros(self.size, dtype=bool)
+        self.has_platforms = np.zeros(self.size, dtype=bool)
+
+        # Niche + sub-niche terms as a flat (row, term) list of unique terms per row
+        term_rows = []
+        term_ids = []
+        platform_rows = []
+        platform_bits = []
+
+        for row, profile in enumerate(profiles):
+            self.profile_ids[row] = profile.id or 0
+            niche = (profile.niche or "").lower()
+            self.niche_ids[row] = self._vocab_id(self.term_vocab, niche)
+
+            terms = {niche} | {n.lower() for n in profile.get_sub_niches()}
+            for term in terms:
+                term_rows.append(row)
+                term_ids.append(self._vocab_id(self.term_vocab, term))
+
+            self.audience[row] = profile.audience_size or 0
+            self.preferred_min[row] = profile.preferred_min_audience or 0
+            self.preferred_max[row] = profile.preferred_max_audience or 0
+
+            if profile.content_style:
+                self.style_ids[row] = self._vocab_id(self.style_vocab, profile.content_style.lower())
+
+            if profile.updated_at:
+                self.updated_us[row] = _to_microseconds(profile.updated_at)
+                self.has_updated[row] = True
+
+            platforms = profile.get_platforms().keys()
+            self.has_platforms[row] = bool(platforms)
+            for platform in platforms:
+                platform_rows.append(row)
+                platform_bits.append(self._vocab_id(self.platform_vocab, platform))
+
+        self.term_rows = np.asarray(term_rows, dtype=np.int64)
+        self.term_ids = np.asarray(term_ids, dtype=np.int64)
+
+        # Platforms as a bitmask, one uint64 word per 64 distinct platform names
+        self.platform_words = max(1, -(-len(self.platform_vocab) // 64))
+        self.platform_masks = np.zeros((self.size, self.platform_words), dtype=np.uint64)
+        if platform_rows:
+            bits = np.asarray(platform_bits, dtype=np.int64)
+            np.bitwise_or.at(
+                self.platform_masks,
+                (np.asarray(platform_rows, dtype=np.int64), bits // 64),
+                np.left_shift(np.uint64(1), (bits % 64).astype(np.uint64))
+            )
+
+    def subset(self, rows: np.ndarray) -> "ProfileFeatures":
+        """Features for a subset of rows, sharing this encoding's vocabularies."""
+        rows = np.asarray(rows, dtype=np.int64)
+        subset = object.__new__(ProfileFeatures)
+        subset.profiles = [self.profiles[row] for row in rows]
+        subset.size = len(rows)
+        subset.term_vocab = self.term_vocab
+        subset.style_vocab = self.style_vocab
+        subset.platform_vocab = self.platform_vocab
+        subset.platform_words = self.platform_words
+
+        for name in ("profile_ids", "niche_ids", "audience", "preferred_min", "preferred_max",
+                     "style_ids", "updated_us", "has_updated", "has_platforms", "platform_masks"):
+            setattr(subset, name, getattr(self, name)[rows])
+
+        new_row = np.full(self.size, -1, dtype=np.int64)
+        new_row[rows] = np.arange(len(rows))
+        kept = new_row[self.term_rows] >= 0
+        subset.term_rows = new_row[self.term_rows[kept]]
+        subset.term_ids = self.term_ids[kept]
+        return subset
+
+    @staticmethod
+    def _vocab_id(vocab: dict, key: str) -> int:
+        if key not in vocab:
+            vocab[key] = len(vocab)
+        return vocab[key]
+
+
+class CollabMatchingEngine:
+    """
+    Scores one creator against many candidates in a single vectorized pass.
+    Produces the same scores as CollaborationService.calculate_match_score.
+    """
+
+    def __init__(self, weights: dict, compatible_styles: dict):
+        self.weights = weights
+        self.compatible_styles = compatible_styles
+
+    def encode(self, profiles: list) -> ProfileFeatures:
+        """Encode candidate profiles into feature arrays."""
+        return ProfileFeatures(profiles)
+
+    def score(self, profile, features: ProfileFeatures, now: datetime = None) -> dict:
+        """
+        Score a profile (side A) against every encoded candidate (side B).
+
+        Returns:
+            Dict of score arrays: niche_score, audience_score, style_score,
+            platform_score, activity_score, total_score and has_platform_score
+        """
+        now = now or datetime.utcnow()
+        size = features.size
+
+        # 1. Niche match
+        niche = (profile.niche or "").lower()
+        same_niche = features.niche_ids == features.term_vocab.get(niche, -1)
+        user_terms = {niche} | {n.lower() for n in profile.get_sub_niches()}
+        user_term_ids = [features.term_vocab[t] for t in user_terms if t in features.term_vocab]
+        shared = np.isin(features.term_ids, user_term_ids)
+        overlap = np.bincount(features.term_rows[shared], minlength=size)
+        niche_score = np.where(same_niche, 100, np.where(overlap > 0, np.minimum(overlap * 40, 80), 0))
+
+        # 2. Audience compatibility
+        audience_score = self._audience_score(
+            profile.audience_size or 0, features.audience, features.preferred_min, features.preferred_max
+        )
+
+        # 3. Content style match
+        if profile.content_style:
+            style_a = profile.content_style.lower()
+            compatible_ids = [
+                features.style_vocab[s] for s in self.compatible_styles.get(style_a, [])
+                if s in features.style_vocab
+            ]
+            style_score = np.where(
+                features.style_ids == features.style_vocab.get(style_a, -2),
+                100,
+                np.where(np.isin(features.style_ids, compatible_ids), 70, 30)
+            )
+            style_score = np.where(features.style_ids >= 0, style_score, 50)
+        else:
+            style_score = np.full(size, 50, dtype=np.int64)
+
+        # 4. Platform overlap (Jaccard over platform bitmasks)
+        platforms_a = list(profile.get_platforms().keys())
+        mask_a = np.zeros(features.platform_words, dtype=np.uint64)
+        unknown_platforms = 0
+        for platform in platforms_a:
+            bit = features.platform_vocab.get(platform)
+            if bit is None:
+                unknown_platforms += 1
+            else:
+                mask_a[bit // 64] |= np.uint64(1) << np.uint64(bit % 64)
+        intersection = np.bitwise_count(features.platform_masks & mask_a).sum(axis=1).astype(np.int64)
+        union = np.bitwise_count(features.platform_masks | mask_a).sum(axis=1).astype(np.int64) + unknown_platforms
+        has_platform_score = features.has_platforms & bool(platforms_a)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            platform_score = np.where(has_platform_score & (union > 0), (intersection / union) * 100, 0.0)
+
+        # 5. Activity (days since candidate profile update)
+        activity_score = self._activity_score(features.updated_us, features.has_updated, now)
+
+        return self._totals(niche_score, audience_score, style_score, platform_score, activity_score, has_platform_score)
+
+    def score_as_candidate(self, profile, features: ProfileFeatures, now: datetime = None) -> dict:
+        """
+        Score every encoded creator (side A) against one profile (side B):
+        the score `profile` gets in each of their match lists.
+
+        Niche, platform and audience ratio scores are symmetric, so they
+        come from score(); the audience preferences, style compatibility
+        and activity are taken from the other side.
+        """
+        now = now or datetime.utcnow()
+        scores = self.score(profile, features, now)
+        size = features.size
+
+        audience_score = self._audience_score(
+            features.audience, profile.audience_size or 0,
+            profile.preferred_min_audience or 0, profile.preferred_max_audience or 0
+        )
+
+        style_b = (profile.content_style or "").lower()
+        if style_b:
+            by_style = np.asarray([
+                100 if style_a == style_b else 70 if style_b in self.compatible_styles.get(style_a, []) else 30
+                for style_a in sorted(features.style_vocab, key=features.style_vocab.get)
+            ] or [50], dtype=np.int64)
+            style_score = np.where(features.style_ids >= 0, by_style[np.maximum(features.style_ids, 0)], 50)
+        else:
+            style_score = np.full(size, 50, dtype=np.int64)
+
+        updated = profile.updated_at
+        activity_score = np.full(size, self._activity_score(
+            np.asarray([_to_microseconds(updated) if updated else 0]), np.asarray([bool(updated)]), now
+        )[0], dtype=np.int64)
+
+        return self._totals(scores["niche_score"], audience_score, style_score, scores["platform_score"],
+                            activity_score, scores["has_platform_score"])
+
+    @staticmethod
+    def _audience_score(audience_a, audience_b, preferred_min, preferred_max) -> np.ndarray:
+        """Audience compatibility; the preferred range is side B's, checked against side A's audience."""
+        both_positive = (audience_a > 0) & (audience_b > 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.minimum(audience_a, audience_b) / np.maximum(audience_a, audience_b)
+        audience_score = np.select(
+            [ratio >= 0.5, ratio >= 0.2, ratio >= 0.1],
+            [100, 70, 40],
+            default=20
+        )
+        below_min = (preferred_min > 0) & (audience_a < preferred_min)
+        audience_score = np.where(below_min, np.maximum(0, audience_score - 30), audience_score)
+        above_max = (preferred_max > 0) & (audience_a > preferred_max)
+        audience_score = np.where(above_max, np.maximum(0, audience_score - 20), audience_score)
+        return np.where(both_positive, audience_score, 0)
+
+    @staticmethod
+    def _activity_score(updated_us: np.ndarray, has_updated: np.ndarray, now: datetime) -> np.ndarray:
+        """Activity of side B from days since its update, floored like timedelta.days."""
+        days_since_update = np.floor_divide(_to_microseconds(now) - updated_us, MICROSECONDS_PER_DAY)
+        activity_score = np.select(
+            [days_since_update > 90, days_since_update > 30, days_since_update > 7],
+            [30, 60, 80],
+            default=100
+        )
+        return np.where(has_updated, activity_score, 100)
+
+    def _totals(self, niche_score, audience_score, style_score, platform_score, activity_score,
+                has_platform_score) -> dict:
+        total_score = (
+            (niche_score * self.weights["niche"] / 100) +
+            (audience_score * self.weights["audience"] / 100) +
+            (style_score * self.weights["style"] / 100) +
+            (platform_score * self.weights["platform"] / 100) +
+            (activity_score * self.weights["activity"] / 100)
+        )
+
+        return {
+            "niche_score": niche_score,
+            "audience_score": audience_score,
+            "style_score": style_score,
+            "platform_score": platform_score,
+            "activity_score": activity_score,
+            "total_score": total_score,
+            "has_platform_score": has_platform_score
+        }
+
+    def top_k(self, total_score: np.ndarray, k: int = None) -> np.ndarray:
+        """
+        Indices of the k best candidates, ordered by score (rounded to 0.1) descending.
+        Ties keep candidate order, matching a stable sort over all candidates.
+        """
+        size = len(total_score)
+        if size == 0 or (k is not None and k <= 0):
+            return np.zeros(0, dtype=np.int64)
+
+        key = np.round(total_score, 1)
+        if k is None or k >= size:
+            candidates = np.arange(size)
+        else:
+            threshold = key[np.argpartition(-key, k - 1)[:k]].min()
+            candidates = np.flatnonzero(key >= threshold)
+
+        order = candidates[np.lexsort((candidates, -key[candidates]))]
+        return order[:k] if k is not None else order
+
+    def breakdown(self, scores: dict, index: int) -> dict:
+        """Score breakdown for one candidate, typed like calculate_match_score's."""
+        platform_score = float(scores["platform_score"][index]) if scores["has_platform_score"][index] else 0
+        return {
+            "niche_score": int(scores["niche_score"][index]),
+            "audience_score": int(scores["audience_score"][index]),
+            "style_score": int(scores["style_score"][index]),
+            "platform_score": platform_score,
+            "activity_score": int(scores["activity_score"][index])
+        }
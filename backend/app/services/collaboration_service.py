@@ -1,7 +1,13 @@
 from datetime import datetime, timedelta
 from app.extensions import db
-from app.models.sql.creator_profile import CreatorProfile, CollabRequest
+from app.models.sql.creator_profile import (
+    CreatorProfile, CreatorSubNiche, CreatorPlatform, CollabRequest, CollabMatchList, CollabMatchEntry
+)
+from app.services.collab_matching_engine import CollabMatchingEngine
+from app.services.collab_candidate_index import CollabCandidateIndex
+import numpy as np
 from sqlalchemy import or_, and_
+from sqlalchemy.orm import aliased
 
 
 class CollaborationService:
@@ -16,6 +22,31 @@ class CollaborationService:
     PLATFORM_WEIGHT = 15
     ACTIVITY_WEIGHT = 10
 
+    # Cached match lists: unfiltered /matches requests up to this size are served from cache
+    MATCH_CACHE_SIZE = 50
+    # Lists are also recomputed after this long, to pick up new creators and activity decay
+    MATCH_CACHE_MAX_AGE = timedelta(hours=6)
+
+    # Styles that pair well with each other
+    COMPATIBLE_STYLES = {
+        "educational": ["tutorials", "explainers", "howto"],
+        "entertainment": ["comedy", "vlogs", "challenges"],
+        "reviews": ["tutorials", "howto", "educational"]
+    }
+
+    def get_matching_engine(self) -> CollabMatchingEngine:
+        """Get a vectorized matching engine using this service's weights."""
+        return CollabMatchingEngine(
+            weights={
+                "niche": self.NICHE_WEIGHT,
+                "audience": self.AUDIENCE_WEIGHT,
+                "style": self.STYLE_WEIGHT,
+                "platform": self.PLATFORM_WEIGHT,
+                "activity": self.ACTIVITY_WEIGHT
+            },
+            compatible_styles=self.COMPATIBLE_STYLES
+        )
+
     def calculate_match_score(self, profile_a: CreatorProfile, profile_b: CreatorProfile) -> dict:
         """
         Calculate compatibility score between two creators.
@@ -72,14 +103,9 @@ class CollaborationService:
                 style_score = 100
             else:
                 # Compatible styles
-                compatible_styles = {
-                    "educational": ["tutorials", "explainers", "howto"],
-                    "entertainment": ["comedy", "vlogs", "challenges"],
-                    "reviews": ["tutorials", "howto", "educational"]
-                }
                 a_style = profile_a.content_style.lower()
                 b_style = profile_b.content_style.lower()
-                if a_style in compatible_styles and b_style in compatible_styles.get(a_style, []):
+                if a_style in self.COMPATIBLE_STYLES and b_style in self.COMPATIBLE_STYLES.get(a_style, []):
                     style_score = 70
                 else:
                     style_score = 30  # Different styles can still work
@@ -136,16 +162,21 @@ class CollaborationService:
         else:
             return "Low Match"
 
-    def find_matches(self, user_id: int, filters: dict = None) -> list:
+    def find_matches(self, user_id: int, filters: dict = None, limit: int = None) -> list:
         """
         Find potential collaboration partners for a user.
         
+        Unfiltered requests for at most MATCH_CACHE_SIZE matches are served from
+        the user's cached match list. Otherwise all candidates are scored in one
+        vectorized pass and only the top `limit` matches are serialized.
+        
         Args:
             user_id: The user's ID
-            filters: Optional filters (niche, min_audience, max_audience, style)
+            filters: Optional filters (niche, sub_niche, platform, min_audience, max_audience, style)
+            limit: Maximum number of matches to return (all when None)
         
         Returns:
-            List of matches with scores
+            List of matches with scores, best first
         """
         filters = filters or {}
         
@@ -154,6 +185,10 @@ class CollaborationService:
         if not user_profile:
             return []
         
+        # Unfiltered requests are served from the cached match list
+        if not filters and limit is not None and limit <= self.MATCH_CACHE_SIZE:
+            return self.get_cached_matches(user_profile, limit)
+        
         # Build query for potential matches
         query = CreatorProfile.query.filter(
             CreatorProfile.user_id != user_id,
@@ -164,6 +199,16 @@ class CollaborationService:
         if filters.get("niche"):
             query = query.filter(CreatorProfile.niche.ilike(f"%{filters['niche']}%"))
         
+        if filters.get("sub_niche"):
+            query = query.filter(CreatorProfile.niche_terms.any(
+                CreatorSubNiche.name == filters["sub_niche"].lower()
+            ))
+        
+        if filters.get("platform"):
+            query = query.filter(CreatorProfile.platform_entries.any(
+                CreatorPlatform.platform == filters["platform"]
+            ))
+        
         if filters.get("min_audience"):
             query = query.filter(CreatorProfile.audience_size >= filters["min_audience"])
         
@@ -176,27 +221,200 @@ class CollaborationService:
         # Get all potential matches
         potential_matches = query.all()
         
-        # Calculate match scores
+        return self._rank_candidates(user_profile, potential_matches, limit)
+
+    def _rank_candidates(self, user_profile: CreatorProfile, candidates: list, limit: int = None) -> list:
+        """Score candidates against a profile in one vectorized pass and serialize the top matches."""
+        engine = self.get_matching_engine()
+        features = engine.encode(candidates)
+        scores = engine.score(user_profile, features)
+        
         matches = []
-        for profile in potential_matches:
-            score_data = self.calculate_match_score(user_profile, profile)
+        for index in engine.top_k(scores["total_score"], limit):
+            total_score = float(scores["total_score"][index])
             matches.append({
-                "profile": profile.to_dict(),
-                "match_score": score_data["total_score"],
-                "score_breakdown": score_data["breakdown"],
-                "compatibility_level": score_data["compatibility_level"]
+                "profile": candidates[index].to_dict(),
+                "match_score": round(total_score, 1),
+                "score_breakdown": engine.breakdown(scores, index),
+                "compatibility_level": self._get_compatibility_level(total_score)
             })
         
-        # Sort by match score descending
-        matches.sort(key=lambda x: x["match_score"], reverse=True)
+        return matches
+
+    # ============ MATCH LIST CACHE ============
+
+    def get_cached_matches(self, user_profile: CreatorProfile, limit: int) -> list:
+        """
+        Get the top matches for a profile from its cached match list,
+        recomputing the list first if it is missing, stale or expired.
+        """
+        match_list = CollabMatchList.query.filter_by(user_id=user_profile.user_id).first()
+        if not match_list or match_list.is_expired(self.MATCH_CACHE_MAX_AGE):
+            match_list = self.refresh_match_list(user_profile)
+        
+        entries = match_list.entries[:limit]
+        profiles = {
+            p.id: p for p in CreatorProfile.query.filter(
+                CreatorProfile.id.in_([e.profile_id for e in entries])
+            ).all()
+        }
+        
+        matches = []
+        for entry in entries:
+            profile = profiles.get(entry.profile_id)
+            if not profile:
+                continue
+            matches.append({
+                "profile": profile.to_dict(),
+                "match_score": entry.match_score,
+                "score_breakdown": entry.get_score_breakdown(),
+                "compatibility_level": entry.compatibility_level
+            })
         
         return matches
 
+    def refresh_match_list(self, user_profile: CreatorProfile) -> CollabMatchList:
+        """Recompute and store the top MATCH_CACHE_SIZE matches for a profile."""
+        candidate_index.refresh()
+        ranked = candidate_index.rank(user_profile, self.MATCH_CACHE_SIZE)
+        
+        match_list = CollabMatchList.query.filter_by(user_id=user_profile.user_id).first()
+        if not match_list:
+            match_list = CollabMatchList(user_id=user_profile.user_id)
+            db.session.add(match_list)
+        
+        match_list.entries = []
+        for rank, (snapshot, total_score, breakdown) in enumerate(ranked):
+            entry = CollabMatchEntry(
+                profile_id=snapshot.id,
+                rank=rank,
+                match_score=round(total_score, 1),
+                compatibility_level=self._get_compatibility_level(total_score)
+            )
+            entry.set_score_breakdown(breakdown)
+            match_list.entries.append(entry)
+        
+        match_list.is_stale = False
+        match_list.computed_at = datetime.utcnow()
+        db.session.commit()
+        
+        return match_list
+
+    def invalidate_match_lists(self, profile: CreatorProfile):
+        """
+        Mark cached match lists affected by a profile change as stale:
+        the profile owner's own list, every list the profile appears in,
+        and, while the profile is open to collabs, the lists it would now
+        enter (see _lists_entered_by). Only call it when a field the
+        scorer reads changed (match_fields).
+        """
+        listing_ids = db.session.query(CollabMatchEntry.match_list_id).filter(
+            CollabMatchEntry.profile_id == profile.id
+        )
+        affected = [
+            CollabMatchList.user_id == profile.user_id,
+            CollabMatchList.id.in_(listing_ids)
+        ]
+        if profile.is_open_to_collabs:
+            entered = self._lists_entered_by(profile)
+            if entered:
+                affected.append(CollabMatchList.id.in_(entered))
+
+        CollabMatchList.query.filter(
+            CollabMatchList.is_stale == False,
+            or_(*affected)
+        ).update({"is_stale": True}, synchronize_session=False)
+        db.session.commit()
+
+    def _lists_entered_by(self, profile: CreatorProfile) -> list:
+        """
+        IDs of fresh match lists the profile would now enter: lists not yet
+        full, and lists whose lowest cached score it reaches. Only lists of
+        creators sharing a niche term with it are scored, plus lists ending
+        below the best score possible without a niche match; the rest can't
+        take it.
+        """
+        last = aliased(CollabMatchEntry)
+        lists = db.session.query(CollabMatchList.id, last.match_score, CreatorProfile).join(
+            CreatorProfile, CreatorProfile.user_id == CollabMatchList.user_id
+        ).outerjoin(
+            last, and_(last.match_list_id == CollabMatchList.id, last.rank == self.MATCH_CACHE_SIZE - 1)
+        ).filter(
+            CollabMatchList.is_stale == False,
+            CollabMatchList.user_id != profile.user_id
+        )
+
+        engine = self.get_matching_engine()
+        terms = {(profile.niche or "").lower()} | {n.lower() for n in profile.get_sub_niches()}
+        sharing = db.session.query(CreatorSubNiche.profile_id).filter(CreatorSubNiche.name.in_(terms))
+        without_niche = sum(engine.weights.values()) - self.NICHE_WEIGHT
+
+        rows = {}
+        for query in (
+            lists.filter(CreatorProfile.id.in_(sharing)),
+            lists.filter(or_(last.id.is_(None), last.match_score <= without_niche))
+        ):
+            for list_id, lowest, owner in query:
+                rows[list_id] = (lowest, owner)
+        if not rows:
+            return []
+
+        owners = [owner for _, owner in rows.values()]
+        scores = np.round(engine.score_as_candidate(profile, engine.encode(owners))["total_score"], 1)
+        return [
+            list_id for (list_id, (lowest, _)), score in zip(rows.items(), scores)
+            if lowest is None or score >= lowest  # Not full, or it would displace the last entry
+        ]
+
+    @staticmethod
+    def match_fields(profile: CreatorProfile) -> tuple:
+        """The profile fields the match scorer (or a match list's eligibility) depends on."""
+        return (
+            profile.niche,
+            tuple(profile.get_sub_niches()),
+            tuple(sorted(profile.get_platforms().items())),
+            profile.audience_size,
+            profile.content_style,
+            bool(profile.is_open_to_collabs),
+            tuple(profile.get_collab_interests()),
+            profile.preferred_min_audience,
+            profile.preferred_max_audience
+        )
+
+    def refresh_stale_match_lists(self, batch_size: int = 200) -> dict:
+        """
+        Recompute stale or expired match lists, oldest first.
+        Called periodically by the scheduler.
+        """
+        expired_before = datetime.utcnow() - self.MATCH_CACHE_MAX_AGE
+        match_lists = CollabMatchList.query.filter(
+            or_(
+                CollabMatchList.is_stale == True,
+                CollabMatchList.computed_at < expired_before
+            )
+        ).order_by(CollabMatchList.computed_at).limit(batch_size).all()
+        
+        refreshed = 0
+        for match_list in match_lists:
+            profile = CreatorProfile.query.filter_by(user_id=match_list.user_id).first()
+            if not profile:
+                db.session.delete(match_list)
+                db.session.commit()
+                continue
+            self.refresh_match_list(profile)
+            refreshed += 1
+        
+        return {
+            "success": True,
+            "refreshed": refreshed
+        }
+
     def get_or_create_profile(self, user_id: int, data: dict) -> dict:
         """
         Get or create a creator profile.
         """
         profile = CreatorProfile.query.filter_by(user_id=user_id).first()
+        previous = self.match_fields(profile) if profile else None
         
         if profile:
             # Update existing profile
@@ -247,7 +465,11 @@ class CollaborationService:
             
             db.session.add(profile)
         
+        profile.sync_lookup_tables()
         db.session.commit()
+        # Bio, display name and image edits don't change any match
+        if self.match_fields(profile) != previous:
+            self.invalidate_match_lists(profile)
         
         return {
             "success": True,
@@ -401,3 +623,7 @@ class CollaborationService:
         if not profile:
             return None
         return profile.to_dict()
+
+
+# Shared per-process candidate index used to build cached match lists
+candidate_index = CollabCandidateIndex(lambda: CollaborationService().get_matching_engine())
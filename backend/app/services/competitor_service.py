@@ -1,9 +1,16 @@
 import os
 import re
 from datetime import datetime, timedelta
-from googleapiclient.discovery import build
 from app.extensions import db
 from app.models.sql.competitor import Competitor, CompetitorVideo
+from sqlalchemy.orm import undefer_group
+from app.utils.telemetry import span
+from app.utils.aio import run_sync
+from app.services.budget_service import budget_manager, youtube_cost
+from app.services.youtube_service import youtube_api_get
+from app.utils.lazy import lazy_attr
+
+build = lazy_attr("googleapiclient.discovery", "build")
 
 
 class CompetitorService:
@@ -54,13 +61,20 @@ class CompetitorService:
             return None
             
         try:
+            admission = budget_manager.admit("youtube", youtube_cost("search.list"))
+            if not admission.allowed:
+                print(f"YouTube budget exhausted, skipping channel lookup for {handle}")
+                return None
+
             request = self.youtube.search().list(
                 q=handle,
                 part='snippet',
                 type='channel',
                 maxResults=1
             )
-            response = request.execute()
+            with span("youtube", "search.list"):
+                response = request.execute()
+            budget_manager.record("youtube", youtube_cost("search.list"))
             
             if response.get('items'):
                 return response['items'][0]
@@ -79,25 +93,30 @@ class CompetitorService:
                 part='snippet,statistics,contentDetails',
                 id=channel_id
             )
-            response = request.execute()
+            with span("youtube", "channels.list"):
+                response = request.execute()
+            budget_manager.record("youtube", youtube_cost("channels.list"))
             
-            if response.get('items'):
-                item = response['items'][0]
-                return {
-                    "channel_id": item['id'],
-                    "channel_name": item['snippet']['title'],
-                    "description": item['snippet'].get('description', ''),
-                    "thumbnail": item['snippet']['thumbnails'].get('high', {}).get('url'),
-                    "subscriber_count": int(item['statistics'].get('subscriberCount', 0)),
-                    "video_count": int(item['statistics'].get('videoCount', 0)),
-                    "total_views": int(item['statistics'].get('viewCount', 0)),
-                    "uploads_playlist": item['contentDetails']['relatedPlaylists'].get('uploads')
-                }
-            return None
+            return self._channel_details(response)
         except Exception as e:
             print(f"Error fetching channel details: {e}")
             return None
 
+    def _channel_details(self, response: dict) -> dict:
+        if response.get('items'):
+            item = response['items'][0]
+            return {
+                "channel_id": item['id'],
+                "channel_name": item['snippet']['title'],
+                "description": item['snippet'].get('description', ''),
+                "thumbnail": item['snippet']['thumbnails'].get('high', {}).get('url'),
+                "subscriber_count": int(item['statistics'].get('subscriberCount', 0)),
+                "video_count": int(item['statistics'].get('videoCount', 0)),
+                "total_views": int(item['statistics'].get('viewCount', 0)),
+                "uploads_playlist": item['contentDetails']['relatedPlaylists'].get('uploads')
+            }
+        return None
+
     def add_competitor(self, user_id: int, channel_url: str) -> dict:
         """
         Add a new competitor channel for tracking.
@@ -170,7 +189,9 @@ class CompetitorService:
                 playlistId=playlist_id,
                 maxResults=max_results
             )
-            response = request.execute()
+            with span("youtube", "playlistItems.list"):
+                response = request.execute()
+            budget_manager.record("youtube", youtube_cost("playlistItems.list"))
             
             video_ids = [item['contentDetails']['videoId'] for item in response.get('items', [])]
             
@@ -182,34 +203,39 @@ class CompetitorService:
                 part='statistics,contentDetails',
                 id=','.join(video_ids)
             )
-            stats_response = stats_request.execute()
+            with span("youtube", "videos.list"):
+                stats_response = stats_request.execute()
+            budget_manager.record("youtube", youtube_cost("videos.list"))
             
-            stats_map = {}
-            for item in stats_response.get('items', []):
-                stats_map[item['id']] = item
-            
-            videos = []
-            for item in response.get('items', []):
-                video_id = item['contentDetails']['videoId']
-                stats = stats_map.get(video_id, {})
-                
-                videos.append({
-                    "video_id": video_id,
-                    "title": item['snippet']['title'],
-                    "description": item['snippet'].get('description', ''),
-                    "thumbnail_url": item['snippet']['thumbnails'].get('high', {}).get('url'),
-                    "published_at": item['snippet'].get('publishedAt'),
-                    "views": int(stats.get('statistics', {}).get('viewCount', 0)),
-                    "likes": int(stats.get('statistics', {}).get('likeCount', 0)),
-                    "comments": int(stats.get('statistics', {}).get('commentCount', 0)),
-                    "duration": stats.get('contentDetails', {}).get('duration')
-                })
-            
-            return videos
+            return self._playlist_videos(response, stats_response)
         except Exception as e:
             print(f"Error fetching playlist videos: {e}")
             return []
 
+    def _playlist_videos(self, response: dict, stats_response: dict) -> list:
+        stats_map = {}
+        for item in stats_response.get('items', []):
+            stats_map[item['id']] = item
+        
+        videos = []
+        for item in response.get('items', []):
+            video_id = item['contentDetails']['videoId']
+            stats = stats_map.get(video_id, {})
+            
+            videos.append({
+                "video_id": video_id,
+                "title": item['snippet']['title'],
+                "description": item['snippet'].get('description', ''),
+                "thumbnail_url": item['snippet']['thumbnails'].get('high', {}).get('url'),
+                "published_at": item['snippet'].get('publishedAt'),
+                "views": int(stats.get('statistics', {}).get('viewCount', 0)),
+                "likes": int(stats.get('statistics', {}).get('likeCount', 0)),
+                "comments": int(stats.get('statistics', {}).get('commentCount', 0)),
+                "duration": stats.get('contentDetails', {}).get('duration')
+            })
+        
+        return videos
+
     def sync_competitor_videos(self, competitor_id: int, uploads_playlist: str = None) -> dict:
         """Sync/refresh videos for a competitor."""
         competitor = Competitor.query.get(competitor_id)
@@ -359,7 +385,7 @@ class CompetitorService:
         if not competitor:
             return []
         
-        videos = CompetitorVideo.query.filter(
+        videos = CompetitorVideo.query.options(undefer_group("details")).filter(
             CompetitorVideo.competitor_id == competitor_id,
             CompetitorVideo.viral_score >= min_score
         ).order_by(CompetitorVideo.viral_score.desc()).limit(10).all()
@@ -412,3 +438,73 @@ class CompetitorService:
         db.session.commit()
         
         return {"success": True, "message": "Competitor removed successfully"}
+
+
+class AsyncCompetitorService(CompetitorService):
+    """
+    The YouTube lookups of CompetitorService for coroutines, over the Data
+    API's REST endpoints. Syncing and metrics stay synchronous: they are
+    database work.
+    """
+
+    def __init__(self):
+        self.api_key = os.getenv("YOUTUBE_API_KEY")
+        self.youtube = None
+
+    async def get_channel_by_handle(self, handle: str) -> dict:
+        if not self.api_key:
+            return None
+        try:
+            admission = await run_sync(budget_manager.admit, "youtube", youtube_cost("search.list"))
+            if not admission.allowed:
+                print(f"YouTube budget exhausted, skipping channel lookup for {handle}")
+                return None
+            with span("youtube", "search.list"):
+                response = await youtube_api_get(
+                    "search", {"q": handle, "part": "snippet", "type": "channel", "maxResults": 1}, self.api_key
+                )
+            await run_sync(budget_manager.record, "youtube", youtube_cost("search.list"))
+            return response['items'][0] if response.get('items') else None
+        except Exception as e:
+            print(f"Error fetching channel by handle: {e}")
+            return None
+
+    async def get_channel_details(self, channel_id: str) -> dict:
+        if not self.api_key:
+            return None
+        try:
+            with span("youtube", "channels.list"):
+                response = await youtube_api_get(
+                    "channels", {"part": "snippet,statistics,contentDetails", "id": channel_id}, self.api_key
+                )
+            await run_sync(budget_manager.record, "youtube", youtube_cost("channels.list"))
+            return self._channel_details(response)
+        except Exception as e:
+            print(f"Error fetching channel details: {e}")
+            return None
+
+    async def get_playlist_videos(self, playlist_id: str, max_results: int = 20) -> list:
+        if not self.api_key:
+            return []
+        try:
+            with span("youtube", "playlistItems.list"):
+                response = await youtube_api_get(
+                    "playlistItems",
+                    {"part": "snippet,contentDetails", "playlistId": playlist_id, "maxResults": max_results},
+                    self.api_key
+                )
+            await run_sync(budget_manager.record, "youtube", youtube_cost("playlistItems.list"))
+
+            video_ids = [item['contentDetails']['videoId'] for item in response.get('items', [])]
+            if not video_ids:
+                return []
+
+            with span("youtube", "videos.list"):
+                stats_response = await youtube_api_get(
+                    "videos", {"part": "statistics,contentDetails", "id": ",".join(video_ids)}, self.api_key
+                )
+            await run_sync(budget_manager.record, "youtube", youtube_cost("videos.list"))
+            return self._playlist_videos(response, stats_response)
+        except Exception as e:
+            print(f"Error fetching playlist videos: {e}")
+            return []
@@ -1,5 +1,10 @@
 import os
-from google import genai
+from app.utils.telemetry import span
+from app.utils.aio import run_sync
+from app.services.budget_service import budget_manager, estimate_tokens
+from app.utils.lazy import lazy_module
+
+genai = lazy_module("google.genai")
 
 class EmbeddingService:
     def __init__(self):
@@ -7,12 +12,38 @@ class EmbeddingService:
 
     def embed(self, texts: list[str]) -> list[list[float]]:
         if not texts: return []
+
+        estimate = sum(estimate_tokens(text) for text in texts)
+        if not budget_manager.admit("gemini", estimate).allowed:
+            # Clustering treats no embeddings as "no clusters"
+            return []
         
         # Use the newer and more stable text-embedding-004
-        result = self.client.models.embed_content(
-            model="text-embedding-004", 
-            contents=texts
-        )
+        with span("gemini", "embed_content"):
+            result = self.client.models.embed_content(
+                model="text-embedding-004", 
+                contents=texts
+            )
+        budget_manager.record("gemini", estimate)
         
         # Extract the vector values from the response
-        return [e.values for e in result.embeddings]
\ No newline at end of file
+        return [e.values for e in result.embeddings]
+
+
+class AsyncEmbeddingService(EmbeddingService):
+    """EmbeddingService for coroutines, on the genai client's aio interface."""
+
+    async def embed(self, texts: list[str]) -> list[list[float]]:
+        if not texts: return []
+
+        estimate = sum(estimate_tokens(text) for text in texts)
+        if not (await run_sync(budget_manager.admit, "gemini", estimate)).allowed:
+            return []
+
+        with span("gemini", "embed_content"):
+            result = await self.client.aio.models.embed_content(
+                model="text-embedding-004",
+                contents=texts
+            )
+        await run_sync(budget_manager.record, "gemini", estimate)
+        return [e.values for e in result.embeddings]
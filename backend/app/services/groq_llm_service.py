@@ -1,41 +1,282 @@
 import os
 import json
-from groq import Groq
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from app.utils.telemetry import span
+from app.utils.rate_limiter import (
+    AdaptiveConcurrency, RateLimitTimeout, SharedRateLimiter, backoff_delay, parse_duration, upstream_retries
+)
+from app.services.budget_service import COMPLETE_CONTENT_TOKENS, BudgetExceeded, budget_manager, estimate_tokens
+from app.services.llm_service import AsyncLLMService, LLMService
+from app.services.model_router import model_router, with_context
+from app.services import llm_schemas
+from app.utils.structured_output import agenerate_structured, generate_structured, validate
+from app.utils.aio import run_sync
+from app.utils.lazy import lazy_attr, lazy_module
+
+groq = lazy_module("groq")
+Groq = lazy_attr("groq", "Groq")
+AsyncGroq = lazy_attr("groq", "AsyncGroq")
+
+SYSTEM_PROMPT = "You are an expert content creator and social media strategist. Create engaging, viral-worthy content that captures attention and drives engagement."
+
+# Requests and tokens per minute per model (free tier), lowered automatically from the response headers
+GROQ_MODEL_LIMITS = {
+    "llama-3.1-8b-instant": (int(os.getenv("GROQ_RPM", 30)), int(os.getenv("GROQ_TPM", 6000))),
+    "llama-3.3-70b-versatile": (30, 12000),
+}
+_rate_limiters = {}
+
+
+def groq_rate_limiter(model: str) -> SharedRateLimiter:
+    """The shared limiter for a Groq model; Groq enforces limits per model."""
+    limiter = _rate_limiters.get(model)
+    if limiter is None:
+        rpm, tpm = GROQ_MODEL_LIMITS.get(model, GROQ_MODEL_LIMITS["llama-3.1-8b-instant"])
+        limiter = _rate_limiters.setdefault(model, SharedRateLimiter(
+            f"groq_{model.replace('.', '_')}", rpm=rpm, tpm=tpm,
+            max_wait=float(os.getenv("GROQ_MAX_QUEUE_SECONDS", 120))
+        ))
+    return limiter
+
+
+def _failed_generation(error) -> str:
+    """The rejected completion Groq returns with a json_validate_failed error, if any."""
+    body = getattr(error, "body", None)
+    if not isinstance(body, dict):
+        return None
+    details = body.get("error", body)
+    if isinstance(details, dict) and details.get("code") == "json_validate_failed":
+        return details.get("failed_generation") or None
+    return None
+
+
+groq_concurrency = AdaptiveConcurrency(initial=4, maximum=int(os.getenv("GROQ_MAX_CONCURRENCY", 16)))
+
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+
+# Batched prompts: items per completion, and the completion allowance one batch may use
+BATCH_MAX_ITEMS = int(os.getenv("LLM_BATCH_MAX_ITEMS", 6))
+BATCH_MAX_TOKENS = 8000
+_batch_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="llm-batch")
+
+
+def _items_per_batch(max_tokens: int) -> int:
+    """
+    How many items of max_tokens each one completion may pack: as many as
+    fit in BATCH_MAX_TOKENS, up to BATCH_MAX_ITEMS. 1 (no batching) when a
+    single item may use more than a batch, so it keeps its full allowance.
+    """
+    if max_tokens <= 0:
+        raise ValueError(f"max_tokens must be positive, got {max_tokens}")
+    if max_tokens > BATCH_MAX_TOKENS:
+        return 1
+    return max(1, min(BATCH_MAX_ITEMS, BATCH_MAX_TOKENS // max_tokens))
 
 
 class GroqLLMService:
     """
     LLaMA 3 powered content generation service using Groq's free API tier.
     Generates video scripts, social media posts, captions, hashtags, and more.
+    Each generator names its task; model_router picks the Groq or Gemini
+    model for it and falls back across them.
     """
     
     def __init__(self):
-        self.client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+        # Retries are handled in call_groq so they respect the shared rate limit
+        self.client = Groq(api_key=os.getenv("GROQ_API_KEY"), max_retries=0)
         self.model = "llama-3.1-8b-instant"  # Fast, free tier model
+        self._gemini = None
     
-    def _generate(self, prompt: str, max_tokens: int = 2048, json_mode: bool = False) -> str:
-        """Base generation method with error handling."""
+    def _generate(self, prompt: str, max_tokens: int = 2048, json_mode: bool = False, task: str = "general") -> str:
+        """Base generation method: routes the prompt to the best model for the task."""
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert content creator and social media strategist. Create engaging, viral-worthy content that captures attention and drives engagement."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                max_tokens=max_tokens,
-                temperature=0.8,
-                response_format={"type": "json_object"} if json_mode else None
-            )
-            return response.choices[0].message.content
+            return model_router.generate(task, prompt, max_tokens, json_mode, {
+                "groq": self.call_groq,
+                "gemini": self._call_gemini
+            })
+        except BudgetExceeded:
+            raise
         except Exception as e:
-            print(f"Groq LLM Error: {e}")
+            print(f"LLM Error ({task}): {e}")
             raise Exception(f"Content generation failed: {str(e)}")
+
+    def generate_json(self, prompt: str, max_tokens: int = 2048, task: str = "general", schema: dict = None):
+        """
+        Generate a JSON result, tolerating fences and small syntax defects.
+        A completion cut off at max_tokens is continued instead of regenerated,
+        and the result is validated against `schema`.
+        """
+        return generate_structured(
+            lambda text, json_mode: self._generate(text, max_tokens, json_mode, task),
+            prompt,
+            schema
+        )
+
+    def generate_batch(self, prompts: dict, max_tokens: int = 1024, task: str = "general", schema: dict = None) -> dict:
+        """
+        Run several small, independent JSON prompts as one completion.
+
+        The prompts are packed into a single request that asks for one JSON
+        object keyed by task id, so the system prompt and per-request
+        overhead are paid once per batch instead of once per item. Items the
+        batch response leaves out or gets wrong (per `schema`) are retried
+        with individual calls, as is every item of a batch that fails.
+
+        Args:
+            prompts: key -> prompt, each asking for a JSON object
+            max_tokens: Completion allowance per item (positive); above
+                BATCH_MAX_TOKENS every item is generated individually
+            task: Routing task for the batch and the individual calls
+            schema: JSON schema every item's result must satisfy
+
+        Returns:
+            key -> result; keys whose individual call also failed are left out
+
+        Raises:
+            ValueError: max_tokens is not positive
+        """
+        keys = list(prompts)
+        per_batch = _items_per_batch(max_tokens)
+        results = {}
+        for start in range(0, len(keys), per_batch):
+            chunk = keys[start:start + per_batch]
+            if len(chunk) > 1:
+                results.update(self._run_batch({key: prompts[key] for key in chunk}, max_tokens, task, schema))
+
+        # Whatever the batches didn't deliver is generated individually, in parallel
+        def generate_one(key):
+            return self.generate_json(prompts[key], max_tokens, task, schema)
+
+        leftovers = [key for key in keys if key not in results]
+        futures = {key: _batch_pool.submit(with_context(generate_one), key) for key in leftovers}
+        for key, future in futures.items():
+            try:
+                results[key] = future.result()
+            except BudgetExceeded:
+                raise
+            except Exception as e:
+                print(f"LLM batch item '{key}' failed: {e}")
+        return results
+
+    def _run_batch(self, prompts: dict, max_tokens: int, task: str, schema: dict) -> dict:
+        """The items of one packed completion that came back valid."""
+        ids, prompt = self._batch_prompt(prompts)
+        try:
+            # Only the envelope is required here: missing or invalid items are redone individually
+            response = self.generate_json(prompt, min(max_tokens * len(ids), BATCH_MAX_TOKENS), task, {"type": "object"})
+        except BudgetExceeded:
+            raise
+        except Exception as e:
+            print(f"LLM batch of {len(ids)} failed, falling back to individual calls: {e}")
+            return {}
+        return self._split_batch(ids, response, schema)
+
+    def _batch_prompt(self, prompts: dict) -> tuple:
+        """(task id -> key, packed prompt) for one batch."""
+        ids = {f"task_{i + 1}": key for i, key in enumerate(prompts)}
+        sections = "\n\n".join(f'=== Task "{task_id}" ===\n{prompts[key].strip()}' for task_id, key in ids.items())
+        prompt = f"""Complete the following {len(ids)} independent tasks. Answer each one exactly as it asks, without letting the tasks influence each other.
+
+Reply with one JSON object that has a key for every task id ({", ".join(ids)}) whose value is the JSON object that task asks for.
+
+{sections}"""
+        return ids, prompt
+
+    def _split_batch(self, ids: dict, response: dict, schema: dict) -> dict:
+        results = {}
+        for task_id, key in ids.items():
+            value = response.get(task_id)
+            if value is not None and not validate(value, schema):
+                results[key] = value
+        return results
+
+    def _call_gemini(self, model: str, prompt: str, max_tokens: int, json_mode: bool, attempts: int = 1) -> str:
+        if self._gemini is None:
+            self._gemini = LLMService()
+        return self._gemini.generate(model, prompt, max_tokens, json_mode, attempts, system=SYSTEM_PROMPT)
+
+    def call_groq(self, model: str, prompt: str, max_tokens: int = 2048, json_mode: bool = False,
+                  attempts: int = 1, system: str = SYSTEM_PROMPT) -> str:
+        """
+        One Groq completion with token budget admission, client-side rate
+        limiting and up to `attempts` tries with jittered backoff on 429s
+        and server errors.
+        """
+        admission = budget_manager.admit("groq", estimate_tokens(prompt, max_tokens))
+        admission.raise_for_denial("groq")
+        if admission.degraded:
+            max_tokens = budget_manager.degraded_max_tokens(max_tokens)
+        estimate = estimate_tokens(prompt, max_tokens)
+        limiter = groq_rate_limiter(model)
+        messages = self._messages(prompt, system)
+
+        for attempt in range(attempts):
+            try:
+                reservation = limiter.acquire(estimate)
+            except RateLimitTimeout as e:
+                raise BudgetExceeded("groq", "rate limit", e.retry_after)
+
+            try:
+                with groq_concurrency.slot(), span("groq", "chat.completions"):
+                    raw = self.client.chat.completions.with_raw_response.create(
+                        model=model,
+                        messages=messages,
+                        max_tokens=max_tokens,
+                        temperature=0.8,
+                        response_format={"type": "json_object"} if json_mode else None
+                    )
+                limiter.update_from_headers(raw.headers)
+                groq_concurrency.on_success()
+                response = raw.parse()
+            except Exception as e:
+                failed_generation = _failed_generation(e)
+                if failed_generation:
+                    # JSON mode rejected the completion (usually cut off at max_tokens);
+                    # the structured-output layer can still repair or continue it
+                    limiter.settle(reservation, estimate)
+                    budget_manager.record("groq", estimate, degraded=admission.degraded)
+                    return failed_generation
+
+                limiter.settle(reservation, 0)
+                time.sleep(self._retry_delay(e, limiter, model, attempt, attempts))
+                continue
+
+            usage = getattr(response, "usage", None)
+            used = getattr(usage, "total_tokens", None) or estimate
+            limiter.settle(reservation, used)
+            budget_manager.record("groq", used, degraded=admission.degraded)
+            return response.choices[0].message.content
+
+    def _messages(self, prompt: str, system: str) -> list:
+        messages = [{"role": "user", "content": prompt}]
+        if system:
+            messages.insert(0, {"role": "system", "content": system})
+        return messages
+
+    def _retry_delay(self, error: Exception, limiter: SharedRateLimiter, model: str, attempt: int, attempts: int) -> float:
+        """Backoff before retrying a failed call; re-raises `error` when it is final."""
+        status = getattr(error, "status_code", None)
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        retry_after = parse_duration(headers.get("retry-after"))
+        if status == 429:
+            groq_concurrency.on_throttled()
+            limiter.update_from_headers(headers)
+            if retry_after:
+                limiter.block_for(retry_after)
+            if retry_after > limiter.max_wait:
+                # Longer than a caller may queue (e.g. the daily allowance): fail now,
+                # like a queue timeout, instead of holding the thread until the reset
+                print(f"Groq rate limited ({model}) for {retry_after:.0f}s, not retrying")
+                raise BudgetExceeded("groq", "rate limit", int(retry_after) + 1)
+
+        retryable = status in RETRYABLE_STATUSES or isinstance(error, (groq.APIConnectionError, groq.APITimeoutError))
+        if not retryable or attempt == attempts - 1:
+            print(f"Groq LLM Error ({model}): {error}")
+            raise error
+        upstream_retries.inc(service="groq", reason=str(status or type(error).__name__))
+        return backoff_delay(attempt, retry_after=retry_after)
     
     def generate_hook(self, topic: str, platform: str = "tiktok", style: str = "engaging") -> dict:
         """
@@ -73,8 +314,7 @@ Return a JSON object with this exact structure:
     "best_for_platform": "Which hook works best for {platform} and why"
 }}"""
         
-        result = self._generate(prompt, json_mode=True)
-        return json.loads(result)
+        return self.generate_json(prompt, task="hook", schema=llm_schemas.HOOKS)
     
     def generate_full_script(self, topic: str, duration: int = 60, platform: str = "tiktok", style: str = "engaging") -> dict:
         """
@@ -119,8 +359,7 @@ Return a JSON object with this structure:
     "text_overlays": ["Key text to show on screen"]
 }}"""
         
-        result = self._generate(prompt, max_tokens=3000, json_mode=True)
-        return json.loads(result)
+        return self.generate_json(prompt, max_tokens=3000, task="script", schema=llm_schemas.SCRIPT)
     
     def generate_captions(self, topic: str, content_summary: str = "", tone: str = "engaging") -> dict:
         """
@@ -175,8 +414,7 @@ Return a JSON object with this structure:
     }}
 }}"""
         
-        result = self._generate(prompt, max_tokens=3000, json_mode=True)
-        return json.loads(result)
+        return self.generate_json(prompt, max_tokens=3000, task="captions", schema=llm_schemas.CAPTIONS)
     
     def generate_hashtags(self, topic: str, platform: str = "all", niche: str = "") -> dict:
         """
@@ -227,8 +465,7 @@ Return a JSON object with this structure:
     "avoid_hashtags": ["Lists generic or overused tags to avoid"]
 }}"""
         
-        result = self._generate(prompt, json_mode=True)
-        return json.loads(result)
+        return self.generate_json(prompt, task="hashtags", schema=llm_schemas.HASHTAGS)
     
     def generate_thumbnail_titles(self, topic: str, video_type: str = "educational", target_emotion: str = "curiosity") -> dict:
         """
@@ -274,8 +511,7 @@ Return a JSON object with this structure:
     }}
 }}"""
         
-        result = self._generate(prompt, json_mode=True)
-        return json.loads(result)
+        return self.generate_json(prompt, task="thumbnails", schema=llm_schemas.THUMBNAILS)
     
     def generate_complete_content(self, topic: str, platform: str = "all", duration: int = 60, 
                                    style: str = "engaging", niche: str = "") -> dict:
@@ -296,6 +532,9 @@ Return a JSON object with this structure:
             Complete content package with hooks, script, captions, hashtags, and thumbnails
         """
         try:
+            # Refuse up front rather than failing halfway through the five prompts
+            budget_manager.admit("groq", COMPLETE_CONTENT_TOKENS).raise_for_denial("groq")
+
             # Generate all components
             hooks = self.generate_hook(topic, platform, style)
             script = self.generate_full_script(topic, duration, platform, style)
@@ -303,35 +542,42 @@ Return a JSON object with this structure:
             hashtags = self.generate_hashtags(topic, platform, niche)
             thumbnails = self.generate_thumbnail_titles(topic)
             
-            return {
-                "success": True,
-                "topic": topic,
-                "platform": platform,
-                "content_package": {
-                    "hooks": hooks,
-                    "script": script,
-                    "captions": captions,
-                    "hashtags": hashtags,
-                    "thumbnails": thumbnails
-                },
-                "estimated_time_saved": "4-6 hours",
-                "content_ready": True
-            }
+            return self._content_package(topic, platform, hooks, script, captions, hashtags, thumbnails)
+        except BudgetExceeded:
+            raise
         except Exception as e:
             return {
                 "success": False,
                 "error": str(e),
                 "topic": topic
             }
+
+    def _content_package(self, topic: str, platform: str, hooks: dict, script: dict, captions: dict,
+                         hashtags: dict, thumbnails: dict) -> dict:
+        return {
+            "success": True,
+            "topic": topic,
+            "platform": platform,
+            "content_package": {
+                "hooks": hooks,
+                "script": script,
+                "captions": captions,
+                "hashtags": hashtags,
+                "thumbnails": thumbnails
+            },
+            "estimated_time_saved": "4-6 hours",
+            "content_ready": True
+        }
     
     def test_connection(self) -> dict:
         """Test the Groq API connection."""
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": "Say 'API connected successfully' in 5 words or less."}],
-                max_tokens=20
-            )
+            with span("groq", "chat.completions"):
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[{"role": "user", "content": "Say 'API connected successfully' in 5 words or less."}],
+                    max_tokens=20
+                )
             return {
                 "success": True,
                 "message": response.choices[0].message.content,
@@ -391,8 +637,7 @@ Return a JSON object with this structure:
     ]
 }}"""
         
-        result = self._generate(prompt, max_tokens=2000, json_mode=True)
-        return json.loads(result)
+        return self.generate_json(prompt, max_tokens=2000, task="analysis", schema=llm_schemas.VIRAL_ANALYSIS)
 
     def analyze_content_gaps(self, user_topics: list, competitor_topics: list) -> dict:
         """
@@ -452,8 +697,7 @@ Return a JSON object with this structure:
     ]
 }}"""
         
-        result = self._generate(prompt, max_tokens=2500, json_mode=True)
-        return json.loads(result)
+        return self.generate_json(prompt, max_tokens=2500, task="analysis", schema=llm_schemas.CONTENT_GAPS)
 
     # ============ NICHE FINDER METHODS ============
     
@@ -512,8 +756,7 @@ Return a JSON object with this structure:
     "verdict": "Overall recommendation for this niche"
 }}"""
         
-        result = self._generate(prompt, max_tokens=2500, json_mode=True)
-        return json.loads(result)
+        return self.generate_json(prompt, max_tokens=2500, task="analysis", schema=llm_schemas.NICHE_ANALYSIS)
 
     def find_micro_niches(self, parent_niche: str) -> dict:
         """
@@ -560,8 +803,7 @@ Return a JSON object with this structure:
     "recommendation": "Best micro-niche to start with and why"
 }}"""
         
-        result = self._generate(prompt, max_tokens=3000, json_mode=True)
-        return json.loads(result)
+        return self.generate_json(prompt, max_tokens=3000, task="analysis", schema=llm_schemas.MICRO_NICHES)
 
     def find_related_niches(self, niche_name: str) -> dict:
         """
@@ -600,8 +842,7 @@ Return a JSON object with this structure:
     "expansion_strategy": "Recommended path to expand into new niches"
 }}"""
         
-        result = self._generate(prompt, max_tokens=2000, json_mode=True)
-        return json.loads(result)
+        return self.generate_json(prompt, max_tokens=2000, task="analysis", schema=llm_schemas.RELATED_NICHES)
 
     def explore_trending_niches(self) -> dict:
         """
@@ -648,8 +889,7 @@ Return a JSON object with this structure:
     "prediction": "Where content creation is heading in 6 months"
 }"""
         
-        result = self._generate(prompt, max_tokens=3000, json_mode=True)
-        return json.loads(result)
+        return self.generate_json(prompt, max_tokens=3000, task="analysis", schema=llm_schemas.TRENDING_NICHES)
 
     # ============ ANALYTICS & CONTENT SCORING METHODS ============
     
@@ -715,8 +955,7 @@ Return a JSON object with this structure:
     "final_recommendation": "Post now / Improve first / Reconsider"
 }}"""
         
-        result = self._generate(prompt, max_tokens=2000, json_mode=True)
-        return json.loads(result)
+        return self.generate_json(prompt, max_tokens=2000, task="analysis", schema=llm_schemas.CONTENT_SCORE)
 
     def generate_weekly_insights(self, performance_data: dict) -> dict:
         """
@@ -777,8 +1016,7 @@ Return a JSON object with this structure:
     "motivational_note": "Encouraging message based on the data"
 }}"""
         
-        result = self._generate(prompt, max_tokens=2500, json_mode=True)
-        return json.loads(result)
+        return self.generate_json(prompt, max_tokens=2500, task="analysis", schema=llm_schemas.WEEKLY_INSIGHTS)
 
     def suggest_ab_tests(self, content_data: dict) -> dict:
         """
@@ -823,8 +1061,7 @@ Return a JSON object with this structure:
     ]
 }}"""
         
-        result = self._generate(prompt, max_tokens=2000, json_mode=True)
-        return json.loads(result)
+        return self.generate_json(prompt, max_tokens=2000, task="analysis", schema=llm_schemas.AB_TESTS)
 
     # ============ COLLABORATION METHODS ============
     
@@ -876,8 +1113,7 @@ Return a JSON object with this structure:
     "follow_up_suggestion": "What to say if no response after a week"
 }}"""
         
-        result = self._generate(prompt, max_tokens=2500, json_mode=True)
-        return json.loads(result)
+        return self.generate_json(prompt, max_tokens=2500, task="analysis", schema=llm_schemas.PITCH_TEMPLATES)
 
     def generate_collab_ideas(self, profile_a: dict, profile_b: dict) -> dict:
         """
@@ -932,8 +1168,7 @@ Return a JSON object with this structure:
     "content_split": "Suggested content division between creators"
 }}"""
         
-        result = self._generate(prompt, max_tokens=3000, json_mode=True)
-        return json.loads(result)
+        return self.generate_json(prompt, max_tokens=3000, task="analysis", schema=llm_schemas.COLLAB_IDEAS)
 
     def analyze_collab_compatibility(self, profile_a: dict, profile_b: dict, match_score: float) -> dict:
         """
@@ -987,5 +1222,177 @@ Return a JSON object with this structure:
     "recommendation": "Final recommendation on proceeding"
 }}"""
         
-        result = self._generate(prompt, max_tokens=2000, json_mode=True)
-        return json.loads(result)
+        return self.generate_json(prompt, max_tokens=2000, task="analysis", schema=llm_schemas.COLLAB_COMPATIBILITY)
+
+
+class AsyncGroqLLMService(GroqLLMService):
+    """
+    GroqLLMService for coroutines, on AsyncGroq and AsyncLLMService.
+
+    The generators are inherited unchanged: each ends in
+    `return self.generate_json(...)`, which here returns a coroutine, so
+    `await service.generate_hook(...)` works for all of them. Methods that
+    do more than that are overridden below.
+    """
+
+    def __init__(self):
+        self.client = AsyncGroq(api_key=os.getenv("GROQ_API_KEY"), max_retries=0)
+        self.model = "llama-3.1-8b-instant"
+        self._gemini = None
+
+    async def _generate(self, prompt: str, max_tokens: int = 2048, json_mode: bool = False, task: str = "general") -> str:
+        try:
+            return await model_router.agenerate(task, prompt, max_tokens, json_mode, {
+                "groq": self.call_groq,
+                "gemini": self._call_gemini
+            })
+        except BudgetExceeded:
+            raise
+        except Exception as e:
+            print(f"LLM Error ({task}): {e}")
+            raise Exception(f"Content generation failed: {str(e)}")
+
+    async def generate_json(self, prompt: str, max_tokens: int = 2048, task: str = "general", schema: dict = None):
+        return await agenerate_structured(
+            lambda text, json_mode: self._generate(text, max_tokens, json_mode, task),
+            prompt,
+            schema
+        )
+
+    async def generate_batch(self, prompts: dict, max_tokens: int = 1024, task: str = "general", schema: dict = None) -> dict:
+        keys = list(prompts)
+        per_batch = _items_per_batch(max_tokens)
+        chunks = [keys[start:start + per_batch] for start in range(0, len(keys), per_batch)]
+        results = {}
+        for batch in await asyncio.gather(*(
+            self._run_batch({key: prompts[key] for key in chunk}, max_tokens, task, schema)
+            for chunk in chunks if len(chunk) > 1
+        )):
+            results.update(batch)
+
+        leftovers = [key for key in keys if key not in results]
+        outcomes = await asyncio.gather(
+            *(self.generate_json(prompts[key], max_tokens, task, schema) for key in leftovers),
+            return_exceptions=True
+        )
+        for key, outcome in zip(leftovers, outcomes):
+            if isinstance(outcome, BudgetExceeded):
+                raise outcome
+            if isinstance(outcome, Exception):
+                print(f"LLM batch item '{key}' failed: {outcome}")
+            else:
+                results[key] = outcome
+        return results
+
+    async def _run_batch(self, prompts: dict, max_tokens: int, task: str, schema: dict) -> dict:
+        ids, prompt = self._batch_prompt(prompts)
+        try:
+            response = await self.generate_json(prompt, min(max_tokens * len(ids), BATCH_MAX_TOKENS), task, {"type": "object"})
+        except BudgetExceeded:
+            raise
+        except Exception as e:
+            print(f"LLM batch of {len(ids)} failed, falling back to individual calls: {e}")
+            return {}
+        return self._split_batch(ids, response, schema)
+
+    async def _call_gemini(self, model: str, prompt: str, max_tokens: int, json_mode: bool, attempts: int = 1) -> str:
+        if self._gemini is None:
+            self._gemini = AsyncLLMService()
+        return await self._gemini.generate(model, prompt, max_tokens, json_mode, attempts, system=SYSTEM_PROMPT)
+
+    async def call_groq(self, model: str, prompt: str, max_tokens: int = 2048, json_mode: bool = False,
+                        attempts: int = 1, system: str = SYSTEM_PROMPT) -> str:
+        admission = await run_sync(budget_manager.admit, "groq", estimate_tokens(prompt, max_tokens))
+        admission.raise_for_denial("groq")
+        if admission.degraded:
+            max_tokens = budget_manager.degraded_max_tokens(max_tokens)
+        estimate = estimate_tokens(prompt, max_tokens)
+        limiter = groq_rate_limiter(model)
+        messages = self._messages(prompt, system)
+
+        for attempt in range(attempts):
+            try:
+                reservation = await limiter.acquire_async(estimate)
+            except RateLimitTimeout as e:
+                raise BudgetExceeded("groq", "rate limit", e.retry_after)
+
+            try:
+                async with groq_concurrency.slot_async():
+                    with span("groq", "chat.completions"):
+                        raw = await self.client.chat.completions.with_raw_response.create(
+                            model=model,
+                            messages=messages,
+                            max_tokens=max_tokens,
+                            temperature=0.8,
+                            response_format={"type": "json_object"} if json_mode else None
+                        )
+                await run_sync(limiter.update_from_headers, raw.headers)
+                groq_concurrency.on_success()
+                response = await raw.parse()
+            except Exception as e:
+                failed_generation = _failed_generation(e)
+                if failed_generation:
+                    await run_sync(limiter.settle, reservation, estimate)
+                    await run_sync(budget_manager.record, "groq", estimate, degraded=admission.degraded)
+                    return failed_generation
+
+                await run_sync(limiter.settle, reservation, 0)
+                await asyncio.sleep(await run_sync(self._retry_delay, e, limiter, model, attempt, attempts))
+                continue
+
+            usage = getattr(response, "usage", None)
+            used = getattr(usage, "total_tokens", None) or estimate
+            await run_sync(limiter.settle, reservation, used)
+            await run_sync(budget_manager.record, "groq", used, degraded=admission.degraded)
+            return response.choices[0].message.content
+
+    async def generate_complete_content(self, topic: str, platform: str = "all", duration: int = 60,
+                                        style: str = "engaging", niche: str = "") -> dict:
+        """
+        generate_complete_content() with the five prompts in flight together;
+        only the captions wait, for the script's title.
+        """
+        try:
+            admission = await run_sync(budget_manager.admit, "groq", COMPLETE_CONTENT_TOKENS)
+            admission.raise_for_denial("groq")
+
+            script = asyncio.ensure_future(self.generate_full_script(topic, duration, platform, style))
+
+            async def captions_for_script():
+                return await self.generate_captions(topic, (await script).get("title", topic), style)
+
+            hooks, script, captions, hashtags, thumbnails = await asyncio.gather(
+                self.generate_hook(topic, platform, style),
+                script,
+                captions_for_script(),
+                self.generate_hashtags(topic, platform, niche),
+                self.generate_thumbnail_titles(topic)
+            )
+            return self._content_package(topic, platform, hooks, script, captions, hashtags, thumbnails)
+        except BudgetExceeded:
+            raise
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "topic": topic
+            }
+
+    async def test_connection(self) -> dict:
+        try:
+            with span("groq", "chat.completions"):
+                response = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[{"role": "user", "content": "Say 'API connected successfully' in 5 words or less."}],
+                    max_tokens=20
+                )
+            return {
+                "success": True,
+                "message": response.choices[0].message.content,
+                "model": self.model
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
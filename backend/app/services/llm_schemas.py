@@ -0,0 +1,84 @@
+"""
+JSON schemas for the structured LLM generators.
+
+They check what the routes and the frontend rely on: the main keys are
+present and containers have the right shape. Scalar fields are left loose
+because models return "85%" and 85 interchangeably.
+"""
+
+
+def _object(required: list = None, **properties) -> dict:
+    schema = {"type": "object", "properties": properties}
+    if required:
+        schema["required"] = required
+    return schema
+
+
+def _array(items: dict = None, min_items: int = 0) -> dict:
+    schema = {"type": "array"}
+    if items:
+        schema["items"] = items
+    if min_items:
+        schema["minItems"] = min_items
+    return schema
+
+
+_LIST = _array()
+_OBJECT = {"type": "object"}
+_TEXT_ITEMS = _array({"type": "object", "required": ["text"]}, min_items=1)
+
+HOOKS = _object(["hooks"], hooks=_TEXT_ITEMS)
+
+SCRIPT = _object(
+    ["title", "segments"],
+    segments=_array({"type": "object", "required": ["script"]}, min_items=1),
+    b_roll_suggestions=_LIST,
+    text_overlays=_LIST
+)
+
+_PLATFORM_CAPTIONS = _object(["captions"], captions=_TEXT_ITEMS)
+CAPTIONS = _object(
+    ["tiktok", "instagram", "youtube"],
+    tiktok=_PLATFORM_CAPTIONS, instagram=_PLATFORM_CAPTIONS, youtube=_PLATFORM_CAPTIONS
+)
+
+HASHTAGS = _object(["categories"], categories=_OBJECT, recommended_combinations=_OBJECT, avoid_hashtags=_LIST)
+
+THUMBNAILS = _object(["titles"], titles=_TEXT_ITEMS, thumbnail_tips=_LIST, color_suggestions=_OBJECT)
+
+VIRAL_ANALYSIS = _object(["viral_factors"], viral_factors=_LIST, actionable_takeaways=_LIST, content_ideas=_LIST)
+
+CONTENT_GAPS = _object(["gap_analysis"], gap_analysis=_OBJECT, recommended_actions=_LIST, quick_wins=_LIST)
+
+NICHE_ANALYSIS = _object(["niche_name", "scores"], scores=_OBJECT, audience=_OBJECT, monetization=_OBJECT,
+                         example_channels=_LIST)
+
+MICRO_NICHES = _object(["micro_niches"], micro_niches=_array(min_items=1), emerging_niches=_LIST)
+
+RELATED_NICHES = _object(["related_niches"], related_niches=_array(min_items=1), adjacent_niches=_LIST)
+
+TRENDING_NICHES = _object(["trending_niches"], trending_niches=_array(min_items=1), niches_to_avoid=_LIST)
+
+CONTENT_SCORE = _object(["overall_score", "scores"], scores=_OBJECT, improvements=_OBJECT, critical_fixes=_LIST,
+                        strengths=_LIST)
+
+WEEKLY_INSIGHTS = _object(["summary"], highlights=_LIST, concerns=_LIST, next_week_focus=_LIST)
+
+AB_TESTS = _object(["ab_test_suggestions"], ab_test_suggestions=_array(min_items=1), priority_order=_LIST)
+
+PITCH_TEMPLATES = _object(["pitch_templates"], pitch_templates=_array(min_items=1), key_hooks=_LIST)
+
+COLLAB_IDEAS = _object(["collab_ideas"], collab_ideas=_array(min_items=1), unique_angles=_LIST)
+
+COLLAB_COMPATIBILITY = _object(["compatibility_summary"], strengths=_LIST, challenges=_LIST,
+                               growth_potential=_OBJECT, best_collab_types=_LIST)
+
+QUIZ = _object(
+    ["questions"],
+    questions=_array(_object(["question", "options", "correct_index"], options=_array(min_items=2)), min_items=1)
+)
+
+SENTIMENT = _object(
+    ["positive", "negative", "neutral"],
+    positive={"type": "number"}, negative={"type": "number"}, neutral={"type": "number"}
+)
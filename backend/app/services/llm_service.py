@@ -1,62 +1,171 @@
 import os
-import json
-from google import genai
+from app.utils.telemetry import span
+from app.services.budget_service import budget_manager, estimate_tokens
+from app.services.model_router import model_router
+from app.services import llm_schemas
+from app.utils.structured_output import agenerate_structured, generate_structured
+from app.utils.rate_limiter import backoff_delay, upstream_retries
+from app.utils.aio import run_sync
+import asyncio
+import time
+from app.utils.lazy import lazy_module
+
+genai = lazy_module("google.genai")
+
+RETRYABLE_CODES = (429, 500, 502, 503, 504)
 
 class LLMService:
     def __init__(self):
         # Initialize client with the key from your .env
         self.client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+        self._groq = None
+
+    def generate(self, model: str, prompt: str, max_tokens: int = 1024, json_mode: bool = False,
+                 attempts: int = 1, system: str = None) -> str:
+        """One Gemini completion with budget admission and up to `attempts` tries on 429s and server errors."""
+        budget_manager.admit("gemini", estimate_tokens(prompt, max_tokens)).raise_for_denial("gemini")
+        config = self._config(max_tokens, json_mode, system)
+
+        for attempt in range(attempts):
+            try:
+                with span("gemini", "generate_content"):
+                    response = self.client.models.generate_content(model=model, contents=prompt, config=config)
+                break
+            except Exception as e:
+                code = getattr(e, "code", None) or getattr(e, "status_code", None)
+                if code not in RETRYABLE_CODES or attempt == attempts - 1:
+                    raise
+                upstream_retries.inc(service="gemini", reason=str(code))
+                time.sleep(backoff_delay(attempt))
+
+        self._record_usage(response, prompt)
+        return response.text
+
+    def _config(self, max_tokens: int, json_mode: bool, system: str) -> dict:
+        config = {"max_output_tokens": max_tokens}
+        if json_mode:
+            config["response_mime_type"] = "application/json"
+        if system:
+            config["system_instruction"] = system
+        return config
+
+    def _route(self, task: str, prompt: str, max_tokens: int, json_mode: bool = False) -> str:
+        """Run the prompt on the model model_router picks, Gemini first with Groq as fallback."""
+        return model_router.generate(task, prompt, max_tokens, json_mode, {
+            "gemini": self.generate,
+            "groq": self._call_groq
+        })
+
+    def _call_groq(self, model: str, prompt: str, max_tokens: int, json_mode: bool, attempts: int = 1) -> str:
+        if self._groq is None:
+            from app.services.groq_llm_service import GroqLLMService
+            self._groq = GroqLLMService()
+        return self._groq.call_groq(model, prompt, max_tokens, json_mode, attempts, system=None)
 
     def summarize_trends(self, topic: str, content: list[str]) -> str:
         if not content:
             return f"No recent trends found for {topic}."
             
-        processed_content = [item[:200] for item in content[:15]]
-        
-        prompt = (
-            f"Analyze these top 15 trending results for '{topic}'. "
-            "Identify the most significant common themes and provide a deep, professional "
-            "3-sentence analysis of where this topic is heading in 2025:\n\n"
-            + "\n- ".join(processed_content)
-        )
-        
         try:
-            response = self.client.models.generate_content(
-                model='gemini-flash-latest',
-                contents=prompt
-            )
-            return response.text
+            return self._route("trend_summary", self._trend_prompt(topic, content), 512)
         except Exception as e:
             print(f"LLM Error: {e}")
-            return f"Analysis currently unavailable for {topic} due to API limits. Please try again in a few minutes."
+            return self._trend_fallback(topic)
 
     def analyze_opinions(self, comments: list[str]) -> dict:
         if not comments:
             return {"positive": 0, "negative": 0, "neutral": 0}
             
+        try:
+            return generate_structured(
+                lambda text, json_mode: self._route("sentiment", text, 256, json_mode),
+                self._opinion_prompt(comments),
+                llm_schemas.SENTIMENT
+            )
+        except Exception as e:
+            print(f"LLM Error: {e}")
+            return {"positive": 50, "negative": 25, "neutral": 25} # Fallback
+
+    def _trend_prompt(self, topic: str, content: list[str]) -> str:
+        processed_content = [item[:200] for item in content[:15]]
+        return (
+            f"Analyze these top 15 trending results for '{topic}'. "
+            "Identify the most significant common themes and provide a deep, professional "
+            "3-sentence analysis of where this topic is heading in 2025:\n\n"
+            + "\n- ".join(processed_content)
+        )
+
+    def _trend_fallback(self, topic: str) -> str:
+        return f"Analysis currently unavailable for {topic} due to API limits. Please try again in a few minutes."
+
+    def _opinion_prompt(self, comments: list[str]) -> str:
         processed_comments = [c[:200] for c in comments[:15]]
-        prompt = (
+        return (
             "Analyze these YouTube comments and provide a sentiment breakdown. "
             "Return ONLY a JSON object with keys 'positive', 'negative', and 'neutral' "
             "representing percentages (integers adding up to 100).\n\n"
             + "\n- ".join(processed_comments)
         )
-        
+
+    def _record_usage(self, response, prompt: str):
+        usage = getattr(response, "usage_metadata", None)
+        budget_manager.record("gemini", getattr(usage, "total_token_count", None) or estimate_tokens(prompt))
+
+
+class AsyncLLMService(LLMService):
+    """LLMService for coroutines: Gemini through the genai aio client, Groq through AsyncGroqLLMService."""
+
+    async def generate(self, model: str, prompt: str, max_tokens: int = 1024, json_mode: bool = False,
+                       attempts: int = 1, system: str = None) -> str:
+        admission = await run_sync(budget_manager.admit, "gemini", estimate_tokens(prompt, max_tokens))
+        admission.raise_for_denial("gemini")
+        config = self._config(max_tokens, json_mode, system)
+
+        for attempt in range(attempts):
+            try:
+                with span("gemini", "generate_content"):
+                    response = await self.client.aio.models.generate_content(model=model, contents=prompt, config=config)
+                break
+            except Exception as e:
+                code = getattr(e, "code", None) or getattr(e, "status_code", None)
+                if code not in RETRYABLE_CODES or attempt == attempts - 1:
+                    raise
+                upstream_retries.inc(service="gemini", reason=str(code))
+                await asyncio.sleep(backoff_delay(attempt))
+
+        await run_sync(self._record_usage, response, prompt)
+        return response.text
+
+    async def _route(self, task: str, prompt: str, max_tokens: int, json_mode: bool = False) -> str:
+        return await model_router.agenerate(task, prompt, max_tokens, json_mode, {
+            "gemini": self.generate,
+            "groq": self._call_groq
+        })
+
+    async def _call_groq(self, model: str, prompt: str, max_tokens: int, json_mode: bool, attempts: int = 1) -> str:
+        if self._groq is None:
+            from app.services.groq_llm_service import AsyncGroqLLMService
+            self._groq = AsyncGroqLLMService()
+        return await self._groq.call_groq(model, prompt, max_tokens, json_mode, attempts, system=None)
+
+    async def summarize_trends(self, topic: str, content: list[str]) -> str:
+        if not content:
+            return f"No recent trends found for {topic}."
         try:
-            response = self.client.models.generate_content(
-                model='gemini-flash-latest',
-                contents=prompt,
-                config={
-                    'response_mime_type': 'application/json'
-                }
+            return await self._route("trend_summary", self._trend_prompt(topic, content), 512)
+        except Exception as e:
+            print(f"LLM Error: {e}")
+            return self._trend_fallback(topic)
+
+    async def analyze_opinions(self, comments: list[str]) -> dict:
+        if not comments:
+            return {"positive": 0, "negative": 0, "neutral": 0}
+        try:
+            return await agenerate_structured(
+                lambda text, json_mode: self._route("sentiment", text, 256, json_mode),
+                self._opinion_prompt(comments),
+                llm_schemas.SENTIMENT
             )
-            
-            content = response.text
-            # Basic cleanup if not pure JSON
-            if content.startswith("```json"):
-                content = content.replace("```json", "").replace("```", "").strip()
-            
-            return json.loads(content)
         except Exception as e:
             print(f"LLM Error: {e}")
-            return {"positive": 50, "negative": 25, "neutral": 25} # Fallback
\ No newline at end of file
+            return {"positive": 50, "negative": 25, "neutral": 25}
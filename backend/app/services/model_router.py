@@ -0,0 +1,381 @@
+"""
+Model routing across LLM providers.
+
+Each task (hooks, scripts, hashtags, trend summaries, ...) declares the
+output it needs; ModelRouter ranks the models in MODELS for it and calls
+them in order until one succeeds:
+
+- models below the task's quality bar form a lower fallback tier
+- within a tier, models are ranked by expected latency (the task's
+  observed EWMA once there are samples, the table's estimate before),
+  inflated by the model's recent error rate, plus estimated cost and a
+  small penalty for leaving the task's preferred provider
+- a model that returned a 429 sits out until its Retry-After passes
+
+Latency-sensitive tasks are hedged: if the first model hasn't answered
+within its usual latency (EWMA + 2 deviations), the best model from another
+provider is started too and the first answer wins. The slower call still
+runs to completion and is still billed and recorded. Hedged calls run on a
+pool of LLM_HEDGE_THREADS threads (default: six per request thread, since a
+content package races three calls, each of which may start a backup); the
+hedge delay counts from when the first call starts running, so time spent
+waiting for a pool thread never triggers a backup.
+
+Providers are plain callables supplied by the services that own the clients:
+    call(model, prompt, max_tokens, json_mode, attempts) -> str
+agenerate() is the asyncio counterpart and takes coroutine functions with
+the same signature; both share the ranking and the feedback statistics.
+"""
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from flask import copy_current_request_context, current_app, has_app_context, has_request_context
+from app.services.budget_service import BudgetExceeded
+from app.utils.telemetry import CounterMetric, HistogramMetric
+
+EWMA_ALPHA = 0.2
+COST_WEIGHT = 1000.0  # Seconds of latency one US dollar is worth when ranking
+OFF_PROVIDER_PENALTY = 2.0  # Seconds added for leaving the task's preferred provider (its prompts were tuned there)
+MIN_HEDGE_DELAY = 0.3
+MAX_ATTEMPTS = 4
+
+
+class ModelSpec:
+    """
+    One model's static profile. Latency and price figures are published
+    list numbers and serve only until the router has its own measurements.
+    """
+
+    def __init__(self, provider: str, model: str, quality: int, first_token_s: float, tokens_per_s: float,
+                 input_cost: float, output_cost: float, max_output: int):
+        self.provider = provider
+        self.model = model
+        self.quality = quality  # 1 = fine for short structured output, 2 = better long-form writing
+        self.first_token_s = first_token_s
+        self.tokens_per_s = tokens_per_s
+        self.input_cost = input_cost  # USD per 1M tokens
+        self.output_cost = output_cost
+        self.max_output = max_output
+
+    @property
+    def key(self) -> str:
+        return f"{self.provider}/{self.model}"
+
+    def estimated_latency(self, output_tokens: int) -> float:
+        return self.first_token_s + output_tokens / self.tokens_per_s
+
+    def estimated_cost(self, input_tokens: int, output_tokens: int) -> float:
+        return (input_tokens * self.input_cost + output_tokens * self.output_cost) / 1_000_000
+
+
+class TaskSpec:
+    """
+    What a task needs. `expected_output` is the typical completion length as
+    a share of max_tokens (completions rarely use the whole allowance).
+    """
+
+    def __init__(self, min_quality: int = 1, expected_output: float = 0.4, latency_sensitive: bool = False,
+                 preferred_provider: str = "groq"):
+        self.min_quality = min_quality
+        self.expected_output = expected_output
+        self.latency_sensitive = latency_sensitive
+        self.preferred_provider = preferred_provider
+
+
+MODELS = [
+    ModelSpec("groq", "llama-3.1-8b-instant", quality=1, first_token_s=0.25, tokens_per_s=750,
+              input_cost=0.05, output_cost=0.08, max_output=8192),
+    ModelSpec("groq", "llama-3.3-70b-versatile", quality=2, first_token_s=0.4, tokens_per_s=275,
+              input_cost=0.59, output_cost=0.79, max_output=32768),
+    ModelSpec("gemini", "gemini-flash-lite-latest", quality=1, first_token_s=0.5, tokens_per_s=250,
+              input_cost=0.10, output_cost=0.40, max_output=8192),
+    ModelSpec("gemini", "gemini-flash-latest", quality=2, first_token_s=0.7, tokens_per_s=200,
+              input_cost=0.30, output_cost=2.50, max_output=8192),
+]
+
+TASKS = {
+    "hook": TaskSpec(expected_output=0.25, latency_sensitive=True),
+    "hashtags": TaskSpec(expected_output=0.25, latency_sensitive=True),
+    "thumbnails": TaskSpec(expected_output=0.25, latency_sensitive=True),
+    "captions": TaskSpec(expected_output=0.5),
+    "script": TaskSpec(min_quality=2, expected_output=0.6),
+    "analysis": TaskSpec(expected_output=0.5),
+    "trend_summary": TaskSpec(min_quality=2, expected_output=0.5, preferred_provider="gemini"),
+    "sentiment": TaskSpec(expected_output=0.2, latency_sensitive=True, preferred_provider="gemini"),
+    "general": TaskSpec(),
+}
+
+llm_request_duration = HistogramMetric(
+    "llm_request_duration_seconds", "LLM call latency by routed model", ("model", "task", "outcome")
+)
+llm_fallbacks = CounterMetric(
+    "llm_fallbacks_total", "LLM calls that failed over to the next model", ("task", "model")
+)
+llm_hedges = CounterMetric(
+    "llm_hedged_requests_total", "Hedged LLM calls by which request answered first", ("task", "winner")
+)
+
+
+
+def _hedge_threads() -> int:
+    configured = int(os.getenv("LLM_HEDGE_THREADS", 0))
+    if configured > 0:
+        return configured
+    # The request threads per worker, as gunicorn.conf.py caps them
+    request_threads = int(os.getenv("GUNICORN_THREADS") or os.getenv("GUNICORN_MAX_THREADS") or
+                          int(os.getenv("DB_POOL_SIZE", 5)) + int(os.getenv("DB_MAX_OVERFLOW", 10)))
+    return max(8, 6 * request_threads)
+
+
+_hedge_pool = ThreadPoolExecutor(max_workers=_hedge_threads(), thread_name_prefix="llm-hedge")
+
+
+def with_context(fn):
+    """Run fn in a worker thread with the caller's request (or app) context."""
+    if has_request_context():
+        return copy_current_request_context(fn)
+    if has_app_context():
+        app = current_app._get_current_object()
+
+        def run(*args, **kwargs):
+            with app.app_context():
+                return fn(*args, **kwargs)
+        return run
+    return fn
+
+
+class ModelRouter:
+    def __init__(self, models: list = None, tasks: dict = None):
+        self.models = models or MODELS
+        self.tasks = tasks or TASKS
+        self._latency = {}  # (model key, task) -> [ewma seconds, ewma deviation, samples]
+        self._errors = {}  # model key -> ewma error rate
+        self._cooldown = {}  # model key -> monotonic time it may be used again
+        self._lock = threading.Lock()
+
+    # ============ RANKING ============
+
+    def candidates(self, task: str, prompt_tokens: int, max_tokens: int, providers) -> list:
+        """Models able to serve the task with the given providers, best first."""
+        spec = self.tasks.get(task, self.tasks["general"])
+        now = time.monotonic()
+
+        def rank(model: ModelSpec) -> tuple:
+            output_tokens = int(max_tokens * spec.expected_output)
+            with self._lock:
+                error_rate = self._errors.get(model.key, 0.0)
+                cooling = self._cooldown.get(model.key, 0) > now
+            score = self.expected_latency(model, task, max_tokens) * (1 + 3 * error_rate)
+            score += COST_WEIGHT * model.estimated_cost(prompt_tokens, output_tokens)
+            if model.provider != spec.preferred_provider:
+                score += OFF_PROVIDER_PENALTY
+            return (cooling, model.quality < spec.min_quality, score)
+
+        usable = [m for m in self.models if m.provider in providers and m.max_output >= max_tokens]
+        return sorted(usable, key=rank)
+
+    def expected_latency(self, model: ModelSpec, task: str, max_tokens: int) -> float:
+        with self._lock:
+            observed = self._latency.get((model.key, task))
+        if observed:
+            return observed[0]
+        spec = self.tasks.get(task, self.tasks["general"])
+        return model.estimated_latency(int(max_tokens * spec.expected_output))
+
+    def hedge_delay(self, model: ModelSpec, task: str, max_tokens: int) -> float:
+        """How long to wait for a model before hedging: its usual latency plus two deviations."""
+        with self._lock:
+            observed = self._latency.get((model.key, task))
+        if observed:
+            return max(MIN_HEDGE_DELAY, observed[0] + 2 * observed[1])
+        return max(MIN_HEDGE_DELAY, 1.5 * self.expected_latency(model, task, max_tokens))
+
+    # ============ FEEDBACK ============
+
+    def observe(self, model: ModelSpec, task: str, seconds: float, error: Exception = None):
+        outcome = "ok" if error is None else type(error).__name__
+        llm_request_duration.observe(seconds, model=model.key, task=task, outcome=outcome)
+        with self._lock:
+            self._errors[model.key] = (1 - EWMA_ALPHA) * self._errors.get(model.key, 0.0) + EWMA_ALPHA * (error is not None)
+            if error is None:
+                stats = self._latency.get((model.key, task))
+                if stats is None:
+                    self._latency[(model.key, task)] = [seconds, seconds / 2, 1]
+                else:
+                    deviation = abs(seconds - stats[0])
+                    stats[0] = (1 - EWMA_ALPHA) * stats[0] + EWMA_ALPHA * seconds
+                    stats[1] = (1 - EWMA_ALPHA) * stats[1] + EWMA_ALPHA * deviation
+                    stats[2] += 1
+            elif 429 in (getattr(error, "status_code", None), getattr(error, "code", None)) or isinstance(error, BudgetExceeded):
+                retry_after = getattr(error, "retry_after", None) or 30
+                self._cooldown[model.key] = time.monotonic() + min(float(retry_after), 300)
+
+    def stats(self) -> dict:
+        """Observed latency and error rate per model and task."""
+        with self._lock:
+            result = {}
+            for (key, task), (latency, deviation, samples) in self._latency.items():
+                result.setdefault(key, {"error_rate": round(self._errors.get(key, 0.0), 3), "tasks": {}})
+                result[key]["tasks"][task] = {
+                    "latency_s": round(latency, 3), "deviation_s": round(deviation, 3), "samples": samples
+                }
+            return result
+
+    # ============ CALLING ============
+
+    def generate(self, task: str, prompt: str, max_tokens: int, json_mode: bool, providers: dict) -> str:
+        """
+        Run the prompt on the best model for the task, falling back down the
+        ranking on errors and rate limits. Raises the first BudgetExceeded if
+        every model was over budget, otherwise the last error.
+        """
+        ranked = self.candidates(task, len(prompt) // 4, max_tokens, providers)
+        if not ranked:
+            raise ValueError(f"No model available for task '{task}'")
+
+        errors = []
+        index = 0
+        spec = self.tasks.get(task, self.tasks["general"])
+        while index < len(ranked):
+            model = ranked[index]
+            remaining = ranked[index + 1:]
+            hedge = next((m for m in remaining if m.provider != model.provider), None) if spec.latency_sensitive else None
+
+            if hedge is not None:
+                text, failures = self._hedged(task, model, hedge, prompt, max_tokens, json_mode, providers)
+                errors.extend(failures)
+                if text is not None:
+                    return text
+                tried = {model.key, hedge.key}
+                ranked = ranked[:index + 1] + [m for m in remaining if m.key not in tried]
+            else:
+                attempts = 1 if remaining else MAX_ATTEMPTS  # Retry in place only when nothing is left to fail over to
+                try:
+                    return self._call(task, model, prompt, max_tokens, json_mode, providers, attempts)
+                except Exception as e:
+                    errors.append(e)
+            if index + 1 < len(ranked):
+                llm_fallbacks.inc(task=task, model=model.key)
+            index += 1
+
+        over_budget = [e for e in errors if isinstance(e, BudgetExceeded)]
+        if over_budget and len(over_budget) == len(errors):
+            raise over_budget[0]
+        raise errors[-1]
+
+    async def agenerate(self, task: str, prompt: str, max_tokens: int, json_mode: bool, providers: dict) -> str:
+        """generate() for async providers."""
+        ranked = self.candidates(task, len(prompt) // 4, max_tokens, providers)
+        if not ranked:
+            raise ValueError(f"No model available for task '{task}'")
+
+        errors = []
+        index = 0
+        spec = self.tasks.get(task, self.tasks["general"])
+        while index < len(ranked):
+            model = ranked[index]
+            remaining = ranked[index + 1:]
+            hedge = next((m for m in remaining if m.provider != model.provider), None) if spec.latency_sensitive else None
+
+            if hedge is not None:
+                text, failures = await self._ahedged(task, model, hedge, prompt, max_tokens, json_mode, providers)
+                errors.extend(failures)
+                if text is not None:
+                    return text
+                tried = {model.key, hedge.key}
+                ranked = ranked[:index + 1] + [m for m in remaining if m.key not in tried]
+            else:
+                attempts = 1 if remaining else MAX_ATTEMPTS
+                try:
+                    return await self._acall(task, model, prompt, max_tokens, json_mode, providers, attempts)
+                except Exception as e:
+                    errors.append(e)
+            if index + 1 < len(ranked):
+                llm_fallbacks.inc(task=task, model=model.key)
+            index += 1
+
+        over_budget = [e for e in errors if isinstance(e, BudgetExceeded)]
+        if over_budget and len(over_budget) == len(errors):
+            raise over_budget[0]
+        raise errors[-1]
+
+    def _call(self, task: str, model: ModelSpec, prompt: str, max_tokens: int, json_mode: bool,
+              providers: dict, attempts: int) -> str:
+        start = time.perf_counter()
+        try:
+            text = providers[model.provider](model.model, prompt, max_tokens, json_mode, attempts)
+        except Exception as e:
+            self.observe(model, task, time.perf_counter() - start, e)
+            raise
+        self.observe(model, task, time.perf_counter() - start)
+        return text
+
+    def _hedged(self, task: str, primary: ModelSpec, backup: ModelSpec, prompt: str, max_tokens: int,
+                json_mode: bool, providers: dict) -> tuple:
+        """(text or None, errors) from racing `primary` against a delayed `backup`."""
+        def call(model, started=None):
+            if started is not None:
+                started.set()
+            return self._call(task, model, prompt, max_tokens, json_mode, providers, 1)
+
+        started = threading.Event()
+        futures = {_hedge_pool.submit(with_context(call), primary, started): "primary"}
+        # The hedge clock starts when the primary does, not while it is queued for a thread
+        started.wait()
+        done, _ = wait(futures, timeout=self.hedge_delay(primary, task, max_tokens))
+        if not done or next(iter(done)).exception() is not None:
+            futures[_hedge_pool.submit(with_context(call), backup)] = "hedge"
+
+        errors = []
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if len(futures) > 1:
+                        llm_hedges.inc(task=task, winner=futures[future])
+                    return future.result(), errors
+                errors.append(future.exception())
+        return None, errors
+
+
+    async def _acall(self, task: str, model: ModelSpec, prompt: str, max_tokens: int, json_mode: bool,
+                     providers: dict, attempts: int) -> str:
+        start = time.perf_counter()
+        try:
+            text = await providers[model.provider](model.model, prompt, max_tokens, json_mode, attempts)
+        except Exception as e:
+            self.observe(model, task, time.perf_counter() - start, e)
+            raise
+        self.observe(model, task, time.perf_counter() - start)
+        return text
+
+    async def _ahedged(self, task: str, primary: ModelSpec, backup: ModelSpec, prompt: str, max_tokens: int,
+                       json_mode: bool, providers: dict) -> tuple:
+        """_hedged() with tasks instead of threads. The losing call is left to finish in the background."""
+        def call(model):
+            future = asyncio.ensure_future(self._acall(task, model, prompt, max_tokens, json_mode, providers, 1))
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())  # A late loser's error is already observed
+            return future
+
+        futures = {call(primary): "primary"}
+        done, _ = await asyncio.wait(futures, timeout=self.hedge_delay(primary, task, max_tokens))
+        if not done or next(iter(done)).exception() is not None:
+            futures[call(backup)] = "hedge"
+
+        errors = []
+        pending = set(futures)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if len(futures) > 1:
+                        llm_hedges.inc(task=task, winner=futures[future])
+                    return future.result(), errors
+                errors.append(future.exception())
+        return None, errors
+
+
+model_router = ModelRouter()
@@ -1,9 +1,17 @@
 import os
-from twilio.rest import Client as TwilioClient
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
+from app.utils.telemetry import span
+from app.utils.aio import http_client
+from app.utils.lazy import lazy_attr
+import asyncio
 import json
 
+TwilioClient = lazy_attr("twilio.rest", "Client")
+SendGridAPIClient = lazy_attr("sendgrid", "SendGridAPIClient")
+Mail = lazy_attr("sendgrid.helpers.mail", "Mail")
+
+TWILIO_API_URL = "https://api.twilio.com/2010-04-01"
+SENDGRID_SEND_URL = "https://api.sendgrid.com/v3/mail/send"
+
 class NotificationService:
     def __init__(self):
         # Twilio setup
@@ -27,11 +35,12 @@ class NotificationService:
             return False
             
         try:
-            self.twilio_client.messages.create(
-                body=message,
-                from_=self.twilio_phone,
-                to=to_phone
-            )
+            with span("twilio", "messages.create"):
+                self.twilio_client.messages.create(
+                    body=message,
+                    from_=self.twilio_phone,
+                    to=to_phone
+                )
             return True
         except Exception as e:
             print(f"Twilio SMS Error: {e}")
@@ -52,7 +61,8 @@ class NotificationService:
         
         try:
             sg = SendGridAPIClient(self.sendgrid_key)
-            sg.send(message)
+            with span("sendgrid", "mail.send"):
+                sg.send(message)
             return True
         except Exception as e:
             print(f"SendGrid Error: {e}")
@@ -60,6 +70,20 @@ class NotificationService:
 
     def notify_trend_alert(self, user, trend_data, alert_rule):
         """Notify user about a trend alert through their chosen channels."""
+        channels, sms_text, subject, email_content = self._trend_alert(trend_data, alert_rule)
+
+        results = {}
+        
+        if "sms" in channels and user.phone_number:
+            results["sms"] = self.send_sms(user.phone_number, sms_text)
+            
+        if "email" in channels and user.email:
+            results["email"] = self.send_email(user.email, subject, email_content)
+            
+        return results
+
+    def _trend_alert(self, trend_data, alert_rule) -> tuple:
+        """(channels, SMS text, email subject, email HTML) for a trend alert."""
         virality_score = trend_data.get("virality_score", 0)
         topic = alert_rule.topic
         
@@ -77,13 +101,63 @@ class NotificationService:
         </ul>
         <p>Go to your dashboard to see the full analysis and generate content scripts.</p>
         """
+        return channels, sms_text, f"Trend Alert: {topic}", email_content
 
-        results = {}
-        
+
+class AsyncNotificationService(NotificationService):
+    """
+    NotificationService for coroutines. Talks to the Twilio and SendGrid
+    REST APIs directly through the shared httpx client.
+    """
+
+    async def send_sms(self, to_phone: str, message: str) -> bool:
+        if not self.twilio_sid or not self.twilio_token or not self.twilio_phone:
+            print("Twilio client not configured.")
+            return False
+
+        try:
+            with span("twilio", "messages.create"):
+                response = await http_client().post(
+                    f"{TWILIO_API_URL}/Accounts/{self.twilio_sid}/Messages.json",
+                    auth=(self.twilio_sid, self.twilio_token),
+                    data={"Body": message, "From": self.twilio_phone, "To": to_phone}
+                )
+                response.raise_for_status()
+            return True
+        except Exception as e:
+            print(f"Twilio SMS Error: {e}")
+            return False
+
+    async def send_email(self, to_email: str, subject: str, content: str) -> bool:
+        if not self.sendgrid_key or not self.from_email:
+            print("SendGrid not configured.")
+            return False
+
+        try:
+            with span("sendgrid", "mail.send"):
+                response = await http_client().post(
+                    SENDGRID_SEND_URL,
+                    headers={"Authorization": f"Bearer {self.sendgrid_key}"},
+                    json={
+                        "personalizations": [{"to": [{"email": to_email}]}],
+                        "from": {"email": self.from_email},
+                        "subject": subject,
+                        "content": [{"type": "text/html", "value": content}]
+                    }
+                )
+                response.raise_for_status()
+            return True
+        except Exception as e:
+            print(f"SendGrid Error: {e}")
+            return False
+
+    async def notify_trend_alert(self, user, trend_data, alert_rule):
+        channels, sms_text, subject, email_content = self._trend_alert(trend_data, alert_rule)
+
+        sends = {}
         if "sms" in channels and user.phone_number:
-            results["sms"] = self.send_sms(user.phone_number, sms_text)
-            
+            sends["sms"] = self.send_sms(user.phone_number, sms_text)
         if "email" in channels and user.email:
-            results["email"] = self.send_email(user.email, f"Trend Alert: {topic}", email_content)
-            
-        return results
+            sends["email"] = self.send_email(user.email, subject, email_content)
+
+        return dict(zip(sends, await asyncio.gather(*sends.values())))
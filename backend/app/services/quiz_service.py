@@ -1,21 +1,116 @@
-import json
-from app.services.groq_llm_service import GroqLLMService
+import os
+import re
+import threading
+from app.services.groq_llm_service import AsyncGroqLLMService, GroqLLMService
+from app.services import llm_schemas
+from app.repositories.quiz_repository import QuizRepository
+from app.extensions import db
+from app.utils.aio import run_sync
+
+QUIZ_MAX_TOKENS = 1024
+QUIZ_CACHE_DAYS = int(os.getenv("QUIZ_CACHE_DAYS", 90))
+
+_shared_llm = None
+_shared_llm_lock = threading.Lock()
+
+
+def _llm() -> GroqLLMService:
+    """One GroqLLMService (and HTTP client) for every QuizService."""
+    global _shared_llm
+    with _shared_llm_lock:
+        if _shared_llm is None:
+            _shared_llm = GroqLLMService()
+        return _shared_llm
+
+
+def normalize_title(title: str) -> str:
+    """
+    Cache key for a video title: lowercased, without bracketed tags like
+    "[2024]" or "(Full Course)", punctuation and emoji, whitespace collapsed.
+    """
+    key = re.sub(r"[\[(][^\])]*[\])]", " ", (title or "").lower())
+    key = re.sub(r"[^\w\s]", " ", key)
+    return " ".join(key.split())[:255]
+
 
 class QuizService:
     def __init__(self):
-        self.llm = GroqLLMService()
+        self.llm = _llm()
+        self.repo = QuizRepository()
 
     def generate_quiz(self, topic: str) -> dict:
         """
         Generates a 3-question multiple choice quiz for a specific topic using LLaMA 3.
         """
-        prompt = f"""Generate a 3-question Multiple Choice Quiz (MCQ) for the professional topic: "{topic}".
-        
+        try:
+            return self.llm.generate_json(self._prompt(topic), max_tokens=QUIZ_MAX_TOKENS, schema=llm_schemas.QUIZ)
+        except Exception as e:
+            print(f"Quiz Generation Error: {e}")
+            return self._fallback_quiz(topic)
+
+    def generate_quizzes(self, topics: list) -> list:
+        """
+        Generates one quiz per topic, in the order of `topics`. Quizzes
+        cached for the same normalised title are reused; the rest are
+        generated together in one batched LLM call and cached.
+        """
+        keys = [normalize_title(topic) for topic in topics]
+        cached = self._read_cache(keys)
+        missing = self._missing(keys, topics, cached)
+
+        generated = {}
+        if missing:
+            try:
+                generated = self.llm.generate_batch(
+                    {key: self._prompt(topic) for key, topic in missing.items()},
+                    max_tokens=QUIZ_MAX_TOKENS,
+                    schema=llm_schemas.QUIZ
+                )
+            except Exception as e:
+                print(f"Quiz Generation Error: {e}")
+            self._write_cache(missing, generated)
+
+        return self._assemble(keys, topics, cached, generated)
+
+    def _read_cache(self, keys: list) -> dict:
+        try:
+            return self.repo.get_many([key for key in keys if key], QUIZ_CACHE_DAYS)
+        except Exception as e:
+            print(f"Quiz cache read failed: {e}")
+            db.session.rollback()
+            return {}
+
+    def _write_cache(self, missing: dict, generated: dict):
+        for key, quiz in generated.items():
+            if key:
+                try:
+                    self.repo.save(key, missing[key], quiz)
+                except Exception as e:
+                    print(f"Quiz cache write failed: {e}")
+                    db.session.rollback()
+
+    def _missing(self, keys: list, topics: list, cached: dict) -> dict:
+        missing = {}
+        for key, topic in zip(keys, topics):
+            if key not in cached:
+                missing.setdefault(key, topic)
+        return missing
+
+    def _assemble(self, keys: list, topics: list, cached: dict, generated: dict) -> list:
+        quizzes = []
+        for key, topic in zip(keys, topics):
+            quiz = cached.get(key) or generated.get(key)
+            quizzes.append(dict(quiz, topic=topic) if quiz else self._fallback_quiz(topic))
+        return quizzes
+
+    def _prompt(self, topic: str) -> str:
+        return f"""Generate a 3-question Multiple Choice Quiz (MCQ) for the professional topic: "{topic}".
+
         For each question:
         - Provide 4 options (A, B, C, D)
         - Identify the correct answer index (0-3)
         - Provide a brief 1-sentence explanation for the answer.
-        
+
         Return a JSON object with this structure:
         {{
             "topic": "{topic}",
@@ -28,23 +123,50 @@ class QuizService:
                 }}
             ]
         }}"""
-        
+
+    def _fallback_quiz(self, topic: str) -> dict:
+        return {
+            "topic": topic,
+            "questions": [
+                {
+                    "question": f"What is the core concept of {topic}?",
+                    "options": ["Standard Implementation", "Legacy Approach", "Modern Strategy", "All of the above"],
+                    "correct_index": 3,
+                    "explanation": "The topic encompasses multiple facets of modern industry standards."
+                }
+            ]
+        }
+
+
+class AsyncQuizService(QuizService):
+    """QuizService for coroutines: cache reads and writes run on a worker thread."""
+
+    def __init__(self):
+        self.llm = AsyncGroqLLMService()
+        self.repo = QuizRepository()
+
+    async def generate_quiz(self, topic: str) -> dict:
         try:
-            # We use the internal _generate from the service or just instantiate a new client
-            # To keep it clean, let's assume GroqLLMService has a general generate method or we add one
-            result = self.llm._generate(prompt, json_mode=True)
-            return json.loads(result)
+            return await self.llm.generate_json(self._prompt(topic), max_tokens=QUIZ_MAX_TOKENS, schema=llm_schemas.QUIZ)
         except Exception as e:
             print(f"Quiz Generation Error: {e}")
-            # Fallback quiz
-            return {
-                "topic": topic,
-                "questions": [
-                    {
-                        "question": f"What is the core concept of {topic}?",
-                        "options": ["Standard Implementation", "Legacy Approach", "Modern Strategy", "All of the above"],
-                        "correct_index": 3,
-                        "explanation": "The topic encompasses multiple facets of modern industry standards."
-                    }
-                ]
-            }
+            return self._fallback_quiz(topic)
+
+    async def generate_quizzes(self, topics: list) -> list:
+        keys = [normalize_title(topic) for topic in topics]
+        cached = await run_sync(self._read_cache, keys)
+        missing = self._missing(keys, topics, cached)
+
+        generated = {}
+        if missing:
+            try:
+                generated = await self.llm.generate_batch(
+                    {key: self._prompt(topic) for key, topic in missing.items()},
+                    max_tokens=QUIZ_MAX_TOKENS,
+                    schema=llm_schemas.QUIZ
+                )
+            except Exception as e:
+                print(f"Quiz Generation Error: {e}")
+            await run_sync(self._write_cache, missing, generated)
+
+        return self._assemble(keys, topics, cached, generated)
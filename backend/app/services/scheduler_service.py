@@ -1,4 +1,3 @@
-import json
 import csv
 import io
 from datetime import datetime, timedelta
@@ -52,8 +51,7 @@ class SchedulerService:
         ]"""
         
         try:
-            result = self.llm._generate(prompt, json_mode=True)
-            data = json.loads(result)
+            data = self.llm.generate_json(prompt)
             
             # Extract list if LLM wrapped it in an object
             if isinstance(data, dict):
@@ -0,0 +1,168 @@
+"""
+Migration and size report for the CompressedText columns (app/models/sql/types.py).
+
+Existing databases have these columns as TEXT. convert_schema() turns
+them into binary columns; the TEXT values keep their bytes and are still
+read as plain text. migrate() then rewrites existing rows in the
+compressed format, a batch at a time with a pause in between, so it can
+run in the background while the app serves traffic. size_report() shows
+the stored and uncompressed size of each column, and on MySQL and
+PostgreSQL the size of each table.
+
+The conversion has to run before code writing compressed values is
+deployed: a TEXT column can't hold them. Run it with
+compress_stored_content.py.
+"""
+import time
+from sqlalchemy import inspect, select, text, type_coerce
+from sqlalchemy.types import NullType
+from app.extensions import db
+from app.models.sql.content_script import ContentScript
+from app.models.sql.niche import Niche
+from app.models.sql.trend_analysis import TrendAnalysis
+from app.models.sql.types import decompress_text, is_compressed_format
+
+COMPRESSED_COLUMNS = {
+    ContentScript: ("hooks", "full_script", "captions", "hashtags", "thumbnail_titles"),
+    Niche: ("ai_analysis",),
+    TrendAnalysis: ("summary",),
+}
+
+
+def _is_binary(column_type) -> bool:
+    try:
+        return column_type.python_type is bytes
+    except NotImplementedError:
+        return False
+
+
+def _raw_length(value) -> int:
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    return len(value)
+
+
+class StorageCompressionService:
+    def __init__(self, batch_size: int = 500, pause: float = 0.1):
+        self.batch_size = batch_size
+        self.pause = pause  # Seconds between batches, to leave the database to the app
+
+    # ============ SCHEMA ============
+
+    def convert_schema(self) -> list:
+        """ALTER the compressed columns that are still TEXT; returns the "table.column" names converted."""
+        dialect = db.engine.dialect.name
+        inspector = inspect(db.engine)
+        converted = []
+        for model, columns in COMPRESSED_COLUMNS.items():
+            table = model.__tablename__
+            if not inspector.has_table(table):
+                continue
+            current = {c["name"]: c["type"] for c in inspector.get_columns(table)}
+            for column in columns:
+                if column not in current or _is_binary(current[column]):
+                    continue
+                if dialect == "mysql":
+                    statement = f"ALTER TABLE {table} MODIFY COLUMN {column} MEDIUMBLOB NULL"
+                elif dialect == "postgresql":
+                    statement = f"ALTER TABLE {table} ALTER COLUMN {column} TYPE BYTEA USING convert_to({column}, 'UTF8')"
+                else:
+                    # SQLite stores whatever it is given; old values stay text until migrated
+                    continue
+                with db.engine.begin() as conn:
+                    conn.execute(text(statement))
+                converted.append(f"{table}.{column}")
+        return converted
+
+    # ============ ROWS ============
+
+    def _batches(self, model, columns, for_update: bool = False):
+        """
+        Yield (connection, rows) per batch of primary keys, each in its own
+        transaction. Column values are raw: bytes, or str where SQLite still
+        holds the old TEXT value.
+        """
+        table = model.__table__
+        raw = [type_coerce(table.c[name], NullType()).label(name) for name in columns]
+        last_id = 0
+        while True:
+            with db.engine.begin() as conn:
+                query = select(table.c.id, *raw).where(table.c.id > last_id).order_by(table.c.id).limit(self.batch_size)
+                if for_update:
+                    query = query.with_for_update()
+                rows = conn.execute(query).all()
+                if not rows:
+                    return
+                yield conn, rows
+                last_id = rows[-1].id
+
+    def migrate_model(self, model, columns, log=print) -> dict:
+        """Rewrite the rows of one model whose values aren't compressed yet."""
+        table = model.__table__
+        scanned = rewritten = 0
+        for conn, rows in self._batches(model, columns, for_update=True):
+            for row in rows:
+                values = {
+                    name: decompress_text(value)  # Compressed again by the column type
+                    for name, value in zip(columns, row[1:])
+                    if value is not None and not is_compressed_format(value)
+                }
+                if values:
+                    conn.execute(table.update().where(table.c.id == row.id).values(**values))
+                    rewritten += 1
+            scanned += len(rows)
+            log(f"{table.name}: {scanned} rows scanned, {rewritten} rewritten")
+            if self.pause:
+                time.sleep(self.pause)
+        return {"table": table.name, "scanned": scanned, "rewritten": rewritten}
+
+    def migrate(self, log=print) -> list:
+        return [self.migrate_model(model, columns, log) for model, columns in COMPRESSED_COLUMNS.items()]
+
+    # ============ REPORT ============
+
+    def _table_bytes(self, table: str):
+        dialect = db.engine.dialect.name
+        with db.engine.connect() as conn:
+            if dialect == "mysql":
+                return conn.execute(text(
+                    "SELECT data_length + index_length FROM information_schema.tables "
+                    "WHERE table_schema = DATABASE() AND table_name = :table"
+                ), {"table": table}).scalar()
+            if dialect == "postgresql":
+                return conn.execute(text("SELECT pg_total_relation_size(:table)"), {"table": table}).scalar()
+        return None
+
+    def size_report(self) -> list:
+        """Per column: rows with a value, rows not yet compressed, stored and uncompressed bytes."""
+        report = []
+        for model, columns in COMPRESSED_COLUMNS.items():
+            totals = {name: {"rows": 0, "uncompressed_rows": 0, "stored_bytes": 0, "text_bytes": 0} for name in columns}
+            for _, rows in self._batches(model, columns):
+                for row in rows:
+                    for name, value in zip(columns, row[1:]):
+                        if value is None:
+                            continue
+                        column = totals[name]
+                        column["rows"] += 1
+                        column["stored_bytes"] += _raw_length(value)
+                        column["text_bytes"] += len(decompress_text(value).encode("utf-8"))
+                        if not is_compressed_format(value):
+                            column["uncompressed_rows"] += 1
+            table_bytes = self._table_bytes(model.__tablename__)
+            for name in columns:
+                report.append({"table": model.__tablename__, "column": name, "table_bytes": table_bytes, **totals[name]})
+        return report
+
+
+def format_size_report(report: list) -> str:
+    header = f"{'column':<36}{'rows':>8}{'not compressed':>16}{'text KB':>12}{'stored KB':>12}{'ratio':>8}{'table KB':>12}"
+    lines = [header, "-" * len(header)]
+    for r in report:
+        ratio = f"{r['stored_bytes'] / r['text_bytes']:.0%}" if r["text_bytes"] else "-"
+        table_kb = f"{r['table_bytes'] / 1024:.0f}" if r["table_bytes"] is not None else "-"
+        lines.append(
+            f"{r['table'] + '.' + r['column']:<36}{r['rows']:>8}{r['uncompressed_rows']:>16}"
+            f"{r['text_bytes'] / 1024:>12.1f}{r['stored_bytes'] / 1024:>12.1f}{ratio:>8}{table_kb:>12}"
+        )
+    return "\n".join(lines)
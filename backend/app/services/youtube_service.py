@@ -1,5 +1,19 @@
 import os
-from googleapiclient.discovery import build
+import threading
+from collections import OrderedDict
+from app.utils.telemetry import span
+from app.utils.aio import http_client, run_sync
+from app.services.budget_service import budget_manager, youtube_cost
+from app.utils.lazy import lazy_attr
+
+build = lazy_attr("googleapiclient.discovery", "build")
+
+# Last search results per topic, served instead of a fresh search when the quota runs low
+_search_cache = OrderedDict()
+_search_cache_lock = threading.Lock()
+SEARCH_CACHE_SIZE = 500
+
+YOUTUBE_API_URL = "https://www.googleapis.com/youtube/v3"
 
 class YouTubeService:
     def __init__(self):
@@ -7,6 +21,15 @@ class YouTubeService:
         self.youtube = build('youtube', 'v3', developerKey=self.api_key)
 
     def search_videos(self, topic: str) -> list[dict]:
+        cache_key = topic.strip().lower()
+        admission = budget_manager.admit("youtube", youtube_cost("search.list"))
+        if not admission.allowed or admission.degraded:
+            cached = self._cached(cache_key)
+            if cached is not None:
+                budget_manager.record("youtube", 0, degraded=True)
+                return cached
+            admission.raise_for_denial("youtube")
+
         request = self.youtube.search().list(
             q=topic,
             part='snippet',
@@ -14,16 +37,37 @@ class YouTubeService:
             type='video',
             order='relevance'
         )
-        response = request.execute()
-        
+        with span("youtube", "search.list"):
+            response = request.execute()
+        budget_manager.record("youtube", youtube_cost("search.list"), degraded=admission.degraded)
+
         video_ids = [item['id']['videoId'] for item in response.get('items', [])]
         stats = self.get_video_stats(video_ids) if video_ids else {}
-        
+
+        videos = self._to_videos(response, stats)
+        self._remember(cache_key, videos)
+        return videos
+
+    def get_video_stats(self, video_ids: list[str]) -> dict:
+        """Fetch statistics for a list of video IDs."""
+        if not video_ids:
+            return {}
+
+        request = self.youtube.videos().list(
+            part='statistics,contentDetails',
+            id=','.join(video_ids)
+        )
+        with span("youtube", "videos.list"):
+            response = request.execute()
+        budget_manager.record("youtube", youtube_cost("videos.list"))
+        return self._to_stats(response)
+
+    def _to_videos(self, response: dict, stats: dict) -> list[dict]:
         videos = []
         for item in response.get('items', []):
             vid = item['id']['videoId']
             v_stats = stats.get(vid, {})
-            
+
             videos.append({
                 "id": vid,
                 "title": item['snippet']['title'],
@@ -36,17 +80,7 @@ class YouTubeService:
             })
         return videos
 
-    def get_video_stats(self, video_ids: list[str]) -> dict:
-        """Fetch statistics for a list of video IDs."""
-        if not video_ids:
-            return {}
-            
-        request = self.youtube.videos().list(
-            part='statistics,contentDetails',
-            id=','.join(video_ids)
-        )
-        response = request.execute()
-        
+    def _to_stats(self, response: dict) -> dict:
         stats = {}
         for item in response.get('items', []):
             stats[item['id']] = {
@@ -55,4 +89,65 @@ class YouTubeService:
                 "comments": int(item['statistics'].get('commentCount', 0)),
                 "duration": item['contentDetails'].get('duration')
             }
-        return stats
\ No newline at end of file
+        return stats
+
+    def _cached(self, cache_key: str):
+        with _search_cache_lock:
+            return _search_cache.get(cache_key)
+
+    def _remember(self, cache_key: str, videos: list[dict]):
+        with _search_cache_lock:
+            _search_cache[cache_key] = videos
+            _search_cache.move_to_end(cache_key)
+            while len(_search_cache) > SEARCH_CACHE_SIZE:
+                _search_cache.popitem(last=False)
+
+
+class AsyncYouTubeService(YouTubeService):
+    """
+    YouTubeService for coroutines. The discovery client is synchronous, so
+    this one calls the Data API's REST endpoints with the shared httpx client.
+    """
+
+    def __init__(self):
+        self.api_key = os.getenv("YOUTUBE_API_KEY")
+
+    async def search_videos(self, topic: str) -> list[dict]:
+        cache_key = topic.strip().lower()
+        admission = await run_sync(budget_manager.admit, "youtube", youtube_cost("search.list"))
+        if not admission.allowed or admission.degraded:
+            cached = self._cached(cache_key)
+            if cached is not None:
+                await run_sync(budget_manager.record, "youtube", 0, degraded=True)
+                return cached
+            admission.raise_for_denial("youtube")
+
+        with span("youtube", "search.list"):
+            response = await youtube_api_get("search", {
+                "q": topic, "part": "snippet", "maxResults": 10, "type": "video", "order": "relevance"
+            }, self.api_key)
+        await run_sync(budget_manager.record, "youtube", youtube_cost("search.list"), degraded=admission.degraded)
+
+        video_ids = [item['id']['videoId'] for item in response.get('items', [])]
+        stats = await self.get_video_stats(video_ids) if video_ids else {}
+
+        videos = self._to_videos(response, stats)
+        self._remember(cache_key, videos)
+        return videos
+
+    async def get_video_stats(self, video_ids: list[str]) -> dict:
+        if not video_ids:
+            return {}
+        with span("youtube", "videos.list"):
+            response = await youtube_api_get(
+                "videos", {"part": "statistics,contentDetails", "id": ",".join(video_ids)}, self.api_key
+            )
+        await run_sync(budget_manager.record, "youtube", youtube_cost("videos.list"))
+        return self._to_stats(response)
+
+
+async def youtube_api_get(resource: str, params: dict, api_key: str) -> dict:
+    """GET a YouTube Data API v3 resource ("search", "videos", ...) with the shared async client."""
+    response = await http_client().get(f"{YOUTUBE_API_URL}/{resource}", params={**params, "key": api_key})
+    response.raise_for_status()
+    return response.json()
@@ -0,0 +1,59 @@
+"""
+Helpers for the asyncio code paths: app/asgi.py and the Async* services.
+
+Blocking work (SQLAlchemy, budget accounting, scikit-learn, sync SDKs) runs
+through run_sync() on a bounded thread pool, each call in a fresh app
+context so it gets its own database session. HTTP calls share one pooled
+httpx.AsyncClient per event loop.
+"""
+import asyncio
+import contextvars
+import os
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+from flask import current_app, has_app_context
+
+HTTP_TIMEOUT = httpx.Timeout(float(os.getenv("ASYNC_HTTP_TIMEOUT", 30)), connect=5.0)
+HTTP_LIMITS = httpx.Limits(max_connections=int(os.getenv("ASYNC_HTTP_MAX_CONNECTIONS", 200)), max_keepalive_connections=50)
+
+_blocking_pool = ThreadPoolExecutor(
+    max_workers=int(os.getenv("ASYNC_BLOCKING_WORKERS", 32)), thread_name_prefix="aio-blocking"
+)
+_clients = weakref.WeakKeyDictionary()  # event loop -> httpx.AsyncClient
+_app = None
+
+
+def bind_app(app):
+    """The Flask app whose context run_sync() provides when the caller has none."""
+    global _app
+    _app = app
+
+
+async def run_sync(func, *args, **kwargs):
+    """Run a blocking call in a worker thread with its own app context and the caller's context variables."""
+    app = current_app._get_current_object() if has_app_context() else _app
+    context = contextvars.copy_context()
+
+    def call():
+        if app is None:
+            return func(*args, **kwargs)
+        with app.app_context():
+            return func(*args, **kwargs)
+
+    return await asyncio.get_running_loop().run_in_executor(_blocking_pool, context.run, call)
+
+
+def http_client() -> httpx.AsyncClient:
+    """The shared HTTP client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = _clients[loop] = httpx.AsyncClient(timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS)
+    return client
+
+
+async def close_http_client():
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
@@ -0,0 +1,128 @@
+"""
+Precomputed OpenAPI spec for /apispec.json.
+
+flasgger builds the spec by parsing the YAML docstring of every route, once
+per worker process (on every request in debug mode), and serializes the
+whole document again for every request. Here the spec is serialized once,
+with a gzip variant and an ETag, and /apispec.json serves those bytes:
+clients that already have it get 304 Not Modified.
+
+The spec comes from, in order:
+- APISPEC_FILE, written at build time with
+      python -m app.utils.apispec apispec.json
+- otherwise flasgger, on the first request for it (every request in debug
+  mode, so docstring edits show up)
+
+With APISPEC_STRIP_DOCSTRINGS the spec is built (or loaded) at startup and
+the YAML docstrings are dropped from the route functions, so nothing can
+parse them again at runtime.
+"""
+import gzip
+import hashlib
+import json
+import os
+import sys
+import threading
+from flask import Response, request
+
+SPEC_ENDPOINT = "apispec"
+
+
+class SerializedSpec:
+    """A spec serialized once, with its gzip variant and ETag."""
+
+    def __init__(self, spec: dict):
+        self.spec = spec
+        self.body = json.dumps(spec, sort_keys=True, separators=(",", ":")).encode()
+        self.gzipped = gzip.compress(self.body, compresslevel=9)
+        self.etag = hashlib.sha256(self.body).hexdigest()[:32]
+
+    def response(self) -> Response:
+        if request.if_none_match.contains(self.etag):
+            response = Response(status=304)
+        elif request.accept_encodings["gzip"]:
+            response = Response(self.gzipped, mimetype="application/json")
+            response.headers["Content-Encoding"] = "gzip"
+        else:
+            response = Response(self.body, mimetype="application/json")
+        response.set_etag(self.etag)
+        response.headers["Vary"] = "Accept-Encoding"
+        response.headers["Cache-Control"] = "public, max-age=300"
+        return response
+
+
+def generate_spec(app, swagger) -> dict:
+    """Build the spec from the route docstrings with flasgger."""
+    with app.test_request_context():
+        return swagger.get_apispecs(SPEC_ENDPOINT)
+
+
+def strip_docstrings(app) -> int:
+    """Drop the YAML docstrings ("---" sections) from the route functions; returns how many."""
+    stripped = 0
+    for view in app.view_functions.values():
+        doc = getattr(view, "__doc__", None)
+        if doc and "---" in doc:
+            try:
+                view.__doc__ = None
+                stripped += 1
+            except (AttributeError, TypeError):
+                pass
+    return stripped
+
+
+def init_apispec(app, swagger):
+    """Serve /apispec.json from a precomputed spec. Call after every blueprint is registered."""
+    path = app.config.get("APISPEC_FILE")
+    state = {"spec": None}
+    lock = threading.Lock()
+
+    def install(spec: dict) -> SerializedSpec:
+        # flasgger's own lookups (the docs UI, validation) reuse it too
+        swagger.apispecs[SPEC_ENDPOINT] = spec
+        state["spec"] = SerializedSpec(spec)
+        return state["spec"]
+
+    if path:
+        with open(path, "rb") as f:
+            install(json.load(f))
+    elif app.config.get("APISPEC_STRIP_DOCSTRINGS"):
+        install(generate_spec(app, swagger))
+
+    if app.config.get("APISPEC_STRIP_DOCSTRINGS"):
+        strip_docstrings(app)
+
+    def apispec():
+        if app.debug and not path:
+            # Rebuilt every time, so docstring edits show up
+            return SerializedSpec(generate_spec(app, swagger)).response()
+        if state["spec"] is None:
+            with lock:
+                if state["spec"] is None:
+                    install(generate_spec(app, swagger))
+        return state["spec"].response()
+
+    app.view_functions[f"flasgger.{SPEC_ENDPOINT}"] = apispec
+
+
+def main(argv=None) -> int:
+    """Write the spec to a file: python -m app.utils.apispec [PATH]"""
+    argv = sys.argv[1:] if argv is None else argv
+    output = argv[0] if argv else "apispec.json"
+
+    # Building the spec needs neither the database nor the scheduler
+    os.environ.setdefault("RUN_SCHEDULER", "false")
+    os.environ.setdefault("AUTO_CREATE_TABLES", "false")
+    os.environ["APISPEC_FILE"] = ""
+    from app.main import create_app
+
+    app = create_app()
+    spec = generate_spec(app, app.swag)
+    with open(output, "w") as f:
+        json.dump(spec, f, sort_keys=True, separators=(",", ":"))
+    print(f"Wrote {len(spec.get('paths', {}))} paths to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
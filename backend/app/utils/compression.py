@@ -0,0 +1,81 @@
+"""
+Negotiated response compression.
+
+JSON compresses to a fraction of its size, and the largest responses
+(content packages, competitors with their videos, niche explorations) are
+tens of kilobytes. Responses of a compressible type, at least
+COMPRESS_MIN_SIZE bytes, are encoded with the best encoding the client
+accepts: brotli when the Brotli package is installed, otherwise gzip.
+Smaller ones aren't worth the CPU or the header overhead.
+
+The levels are tuned for responses compressed on every request rather
+than once: brotli quality 4 and gzip level 6 get most of the size
+reduction of the maximum levels at a fraction of the time
+(python -m benchmarks.payloads compares them).
+
+Responses that are streamed, sent from files, already encoded (see
+app/utils/apispec.py) or partial are passed through untouched. A strong
+ETag is made weak, since the bytes now depend on Accept-Encoding.
+"""
+import gzip
+from flask import current_app, request
+from werkzeug.http import parse_accept_header
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+COMPRESSIBLE_TYPES = {
+    "application/json", "application/javascript", "image/svg+xml",
+    "text/html", "text/plain", "text/css", "text/csv", "text/javascript",
+}
+
+# In order of preference when the client accepts both equally
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def choose_encoding(accept_encoding: str):
+    """The encoding to use for a request's Accept-Encoding header, or None."""
+    if not accept_encoding:
+        return None
+    return parse_accept_header(accept_encoding).best_match(ENCODINGS)
+
+
+def compress(body: bytes, encoding: str, config) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=config["COMPRESS_BROTLI_QUALITY"])
+    return gzip.compress(body, compresslevel=config["COMPRESS_GZIP_LEVEL"])
+
+
+def _compress_response(response):
+    config = current_app.config
+    if (
+        response.status_code < 200 or response.status_code in (204, 206, 304)
+        or response.direct_passthrough or response.is_streamed
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESSIBLE_TYPES
+    ):
+        return response
+
+    body = response.get_data()
+    if len(body) < config["COMPRESS_MIN_SIZE"]:
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = choose_encoding(request.headers.get("Accept-Encoding"))
+    if encoding is None:
+        return response
+
+    response.set_data(compress(body, encoding, config))
+    response.headers["Content-Encoding"] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_compression(app):
+    """Compress responses unless COMPRESS_RESPONSES is off (e.g. a proxy in front does it)."""
+    if app.config["COMPRESS_RESPONSES"]:
+        app.after_request(_compress_response)
@@ -0,0 +1,197 @@
+"""
+HTTP conditional requests (ETag / Last-Modified) for per-user read endpoints.
+
+The SPA polls history and list endpoints that re-query and re-serialize
+the same rows on every poll. Each user's data is split into scopes, one
+per group of models (MODEL_SCOPES). A data_versions row per (user, scope)
+is bumped in the same transaction as any insert, update or delete of those
+models through the ORM, whether it comes from a route, a repository, a
+service or a scheduler job, so the version changes whenever anything an
+endpoint in that scope returns could have changed.
+
+    @content_bp.route("/history", methods=["GET"])
+    @jwt_required()
+    @conditional("content")
+    def get_content_history(): ...
+
+derives the ETag from the user, the URL and the scope versions, read with
+a single primary-key lookup before the view runs. When the client's
+If-None-Match (or, without one, If-Modified-Since) still matches, the
+response is 304 Not Modified and the view never touches the ORM.
+
+Bulk Query.update()/delete() and Core statements bypass the flush and do
+not bump versions; call bump_versions() after them.
+"""
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps
+from itertools import chain
+from flask import Response, make_response, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import event, select, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.models.sql.calendar_event import CalendarEvent
+from app.models.sql.competitor import Competitor, CompetitorVideo
+from app.models.sql.content_performance import ContentPerformance
+from app.models.sql.content_script import ContentScript
+from app.models.sql.data_version import DataVersion
+from app.models.sql.niche import Niche
+from app.models.sql.skill_path import SkillPath
+
+MODEL_SCOPES = {
+    ContentScript: "content",
+    Niche: "niche",
+    Competitor: "competitor",
+    CompetitorVideo: "competitor",
+    ContentPerformance: "analytics",
+    CalendarEvent: "calendar",
+    SkillPath: "skills",
+}
+
+# Clients revalidate on every use; a revalidation is one primary-key lookup
+DEFAULT_CACHE_CONTROL = "private, no-cache"
+
+
+# ============ VERSIONS ============
+
+def _owner(session, obj, competitor_owners: dict):
+    if isinstance(obj, CompetitorVideo):
+        competitor_id = obj.competitor_id
+        if competitor_id not in competitor_owners:
+            competitor_owners[competitor_id] = session.connection().execute(
+                select(Competitor.user_id).where(Competitor.id == competitor_id)
+            ).scalar()
+        return competitor_owners[competitor_id]
+    return obj.user_id
+
+
+def _after_flush(session, flush_context):
+    # new/dirty/deleted still hold the flushed objects here
+    changed = set()
+    competitor_owners = {}
+    for obj in chain(session.new, session.dirty, session.deleted):
+        scope = MODEL_SCOPES.get(type(obj))
+        if scope is None:
+            continue
+        if obj in session.dirty and not session.is_modified(obj, include_collections=False):
+            continue
+        user_id = _owner(session, obj, competitor_owners)
+        if user_id is not None:
+            changed.add((int(user_id), scope))
+    if changed:
+        bump_versions(changed, session.connection())
+
+
+def bump_versions(keys, connection=None):
+    """
+    Increment the version of each (user_id, scope) in `keys`, creating it at 1.
+    Runs on `connection` (the caller's transaction) or in its own transaction.
+    """
+    if connection is None:
+        with db.engine.begin() as conn:
+            return bump_versions(keys, conn)
+
+    table = DataVersion.__table__
+    now = datetime.utcnow()
+    # Sorted, so concurrent transactions lock the rows in the same order
+    rows = [{"user_id": user_id, "scope": scope, "version": 1, "updated_at": now} for user_id, scope in sorted(keys)]
+    dialect = connection.dialect.name
+
+    if dialect == "mysql":
+        statement = mysql.insert(table).values(rows)
+        connection.execute(statement.on_duplicate_key_update(
+            version=table.c.version + 1, updated_at=statement.inserted.updated_at
+        ))
+    elif dialect in ("postgresql", "sqlite"):
+        statement = (postgresql if dialect == "postgresql" else sqlite).insert(table).values(rows)
+        connection.execute(statement.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.scope],
+            set_={"version": table.c.version + 1, "updated_at": statement.excluded.updated_at}
+        ))
+    else:
+        for row in rows:
+            where = (table.c.user_id == row["user_id"]) & (table.c.scope == row["scope"])
+            if not connection.execute(update(table).where(where).values(version=table.c.version + 1, updated_at=now)).rowcount:
+                connection.execute(table.insert().values(**row))
+
+
+def read_versions(user_id: int, scopes) -> tuple:
+    """({scope: version}, last modified) for one user; scopes never written are version 0."""
+    table = DataVersion.__table__
+    with db.engine.connect() as conn:
+        rows = conn.execute(
+            select(table.c.scope, table.c.version, table.c.updated_at)
+            .where(table.c.user_id == user_id, table.c.scope.in_(scopes))
+        ).all()
+    versions = {scope: 0 for scope in scopes}
+    last_modified = None
+    for scope, version, updated_at in rows:
+        versions[scope] = version
+        if updated_at and (last_modified is None or updated_at > last_modified):
+            last_modified = updated_at
+    return versions, last_modified
+
+
+# ============ REQUESTS ============
+
+def _etag(user_id, versions: dict) -> str:
+    key = f"{user_id}|{request.full_path}|" + ",".join(f"{s}:{v}" for s, v in sorted(versions.items()))
+    return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+
+def _not_modified(etag: str, last_modified) -> bool:
+    # If-Modified-Since only counts without If-None-Match (RFC 9110 13.2.2)
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since and last_modified:
+        return last_modified.replace(microsecond=0, tzinfo=timezone.utc) <= request.if_modified_since
+    return False
+
+
+def conditional(*scopes, cache_control: str = DEFAULT_CACHE_CONTROL):
+    """
+    ETag and Last-Modified for a GET view of the current user's data in
+    `scopes`, answering 304 Not Modified without running the view when the
+    client's copy is current. Goes below @jwt_required().
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            user_id = get_jwt_identity()
+            try:
+                versions, last_modified = read_versions(int(user_id), scopes)
+            except Exception as e:
+                print(f"Data version lookup error: {e}")
+                return view(*args, **kwargs)
+
+            etag = _etag(user_id, versions)
+            if _not_modified(etag, last_modified):
+                response = Response(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            # Weak: the same data may be sent with a different Content-Encoding
+            response.set_etag(etag, weak=True)
+            if last_modified:
+                response.last_modified = last_modified.replace(tzinfo=timezone.utc)
+            response.headers["Cache-Control"] = cache_control
+            response.vary.add("Authorization")
+            return response
+        return wrapper
+    return decorator
+
+
+_session_events_installed = False
+
+
+def init_data_versions(app):
+    """Bump data versions on every ORM flush."""
+    global _session_events_installed
+    if not _session_events_installed:
+        # Listening on the Session class covers the app's scoped session and any other
+        event.listen(Session, "after_flush", _after_flush)
+        _session_events_installed = True
@@ -0,0 +1,206 @@
+"""
+Database engines, connection pools and session routing.
+
+init_database(app) builds the engine options from the DB_* settings before
+Flask-SQLAlchemy creates its engines:
+
+- The request pool holds DB_POOL_SIZE connections plus DB_MAX_OVERFLOW
+  more under load. A request that can't get one within DB_POOL_TIMEOUT
+  fails instead of queueing forever.
+- Connections are checked with a ping before use and replaced after
+  DB_POOL_RECYCLE seconds. A connection closed by the server (wait_timeout,
+  a restart: MySQL's "server has gone away") is replaced instead of
+  failing the request that gets it.
+- Scheduler jobs (everything run under telemetry.job_span) use a pool of
+  their own (the "background" bind, DB_BACKGROUND_POOL_SIZE), so a slow
+  job can't take the connections requests are waiting for. RoutingSession
+  picks it while background_engine() is active.
+- release_request_connection() ends the session's transaction when it has
+  nothing to write, so a request waiting seconds on an LLM call doesn't
+  keep a pooled connection. Budget admission and telemetry.span call it
+  before upstream calls (DB_RELEASE_BEFORE_UPSTREAM). Without it, a
+  request holding its session's connection while budget accounting checks
+  out a second one can leave every thread waiting on the pool.
+
+Pool metrics (connections checked out, idle and in overflow, checkout wait
+and timeouts) are reported per pool on /metrics.
+"""
+import time
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+from flask import current_app, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+from app.utils.telemetry import CounterMetric, GaugeMetric, HistogramMetric
+
+BACKGROUND_BIND = "background"
+
+_background = ContextVar("background_engine", default=False)
+
+
+# ============ POOL METRICS ============
+
+_pools = {}  # pool name -> weakref to its current InstrumentedQueuePool (dispose() replaces it)
+
+db_pool_wait = HistogramMetric(
+    "db_pool_wait_seconds", "Time to get a connection from the pool (waiting, connecting and pinging)", ("pool",),
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+)
+db_pool_timeouts = CounterMetric(
+    "db_pool_timeouts_total", "Checkouts that gave up waiting for a connection (pool exhausted)", ("pool",)
+)
+
+
+def _pool_connections() -> dict:
+    values = {}
+    for name, ref in list(_pools.items()):
+        pool = ref()
+        if pool is None:
+            continue
+        values[(name, "checked_out")] = pool.checkedout()
+        values[(name, "idle")] = pool.checkedin()
+        values[(name, "overflow")] = max(pool.overflow(), 0)
+    return values
+
+
+def _pool_limits() -> dict:
+    return {(name,): pool.size() + max(pool.max_overflow, 0) for name, pool in
+            ((name, ref()) for name, ref in list(_pools.items())) if pool is not None}
+
+
+db_pool_connections = GaugeMetric(
+    "db_pool_connections", "Pooled connections by state", ("pool", "state"), callback=_pool_connections
+)
+db_pool_limit = GaugeMetric(
+    "db_pool_limit", "Most connections the pool opens (pool size + overflow)", ("pool",), callback=_pool_limits
+)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times checkouts and reports its connections."""
+
+    def __init__(self, creator, pool_size: int = 5, max_overflow: int = 10, **kw):
+        super().__init__(creator, pool_size=pool_size, max_overflow=max_overflow, **kw)
+        self.max_overflow = max_overflow
+        self.name = self._orig_logging_name or "default"
+        _pools[self.name] = weakref.ref(self)
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            db_pool_timeouts.inc(pool=self.name)
+            raise
+        finally:
+            db_pool_wait.observe(time.perf_counter() - start, pool=self.name)
+
+
+# ============ ENGINES ============
+
+def _engine_options(uri: str, name: str, pool_size: int, max_overflow: int, config) -> dict:
+    options = {"pool_pre_ping": config["DB_POOL_PRE_PING"], "pool_logging_name": name}
+    url = make_url(uri)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return options  # One shared in-memory connection (Flask-SQLAlchemy's StaticPool)
+    options.update(
+        poolclass=InstrumentedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=config["DB_POOL_TIMEOUT"],
+        pool_recycle=config["DB_POOL_RECYCLE"]
+    )
+    return options
+
+
+def init_database(app):
+    """Set the engine options and the background bind; call before db.init_app(app)."""
+    config = app.config
+    uri = config["SQLALCHEMY_DATABASE_URI"]
+    options = _engine_options(uri, "web", config["DB_POOL_SIZE"], config["DB_MAX_OVERFLOW"], config)
+    options.update(config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+    config["SQLALCHEMY_ENGINE_OPTIONS"] = options
+
+    if config["DB_BACKGROUND_POOL_SIZE"] > 0:
+        binds = dict(config.get("SQLALCHEMY_BINDS") or {})
+        binds.setdefault(BACKGROUND_BIND, {
+            "url": uri,
+            **_engine_options(uri, BACKGROUND_BIND, config["DB_BACKGROUND_POOL_SIZE"], config["DB_BACKGROUND_MAX_OVERFLOW"], config)
+        })
+        config["SQLALCHEMY_BINDS"] = binds
+
+
+# ============ SESSIONS ============
+
+@contextmanager
+def background_engine():
+    """Run the session's queries in this block on the background pool (when configured)."""
+    token = _background.set(True)
+    try:
+        yield
+    finally:
+        _background.reset(token)
+
+
+def current_engine():
+    """The engine for queries outside the session: the background engine inside background_engine()."""
+    from app.extensions import db
+    engines = db.engines
+    if _background.get() and BACKGROUND_BIND in engines:
+        return engines[BACKGROUND_BIND]
+    return engines[None]
+
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy's session, sending default-bind queries to the background engine inside background_engine()."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if bind is None and _background.get():
+            engines = self._db.engines
+            if BACKGROUND_BIND in engines and engine is engines.get(None):
+                return engines[BACKGROUND_BIND]
+        return engine
+
+
+def _track_flush(session, flush_context):
+    session.info["_flushed"] = True
+
+
+def _forget_flush(session, transaction):
+    if transaction.parent is None:
+        session.info.pop("_flushed", None)
+
+
+event.listen(Session, "after_flush", _track_flush)
+event.listen(Session, "after_transaction_end", _forget_flush)
+
+
+def release_idle_connection(session) -> bool:
+    """
+    Commit the session's transaction if it has only read, returning its
+    connection to the pool; a session with changes is left alone. Loaded
+    objects are expired and reload on their next access.
+    """
+    if not session.in_transaction() or session.in_nested_transaction():
+        return False
+    if session.new or session.dirty or session.deleted or session.info.get("_flushed"):
+        return False
+    session.commit()
+    return True
+
+
+def release_request_connection():
+    """release_idle_connection() on the app context's session, if it has one and DB_RELEASE_BEFORE_UPSTREAM is on."""
+    if not has_app_context() or not current_app.config.get("DB_RELEASE_BEFORE_UPSTREAM"):
+        return
+    from app.extensions import db
+    if not db.session.registry.has():
+        return
+    try:
+        release_idle_connection(db.session())
+    except Exception as e:
+        print(f"Releasing the database connection failed: {e}")
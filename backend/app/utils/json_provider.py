@@ -0,0 +1,66 @@
+"""
+Flask JSON provider backed by orjson.
+
+jsonify() and request.get_json() go through app.json. Flask's default
+provider uses the json module; orjson serializes several times faster and
+writes bytes directly, which matters for the large nested responses
+(content packages, competitors with their videos, niche explorations).
+
+Output matches the default provider: keys sorted, dates as HTTP dates
+(Flask's format, not orjson's ISO 8601), Decimal/UUID/dataclass handled
+by Flask's default(), indented in debug mode. Non-ASCII text is written
+as UTF-8 rather than \\u escapes. Non-string keys are converted like json
+does, and numpy scalars and arrays from the analytics services serialize
+as numbers. Anything orjson refuses (integers beyond 64 bits) falls back
+to the json module.
+
+Config JSON_PROVIDER picks the provider: "orjson" (default) or "default".
+"""
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # JSON_PROVIDER=orjson falls back to the default provider
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    def _options(self, indent: bool = False) -> int:
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps_bytes(self, obj, indent: bool = False) -> bytes:
+        try:
+            return orjson.dumps(obj, default=self.default, option=self._options(indent))
+        except orjson.JSONEncodeError:
+            return super().dumps(obj, indent=2 if indent else None).encode()
+
+    def dumps(self, obj, **kwargs) -> str:
+        # json.dumps arguments (cls, separators...) need the json module
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self.dumps_bytes(obj, indent) + b"\n", mimetype=self.mimetype)
+
+
+def init_json(app):
+    """Install the JSON provider named by JSON_PROVIDER."""
+    if app.config.get("JSON_PROVIDER") != "orjson":
+        return
+    if orjson is None:
+        print("JSON_PROVIDER=orjson but orjson is not installed; using the default JSON provider")
+        return
+    app.json = OrjsonProvider(app)
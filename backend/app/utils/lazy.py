@@ -0,0 +1,53 @@
+"""
+Deferred imports for heavy third-party packages.
+
+scikit-learn (with scipy), google-genai, the Google API client, Twilio and
+SendGrid together take seconds to import. create_app() imports every
+blueprint and, through them, every service, so importing them at module
+level would cost each worker, scheduler process and one-off script that
+time before it does anything. Services bind them with these helpers
+instead, and the import happens on first use:
+
+    genai = lazy_module("google.genai")               # on first attribute access
+    KMeans = lazy_attr("sklearn.cluster", "KMeans")   # on first call
+
+Both are plain module attributes, so tests and benchmarks can still patch
+them (mock.patch("app.services.llm_service.genai", ...)).
+"""
+import importlib
+
+
+class LazyModule:
+    """A module that is imported on first attribute access."""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr: str):
+        if attr.startswith("__"):
+            raise AttributeError(attr)
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_module(name: str) -> LazyModule:
+    return LazyModule(name)
+
+
+def lazy_attr(module: str, attr: str):
+    """A callable (class or function) from `module`, imported when first called."""
+    target = LazyModule(module)
+
+    def call(*args, **kwargs):
+        return getattr(target, attr)(*args, **kwargs)
+
+    call.__name__ = attr
+    call.__qualname__ = attr
+    call.__doc__ = f"{module}.{attr}, imported on first call."
+    return call
@@ -1,10 +1,15 @@
 """
 OAuth utilities for Google and GitHub authentication
 """
+import asyncio
 import os
+import httpx
 import requests
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_requests
+from app.utils.aio import http_client
+from app.utils.lazy import lazy_module
+
+id_token = lazy_module("google.oauth2.id_token")
+google_requests = lazy_module("google.auth.transport.requests")
 
 
 def verify_google_token(token: str) -> dict:
@@ -73,22 +78,24 @@ def _verify_google_access_token(token: str) -> dict:
         if response.status_code != 200:
             raise ValueError(f"Google API returned status {response.status_code}")
         
-        userinfo = response.json()
-        
-        if "error" in userinfo:
-            raise ValueError(userinfo.get("error_description", userinfo["error"]))
-        
-        return {
-            "email": userinfo.get("email"),
-            "sub": userinfo.get("sub"),  # Google user ID
-            "name": userinfo.get("name"),
-            "picture": userinfo.get("picture"),
-            "email_verified": userinfo.get("email_verified", False)
-        }
+        return _google_userinfo(response.json())
     except requests.RequestException as e:
         raise ValueError(f"Failed to verify Google access token: {str(e)}")
 
 
+def _google_userinfo(userinfo: dict) -> dict:
+    if "error" in userinfo:
+        raise ValueError(userinfo.get("error_description", userinfo["error"]))
+    
+    return {
+        "email": userinfo.get("email"),
+        "sub": userinfo.get("sub"),  # Google user ID
+        "name": userinfo.get("name"),
+        "picture": userinfo.get("picture"),
+        "email_verified": userinfo.get("email_verified", False)
+    }
+
+
 def exchange_github_code(code: str) -> dict:
     """
     Exchange a GitHub OAuth code for user information.
@@ -156,19 +163,24 @@ def exchange_github_code(code: str) -> dict:
             }
         )
         if emails_response.status_code == 200:
-            emails = emails_response.json()
-            # Get the primary email
-            for email_obj in emails:
-                if email_obj.get("primary"):
-                    email = email_obj.get("email")
-                    break
-            # Fallback to first verified email
-            if not email:
-                for email_obj in emails:
-                    if email_obj.get("verified"):
-                        email = email_obj.get("email")
-                        break
+            email = _github_primary_email(emails_response.json())
     
+    return _github_user(user_data, email)
+
+
+def _github_primary_email(emails: list) -> str:
+    # Get the primary email
+    for email_obj in emails:
+        if email_obj.get("primary"):
+            return email_obj.get("email")
+    # Fallback to first verified email
+    for email_obj in emails:
+        if email_obj.get("verified"):
+            return email_obj.get("email")
+    return None
+
+
+def _github_user(user_data: dict, email: str) -> dict:
     if not email:
         raise ValueError("Unable to get email from GitHub account")
     
@@ -179,3 +191,68 @@ def exchange_github_code(code: str) -> dict:
         "name": user_data.get("name"),
         "avatar_url": user_data.get("avatar_url")
     }
+
+
+# ============ ASYNC VARIANTS ============
+
+async def verify_google_token_async(token: str) -> dict:
+    """verify_google_token() for coroutines."""
+    client_id = os.environ.get("GOOGLE_CLIENT_ID")
+    if not client_id:
+        raise ValueError("GOOGLE_CLIENT_ID environment variable not set")
+
+    if token.startswith("ya29."):
+        try:
+            response = await http_client().get(
+                "https://www.googleapis.com/oauth2/v3/userinfo",
+                headers={"Authorization": f"Bearer {token}"}
+            )
+        except httpx.HTTPError as e:
+            raise ValueError(f"Failed to verify Google access token: {str(e)}")
+        if response.status_code != 200:
+            raise ValueError(f"Google API returned status {response.status_code}")
+        return _google_userinfo(response.json())
+
+    # google-auth verifies ID tokens synchronously (it fetches and caches Google's certificates)
+    return await asyncio.to_thread(_verify_google_id_token, token, client_id)
+
+
+async def exchange_github_code_async(code: str) -> dict:
+    """exchange_github_code() for coroutines."""
+    client_id = os.environ.get("GITHUB_CLIENT_ID")
+    client_secret = os.environ.get("GITHUB_CLIENT_SECRET")
+
+    if not client_id or not client_secret:
+        raise ValueError("GITHUB_CLIENT_ID and GITHUB_CLIENT_SECRET environment variables must be set")
+
+    client = http_client()
+    token_response = await client.post(
+        "https://github.com/login/oauth/access_token",
+        headers={"Accept": "application/json"},
+        data={"client_id": client_id, "client_secret": client_secret, "code": code}
+    )
+    if token_response.status_code != 200:
+        raise ValueError("Failed to exchange GitHub code for token")
+
+    token_data = token_response.json()
+    if "error" in token_data:
+        raise ValueError(f"GitHub OAuth error: {token_data.get('error_description', token_data['error'])}")
+
+    access_token = token_data.get("access_token")
+    if not access_token:
+        raise ValueError("No access token in GitHub response")
+
+    # The emails are fetched alongside the profile and only used when the profile email is private
+    headers = {"Authorization": f"Bearer {access_token}", "Accept": "application/vnd.github.v3+json"}
+    user_response, emails_response = await asyncio.gather(
+        client.get("https://api.github.com/user", headers=headers),
+        client.get("https://api.github.com/user/emails", headers=headers)
+    )
+    if user_response.status_code != 200:
+        raise ValueError("Failed to get GitHub user info")
+
+    user_data = user_response.json()
+    email = user_data.get("email")
+    if not email and emails_response.status_code == 200:
+        email = _github_primary_email(emails_response.json())
+    return _github_user(user_data, email)
@@ -0,0 +1,276 @@
+"""
+Client-side rate limiting for upstream APIs with per-minute limits.
+
+SharedRateLimiter paces requests to a requests-per-minute and
+tokens-per-minute ceiling over a sliding 60 second window. The window lives
+in a small JSON file guarded by an exclusive file lock, so every thread and
+worker process on the host draws from the same allowance. Callers that
+would exceed it wait in acquire() (acquire_async() in coroutines) instead
+of getting a 429. Every method but acquire_async() takes the file lock on
+the calling thread; coroutines call them through run_sync().
+
+The provider's rate-limit response headers are fed back through
+update_from_headers(): a lower reported limit replaces the configured one,
+tokens the provider counts but we didn't (other hosts on the same key)
+are added to the window, and a Retry-After or exhausted daily allowance
+blocks everyone until the reset.
+
+AdaptiveConcurrency caps in-flight calls per process with additive
+increase / multiplicative decrease: each success raises the cap slightly,
+each 429 halves it.
+"""
+import asyncio
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from app.utils.aio import run_sync
+from app.utils.telemetry import CounterMetric, HistogramMetric
+
+try:
+    import fcntl
+except ImportError:  # Windows: the limit is shared between threads only
+    fcntl = None
+
+WINDOW_SECONDS = 60.0
+
+rate_limit_wait = HistogramMetric(
+    "rate_limiter_wait_seconds", "Time callers spent queued for an upstream rate limit", ("service",),
+    buckets=(0.01, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+)
+upstream_retries = CounterMetric(
+    "upstream_retries_total", "Upstream calls retried after a rate limit or server error", ("service", "reason")
+)
+
+
+class RateLimitTimeout(Exception):
+    def __init__(self, service: str, retry_after: int):
+        super().__init__(f"{service} rate limit queue timed out, retry in {retry_after}s")
+        self.service = service
+        self.retry_after = retry_after
+
+
+def parse_duration(value) -> float:
+    """Seconds from a rate-limit header value: "7.66s", "2m59.56s", "1h2m", "120ms" or a plain number."""
+    if value is None:
+        return 0.0
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    seconds = 0.0
+    for amount, unit in re.findall(r"([\d.]+)(ms|h|m|s)", value):
+        seconds += float(amount) * {"ms": 0.001, "h": 3600, "m": 60, "s": 1}[unit]
+    return seconds
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 20.0, retry_after: float = 0.0) -> float:
+    """Full-jitter exponential backoff, never shorter than the server's Retry-After."""
+    return max(retry_after, random.uniform(0, min(cap, base * 2 ** attempt)))
+
+
+class SharedRateLimiter:
+    def __init__(self, service: str, rpm: int, tpm: int, state_path: str = None, max_wait: float = 120.0):
+        self.service = service
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_wait = max_wait
+        self.state_path = state_path or os.path.join(tempfile.gettempdir(), f"insight_sphere_{service}_ratelimit.json")
+        self._thread_lock = threading.Lock()
+        self._sequence = 0
+
+    @contextmanager
+    def _state(self):
+        """The shared window, locked across threads and processes for the duration of the block."""
+        with self._thread_lock:
+            with open(self.state_path, "a+") as handle:
+                if fcntl:
+                    fcntl.flock(handle, fcntl.LOCK_EX)
+                try:
+                    handle.seek(0)
+                    try:
+                        state = json.loads(handle.read() or "{}")
+                    except ValueError:
+                        state = {}
+                    state.setdefault("requests", [])
+                    state.setdefault("tokens", [])
+                    state.setdefault("blocked_until", 0)
+
+                    now = time.time()
+                    state["requests"] = [t for t in state["requests"] if t > now - WINDOW_SECONDS]
+                    state["tokens"] = [e for e in state["tokens"] if e[0] > now - WINDOW_SECONDS]
+                    yield state, now
+
+                    handle.seek(0)
+                    handle.truncate()
+                    handle.write(json.dumps(state))
+                    handle.flush()
+                finally:
+                    if fcntl:
+                        fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _limits(self, state: dict) -> tuple:
+        return min(self.rpm, state.get("rpm") or self.rpm), min(self.tpm, state.get("tpm") or self.tpm)
+
+    def _wait_time(self, state: dict, now: float, tokens: int) -> float:
+        rpm, tpm = self._limits(state)
+        wait = state["blocked_until"] - now
+
+        if len(state["requests"]) >= rpm:
+            wait = max(wait, state["requests"][-rpm] + WINDOW_SECONDS - now)
+
+        used = sum(e[1] for e in state["tokens"])
+        if state["tokens"] and used + tokens > tpm:
+            # Wait until enough of the window has expired; a request larger
+            # than the whole limit goes through once the window is empty
+            needed = used + min(tokens, tpm) - tpm
+            for timestamp, amount, _ in sorted(state["tokens"]):
+                needed -= amount
+                if needed <= 0:
+                    wait = max(wait, timestamp + WINDOW_SECONDS - now)
+                    break
+        return wait
+
+    def acquire(self, tokens: int = 0, max_wait: float = None) -> str:
+        """
+        Block until a request of about `tokens` tokens fits the window, then
+        reserve it. Returns a reservation id for settle(). Raises
+        RateLimitTimeout if that would take longer than max_wait seconds.
+        """
+        max_wait = self.max_wait if max_wait is None else max_wait
+        start = time.monotonic()
+        while True:
+            reservation, delay = self._reserve(tokens, start, max_wait)
+            if reservation is not None:
+                return reservation
+            time.sleep(delay)
+
+    async def acquire_async(self, tokens: int = 0, max_wait: float = None) -> str:
+        """
+        acquire() for coroutines: waits without blocking the event loop. The
+        state file lock is taken in a worker thread, so contention with
+        other threads and processes doesn't stall the loop.
+        """
+        max_wait = self.max_wait if max_wait is None else max_wait
+        start = time.monotonic()
+        while True:
+            reservation, delay = await run_sync(self._reserve, tokens, start, max_wait)
+            if reservation is not None:
+                return reservation
+            await asyncio.sleep(delay)
+
+    def _reserve(self, tokens: int, start: float, max_wait: float) -> tuple:
+        """(reservation id, 0) if the request fits now, else (None, seconds to sleep before checking again)."""
+        with self._state() as (state, now):
+            wait = self._wait_time(state, now, tokens)
+            if wait <= 0:
+                self._sequence += 1
+                reservation = f"{os.getpid()}-{threading.get_ident()}-{self._sequence}"
+                state["requests"].append(now)
+                state["requests"].sort()
+                state["tokens"].append([now, tokens, reservation])
+                rate_limit_wait.observe(time.monotonic() - start, service=self.service)
+                return reservation, 0
+
+        waited = time.monotonic() - start
+        if waited + wait > max_wait:
+            rate_limit_wait.observe(waited, service=self.service)
+            raise RateLimitTimeout(self.service, int(wait) + 1)
+        # Re-check at least once a second: other processes may free capacity or update limits
+        return None, min(wait, 1.0) + random.uniform(0, 0.05)
+
+    def settle(self, reservation: str, tokens: int):
+        """Replace a reservation's estimate with the tokens actually used."""
+        with self._state() as (state, _):
+            for entry in state["tokens"]:
+                if entry[2] == reservation:
+                    entry[1] = tokens
+                    break
+
+    def block_for(self, seconds: float):
+        """Hold every caller back for `seconds` (e.g. a 429's Retry-After)."""
+        with self._state() as (state, now):
+            state["blocked_until"] = max(state["blocked_until"], now + seconds)
+
+    def update_from_headers(self, headers):
+        """Adapt to x-ratelimit-* response headers."""
+        if not headers:
+            return
+        headers = {key.lower(): value for key, value in headers.items()}
+
+        with self._state() as (state, now):
+            limit_tokens = headers.get("x-ratelimit-limit-tokens")
+            if limit_tokens and limit_tokens.isdigit():
+                state["tpm"] = int(limit_tokens)
+
+            remaining_tokens = headers.get("x-ratelimit-remaining-tokens")
+            if remaining_tokens and remaining_tokens.isdigit():
+                _, tpm = self._limits(state)
+                untracked = (tpm - int(remaining_tokens)) - sum(e[1] for e in state["tokens"])
+                if untracked > 0:
+                    state["tokens"].append([now, untracked, "provider"])
+                if int(remaining_tokens) <= 0:
+                    reset = parse_duration(headers.get("x-ratelimit-reset-tokens"))
+                    state["blocked_until"] = max(state["blocked_until"], now + reset)
+
+            # Groq reports the daily request allowance here
+            remaining_requests = headers.get("x-ratelimit-remaining-requests")
+            if remaining_requests and remaining_requests.isdigit() and int(remaining_requests) <= 0:
+                reset = parse_duration(headers.get("x-ratelimit-reset-requests"))
+                state["blocked_until"] = max(state["blocked_until"], now + reset)
+
+
+class AdaptiveConcurrency:
+    """Per-process cap on in-flight calls, adjusted by AIMD."""
+
+    def __init__(self, initial: int = 4, maximum: int = 16):
+        self.limit = float(initial)
+        self.maximum = maximum
+        self.in_flight = 0
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def slot(self, timeout: float = None):
+        with self._condition:
+            if not self._condition.wait_for(lambda: self.in_flight < int(self.limit), timeout):
+                raise TimeoutError("Timed out waiting for an upstream concurrency slot")
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self.in_flight -= 1
+                self._condition.notify()
+
+    @asynccontextmanager
+    async def slot_async(self, timeout: float = None):
+        """slot() for coroutines. Threads and coroutines share the same cap."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._condition:
+                if self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    break
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError("Timed out waiting for an upstream concurrency slot")
+            await asyncio.sleep(0.02)
+        try:
+            yield
+        finally:
+            with self._condition:
+                self.in_flight -= 1
+                self._condition.notify()
+
+    def on_success(self):
+        with self._condition:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._condition.notify()
+
+    def on_throttled(self):
+        with self._condition:
+            self.limit = max(1.0, self.limit / 2)
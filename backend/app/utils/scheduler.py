@@ -3,7 +3,10 @@ from app.models.sql.alert_rule import AlertRule
 from app.models.sql.user import User
 from app.agents.trend_agents import TrendAgent
 from app.services.notification_service import NotificationService
+from app.services.analytics_service import AnalyticsService
+from app.services.collaboration_service import CollaborationService
 from app.extensions import db
+from app.utils.telemetry import job_span
 from datetime import datetime, timedelta
 import json
 
@@ -14,7 +17,7 @@ def check_all_alerts(app):
     Background task to check all active alert rules.
     Runs periodically (e.g., every hour).
     """
-    with app.app_context():
+    with app.app_context(), job_span("check_all_alerts"):
         print(f"[{datetime.now()}] Running background trend alert check...")
         
         # 1. Fetch all active alert rules
@@ -35,8 +38,9 @@ def check_all_alerts(app):
         # 3. Analyze each topic
         for topic, rules in topic_map.items():
             try:
+                # Alerts only need the score: no summary, clustering or saved analysis.
                 # We use user_id=0 for background system tasks
-                result = trend_agent.run(topic, user_id=0)
+                result = trend_agent.run(topic, user_id=0, fields=["virality_score"], persist=False)
                 virality_score = result.get("virality_score", 0)
                 
                 for rule in rules:
@@ -58,6 +62,30 @@ def check_all_alerts(app):
             except Exception as e:
                 print(f"Error checking topic '{topic}': {e}")
 
+def evaluate_ab_tests(app):
+    """
+    Background task to evaluate every running A/B test in one vectorized batch.
+    """
+    with app.app_context(), job_span("evaluate_ab_tests"):
+        try:
+            result = AnalyticsService().evaluate_running_ab_tests()
+            print(f"[{datetime.now()}] Evaluated {result['evaluated_tests']} running A/B tests")
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error evaluating A/B tests: {e}")
+
+def refresh_collab_matches(app):
+    """
+    Background task to recompute stale or expired cached collaboration match lists.
+    """
+    with app.app_context(), job_span("refresh_collab_matches"):
+        try:
+            result = CollaborationService().refresh_stale_match_lists()
+            print(f"[{datetime.now()}] Refreshed {result['refreshed']} collaboration match lists")
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error refreshing collaboration match lists: {e}")
+
 def init_scheduler(app):
     """Initialize and start the scheduler."""
     scheduler.init_app(app)
@@ -71,4 +99,20 @@ def init_scheduler(app):
         hours=1 # Check every hour
     )
     
+    scheduler.add_job(
+        id='evaluate_ab_tests_job',
+        func=evaluate_ab_tests,
+        args=[app],
+        trigger='interval',
+        minutes=15
+    )
+    
+    scheduler.add_job(
+        id='refresh_collab_matches_job',
+        func=refresh_collab_matches,
+        args=[app],
+        trigger='interval',
+        minutes=10
+    )
+    
     scheduler.start()
@@ -0,0 +1,300 @@
+"""
+Tolerant parsing of JSON produced by LLMs.
+
+IncrementalJSONParser reads a completion (all at once or chunk by chunk as it
+streams) and normalises it on the fly: prose and markdown fences around the
+JSON are skipped, Python literals become JSON ones, bare words become
+strings, missing commas are inserted, trailing commas are dropped and raw
+control characters inside strings are escaped. It remembers the last point
+where a value was complete, so a completion cut off at max_tokens can still
+be salvaged by closing the open objects and arrays there.
+
+generate_structured() wraps a generation callable with that parser, schema
+validation and targeted follow-up requests: a truncated completion gets a
+continuation request (only the missing tail is generated), and a complete
+but invalid one gets a correction request that lists the schema errors.
+agenerate_structured() does the same with a coroutine function.
+"""
+import json
+from jsonschema import Draft7Validator
+
+_SCALAR_CHARS = set("0123456789+-.eEabcdfghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_")
+_LITERALS = {"true": "true", "false": "false", "null": "null", "True": "true", "False": "false", "None": "null",
+             "NaN": "null", "Infinity": "null", "-Infinity": "null", "undefined": "null"}
+
+
+class StructuredOutputError(Exception):
+    def __init__(self, message: str, text: str = "", errors: list = None):
+        super().__init__(message)
+        self.text = text
+        self.errors = errors or []
+
+
+class IncrementalJSONParser:
+    def __init__(self):
+        self.out = []  # Normalised JSON text
+        self.stack = []  # [bracket, expecting, member start] with expecting in key/colon/value/comma
+        self.started = False
+        self.complete = False
+        self._in_string = False
+        self._escape = False
+        self._scalar = None  # Characters of the number/literal being read
+        self._safe = None  # (len(out), open brackets) after the last complete value
+
+    def feed(self, chunk: str) -> "IncrementalJSONParser":
+        for char in chunk:
+            if self.complete:
+                break
+            self._consume(char)
+        return self
+
+    # ============ SCANNER ============
+
+    def _consume(self, char: str):
+        if not self.started:
+            if char in "{[":
+                self.started = True
+                self._open(char)
+            return
+
+        if self._in_string:
+            self._string_char(char)
+            return
+
+        if self._scalar is not None:
+            if char in _SCALAR_CHARS:
+                self._scalar.append(char)
+                return
+            self._end_scalar()
+            if self.complete:
+                return
+
+        if char in " \t\r\n":
+            return
+        if char in "}]":
+            self._close(char)
+        elif char == ":":
+            if self.stack and self.stack[-1][0] == "{":
+                self.out.append(":")
+                self.stack[-1][1] = "value"
+        elif char == ",":
+            top = self.stack[-1]
+            if top[1] == "comma":
+                top[2] = len(self.out)
+                self.out.append(",")
+                top[1] = "key" if top[0] == "{" else "value"
+        elif char == '"':
+            self._before_value()
+            self.out.append('"')
+            self._in_string = True
+        elif char in "{[":
+            self._before_value()
+            self._open(char)
+        elif char in _SCALAR_CHARS:
+            self._before_value()
+            self._scalar = [char]
+        # Anything else outside a string (stray quotes, comment slashes) is dropped
+
+    def _string_char(self, char: str):
+        if self._escape:
+            self._escape = False
+            self.out.append(char)
+        elif char == "\\":
+            self._escape = True
+            self.out.append(char)
+        elif char == '"':
+            self._in_string = False
+            self.out.append('"')
+            self._value_done(is_string=True)
+        elif char < " ":
+            self.out.append({"\n": "\\n", "\t": "\\t", "\r": "\\r"}.get(char, f"\\u{ord(char):04x}"))
+        else:
+            self.out.append(char)
+
+    def _before_value(self):
+        """Insert a comma the model left out between two values."""
+        top = self.stack[-1]
+        if top[1] == "comma":
+            top[2] = len(self.out)
+            self.out.append(",")
+            top[1] = "key" if top[0] == "{" else "value"
+        elif top[1] == "colon":
+            self.out.append(":")
+            top[1] = "value"
+
+    def _open(self, bracket: str):
+        self.out.append(bracket)
+        self.stack.append([bracket, "key" if bracket == "{" else "value", len(self.out)])
+
+    def _close(self, bracket: str):
+        top = self.stack[-1]
+        if top[0] == "{" and top[1] in ("colon", "value"):
+            # A key without a value: drop it (and the comma before it)
+            del self.out[top[2]:]
+        while self.out and self.out[-1] == ",":
+            self.out.pop()
+        self.stack.pop()
+        self.out.append("}" if top[0] == "{" else "]")
+        self._value_done()
+
+    def _end_scalar(self):
+        token = "".join(self._scalar)
+        self._scalar = None
+        quoted = False
+        if token in _LITERALS:
+            token = _LITERALS[token]
+        else:
+            try:
+                float(token)
+            except ValueError:
+                token = json.dumps(token)  # A bare word (or unquoted key): keep it as a string
+                quoted = True
+        self.out.append(token)
+        self._value_done(is_string=quoted)
+
+    def _value_done(self, is_string: bool = False):
+        if not self.stack:
+            self.complete = True
+            return
+        top = self.stack[-1]
+        if top[0] == "{" and top[1] == "key":
+            if is_string:
+                top[1] = "colon"
+                return
+        top[1] = "comma"
+        self._safe = (len(self.out), [entry[0] for entry in self.stack])
+
+    # ============ RESULTS ============
+
+    def text(self) -> str:
+        return "".join(self.out)
+
+    def value(self):
+        """The parsed document; raises StructuredOutputError unless it is complete."""
+        if not self.complete:
+            raise StructuredOutputError("Incomplete JSON", self.text())
+        try:
+            return json.loads(self.text())
+        except ValueError as e:
+            raise StructuredOutputError(f"Invalid JSON: {e}", self.text())
+
+    def partial(self):
+        """Everything up to the last complete value, with open brackets closed; None if nothing is salvageable."""
+        if self.complete:
+            return self.value()
+        if self._safe is None:
+            return None
+        length, brackets = self._safe
+        closers = "".join("}" if bracket == "{" else "]" for bracket in reversed(brackets))
+        try:
+            return json.loads("".join(self.out[:length]) + closers)
+        except ValueError:
+            return None
+
+
+def parse_json(text: str):
+    """(value, complete) for an LLM completion; value is the salvaged prefix when the JSON was cut off."""
+    parser = IncrementalJSONParser().feed(text or "")
+    if parser.complete:
+        try:
+            return parser.value(), True
+        except StructuredOutputError:
+            return None, True
+    return parser.partial(), False
+
+
+def validate(value, schema: dict) -> list:
+    """Schema violations as readable strings; empty when valid or no schema is given."""
+    if not schema:
+        return []
+    errors = []
+    for error in Draft7Validator(schema).iter_errors(value):
+        path = "/".join(str(part) for part in error.absolute_path) or "(root)"
+        errors.append(f"{path}: {error.message}")
+    return errors
+
+
+def _join_continuation(text: str, continuation: str) -> str:
+    """Append a continuation, dropping any overlap the model repeated from the end of `text`."""
+    continuation = continuation.strip()
+    if continuation.startswith("```"):
+        continuation = continuation.split("\n", 1)[1] if "\n" in continuation else ""
+        continuation = continuation.rsplit("```", 1)[0]
+    for size in range(min(len(text), len(continuation), 200), 0, -1):
+        if text.endswith(continuation[:size]):
+            return text + continuation[size:]
+    return text + continuation
+
+
+def generate_structured(generate, prompt: str, schema: dict = None, max_followups: int = 1):
+    """
+    Generate and parse a JSON completion.
+
+    Args:
+        generate: callable(prompt, json_mode) -> completion text
+        prompt: The generation prompt
+        schema: JSON schema the result must satisfy
+        max_followups: Continuation or correction requests allowed before giving up
+
+    A truncated completion is continued rather than regenerated; if it is
+    still incomplete when the follow-ups run out, the salvaged prefix is
+    returned when it satisfies the schema.
+    """
+    steps = _structured_steps(prompt, schema, max_followups)
+    request = next(steps)
+    while True:
+        try:
+            request = steps.send(generate(*request))
+        except StopIteration as done:
+            return done.value
+
+
+async def agenerate_structured(generate, prompt: str, schema: dict = None, max_followups: int = 1):
+    """generate_structured() with a coroutine function as `generate`."""
+    steps = _structured_steps(prompt, schema, max_followups)
+    request = next(steps)
+    while True:
+        try:
+            request = steps.send(await generate(*request))
+        except StopIteration as done:
+            return done.value
+
+
+def _structured_steps(prompt: str, schema: dict, max_followups: int):
+    """
+    The request/repair loop shared by both drivers: yields (prompt, json_mode)
+    requests, is sent the completions and returns the parsed value.
+    """
+    text = yield prompt, True
+    for followup in range(max_followups + 1):
+        value, complete = parse_json(text)
+        errors = validate(value, schema) if value is not None else ["no JSON object found"]
+        if complete and not errors:
+            return value
+        if followup == max_followups:
+            break
+
+        if complete or value is None:
+            text = yield (
+                f"{prompt}\n\nYour previous answer was:\n{text}\n\n"
+                f"It does not match the required structure:\n- " + "\n- ".join(errors[:10]) +
+                "\n\nReturn the corrected JSON object only.",
+                True
+            )
+        else:
+            # JSON mode would insist on a whole object, so the tail is requested as plain text
+            continuation = yield (
+                f"{prompt}\n\nYour previous answer was cut off. This is what you wrote so far:\n{text}\n\n"
+                "Continue exactly where it stops. Output only the remaining characters of the JSON, "
+                "without repeating anything and without markdown.",
+                False
+            )
+            text = _join_continuation(text, continuation)
+
+    if value is not None and not complete and not errors:
+        print("Structured output: returning JSON salvaged from a truncated completion")
+        return value
+    raise StructuredOutputError(
+        "LLM output did not contain valid JSON" if value is None else "LLM output failed schema validation",
+        text, errors
+    )
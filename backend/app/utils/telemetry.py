@@ -0,0 +1,407 @@
+"""
+Request tracing, metrics and on-demand profiling.
+
+- span(service, operation) times an upstream call (YouTube, Groq, Gemini, ...)
+  and counts it as in flight until it returns (wait_for_upstreams)
+- SQLAlchemy engine events time every query; pool metrics are in
+  app/utils/database.py
+- Every request is timed per route; the response carries a Server-Timing
+  header with its database and upstream time
+- /metrics renders everything in the Prometheus text format, for the
+  METRICS_TOKEN bearer token or admins (app/api/metrics/routes.py)
+- Admins (ADMIN_USER_IDS) can add ?profile=1 to any request to get a
+  collapsed-stack sample profile (flamegraph.pl / speedscope input)
+  instead of the normal response
+
+Metrics live in process memory, so each worker process reports its own.
+"""
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from flask import Response, current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+# ============ METRICS ============
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _Metric:
+    """Base for labelled metrics; one time series per label-value tuple."""
+
+    kind = None
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _label_text(self, key: tuple, extra: dict = None) -> str:
+        pairs = list(zip(self.labelnames, key)) + list((extra or {}).items())
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        return lines + self._samples()
+
+    def _samples(self) -> list:
+        raise NotImplementedError
+
+
+class CounterMetric(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> list:
+        with self._lock:
+            return [f"{self.name}{self._label_text(key)} {value}" for key, value in sorted(self._values.items())]
+
+
+class GaugeMetric(_Metric):
+    """Gauge whose value is read from a callback at render time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = (), callback=None):
+        super().__init__(name, help_text, labelnames)
+        self._callback = callback
+
+    def _samples(self) -> list:
+        try:
+            values = self._callback() if self._callback else {}
+        except Exception as e:
+            print(f"Telemetry gauge {self.name} error: {e}")
+            return []
+        if not isinstance(values, dict):
+            values = {(): values}
+        return [f"{self.name}{self._label_text(key)} {value}" for key, value in sorted(values.items())]
+
+
+class HistogramMetric(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def _samples(self) -> list:
+        lines = []
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        for key, series in items:
+            for bound, count in zip(self.buckets, series):
+                lines.append(f"{self.name}_bucket{self._label_text(key, {'le': bound})} {count}")
+            lines.append(f"{self.name}_bucket{self._label_text(key, {'le': '+Inf'})} {series[-1]}")
+            lines.append(f"{self.name}_sum{self._label_text(key)} {round(series[-2], 6)}")
+            lines.append(f"{self.name}_count{self._label_text(key)} {series[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric: _Metric):
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_request_duration = HistogramMetric(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route", "status")
+)
+db_query_duration = HistogramMetric(
+    "db_query_duration_seconds", "SQL statement execution time", ("statement",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+)
+upstream_request_duration = HistogramMetric(
+    "upstream_request_duration_seconds", "Upstream API call latency", ("service", "operation", "outcome")
+)
+upstream_errors = CounterMetric(
+    "upstream_errors_total", "Failed upstream API calls", ("service", "operation", "error")
+)
+background_job_duration = HistogramMetric(
+    "background_job_duration_seconds", "Scheduler job run time", ("job", "outcome"),
+    buckets=(0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0)
+)
+
+
+# ============ SPANS ============
+
+# Upstream calls in progress per service, so shutdown can wait for them
+_in_flight = Counter()
+_in_flight_changed = threading.Condition()
+
+
+def _in_flight_by_service() -> dict:
+    with _in_flight_changed:
+        return {(service,): count for service, count in _in_flight.items()}
+
+
+upstream_in_flight = GaugeMetric(
+    "upstream_in_flight", "Upstream API calls in progress", ("service",), callback=_in_flight_by_service
+)
+
+
+def _request_stats() -> dict:
+    """Per-request accumulator on flask.g, or None outside a request."""
+    if not has_request_context():
+        return None
+    stats = g.get("_telemetry")
+    if stats is None:
+        stats = g._telemetry = {"db_time": 0.0, "db_queries": 0, "upstream_time": 0.0, "spans": []}
+    return stats
+
+
+@contextmanager
+def span(service: str, operation: str):
+    """
+    Time an upstream call. Records upstream_request_duration_seconds
+    (and upstream_errors_total on failure) and adds the call to the
+    current request's Server-Timing header. A session that has only read
+    gives its database connection back first.
+
+    Usage:
+        with span("groq", "chat.completions"):
+            response = self.client.chat.completions.create(...)
+    """
+    from app.utils.database import release_request_connection
+    release_request_connection()
+    start = time.perf_counter()
+    outcome = "ok"
+    with _in_flight_changed:
+        _in_flight[service] += 1
+    try:
+        yield
+    except Exception as e:
+        outcome = "error"
+        upstream_errors.inc(service=service, operation=operation, error=type(e).__name__)
+        raise
+    finally:
+        with _in_flight_changed:
+            _in_flight[service] -= 1
+            _in_flight_changed.notify_all()
+        elapsed = time.perf_counter() - start
+        upstream_request_duration.observe(elapsed, service=service, operation=operation, outcome=outcome)
+        stats = _request_stats()
+        if stats is not None:
+            stats["upstream_time"] += elapsed
+            stats["spans"].append((f"{service}.{operation}", elapsed))
+
+
+def wait_for_upstreams(timeout: float) -> int:
+    """
+    Block until no upstream call is in progress, for at most `timeout`
+    seconds. Used on shutdown so LLM calls finish (and get billed) instead
+    of being cut off. Returns the number of calls still in progress.
+    """
+    deadline = time.monotonic() + timeout
+    with _in_flight_changed:
+        while sum(_in_flight.values()) > 0:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            _in_flight_changed.wait(remaining)
+        return sum(_in_flight.values())
+
+
+@contextmanager
+def job_span(job: str):
+    """Time a scheduler job run into background_job_duration_seconds; its queries use the background pool."""
+    from app.utils.database import background_engine
+    start = time.perf_counter()
+    outcome = "ok"
+    try:
+        with background_engine():
+            yield
+    except Exception:
+        outcome = "error"
+        raise
+    finally:
+        background_job_duration.observe(time.perf_counter() - start, job=job, outcome=outcome)
+
+
+# ============ DATABASE ============
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("_telemetry_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("_telemetry_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    db_query_duration.observe(elapsed, statement=statement.lstrip().split(None, 1)[0].upper() if statement else "")
+    stats = _request_stats()
+    if stats is not None:
+        stats["db_time"] += elapsed
+        stats["db_queries"] += 1
+
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute
+    starts = context.connection.info.get("_telemetry_start") if context.connection is not None else None
+    if starts:
+        starts.pop()
+
+
+# ============ PROFILER ============
+
+class SamplingProfiler:
+    """
+    Samples one thread's stack at a fixed interval from a background thread
+    and aggregates the samples as collapsed stacks ("outer;inner;leaf count").
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self) -> str:
+        self._stop.set()
+        self._thread.join()
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common()) + "\n"
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+
+def _profiling_allowed() -> bool:
+    """?profile=1 is honoured only for authenticated users listed in ADMIN_USER_IDS."""
+    if request.args.get("profile") != "1":
+        return False
+    admins = current_app.config.get("ADMIN_USER_IDS") or set()
+    if not admins:
+        return False
+    from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+    try:
+        verify_jwt_in_request(optional=True)
+        return get_jwt_identity() in admins
+    except Exception:
+        return False
+
+
+# ============ FLASK INTEGRATION ============
+
+def _before_request():
+    g._telemetry_start = time.perf_counter()
+    if _profiling_allowed():
+        interval = request.args.get("profile_interval_ms", 5, type=float) / 1000
+        g._profiler = SamplingProfiler(threading.get_ident(), max(interval, 0.001))
+        g._profiler.start()
+
+
+def _after_request(response):
+    start = g.get("_telemetry_start")
+    if start is None:
+        return response
+    elapsed = time.perf_counter() - start
+
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    http_request_duration.observe(elapsed, method=request.method, route=route, status=response.status_code)
+
+    stats = _request_stats()
+    timings = [f"app;dur={elapsed * 1000:.1f}"]
+    if stats:
+        timings.append(f'db;dur={stats["db_time"] * 1000:.1f};desc="{stats["db_queries"]} queries"')
+        if stats["spans"]:
+            timings.append(f"upstream;dur={stats['upstream_time'] * 1000:.1f}")
+            for index, (name, duration) in enumerate(stats["spans"][:20]):
+                timings.append(f'u{index};dur={duration * 1000:.1f};desc="{name}"')
+    response.headers["Server-Timing"] = ", ".join(timings)
+
+    profiler = g.pop("_profiler", None)
+    if profiler is not None:
+        stacks = profiler.stop()
+        profile = Response(stacks, mimetype="text/plain")
+        profile.headers["X-Profile-Samples"] = str(sum(profiler.samples.values()))
+        profile.headers["X-Original-Status"] = str(response.status_code)
+        profile.headers["Server-Timing"] = response.headers["Server-Timing"]
+        return profile
+    return response
+
+
+def _teardown_request(exc):
+    # Stop a profiler whose request never produced a response
+    profiler = g.pop("_profiler", None)
+    if profiler is not None:
+        profiler.stop()
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    return registry.render()
+
+
+_engine_events_installed = False
+
+
+def init_telemetry(app):
+    """Install request hooks and SQLAlchemy query timing."""
+    global _engine_events_installed
+    if not _engine_events_installed:
+        # Listening on the Engine class covers every engine the app creates
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+        _engine_events_installed = True
+
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
@@ -0,0 +1,10 @@
+"""
+WSGI entry point for production:
+
+    gunicorn -c gunicorn.conf.py app.wsgi:application
+
+`python -m app.main` is the development server only.
+"""
+from app.main import create_app
+
+application = create_app()
@@ -0,0 +1,29 @@
+import os
+import sys
+
+# Add the current directory to sys.path so we can import 'app'
+sys.path.append(os.getcwd())
+
+# One-off script: no background jobs
+os.environ.setdefault("RUN_SCHEDULER", "false")
+
+print("Creating app...")
+from app.main import create_app
+from app.extensions import db
+from app.services.analytics_service import AnalyticsService
+
+# Optional: pass a user ID to rebuild a single user's rollups
+user_id = int(sys.argv[1]) if len(sys.argv) > 1 else None
+
+app = create_app()
+print("App created. Entering app context...")
+with app.app_context():
+    target = f"user {user_id}" if user_id is not None else "all users"
+    print(f"In app context. Rebuilding daily analytics rollups for {target}...")
+    try:
+        result = AnalyticsService().rebuild_daily_rollups(user_id)
+        print(f"Successfully rebuilt {result['rollup_rows']} rollup rows")
+    except Exception as e:
+        print(f'Error: {e}')
+        db.session.rollback()
+print("Done.")
@@ -0,0 +1,572 @@
+"""
+Deterministic stand-ins for the upstream APIs the backend calls.
+
+Each fake mimics the client surface the services use (googleapiclient
+resources, Groq chat completions, google-genai models, Twilio messages,
+SendGrid send, and for the Async* services AsyncGroq, genai's aio models
+and the REST endpoints behind the shared httpx client) and simulates latency, errors and payload size from an
+UpstreamProfile. Randomness comes from a seeded generator per fake, so
+two runs with the same profiles see the same latencies and failures.
+"""
+import asyncio
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+import weakref
+import zlib
+from contextlib import ExitStack, contextmanager
+from types import SimpleNamespace
+from unittest import mock
+from urllib.parse import parse_qsl
+import httpx
+
+
+class UpstreamProfile:
+    """
+    Simulated behaviour of one upstream API.
+
+    Args:
+        latency_ms: Median latency of a call
+        jitter_ms: Uniform +/- spread around latency_ms
+        error_rate: Probability (0-1) that a call fails
+        payload_size: Items per response (videos, hooks, embeddings dimensions scale with it)
+        seed: Seed for this upstream's random generator
+    """
+
+    def __init__(self, latency_ms: float = 0, jitter_ms: float = 0, error_rate: float = 0.0,
+                 payload_size: int = 10, seed: int = 42):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.payload_size = payload_size
+        self.seed = seed
+
+    def scaled(self, latency_scale: float) -> "UpstreamProfile":
+        """Copy of this profile with latency and jitter multiplied by latency_scale."""
+        return UpstreamProfile(self.latency_ms * latency_scale, self.jitter_ms * latency_scale,
+                               self.error_rate, self.payload_size, self.seed)
+
+    def to_dict(self) -> dict:
+        return {
+            "latency_ms": self.latency_ms,
+            "jitter_ms": self.jitter_ms,
+            "error_rate": self.error_rate,
+            "payload_size": self.payload_size,
+            "seed": self.seed
+        }
+
+
+# Typical production latencies, used when a profile isn't given
+DEFAULT_PROFILES = {
+    "youtube": UpstreamProfile(latency_ms=150, jitter_ms=50, payload_size=10, seed=1),
+    "groq": UpstreamProfile(latency_ms=450, jitter_ms=150, payload_size=5, seed=2),
+    "gemini": UpstreamProfile(latency_ms=900, jitter_ms=300, payload_size=5, seed=3),
+    "gemini_embed": UpstreamProfile(latency_ms=250, jitter_ms=80, payload_size=768, seed=4),
+    "twilio": UpstreamProfile(latency_ms=300, jitter_ms=100, seed=5),
+    "sendgrid": UpstreamProfile(latency_ms=200, jitter_ms=60, seed=6),
+}
+
+
+class FakeUpstreamError(Exception):
+    """Raised by a fake when it simulates a failed call."""
+
+    def __init__(self, service: str, status_code: int):
+        super().__init__(f"{service} returned HTTP {status_code} (simulated)")
+        self.service = service
+        self.status_code = status_code
+
+
+class _FakeUpstream:
+    """Shared latency/error simulation and call accounting."""
+
+    name = "upstream"
+    ERROR_STATUSES = (429, 500, 503)
+
+    def __init__(self, profile: UpstreamProfile):
+        self.profile = profile
+        self.calls = 0
+        self.errors = 0
+        self._rng = random.Random(profile.seed)
+        self._lock = threading.Lock()
+
+    def _call(self):
+        """Sleep for the simulated latency and raise if this call is chosen to fail."""
+        delay, status = self._draw()
+        if delay:
+            time.sleep(delay)
+        if status:
+            raise FakeUpstreamError(self.name, status)
+
+    async def _acall(self):
+        """_call() for the async clients: the latency is an asyncio sleep."""
+        delay, status = self._draw()
+        if delay:
+            await asyncio.sleep(delay)
+        if status:
+            raise FakeUpstreamError(self.name, status)
+
+    def _draw(self) -> tuple:
+        """(latency in seconds, error status or None) for the next call."""
+        with self._lock:
+            self.calls += 1
+            jitter = self._rng.uniform(-self.profile.jitter_ms, self.profile.jitter_ms)
+            failed = self._rng.random() < self.profile.error_rate
+            status = self._rng.choice(self.ERROR_STATUSES)
+            if failed:
+                self.errors += 1
+        return max(0.0, self.profile.latency_ms + jitter) / 1000, status if failed else None
+
+    def stats(self) -> dict:
+        return {"calls": self.calls, "errors": self.errors}
+
+
+def _stable_seed(*parts) -> int:
+    """Seed derived from the call's inputs, stable across processes (unlike hash())."""
+    return zlib.crc32("|".join(str(p) for p in parts).encode())
+
+
+def _fake_json(prompt: str, rng: random.Random, payload_size: int) -> str:
+    """
+    A response shaped like the JSON template in a generator prompt
+    ("Return a JSON object with this structure: {...}"), with object lists
+    repeated payload_size times; None if the prompt has no template.
+    """
+    from app.utils.structured_output import parse_json
+
+    sections = re.split(r'=== Task "(\w+)" ===', prompt)
+    if len(sections) > 1:
+        # A batched prompt: answer every task under its id
+        answers = {
+            task_id: json.loads(_fake_json(section, rng, payload_size) or "{}")
+            for task_id, section in zip(sections[1::2], sections[2::2])
+        }
+        return json.dumps(answers)
+
+    marker = prompt.find("Return a JSON")
+    template, _ = parse_json(prompt[marker:] if marker >= 0 else "")
+    if template is None:
+        return None
+
+    def fill(value):
+        if isinstance(value, dict):
+            return {key: fill(item) for key, item in value.items()}
+        if isinstance(value, list):
+            if value and isinstance(value[0], dict):
+                return [fill(value[0]) for _ in range(payload_size)]
+            return [fill(item) for item in value]
+        if isinstance(value, bool) or value is None:
+            return value
+        if isinstance(value, (int, float)):
+            return rng.randint(1, 100)
+        return f"{value} ({rng.randint(1, 999)})"
+
+    return json.dumps(fill(template))
+
+
+# ============ YOUTUBE DATA API ============
+
+class _FakeRequest:
+    def __init__(self, upstream: _FakeUpstream, build_response):
+        self._upstream = upstream
+        self._build_response = build_response
+
+    def execute(self):
+        self._upstream._call()
+        return self._build_response()
+
+
+class _FakeCollection:
+    def __init__(self, upstream: "FakeYouTube", handler):
+        self._upstream = upstream
+        self._handler = handler
+
+    def list(self, **params):
+        return _FakeRequest(self._upstream, lambda: self._handler(**params))
+
+
+class FakeYouTube(_FakeUpstream):
+    """Stand-in for googleapiclient's youtube v3 resource (search, videos, channels, playlistItems)."""
+
+    name = "youtube"
+
+    def search(self):
+        return _FakeCollection(self, self._search)
+
+    def videos(self):
+        return _FakeCollection(self, self._videos)
+
+    def channels(self):
+        return _FakeCollection(self, self._channels)
+
+    def playlistItems(self):
+        return _FakeCollection(self, self._playlist_items)
+
+    async def rest(self, resource: str, params: dict) -> dict:
+        """The Data API REST endpoint behind AsyncYouTubeService.youtube_api_get."""
+        handlers = {
+            "search": self._search,
+            "videos": self._videos,
+            "channels": self._channels,
+            "playlistItems": self._playlist_items
+        }
+        await self._acall()
+        params = {key: int(value) if key == "maxResults" else value for key, value in params.items()}
+        return handlers[resource](**params)
+
+    def _snippet(self, video_id: str, rng: random.Random) -> dict:
+        return {
+            "title": f"Video {video_id} about trending topics",
+            "description": "Lorem ipsum dolor sit amet. " * rng.randint(2, 8),
+            "publishedAt": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T12:00:00Z",
+            "thumbnails": {"high": {"url": f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"}}
+        }
+
+    def _search(self, q: str = "", maxResults: int = 10, **_):
+        rng = random.Random(_stable_seed("search", q))
+        count = min(maxResults, self.profile.payload_size)
+        items = []
+        for i in range(count):
+            video_id = f"{_stable_seed(q, i):08x}"
+            items.append({"id": {"videoId": video_id}, "snippet": self._snippet(video_id, rng)})
+        return {"items": items}
+
+    def _videos(self, id: str = "", **_):
+        items = []
+        for video_id in filter(None, id.split(",")):
+            rng = random.Random(_stable_seed("video", video_id))
+            views = rng.randint(1_000, 5_000_000)
+            items.append({
+                "id": video_id,
+                "statistics": {
+                    "viewCount": str(views),
+                    "likeCount": str(int(views * rng.uniform(0.01, 0.08))),
+                    "commentCount": str(int(views * rng.uniform(0.001, 0.01)))
+                },
+                "contentDetails": {"duration": f"PT{rng.randint(1, 20)}M{rng.randint(0, 59)}S"}
+            })
+        return {"items": items}
+
+    def _channels(self, id: str = None, forHandle: str = None, **_):
+        channel_id = id or f"UC{_stable_seed('handle', forHandle):08x}"
+        rng = random.Random(_stable_seed("channel", channel_id))
+        return {"items": [{
+            "id": channel_id,
+            "snippet": {
+                "title": f"Channel {channel_id}",
+                "description": "A fake channel",
+                "thumbnails": {"high": {"url": f"https://yt3.ggpht.com/{channel_id}"}}
+            },
+            "statistics": {
+                "subscriberCount": str(rng.randint(1_000, 10_000_000)),
+                "videoCount": str(rng.randint(10, 2_000)),
+                "viewCount": str(rng.randint(100_000, 1_000_000_000))
+            },
+            "contentDetails": {"relatedPlaylists": {"uploads": f"UU{channel_id[2:]}"}}
+        }]}
+
+    def _playlist_items(self, playlistId: str = "", maxResults: int = 20, **_):
+        rng = random.Random(_stable_seed("playlist", playlistId))
+        items = []
+        for i in range(min(maxResults, self.profile.payload_size)):
+            video_id = f"{_stable_seed(playlistId, i):08x}"
+            items.append({"contentDetails": {"videoId": video_id}, "snippet": self._snippet(video_id, rng)})
+        return {"items": items}
+
+
+# ============ GROQ ============
+
+class FakeGroq(_FakeUpstream):
+    """Stand-in for groq.Groq: client.chat.completions.create(...)."""
+
+    name = "groq"
+    TOKENS_PER_MINUTE = 10_000_000
+
+    def __init__(self, profile: UpstreamProfile):
+        super().__init__(profile)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(
+            create=self._create,
+            with_raw_response=SimpleNamespace(create=self._create_raw)
+        ))
+
+    def _create_raw(self, **kwargs):
+        completion = self._create(**kwargs)
+        return SimpleNamespace(headers=self._headers(completion), parse=lambda: completion)
+
+    def _headers(self, completion) -> dict:
+        return {
+            "x-ratelimit-limit-tokens": str(self.TOKENS_PER_MINUTE),
+            "x-ratelimit-remaining-tokens": str(self.TOKENS_PER_MINUTE - completion.usage.total_tokens),
+            "x-ratelimit-reset-tokens": "1s"
+        }
+
+    def _create(self, model: str = None, messages: list = None, max_tokens: int = 1024,
+                response_format: dict = None, **_):
+        self._call()
+        return self._completion(model, messages, max_tokens, response_format)
+
+    def _completion(self, model: str, messages: list, max_tokens: int, response_format: dict):
+        prompt = messages[-1]["content"] if messages else ""
+        rng = random.Random(_stable_seed("groq", prompt))
+
+        if response_format:
+            content = _fake_json(prompt, rng, self.profile.payload_size)
+            if content is None:
+                items = [
+                    {"text": f"Generated item {i + 1}", "type": "statement", "score": rng.randint(1, 100)}
+                    for i in range(self.profile.payload_size)
+                ]
+                content = json.dumps({
+                    "title": "Generated title",
+                    "items": items,
+                    "hooks": items,
+                    "summary": "Generated summary " * 5
+                })
+        else:
+            content = "Generated text. " * self.profile.payload_size
+
+        completion_tokens = min(max_tokens or 1024, len(content) // 4)
+        return SimpleNamespace(
+            model=model,
+            choices=[SimpleNamespace(
+                message=SimpleNamespace(role="assistant", content=content),
+                finish_reason="stop"
+            )],
+            usage=SimpleNamespace(
+                prompt_tokens=len(prompt) // 4,
+                completion_tokens=completion_tokens,
+                total_tokens=len(prompt) // 4 + completion_tokens
+            )
+        )
+
+
+class FakeAsyncGroq:
+    """Stand-in for groq.AsyncGroq, sharing a FakeGroq's profile and call counts."""
+
+    def __init__(self, groq: FakeGroq):
+        self._groq = groq
+        self.chat = SimpleNamespace(completions=SimpleNamespace(
+            create=self._create,
+            with_raw_response=SimpleNamespace(create=self._create_raw)
+        ))
+
+    async def _create(self, model: str = None, messages: list = None, max_tokens: int = 1024,
+                      response_format: dict = None, **_):
+        await self._groq._acall()
+        return self._groq._completion(model, messages, max_tokens, response_format)
+
+    async def _create_raw(self, **kwargs):
+        completion = await self._create(**kwargs)
+
+        async def parse():
+            return completion
+
+        return SimpleNamespace(headers=self._groq._headers(completion), parse=parse)
+
+
+# ============ GEMINI ============
+
+class FakeGeminiModels:
+    """Stand-in for google-genai's client.models (generate_content and embed_content)."""
+
+    def __init__(self, generate: _FakeUpstream, embed: _FakeUpstream):
+        self._generate = generate
+        self._embed = embed
+
+    def generate_content(self, model: str = None, contents=None, config: dict = None, **_):
+        self._generate._call()
+        return self._content(contents, config)
+
+    def _content(self, contents, config: dict):
+        if config and config.get("response_mime_type") == "application/json":
+            rng = random.Random(_stable_seed("gemini", contents))
+            text = _fake_json(contents, rng, self._generate.profile.payload_size)
+            if text is not None:
+                return SimpleNamespace(text=text)
+            positive = rng.randint(20, 70)
+            negative = rng.randint(0, 100 - positive)
+            text = json.dumps({"positive": positive, "negative": negative, "neutral": 100 - positive - negative})
+        else:
+            text = "Generated analysis sentence. " * self._generate.profile.payload_size
+        return SimpleNamespace(text=text)
+
+    def embed_content(self, model: str = None, contents=None, **_):
+        self._embed._call()
+        return self._embeddings(contents)
+
+    def _embeddings(self, contents):
+        texts = contents if isinstance(contents, list) else [contents]
+        dimensions = self._embed.profile.payload_size
+        embeddings = []
+        for text in texts:
+            rng = random.Random(_stable_seed("embed", text))
+            embeddings.append(SimpleNamespace(values=[rng.uniform(-1, 1) for _ in range(dimensions)]))
+        return SimpleNamespace(embeddings=embeddings)
+
+
+class FakeAsyncGeminiModels(FakeGeminiModels):
+    """Stand-in for google-genai's client.aio.models."""
+
+    async def generate_content(self, model: str = None, contents=None, config: dict = None, **_):
+        await self._generate._acall()
+        return self._content(contents, config)
+
+    async def embed_content(self, model: str = None, contents=None, **_):
+        await self._embed._acall()
+        return self._embeddings(contents)
+
+
+class FakeGemini:
+    """Stand-in for google.genai.Client; generate and embed calls have separate profiles."""
+
+    def __init__(self, generate: _FakeUpstream, embed: _FakeUpstream):
+        self.models = FakeGeminiModels(generate, embed)
+        self.aio = SimpleNamespace(models=FakeAsyncGeminiModels(generate, embed))
+
+
+class _GeminiUpstream(_FakeUpstream):
+    name = "gemini"
+
+
+class _GeminiEmbedUpstream(_FakeUpstream):
+    name = "gemini_embed"
+
+
+# ============ TWILIO / SENDGRID ============
+
+class FakeTwilio(_FakeUpstream):
+    """Stand-in for twilio.rest.Client: client.messages.create(...)."""
+
+    name = "twilio"
+
+    def __init__(self, profile: UpstreamProfile):
+        super().__init__(profile)
+        self.messages = SimpleNamespace(create=self._create)
+
+    def _create(self, body: str = "", from_: str = None, to: str = None, **_):
+        self._call()
+        return SimpleNamespace(sid=f"SM{_stable_seed(to, body, self.calls):08x}", status="queued")
+
+
+class FakeSendGrid(_FakeUpstream):
+    """Stand-in for SendGridAPIClient: client.send(message)."""
+
+    name = "sendgrid"
+
+    def send(self, message):
+        self._call()
+        return SimpleNamespace(status_code=202, body="", headers={})
+
+
+# ============ INSTALLATION ============
+
+class FakeUpstreams:
+    """
+    One fake per upstream API, configured from profiles (missing entries use DEFAULT_PROFILES).
+
+    Usage:
+        fakes = FakeUpstreams(latency_scale=0.1)
+        with fakes.installed():
+            TrendAgent().run("ai tools", user_id=0)
+        print(fakes.stats())
+    """
+
+    def __init__(self, profiles: dict = None, latency_scale: float = 1.0, error_rate: float = None):
+        profiles = {**DEFAULT_PROFILES, **(profiles or {})}
+        profiles = {name: p.scaled(latency_scale) for name, p in profiles.items()}
+        if error_rate is not None:
+            for profile in profiles.values():
+                profile.error_rate = error_rate
+        self.profiles = profiles
+
+        self.youtube = FakeYouTube(profiles["youtube"])
+        self.groq = FakeGroq(profiles["groq"])
+        self.gemini_generate = _GeminiUpstream(profiles["gemini"])
+        self.gemini_embed = _GeminiEmbedUpstream(profiles["gemini_embed"])
+        self.twilio = FakeTwilio(profiles["twilio"])
+        self.sendgrid = FakeSendGrid(profiles["sendgrid"])
+
+    @contextmanager
+    def installed(self):
+        """Patch the client constructors used by app.services to return these fakes."""
+        gemini_module = SimpleNamespace(Client=lambda *args, **kwargs: FakeGemini(self.gemini_generate, self.gemini_embed))
+        patches = [
+            mock.patch("app.services.youtube_service.build", lambda *args, **kwargs: self.youtube),
+            mock.patch("app.services.competitor_service.build", lambda *args, **kwargs: self.youtube),
+            mock.patch("app.services.groq_llm_service.Groq", lambda *args, **kwargs: self.groq),
+            mock.patch("app.services.groq_llm_service.AsyncGroq", lambda *args, **kwargs: FakeAsyncGroq(self.groq)),
+            mock.patch("app.services.llm_service.genai", gemini_module),
+            mock.patch("app.services.embedding_service.genai", gemini_module),
+            mock.patch("app.services.notification_service.TwilioClient", lambda *args, **kwargs: self.twilio),
+            mock.patch("app.services.notification_service.SendGridAPIClient", lambda *args, **kwargs: self.sendgrid),
+            # Services only build clients when credentials are configured
+            mock.patch.dict("os.environ", {
+                "YOUTUBE_API_KEY": "fake-youtube-key",
+                "GROQ_API_KEY": "fake-groq-key",
+                "GEMINI_API_KEY": "fake-gemini-key",
+                "TWILIO_ACCOUNT_SID": "ACfake",
+                "TWILIO_AUTH_TOKEN": "fake-token",
+                "TWILIO_PHONE_NUMBER": "+15550000000",
+                "SENDGRID_API_KEY": "fake-sendgrid-key",
+                "FROM_EMAIL": "alerts@example.com"
+            })
+        ]
+        # Async services: a fresh shared httpx client per loop, answered by the fakes
+        from app.utils import aio
+        transport = httpx.MockTransport(self._handle_http)
+        async_client = httpx.AsyncClient
+        patches += [
+            mock.patch.object(aio, "_clients", weakref.WeakKeyDictionary()),
+            mock.patch.object(httpx, "AsyncClient", lambda **kwargs: async_client(**{"transport": transport, **kwargs}))
+        ]
+        # The fakes have no quota: lift the budgets and rate limits but keep the accounting
+        from app.services import budget_service, groq_llm_service
+        from app.utils.rate_limiter import SharedRateLimiter
+        unlimited = 10 ** 12
+        fake_limiter = SharedRateLimiter(
+            "groq_fake", rpm=unlimited, tpm=FakeGroq.TOKENS_PER_MINUTE,
+            state_path=os.path.join(tempfile.gettempdir(), "insight_sphere_groq_ratelimit_fake.json")
+        )
+        patches += [
+            mock.patch.object(budget_service.budget_manager, "budgets",
+                              {service: (unlimited, unlimited) for service in budget_service.DEFAULT_BUDGETS}),
+            # Its own window, so the fakes don't share (or pollute) the real client's
+            mock.patch.object(groq_llm_service, "groq_rate_limiter", lambda model: fake_limiter)
+        ]
+        with ExitStack() as stack:
+            for patch in patches:
+                stack.enter_context(patch)
+            yield self
+
+    async def _handle_http(self, request: httpx.Request) -> httpx.Response:
+        """Transport for the shared httpx client: YouTube REST, Twilio and SendGrid."""
+        host, path = request.url.host, request.url.path
+        try:
+            if host == "www.googleapis.com" and path.startswith("/youtube/v3/"):
+                params = {key: value for key, value in request.url.params.items() if key != "key"}
+                return httpx.Response(200, json=await self.youtube.rest(path.rsplit("/", 1)[-1], params))
+            if host == "api.twilio.com":
+                form = dict(parse_qsl(request.content.decode()))
+                await self.twilio._acall()
+                return httpx.Response(201, json={"sid": f"SM{_stable_seed(form.get('To'), form.get('Body'), self.twilio.calls):08x}",
+                                                 "status": "queued"})
+            if host == "api.sendgrid.com":
+                await self.sendgrid._acall()
+                return httpx.Response(202)
+        except FakeUpstreamError as e:
+            return httpx.Response(e.status_code, json={"error": str(e)})
+        return httpx.Response(404, json={"error": f"no fake for {host}{path}"})
+
+    def stats(self) -> dict:
+        """Calls and simulated errors per upstream."""
+        return {
+            "youtube": self.youtube.stats(),
+            "groq": self.groq.stats(),
+            "gemini": self.gemini_generate.stats(),
+            "gemini_embed": self.gemini_embed.stats(),
+            "twilio": self.twilio.stats(),
+            "sendgrid": self.sendgrid.stats()
+        }
@@ -0,0 +1,244 @@
+"""
+Offline latency/throughput benchmarks for the backend's upstream-bound hot paths:
+
+    trend_agent_run            TrendAgent.run (YouTube search + stats, Gemini summary + embeddings, clustering)
+    generate_complete_content  GroqLLMService.generate_complete_content (five Groq generations)
+    check_all_alerts           Scheduler alert check (TrendAgent per topic + Twilio/SendGrid notifications)
+    sync_competitor_videos     CompetitorService.sync_competitor_videos (YouTube channel/playlist/videos + DB upserts)
+
+All upstream APIs are replaced by the deterministic fakes in benchmarks.fakes,
+so runs need no API keys or quota. Run from the backend directory:
+
+    python -m benchmarks.hot_paths --iterations 20 --latency-scale 1.0
+    python -m benchmarks.hot_paths --save-baseline benchmarks/baselines/hot_paths.json
+    python -m benchmarks.hot_paths --compare benchmarks/baselines/hot_paths.json
+
+Exits with status 1 when --compare finds a regression beyond --tolerance.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+# Add the backend directory to sys.path so we can import 'app'
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fakes import FakeUpstreams, UpstreamProfile
+from benchmarks import stats
+
+TOPICS = ["ai tools", "home workouts", "budget travel", "retro gaming", "plant care",
+          "personal finance", "street food", "productivity apps", "indie music", "electric cars"]
+
+
+class HotPath:
+    """
+    One benchmarked code path.
+
+    Args:
+        name: Benchmark name used in reports and baselines
+        run: Callable(app, iteration) -> bool (False counts as an error); timed
+        prepare: Optional callable(app, iteration) run before each call; not timed
+    """
+
+    def __init__(self, name: str, run, prepare=None):
+        self.name = name
+        self.run = run
+        self.prepare = prepare
+
+
+# ============ SEED DATA ============
+
+def seed(app, alert_topics: int, alert_users_per_topic: int):
+    """Create the users, alert rules and competitor the hot paths read."""
+    from app.extensions import db
+    from app.models.sql.user import User
+    from app.models.sql.alert_rule import AlertRule
+    from app.models.sql.competitor import Competitor
+
+    with app.app_context():
+        user_id = 0
+        for topic in TOPICS[:alert_topics]:
+            for _ in range(alert_users_per_topic):
+                user_id += 1
+                db.session.add(User(id=user_id, email=f"bench{user_id}@example.com", phone_number="+15550001111"))
+                rule = AlertRule(user_id=user_id, topic=topic, threshold_score=0)
+                rule.set_channels(["sms", "email"])
+                db.session.add(rule)
+
+        db.session.add(Competitor(
+            id=1, user_id=1, channel_id="UCbenchmarkchannel", channel_name="Benchmark Channel",
+            channel_url="https://www.youtube.com/channel/UCbenchmarkchannel"
+        ))
+        db.session.commit()
+
+
+# ============ HOT PATHS ============
+
+def _trend_agent_run(app, iteration: int) -> bool:
+    from app.agents.trend_agents import TrendAgent
+    with app.app_context():
+        result = TrendAgent().run(TOPICS[iteration % len(TOPICS)], user_id=1)
+        return bool(result.get("video_count"))
+
+
+def _generate_complete_content(app, iteration: int) -> bool:
+    from app.services.groq_llm_service import GroqLLMService
+    result = GroqLLMService().generate_complete_content(TOPICS[iteration % len(TOPICS)], platform="youtube")
+    return bool(result.get("success"))
+
+
+def _reset_alert_throttle(app, iteration: int):
+    """Clear last_triggered_at so every alert fires (and notifies) on every iteration."""
+    from app.extensions import db
+    from app.models.sql.alert_rule import AlertRule
+    with app.app_context():
+        AlertRule.query.update({"last_triggered_at": None})
+        db.session.commit()
+
+
+def _check_all_alerts(app, iteration: int) -> bool:
+    from app.utils.scheduler import check_all_alerts
+    check_all_alerts(app)
+    return True
+
+
+def _sync_competitor_videos(app, iteration: int) -> bool:
+    from app.services.competitor_service import CompetitorService
+    with app.app_context():
+        result = CompetitorService().sync_competitor_videos(1)
+        return bool(result.get("success"))
+
+
+HOT_PATHS = [
+    HotPath("trend_agent_run", _trend_agent_run),
+    HotPath("generate_complete_content", _generate_complete_content),
+    HotPath("check_all_alerts", _check_all_alerts, prepare=_reset_alert_throttle),
+    HotPath("sync_competitor_videos", _sync_competitor_videos),
+]
+
+
+# ============ RUNNER ============
+
+def run_hot_path(app, hot_path: HotPath, iterations: int, warmup: int, concurrency: int) -> dict:
+    """Run a hot path `iterations` times (after `warmup` untimed calls) and summarize it."""
+    def call(iteration: int):
+        if hot_path.prepare:
+            hot_path.prepare(app, iteration)
+        start = time.perf_counter()
+        try:
+            ok = hot_path.run(app, iteration)
+        except Exception as e:
+            print(f"{hot_path.name} iteration {iteration} failed: {e}")
+            ok = False
+        return time.perf_counter() - start, ok
+
+    for iteration in range(warmup):
+        call(iteration)
+
+    start = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            outcomes = list(pool.map(call, range(iterations)))
+    else:
+        outcomes = [call(iteration) for iteration in range(iterations)]
+    wall_time = time.perf_counter() - start
+
+    return stats.summarize(
+        [duration for duration, _ in outcomes],
+        wall_time,
+        errors=sum(1 for _, ok in outcomes if not ok)
+    )
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+def _load_profiles(path: str) -> dict:
+    """Load {"groq": {"latency_ms": 300, ...}, ...} into UpstreamProfiles."""
+    if not path:
+        return {}
+    with open(path) as f:
+        return {name: UpstreamProfile(**values) for name, values in json.load(f).items()}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmarks for upstream-bound hot paths.")
+    parser.add_argument("--only", nargs="+", choices=[h.name for h in HOT_PATHS], help="Benchmarks to run (default: all)")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=1, help="Concurrent callers per benchmark")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Multiply all simulated latencies (0 = CPU only)")
+    parser.add_argument("--error-rate", type=float, default=None, help="Override every upstream's error rate")
+    parser.add_argument("--profiles", help="JSON file of per-upstream UpstreamProfile overrides")
+    parser.add_argument("--alert-topics", type=int, default=5)
+    parser.add_argument("--alert-users-per-topic", type=int, default=2)
+    parser.add_argument("--database-url", help="Database to seed and use (default: temporary SQLite file)")
+    parser.add_argument("--save-baseline", metavar="PATH", help="Write results to PATH as the new baseline")
+    parser.add_argument("--compare", metavar="PATH", help="Compare results against the baseline at PATH")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative p95/throughput change")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    # The config reads DATABASE_URL at import time
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        database_dir = tempfile.mkdtemp(prefix="bench-")
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(database_dir, 'bench.db')}"
+
+    fakes = FakeUpstreams(_load_profiles(args.profiles), latency_scale=args.latency_scale, error_rate=args.error_rate)
+    with fakes.installed():
+        from app.main import create_app
+        app = create_app()
+        seed(app, args.alert_topics, args.alert_users_per_topic)
+
+        selected = [h for h in HOT_PATHS if not args.only or h.name in args.only]
+        results = {}
+        for hot_path in selected:
+            print(f"Running {hot_path.name} ({args.iterations} iterations, concurrency {args.concurrency})...")
+            results[hot_path.name] = run_hot_path(app, hot_path, args.iterations, args.warmup, args.concurrency)
+
+    print()
+    print(stats.format_table(results))
+    print()
+    print("Upstream calls:", json.dumps(fakes.stats()))
+
+    if args.save_baseline:
+        stats.save_baseline(args.save_baseline, results, {
+            "commit": _git_commit(),
+            "created_at": datetime.utcnow().isoformat(),
+            "iterations": args.iterations,
+            "concurrency": args.concurrency,
+            "latency_scale": args.latency_scale,
+            "profiles": {name: p.to_dict() for name, p in fakes.profiles.items()}
+        })
+        print(f"Saved baseline to {args.save_baseline}")
+
+    if args.compare:
+        baseline = stats.load_baseline(args.compare)
+        if not baseline:
+            print(f"No baseline found at {args.compare}")
+            return 0
+        rows = stats.compare(results, baseline, args.tolerance)
+        print()
+        print(stats.format_comparison(rows))
+        if any(r["regressed"] for r in rows):
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,265 @@
+"""
+HTTP load test for the read-heavy API endpoints.
+
+    python -m benchmarks.load_test seed --scale 0.01
+    python -m benchmarks.load_test run --concurrency 1 4 16 64 --duration 30
+    python -m benchmarks.load_test run --concurrency 16 --save-baseline benchmarks/baselines/load.json
+    python -m benchmarks.load_test run --concurrency 16 --compare benchmarks/baselines/load.json
+
+`seed` fills the database (DATABASE_URL or --database-url) with synthetic
+users, analyses, content, performance rows, competitors and creator profiles.
+`run` mints JWTs with create_jwt for seeded users and drives a weighted mix
+of GET requests from concurrent virtual users, either against --base-url
+(e.g. one gunicorn worker) or against an in-process server on the same
+database. Running several --concurrency levels reports the highest level
+that stays within --slo-p95-ms and --max-error-rate.
+
+In-process runs install the fake upstreams from benchmarks.fakes, so
+endpoints that call an LLM (the weekly report) never reach a real API.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+# Add the backend directory to sys.path so we can import 'app'
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import stats
+
+DEFAULT_DATABASE_URL = f"sqlite:///{os.path.join(tempfile.gettempdir(), 'insight_sphere_loadtest.db')}"
+
+# (name, path, weight) for the mixed read workload
+ENDPOINTS = [
+    ("dashboard_stats", "/dashboard/stats", 20),
+    ("dashboard_recent_activities", "/dashboard/recent-activities?limit=10", 15),
+    ("collaboration_matches", "/collaboration/matches?limit=20", 15),
+    ("content_history", "/content/history?limit=20", 15),
+    ("analytics_roi", "/analytics/roi?days=30", 10),
+    ("analytics_history", "/analytics/history?limit=20", 10),
+    ("analytics_revenue", "/analytics/revenue?days=30", 5),
+    ("analytics_weekly_report", "/analytics/report/weekly", 5),
+    ("analytics_ab_tests", "/analytics/ab-test/list", 5),
+]
+
+
+# ============ SEED ============
+
+def seed(args) -> int:
+    from benchmarks.synthetic_data import SyntheticDataSeeder, DEFAULT_VOLUMES, scale
+    from app.main import create_app
+
+    volumes = scale(DEFAULT_VOLUMES, args.scale)
+    for override in args.volume or []:
+        table, _, count = override.partition("=")
+        volumes[table] = int(count)
+
+    app = create_app()
+    with app.app_context():
+        print(f"Seeding {os.environ['DATABASE_URL']} ...")
+        SyntheticDataSeeder(volumes, seed=args.seed).seed()
+    return 0
+
+
+# ============ RUN ============
+
+class VirtualUser(threading.Thread):
+    """Sends requests from a weighted endpoint mix until the deadline, recording (endpoint, seconds, ok)."""
+
+    def __init__(self, base_url: str, tokens: list, deadline: float, think_time: float, seed: int):
+        super().__init__(daemon=True)
+        self.base_url = base_url
+        self.tokens = tokens
+        self.deadline = deadline
+        self.think_time = think_time
+        self.rng = random.Random(seed)
+        self.samples = []
+
+    def run(self):
+        import httpx
+        names = [e[0] for e in ENDPOINTS]
+        paths = {e[0]: e[1] for e in ENDPOINTS}
+        weights = [e[2] for e in ENDPOINTS]
+
+        with httpx.Client(base_url=self.base_url, timeout=30.0) as client:
+            while time.perf_counter() < self.deadline:
+                name = self.rng.choices(names, weights)[0]
+                headers = {"Authorization": f"Bearer {self.rng.choice(self.tokens)}"}
+                start = time.perf_counter()
+                try:
+                    ok = client.get(paths[name], headers=headers).status_code < 400
+                except httpx.HTTPError:
+                    ok = False
+                self.samples.append((name, time.perf_counter() - start, ok))
+                if self.think_time:
+                    time.sleep(self.think_time)
+
+
+def _summarize_samples(samples: list, wall_time: float) -> dict:
+    """Per-endpoint and total summaries for (endpoint, seconds, ok) samples."""
+    results = {}
+    for name, _, _ in ENDPOINTS:
+        endpoint_samples = [s for s in samples if s[0] == name]
+        if endpoint_samples:
+            results[name] = stats.summarize(
+                [s[1] for s in endpoint_samples], wall_time, errors=sum(1 for s in endpoint_samples if not s[2])
+            )
+    results["total"] = stats.summarize([s[1] for s in samples], wall_time, errors=sum(1 for s in samples if not s[2]))
+    return results
+
+
+def run_level(base_url: str, tokens: list, concurrency: int, duration: float, think_time: float) -> dict:
+    """Drive traffic from `concurrency` virtual users for `duration` seconds."""
+    start = time.perf_counter()
+    users = [
+        VirtualUser(base_url, tokens, start + duration, think_time, seed=index)
+        for index in range(concurrency)
+    ]
+    for user in users:
+        user.start()
+    for user in users:
+        user.join()
+    wall_time = time.perf_counter() - start
+    return _summarize_samples([s for user in users for s in user.samples], wall_time)
+
+
+def mint_tokens(app, count: int, seed: int) -> list:
+    """JWTs for a random sample of users who have a creator profile (so every endpoint has data)."""
+    from app.models.sql.creator_profile import CreatorProfile
+    from app.utils.security import create_jwt
+
+    with app.app_context():
+        user_ids = [row[0] for row in CreatorProfile.query.with_entities(CreatorProfile.user_id).all()]
+        if not user_ids:
+            raise SystemExit("No seeded users found; run `python -m benchmarks.load_test seed` first.")
+        sample = random.Random(seed).sample(user_ids, min(count, len(user_ids)))
+        return [create_jwt(user_id) for user_id in sample]
+
+
+def _start_server(app, port: int):
+    import logging
+    from werkzeug.serving import make_server
+    # Per-request access logs would dominate the output and skew timings
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    server = make_server("127.0.0.1", port, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(args) -> int:
+    from contextlib import nullcontext
+    from app.main import create_app
+    from benchmarks.fakes import FakeUpstreams
+
+    fakes = FakeUpstreams(latency_scale=args.latency_scale) if not args.base_url else None
+    with fakes.installed() if fakes else nullcontext():
+        app = create_app()
+        tokens = mint_tokens(app, args.tokens, args.seed)
+
+        server = None
+        base_url = args.base_url
+        if not base_url:
+            server = _start_server(app, args.port)
+            base_url = f"http://127.0.0.1:{args.port}"
+
+        print(f"Target {base_url}, {len(tokens)} users, {args.duration:.0f}s per level")
+        if args.warmup:
+            run_level(base_url, tokens, min(args.concurrency), args.warmup, 0)
+
+        levels = {}
+        for concurrency in args.concurrency:
+            print(f"Running {concurrency} concurrent users...")
+            levels[concurrency] = run_level(base_url, tokens, concurrency, args.duration, args.think_ms / 1000)
+
+        if server:
+            server.shutdown()
+
+    single_level = len(levels) == 1
+    results = {}
+    for concurrency, level_results in levels.items():
+        print()
+        print(f"== {concurrency} concurrent users ==")
+        print(stats.format_table(level_results))
+        for name, summary in level_results.items():
+            results[name if single_level else f"c{concurrency}/{name}"] = summary
+
+    sustained = None
+    for concurrency, level_results in levels.items():
+        total = level_results["total"]
+        error_rate = total["errors"] / total["count"] if total["count"] else 1.0
+        if total["count"] and total["p95_ms"] <= args.slo_p95_ms and error_rate <= args.max_error_rate:
+            sustained = concurrency
+    print()
+    print(f"Highest level within p95 <= {args.slo_p95_ms:.0f}ms and errors <= {args.max_error_rate:.1%}: "
+          f"{sustained if sustained is not None else 'none'}")
+
+    if args.save_baseline:
+        from benchmarks.hot_paths import _git_commit
+        stats.save_baseline(args.save_baseline, results, {
+            "commit": _git_commit(),
+            "created_at": datetime.utcnow().isoformat(),
+            "target": args.base_url or "in-process",
+            "database_url": os.environ["DATABASE_URL"],
+            "duration": args.duration,
+            "concurrency": args.concurrency,
+            "sustained_concurrency": sustained
+        })
+        print(f"Saved baseline to {args.save_baseline}")
+
+    if args.compare:
+        baseline = stats.load_baseline(args.compare)
+        if not baseline:
+            print(f"No baseline found at {args.compare}")
+            return 0
+        rows = stats.compare(results, baseline, args.tolerance)
+        print()
+        print(stats.format_comparison(rows))
+        if any(r["regressed"] for r in rows):
+            return 1
+
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Seed synthetic data and load test the API.")
+    parser.add_argument("--database-url", help=f"Database to seed/serve (default: DATABASE_URL or {DEFAULT_DATABASE_URL})")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for data and traffic")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = commands.add_parser("seed", help="Bulk insert synthetic data")
+    seed_parser.add_argument("--scale", type=float, default=1.0,
+                             help="Multiply the full-size volumes (1.0 = 100k users, 2M content performances)")
+    seed_parser.add_argument("--volume", action="append", metavar="TABLE=COUNT", help="Override one table's row count")
+
+    run_parser = commands.add_parser("run", help="Drive mixed HTTP traffic")
+    run_parser.add_argument("--base-url", help="Server to test (default: in-process server on --port)")
+    run_parser.add_argument("--port", type=int, default=5055)
+    run_parser.add_argument("--concurrency", type=int, nargs="+", default=[8], help="Concurrent virtual users (one run per level)")
+    run_parser.add_argument("--duration", type=float, default=30.0, help="Seconds per level")
+    run_parser.add_argument("--warmup", type=float, default=5.0, help="Untimed warmup seconds")
+    run_parser.add_argument("--think-ms", type=float, default=0.0, help="Pause between a virtual user's requests")
+    run_parser.add_argument("--tokens", type=int, default=1000, help="Number of distinct users to authenticate as")
+    run_parser.add_argument("--latency-scale", type=float, default=1.0, help="Fake upstream latency multiplier (in-process only)")
+    run_parser.add_argument("--slo-p95-ms", type=float, default=500.0)
+    run_parser.add_argument("--max-error-rate", type=float, default=0.01)
+    run_parser.add_argument("--save-baseline", metavar="PATH")
+    run_parser.add_argument("--compare", metavar="PATH")
+    run_parser.add_argument("--tolerance", type=float, default=0.2)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    # The config reads DATABASE_URL at import time
+    os.environ["DATABASE_URL"] = args.database_url or os.environ.get("DATABASE_URL") or DEFAULT_DATABASE_URL
+    if args.command == "seed":
+        return seed(args)
+    return run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+"""
+Payload size and serialization time of the largest JSON responses.
+
+    python -m benchmarks.payloads
+    python -m benchmarks.payloads --iterations 500
+
+The responses are produced by the real routes through the test client,
+with the fake upstreams (benchmarks.fakes) generating the LLM and YouTube
+data:
+
+    content_generate   POST /content/generate (hook, script, captions, hashtags, thumbnails)
+    competitor_detail  GET /competitor/<id> with its 20 latest videos
+    niche_explore      GET /niche/explore
+    trends             POST /trends/
+
+For each one the report shows the time to serialize it into a response
+with Flask's default JSON provider and with the orjson provider (see
+app/utils/json_provider.py), and its size and compression time with gzip
+and brotli at several levels (the defaults in app/utils/compression.py are
+gzip 6 and brotli 4). The last table is what the app actually sent for
+each Accept-Encoding.
+"""
+import argparse
+import gzip
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# Add the backend directory to sys.path so we can import 'app'
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fakes import FakeUpstreams
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+CODECS = [("gzip", level) for level in (1, 6, 9)]
+if brotli is not None:
+    CODECS += [("br", quality) for quality in (1, 4, 11)]
+
+ACCEPT_ENCODINGS = ["identity", "gzip", "gzip, deflate, br"]
+
+
+def _compressor(codec: str, level: int):
+    if codec == "br":
+        return lambda body: brotli.compress(body, quality=level)
+    return lambda body: gzip.compress(body, compresslevel=level)
+
+
+def _median_ms(function, iterations: int) -> float:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+# ============ PAYLOADS ============
+
+def capture_payloads(app) -> dict:
+    """Call each route once; returns {name: (method, path, body, headers)} for the ones that answered 200."""
+    from app.extensions import db
+    from app.models.sql.competitor import Competitor
+    from app.models.sql.user import User
+    from app.services.competitor_service import CompetitorService
+    from app.utils.security import create_jwt
+
+    with app.app_context():
+        db.session.add(User(id=1, email="payloads@example.com"))
+        db.session.add(Competitor(
+            id=1, user_id=1, channel_id="UCbenchmarkchannel", channel_name="Benchmark Channel",
+            channel_url="https://www.youtube.com/channel/UCbenchmarkchannel"
+        ))
+        db.session.commit()
+        CompetitorService().sync_competitor_videos(1)
+        headers = {"Authorization": f"Bearer {create_jwt(1)}", "Accept-Encoding": "identity"}
+
+    requests = {
+        "content_generate": ("POST", "/content/generate", {"topic": "ai tools", "platform": "youtube"}),
+        "competitor_detail": ("GET", "/competitor/1", None),
+        "niche_explore": ("GET", "/niche/explore", None),
+        "trends": ("POST", "/trends/", {"topic": "ai tools"}),
+    }
+    client = app.test_client()
+    captured = {}
+    for name, (method, path, body) in requests.items():
+        response = client.open(path, method=method, json=body, headers=headers)
+        if response.status_code != 200:
+            print(f"{name}: {method} {path} returned {response.status_code}, skipped")
+            continue
+        captured[name] = (method, path, body, headers)
+    return captured
+
+
+def measure(app, captured: dict, iterations: int) -> dict:
+    from flask.json.provider import DefaultJSONProvider
+    from app.utils.json_provider import OrjsonProvider
+
+    providers = {"default": DefaultJSONProvider(app), "orjson": OrjsonProvider(app)}
+    client = app.test_client()
+    results = {}
+    for name, (method, path, body, headers) in captured.items():
+        payload = client.open(path, method=method, json=body, headers=headers).get_json()
+        result = {"serialize_ms": {}, "codecs": {}, "sent": {}}
+        with app.app_context():
+            for provider_name, provider in providers.items():
+                result["serialize_ms"][provider_name] = _median_ms(lambda: provider.response(payload), iterations)
+            raw = providers["orjson"].response(payload).get_data()
+        result["bytes"] = len(raw)
+        for codec, level in CODECS:
+            compress = _compressor(codec, level)
+            result["codecs"][f"{codec}-{level}"] = {
+                "bytes": len(compress(raw)),
+                "ms": _median_ms(lambda: compress(raw), max(1, iterations // 10))
+            }
+        for accept in ACCEPT_ENCODINGS:
+            response = client.open(path, method=method, json=body, headers={**headers, "Accept-Encoding": accept})
+            result["sent"][accept] = (response.headers.get("Content-Encoding", "identity"), len(response.get_data()))
+        results[name] = result
+    return results
+
+
+# ============ REPORT ============
+
+def format_report(results: dict) -> str:
+    lines = []
+    header = f"{'payload':<20}{'bytes':>9}{'default ms':>12}{'orjson ms':>11}{'speedup':>9}"
+    lines += [header, "-" * len(header)]
+    for name, r in results.items():
+        default, fast = r["serialize_ms"]["default"], r["serialize_ms"]["orjson"]
+        lines.append(f"{name:<20}{r['bytes']:>9}{default:>12.3f}{fast:>11.3f}{default / fast:>8.1f}x")
+
+    lines.append("")
+    codecs = [f"{codec}-{level}" for codec, level in CODECS]
+    header = f"{'payload':<20}" + "".join(f"{codec:>20}" for codec in codecs)
+    lines += [header, f"{'':<20}" + "".join(f"{'bytes (%) / ms':>20}" for _ in codecs), "-" * len(header)]
+    for name, r in results.items():
+        cells = []
+        for codec in codecs:
+            c = r["codecs"][codec]
+            cells.append(f"{c['bytes']} ({c['bytes'] / r['bytes']:.0%}) / {c['ms']:.2f}".rjust(20))
+        lines.append(f"{name:<20}" + "".join(cells))
+
+    lines.append("")
+    header = f"{'payload':<20}" + "".join(f"{accept:>24}" for accept in ACCEPT_ENCODINGS)
+    lines += ["Sent by the app, per Accept-Encoding:", header, "-" * len(header)]
+    for name, r in results.items():
+        cells = [f"{encoding} {size}".rjust(24) for encoding, size in (r["sent"][a] for a in ACCEPT_ENCODINGS)]
+        lines.append(f"{name:<20}" + "".join(cells))
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Measure the size and serialization time of the largest responses.")
+    parser.add_argument("--iterations", type=int, default=200, help="Timed serializations per payload")
+    parser.add_argument("--json", metavar="PATH", help="Also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    # The config reads these at import time
+    database_dir = tempfile.mkdtemp(prefix="payloads-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(database_dir, 'payloads.db')}"
+    os.environ["RUN_SCHEDULER"] = "false"
+
+    with FakeUpstreams(latency_scale=0).installed():
+        from app.main import create_app
+        app = create_app()
+        captured = capture_payloads(app)
+        results = measure(app, captured, args.iterations)
+
+    print(format_report(results))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+"""
+Throughput of the development server versus gunicorn on the same workload.
+
+    python -m benchmarks.load_test seed --scale 0.01
+    python -m benchmarks.serving --concurrency 1 8 32 --duration 20
+    python -m benchmarks.serving --servers gunicorn --gunicorn-args "--workers 4 --threads 8"
+
+Each server runs in its own process on the seeded database (see
+load_test.py) with the fake upstreams installed, so LLM-backed requests
+wait on simulated latency instead of a real API. "dev" is `python -m
+app.main` (Werkzeug with the debugger); "gunicorn" is gunicorn.conf.py as
+deployed. Both get load_test's weighted read mix at every --concurrency
+level.
+
+Afterwards each server is stopped with SIGTERM while --drain-requests
+content generations (several LLM calls each) are in flight, and the report shows how many
+of them still completed and how long the server took to exit.
+"""
+import argparse
+import os
+import shlex
+import signal
+import subprocess
+import sys
+import threading
+import time
+from contextlib import ExitStack
+from datetime import datetime
+
+# Add the backend directory to sys.path so we can import 'app'
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+from benchmarks import stats
+from benchmarks.load_test import DEFAULT_DATABASE_URL, mint_tokens, run_level
+
+SERVERS = ("dev", "gunicorn")
+
+_fakes = ExitStack()
+
+
+def create_fake_app():
+    """The app with fake upstreams, for the server processes (gunicorn loads it as a factory)."""
+    from benchmarks.fakes import FakeUpstreams
+    from app.main import create_app
+
+    fakes = FakeUpstreams(latency_scale=float(os.getenv("BENCHMARK_LATENCY_SCALE", 1.0)))
+    _fakes.enter_context(fakes.installed())
+    return create_app()
+
+
+def serve_dev(port: int):
+    """What `python -m app.main` runs, minus the reloader (it would fork a second server)."""
+    import logging
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    create_fake_app().run(debug=True, port=port, use_reloader=False)
+
+
+def _server_command(server: str, port: int, gunicorn_args: str) -> list:
+    if server == "dev":
+        return [sys.executable, "-m", "benchmarks.serving", "serve-dev", "--port", str(port)]
+    return [
+        sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py",
+        "--bind", f"127.0.0.1:{port}",
+        *shlex.split(gunicorn_args or ""),
+        "benchmarks.serving:create_fake_app()"
+    ]
+
+
+def _start(server: str, args) -> subprocess.Popen:
+    # Per-request access logs would dominate the output and skew timings
+    env = dict(os.environ, RUN_SCHEDULER="false", GUNICORN_ACCESS_LOG="",
+               BENCHMARK_LATENCY_SCALE=str(args.latency_scale))
+    process = subprocess.Popen(_server_command(server, args.port, args.gunicorn_args), cwd=BACKEND_DIR, env=env)
+    _wait_ready(process, f"http://127.0.0.1:{args.port}")
+    return process
+
+
+def _wait_ready(process: subprocess.Popen, base_url: str, timeout: float = 60.0):
+    import httpx
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"Server exited during startup with status {process.returncode}")
+        try:
+            if httpx.get(f"{base_url}/health/", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.kill()
+    raise SystemExit(f"Server at {base_url} did not become ready in {timeout:.0f}s")
+
+
+def measure_drain(process: subprocess.Popen, base_url: str, tokens: list, requests: int) -> dict:
+    """SIGTERM the server with `requests` content generations in flight; count how many still succeed."""
+    import httpx
+    clients = [httpx.Client(base_url=base_url, timeout=120.0) for _ in range(requests)]
+    outcomes = []
+
+    def generate(index: int):
+        try:
+            response = clients[index].post(
+                "/content/generate",
+                json={"topic": f"drain test {index} {time.time()}"},
+                headers={"Authorization": f"Bearer {tokens[index % len(tokens)]}"}
+            )
+            outcomes.append(response.status_code == 200)
+        except httpx.HTTPError:
+            outcomes.append(False)
+
+    callers = [threading.Thread(target=generate, args=(index,), daemon=True) for index in range(requests)]
+    for caller in callers:
+        caller.start()
+    time.sleep(0.5)  # let the requests reach the server and start their LLM calls
+
+    start = time.perf_counter()
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=180)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+    exit_time = time.perf_counter() - start
+    for caller in callers:
+        caller.join(timeout=10)
+    for client in clients:
+        client.close()
+    return {"in_flight": requests, "completed": sum(outcomes), "exit_seconds": round(exit_time, 2)}
+
+
+def run(args) -> int:
+    from app.main import create_app
+
+    tokens = mint_tokens(create_app(), args.tokens, args.seed)
+    base_url = f"http://127.0.0.1:{args.port}"
+
+    results = {}
+    drains = {}
+    for server in args.servers:
+        print(f"Starting {server} server...")
+        process = _start(server, args)
+        try:
+            if args.warmup:
+                run_level(base_url, tokens, min(args.concurrency), args.warmup, 0)
+            for concurrency in args.concurrency:
+                print(f"  {concurrency} concurrent users...")
+                results[f"{server}/c{concurrency}"] = run_level(base_url, tokens, concurrency, args.duration, 0)["total"]
+            drains[server] = measure_drain(process, base_url, tokens, args.drain_requests)
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+
+    print()
+    print(stats.format_table(results))
+
+    if len(args.servers) == len(SERVERS):
+        print()
+        for concurrency in args.concurrency:
+            dev = results[f"dev/c{concurrency}"]["throughput"]
+            production = results[f"gunicorn/c{concurrency}"]["throughput"]
+            ratio = f"{production / dev:.2f}x" if dev else "n/a"
+            print(f"{concurrency:>4} users: gunicorn {production:.2f} req/s vs dev {dev:.2f} req/s ({ratio})")
+
+    print()
+    for server, drain in drains.items():
+        print(f"{server}: SIGTERM with {drain['in_flight']} content generations in flight -> "
+              f"{drain['completed']} completed, exited after {drain['exit_seconds']}s")
+
+    if args.save_baseline:
+        from benchmarks.hot_paths import _git_commit
+        stats.save_baseline(args.save_baseline, results, {
+            "commit": _git_commit(),
+            "created_at": datetime.utcnow().isoformat(),
+            "database_url": os.environ["DATABASE_URL"],
+            "duration": args.duration,
+            "concurrency": args.concurrency,
+            "latency_scale": args.latency_scale,
+            "gunicorn_args": args.gunicorn_args,
+            "drain": drains
+        })
+        print(f"Saved baseline to {args.save_baseline}")
+
+    if args.compare:
+        baseline = stats.load_baseline(args.compare)
+        if not baseline:
+            print(f"No baseline found at {args.compare}")
+            return 0
+        rows = stats.compare(results, baseline, args.tolerance)
+        print()
+        print(stats.format_comparison(rows))
+        if any(r["regressed"] for r in rows):
+            return 1
+
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the dev server with gunicorn under load.")
+    parser.add_argument("--database-url", help=f"Seeded database to serve (default: DATABASE_URL or {DEFAULT_DATABASE_URL})")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for the users picked")
+    commands = parser.add_subparsers(dest="command")
+
+    serve_parser = commands.add_parser("serve-dev", help=argparse.SUPPRESS)
+    serve_parser.add_argument("--port", type=int, required=True)
+
+    parser.add_argument("--servers", nargs="+", choices=SERVERS, default=list(SERVERS))
+    parser.add_argument("--port", type=int, default=5056)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32], help="Concurrent virtual users (one run per level)")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per level")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Untimed warmup seconds")
+    parser.add_argument("--tokens", type=int, default=200, help="Number of distinct users to authenticate as")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Fake upstream latency multiplier")
+    parser.add_argument("--gunicorn-args", default="", help="Extra gunicorn arguments, e.g. \"--workers 4 --threads 8\"")
+    parser.add_argument("--drain-requests", type=int, default=8, help="Content generations in flight at SIGTERM")
+    parser.add_argument("--save-baseline", metavar="PATH")
+    parser.add_argument("--compare", metavar="PATH")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    # The config reads these at import time
+    os.environ["DATABASE_URL"] = args.database_url or os.environ.get("DATABASE_URL") or DEFAULT_DATABASE_URL
+    os.environ["RUN_SCHEDULER"] = "false"
+    if args.command == "serve-dev":
+        serve_dev(args.port)
+        return 0
+    return run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""
+Cold start: time for a fresh process to import the app, build it and serve its first request.
+
+    python -m benchmarks.startup --runs 5
+    python -m benchmarks.startup --modes lazy --importtime 25
+
+Every run is a new interpreter, so nothing is cached in sys.modules. Each
+reports how long importing app.main, create_app() and the first request
+(/health/ through the test client) took, and the time to first request
+from process launch, interpreter startup included.
+
+Modes:
+    eager               imports the heavy packages up front, as create_app did
+                        before they were loaded lazily (see app/utils/lazy.py)
+    lazy                the current startup
+    lazy-no-create-all  the current startup with AUTO_CREATE_TABLES=false
+
+--importtime N prints the N slowest imports of the current startup
+(python -X importtime, cumulative), to find the next module to defer.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_DATABASE_URL = f"sqlite:///{os.path.join(tempfile.gettempdir(), 'insight_sphere_startup.db')}"
+
+# What app.main pulled in through the services before the lazy imports
+EAGER_IMPORTS = [
+    "sklearn.cluster", "scipy.special", "google.genai", "groq", "googleapiclient.discovery",
+    "twilio.rest", "sendgrid", "google.oauth2.id_token"
+]
+HEAVY_MODULES = ["sklearn", "scipy", "google.genai", "groq", "googleapiclient", "twilio", "sendgrid"]
+
+MODES = {
+    "eager": (EAGER_IMPORTS, {"AUTO_CREATE_TABLES": "true"}),
+    "lazy": ([], {"AUTO_CREATE_TABLES": "true"}),
+    "lazy-no-create-all": ([], {"AUTO_CREATE_TABLES": "false"}),
+}
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+for name in {eager!r}:
+    __import__(name)
+from app.main import create_app
+imported = time.perf_counter()
+app = create_app()
+created = time.perf_counter()
+status = app.test_client().get("/health/").status_code
+served = time.perf_counter()
+print(json.dumps({{
+    "import_s": imported - start,
+    "create_app_s": created - imported,
+    "first_request_s": served - created,
+    "status": status,
+    "heavy_loaded": [name for name in {heavy!r} if name in sys.modules]
+}}))
+"""
+
+
+def _environment(extra: dict) -> dict:
+    return dict(os.environ, RUN_SCHEDULER="false", **extra)
+
+
+def run_once(mode: str) -> dict:
+    eager, env = MODES[mode]
+    code = PROBE.format(eager=eager, heavy=HEAVY_MODULES)
+    launched = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, env=_environment(env), capture_output=True, text=True
+    )
+    total = time.perf_counter() - launched
+    if completed.returncode != 0:
+        raise SystemExit(f"Startup probe failed ({mode}):\n{completed.stderr}")
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["time_to_first_request_s"] = total
+    return result
+
+
+def importtime_report(top: int) -> str:
+    """The `top` slowest imports (cumulative) of `from app.main import create_app`."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "from app.main import create_app"],
+        cwd=BACKEND_DIR, env=_environment({}), capture_output=True, text=True
+    )
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, self_us, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|").split("|"))
+        rows.append((int(cumulative_us), int(self_us), name))
+    rows.sort(reverse=True)
+
+    header = f"{'module':<60}{'cumulative ms':>15}{'self ms':>10}"
+    lines = [header, "-" * len(header)]
+    for cumulative_us, self_us, name in rows[:top]:
+        lines.append(f"{name[:59]:<60}{cumulative_us / 1000:>15.1f}{self_us / 1000:>10.1f}")
+    return "\n".join(lines)
+
+
+def _mean(results: list, key: str) -> float:
+    return sum(r[key] for r in results) / len(results)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Measure cold start and time to first request.")
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument("--runs", type=int, default=5, help="Fresh processes per mode")
+    parser.add_argument("--importtime", type=int, metavar="N", help="Also print the N slowest imports")
+    parser.add_argument("--database-url", help=f"Database to start against (default: DATABASE_URL or {DEFAULT_DATABASE_URL})")
+    args = parser.parse_args(argv)
+    os.environ["DATABASE_URL"] = args.database_url or os.environ.get("DATABASE_URL") or DEFAULT_DATABASE_URL
+
+    # Create the tables once so every mode starts against the same schema
+    run_once("lazy")
+
+    summaries = {}
+    for mode in args.modes:
+        print(f"Starting {args.runs} processes ({mode})...")
+        results = [run_once(mode) for _ in range(args.runs)]
+        summaries[mode] = {
+            key: _mean(results, key)
+            for key in ("import_s", "create_app_s", "first_request_s", "time_to_first_request_s")
+        }
+        summaries[mode]["heavy_loaded"] = results[-1]["heavy_loaded"]
+
+    print()
+    header = f"{'mode':<22}{'import ms':>11}{'create_app ms':>15}{'1st request ms':>16}{'to 1st request ms':>19}  heavy modules loaded"
+    print(header)
+    print("-" * len(header))
+    for mode, s in summaries.items():
+        print(f"{mode:<22}{s['import_s'] * 1000:>11.0f}{s['create_app_s'] * 1000:>15.0f}{s['first_request_s'] * 1000:>16.0f}"
+              f"{s['time_to_first_request_s'] * 1000:>19.0f}  {', '.join(s['heavy_loaded']) or '-'}")
+
+    if "eager" in summaries and len(summaries) > 1:
+        before = summaries["eager"]["time_to_first_request_s"]
+        print()
+        for mode, s in summaries.items():
+            if mode != "eager":
+                after = s["time_to_first_request_s"]
+                print(f"{mode}: time to first request {before * 1000:.0f}ms -> {after * 1000:.0f}ms "
+                      f"({(before - after) / before:.0%} faster)")
+
+    if args.importtime:
+        print()
+        print(importtime_report(args.importtime))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""
+Latency/throughput summaries and baseline comparison for benchmark runs.
+"""
+import json
+import os
+import numpy as np
+
+
+def summarize(durations: list, wall_time: float, errors: int = 0) -> dict:
+    """
+    Summarize per-call durations (seconds) from a run.
+
+    Args:
+        durations: Duration of every completed call, in seconds
+        wall_time: Wall-clock duration of the whole run, in seconds
+        errors: Number of calls that raised or reported failure
+
+    Returns:
+        Dict with count, errors, throughput (calls/s) and latency percentiles in ms
+    """
+    count = len(durations)
+    if not count:
+        return {"count": 0, "errors": errors, "throughput": 0.0}
+
+    latencies = np.asarray(durations, dtype=float) * 1000
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+        "count": count,
+        "errors": errors,
+        "throughput": round(count / wall_time, 3) if wall_time > 0 else 0.0,
+        "mean_ms": round(float(latencies.mean()), 3),
+        "min_ms": round(float(latencies.min()), 3),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "max_ms": round(float(latencies.max()), 3)
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float = 0.2) -> list:
+    """
+    Compare two {benchmark name: summary} dicts.
+
+    A benchmark regresses when its p95 latency grows or its throughput drops
+    by more than `tolerance` (a fraction) relative to the baseline.
+
+    Returns:
+        List of per-benchmark comparison dicts (benchmarks missing from either side are skipped)
+    """
+    rows = []
+    for name, summary in current.items():
+        base = baseline.get(name)
+        if not base or not base.get("count") or not summary.get("count"):
+            continue
+
+        p95_change = _relative_change(summary["p95_ms"], base["p95_ms"])
+        throughput_change = _relative_change(summary["throughput"], base["throughput"])
+        rows.append({
+            "name": name,
+            "p95_ms": summary["p95_ms"],
+            "baseline_p95_ms": base["p95_ms"],
+            "p95_change": p95_change,
+            "throughput": summary["throughput"],
+            "baseline_throughput": base["throughput"],
+            "throughput_change": throughput_change,
+            "regressed": p95_change > tolerance or throughput_change < -tolerance
+        })
+    return rows
+
+
+def _relative_change(value: float, base: float) -> float:
+    if not base:
+        return 0.0
+    return round((value - base) / base, 4)
+
+
+def load_baseline(path: str) -> dict:
+    """Load saved results ({"results": {...}}) from a JSON file, or {} if it doesn't exist."""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f).get("results", {})
+
+
+def save_baseline(path: str, results: dict, metadata: dict = None):
+    """Save results with run metadata (settings, commit) as JSON."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"metadata": metadata or {}, "results": results}, f, indent=2, sort_keys=True)
+
+
+def format_table(results: dict) -> str:
+    """Render summaries as a fixed-width text table."""
+    header = f"{'benchmark':<28}{'calls':>7}{'errors':>8}{'ops/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    lines = [header, "-" * len(header)]
+    for name, s in results.items():
+        lines.append(
+            f"{name:<28}{s['count']:>7}{s['errors']:>8}{s['throughput']:>10.2f}"
+            f"{s.get('p50_ms', 0):>10.1f}{s.get('p95_ms', 0):>10.1f}{s.get('p99_ms', 0):>10.1f}"
+        )
+    return "\n".join(lines)
+
+
+def format_comparison(rows: list) -> str:
+    """Render compare() output as a fixed-width text table."""
+    header = f"{'benchmark':<28}{'p95 ms':>10}{'base':>10}{'change':>9}{'ops/s':>10}{'base':>10}{'change':>9}  status"
+    lines = [header, "-" * len(header)]
+    for r in rows:
+        lines.append(
+            f"{r['name']:<28}{r['p95_ms']:>10.1f}{r['baseline_p95_ms']:>10.1f}{r['p95_change']:>+9.1%}"
+            f"{r['throughput']:>10.2f}{r['baseline_throughput']:>10.2f}{r['throughput_change']:>+9.1%}"
+            f"  {'REGRESSED' if r['regressed'] else 'ok'}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,310 @@
+"""
+Bulk seeding of realistic synthetic volumes for load testing.
+
+Rows are generated with a seeded random generator and written with Core
+executemany inserts in batches, using explicit primary keys so related rows
+can reference each other without reading IDs back. Volumes are given per
+table; scale() multiplies the full-size defaults for quicker local runs.
+"""
+import random
+import time
+from datetime import datetime, timedelta
+from app.extensions import db
+from app.models.sql.user import User
+from app.models.sql.trend_analysis import TrendAnalysis
+from app.models.sql.opinion_analysis import OpinionAnalysis
+from app.models.sql.skill_path import SkillPath
+from app.models.sql.content_script import ContentScript
+from app.models.sql.content_performance import ContentPerformance, ABTest
+from app.models.sql.competitor import Competitor, CompetitorVideo
+from app.models.sql.creator_profile import CreatorProfile, CreatorSubNiche, CreatorPlatform
+from app.services.analytics_service import AnalyticsService
+
+# Full-size volumes (rows per table)
+DEFAULT_VOLUMES = {
+    "users": 100_000,
+    "trend_analyses": 400_000,
+    "opinion_analyses": 150_000,
+    "skill_paths": 100_000,
+    "content_scripts": 500_000,
+    "content_performances": 2_000_000,
+    "ab_tests": 20_000,
+    "competitors": 30_000,
+    "competitor_videos": 1_500_000,
+    "creator_profiles": 40_000,
+}
+
+NICHES = ["tech", "gaming", "fitness", "beauty", "finance", "travel", "food", "music", "education",
+          "comedy", "fashion", "diy", "parenting", "pets", "sports", "science", "cars", "books"]
+SUB_NICHES = ["reviews", "tutorials", "news", "challenges", "vlogs", "shorts", "budget", "luxury",
+              "beginners", "advanced", "history", "trends", "hacks", "interviews", "reactions"]
+STYLES = ["educational", "entertainment", "vlogs", "tutorials", "reviews", "comedy", "documentary"]
+PLATFORMS = ["youtube", "tiktok", "instagram", "twitter", "twitch", "linkedin"]
+SUGGESTION_TYPES = [None, "topic", "hook", "script", "hashtags"]
+
+BATCH_SIZE = 10_000
+HISTORY_DAYS = 120
+
+
+def scale(volumes: dict, factor: float) -> dict:
+    """Multiply every volume by factor (keeping at least one row per table)."""
+    return {table: max(1, int(count * factor)) for table, count in volumes.items()}
+
+
+class SyntheticDataSeeder:
+    """
+    Seeds every table the load-tested endpoints read.
+
+    Usage (inside an app context):
+        SyntheticDataSeeder(scale(DEFAULT_VOLUMES, 0.01)).seed()
+    """
+
+    def __init__(self, volumes: dict = None, seed: int = 42, now: datetime = None):
+        self.volumes = {**DEFAULT_VOLUMES, **(volumes or {})}
+        self.rng = random.Random(seed)
+        self.now = now or datetime.utcnow()
+
+    # ============ HELPERS ============
+
+    def _insert(self, model, rows):
+        """Insert an iterable of row dicts in batches; returns the row count."""
+        table = model.__table__
+        count = 0
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= BATCH_SIZE:
+                db.session.execute(table.insert(), batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            db.session.execute(table.insert(), batch)
+            count += len(batch)
+        db.session.commit()
+        return count
+
+    def _past(self, max_days: int = HISTORY_DAYS) -> datetime:
+        """A random timestamp within the last max_days, skewed towards recent activity."""
+        days = max_days * (self.rng.random() ** 2)
+        return self.now - timedelta(days=days)
+
+    def _user_id(self) -> int:
+        return self.rng.randint(1, self.volumes["users"])
+
+    # ============ TABLES ============
+
+    def seed(self, log=print) -> dict:
+        """Seed every table; returns {table: rows inserted}."""
+        steps = [
+            ("users", self._users),
+            ("trend_analyses", self._trend_analyses),
+            ("opinion_analyses", self._opinion_analyses),
+            ("skill_paths", self._skill_paths),
+            ("content_scripts", self._content_scripts),
+            ("content_performances", self._content_performances),
+            ("ab_tests", self._ab_tests),
+            ("competitors", self._competitors),
+            ("competitor_videos", self._competitor_videos),
+            ("creator_profiles", self._creator_profiles),
+            ("content_performance_daily", self._daily_rollups),
+        ]
+        counts = {}
+        for name, step in steps:
+            start = time.perf_counter()
+            counts[name] = step()
+            log(f"Seeded {counts[name]:>10,} {name} in {time.perf_counter() - start:.1f}s")
+        return counts
+
+    def _users(self) -> int:
+        return self._insert(User, (
+            {
+                "id": i,
+                "email": f"loadtest{i}@example.com",
+                "provider": "local",
+                "created_at": self._past(365)
+            }
+            for i in range(1, self.volumes["users"] + 1)
+        ))
+
+    def _trend_analyses(self) -> int:
+        return self._insert(TrendAnalysis, (
+            {
+                "id": i,
+                "topic": f"{self.rng.choice(NICHES)} {self.rng.choice(SUB_NICHES)}",
+                "summary": "Synthetic trend summary. " * self.rng.randint(3, 12),
+                "user_id": self._user_id(),
+                "created_at": self._past()
+            }
+            for i in range(1, self.volumes["trend_analyses"] + 1)
+        ))
+
+    def _opinion_analyses(self) -> int:
+        return self._insert(OpinionAnalysis, (
+            {
+                "id": i,
+                "topic": self.rng.choice(NICHES),
+                "summary": "Synthetic opinion summary. " * self.rng.randint(2, 8),
+                "sentiment_breakdown": '{"positive": 60, "negative": 15, "neutral": 25}',
+                "user_id": self._user_id(),
+                "created_at": self._past()
+            }
+            for i in range(1, self.volumes["opinion_analyses"] + 1)
+        ))
+
+    def _skill_paths(self) -> int:
+        return self._insert(SkillPath, (
+            {
+                "id": i,
+                "skill_name": f"{self.rng.choice(NICHES)} skills",
+                "steps": '[{"title": "Step 1"}, {"title": "Step 2"}, {"title": "Step 3"}]',
+                "user_id": self._user_id(),
+                "is_completed": self.rng.random() < 0.3,
+                "created_at": self._past()
+            }
+            for i in range(1, self.volumes["skill_paths"] + 1)
+        ))
+
+    def _content_scripts(self) -> int:
+        return self._insert(ContentScript, (
+            {
+                "id": i,
+                "user_id": self._user_id(),
+                "topic": f"{self.rng.choice(NICHES)} {self.rng.choice(SUB_NICHES)}",
+                "platform": self.rng.choice(PLATFORMS[:3] + ["all"]),
+                "content_style": self.rng.choice(STYLES),
+                "duration": self.rng.choice([15, 30, 60, 180, 600]),
+                "hooks": '{"hooks": [{"text": "Synthetic hook"}]}',
+                "full_script": '{"title": "Synthetic script", "sections": []}' + " " * self.rng.randint(500, 4000),
+                "captions": '{"captions": []}',
+                "hashtags": '{"hashtags": []}',
+                "thumbnail_titles": '{"titles": []}',
+                "generation_status": "completed",
+                "created_at": self._past()
+            }
+            for i in range(1, self.volumes["content_scripts"] + 1)
+        ))
+
+    def _content_performances(self) -> int:
+        def rows():
+            for i in range(1, self.volumes["content_performances"] + 1):
+                views = int(self.rng.lognormvariate(8, 1.8))
+                likes = int(views * self.rng.uniform(0.01, 0.08))
+                comments = int(views * self.rng.uniform(0.001, 0.01))
+                shares = int(views * self.rng.uniform(0.0, 0.005))
+                created_at = self._past()
+                suggestion_type = self.rng.choice(SUGGESTION_TYPES)
+                yield {
+                    "id": i,
+                    "user_id": self._user_id(),
+                    "title": f"Synthetic video {i}",
+                    "platform": self.rng.choice(PLATFORMS[:3]),
+                    "video_id": f"v{i:09d}",
+                    "published_at": created_at,
+                    "views": views,
+                    "likes": likes,
+                    "comments": comments,
+                    "shares": shares,
+                    "engagement_rate": round((likes + comments + shares) / views * 100, 2) if views else 0.0,
+                    "estimated_revenue": round(views / 1000 * self.rng.uniform(0.5, 6.0), 2),
+                    "used_platform_suggestion": suggestion_type is not None,
+                    "suggestion_type": suggestion_type,
+                    "content_score": self.rng.randint(30, 95),
+                    "actual_score": self.rng.randint(20, 100),
+                    "score_accuracy": round(self.rng.uniform(50, 100), 1),
+                    "created_at": created_at
+                }
+        return self._insert(ContentPerformance, rows())
+
+    def _ab_tests(self) -> int:
+        performances = self.volumes["content_performances"]
+        return self._insert(ABTest, (
+            {
+                "id": i,
+                "user_id": self._user_id(),
+                "test_name": f"Synthetic test {i}",
+                "test_variable": self.rng.choice(["hook", "thumbnail", "title"]),
+                "content_a_id": self.rng.randint(1, performances),
+                "content_b_id": self.rng.randint(1, performances),
+                "status": self.rng.choice(["running", "completed"]),
+                "created_at": self._past()
+            }
+            for i in range(1, self.volumes["ab_tests"] + 1)
+        ))
+
+    def _competitors(self) -> int:
+        return self._insert(Competitor, (
+            {
+                "id": i,
+                "user_id": self._user_id(),
+                "channel_id": f"UC{i:022d}",
+                "channel_name": f"Synthetic channel {i}",
+                "channel_url": f"https://www.youtube.com/channel/UC{i:022d}",
+                "subscriber_count": int(self.rng.lognormvariate(10, 2)),
+                "video_count": self.rng.randint(10, 2000),
+                "created_at": self._past()
+            }
+            for i in range(1, self.volumes["competitors"] + 1)
+        ))
+
+    def _competitor_videos(self) -> int:
+        competitors = self.volumes["competitors"]
+
+        def rows():
+            for i in range(1, self.volumes["competitor_videos"] + 1):
+                views = int(self.rng.lognormvariate(9, 2))
+                likes = int(views * self.rng.uniform(0.01, 0.08))
+                comments = int(views * self.rng.uniform(0.001, 0.01))
+                yield {
+                    "id": i,
+                    "competitor_id": self.rng.randint(1, competitors),
+                    "video_id": f"c{i:09d}",
+                    "title": f"Competitor video {i}",
+                    "description": "Synthetic description. " * self.rng.randint(1, 10),
+                    "published_at": self._past(365),
+                    "views": views,
+                    "likes": likes,
+                    "comments": comments,
+                    "engagement_rate": round((likes + comments) / views * 100, 2) if views else 0.0,
+                    "viral_score": self.rng.randint(0, 100),
+                    "created_at": self._past()
+                }
+        return self._insert(CompetitorVideo, rows())
+
+    def _creator_profiles(self) -> int:
+        # One profile per user for the first N users, with matching lookup rows
+        count = min(self.volumes["creator_profiles"], self.volumes["users"])
+        profiles, terms, platforms = [], [], []
+        for i in range(1, count + 1):
+            niche = self.rng.choice(NICHES)
+            sub_niches = self.rng.sample(SUB_NICHES, self.rng.randint(0, 3))
+            followers = {p: int(self.rng.lognormvariate(8, 2)) for p in self.rng.sample(PLATFORMS, self.rng.randint(1, 3))}
+            updated_at = self._past(180)
+            profiles.append({
+                "id": i,
+                "user_id": i,
+                "display_name": f"Creator {i}",
+                "niche": niche,
+                "sub_niches": sub_niches,
+                "content_style": self.rng.choice(STYLES),
+                "audience_size": sum(followers.values()),
+                "platforms": followers,
+                "is_open_to_collabs": self.rng.random() < 0.85,
+                "collab_interests": ["joint video"],
+                "preferred_min_audience": 0,
+                "created_at": updated_at,
+                "updated_at": updated_at
+            })
+            term_names = {niche: True}
+            for name in sub_niches:
+                term_names.setdefault(name, False)
+            terms.extend({"profile_id": i, "name": name, "is_primary": primary} for name, primary in term_names.items())
+            platforms.extend({"profile_id": i, "platform": p, "followers": f} for p, f in followers.items())
+
+        inserted = self._insert(CreatorProfile, profiles)
+        self._insert(CreatorSubNiche, terms)
+        self._insert(CreatorPlatform, platforms)
+        return inserted
+
+    def _daily_rollups(self) -> int:
+        # Analytics endpoints read the daily rollups, not the raw rows
+        return AnalyticsService().rebuild_daily_rollups()["rollup_rows"]
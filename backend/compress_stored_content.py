@@ -0,0 +1,44 @@
+import argparse
+import os
+import sys
+
+# Add the current directory to sys.path so we can import 'app'
+sys.path.append(os.getcwd())
+
+# One-off script: no background jobs
+os.environ.setdefault("RUN_SCHEDULER", "false")
+
+# Stores the generated content, niche analyses and trend summaries compressed
+# (app/models/sql/types.py). On MySQL/PostgreSQL, run with --schema-only
+# before deploying the code that writes compressed values, then without
+# flags to compress the existing rows while the app keeps running.
+parser = argparse.ArgumentParser(description="Compress stored content columns and report their size.")
+parser.add_argument("--schema-only", action="store_true", help="Only convert the TEXT columns to binary")
+parser.add_argument("--report", action="store_true", help="Only print the size report")
+parser.add_argument("--batch-size", type=int, default=500, help="Rows per transaction")
+parser.add_argument("--pause", type=float, default=0.1, help="Seconds to wait between batches")
+args = parser.parse_args()
+
+print("Creating app...")
+from app.main import create_app
+from app.extensions import db
+from app.services.storage_compression_service import StorageCompressionService, format_size_report
+
+app = create_app()
+print("App created. Entering app context...")
+with app.app_context():
+    service = StorageCompressionService(batch_size=args.batch_size, pause=args.pause)
+    try:
+        if not args.report:
+            print(f"In app context ({db.engine.dialect.name}). Converting columns...")
+            converted = service.convert_schema()
+            print(f"Converted {', '.join(converted)}" if converted else "Columns are already binary.")
+            if not args.schema_only:
+                print("Compressing existing rows...")
+                for result in service.migrate():
+                    print(f"{result['table']}: {result['rewritten']} of {result['scanned']} rows rewritten")
+        print(format_size_report(service.size_report()))
+    except Exception as e:
+        print(f'Error: {e}')
+        db.session.rollback()
+print("Done.")
@@ -4,6 +4,10 @@ import sys
 # Add the current directory to sys.path so we can import 'app'
 sys.path.append(os.getcwd())
 
+# One-off script: no background jobs, and it alters existing tables itself
+os.environ.setdefault("RUN_SCHEDULER", "false")
+os.environ.setdefault("AUTO_CREATE_TABLES", "false")
+
 print("Creating app...")
 from app.main import create_app
 from app.extensions import db
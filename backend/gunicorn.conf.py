@@ -0,0 +1,86 @@
+"""
+Production server settings:
+
+    gunicorn -c gunicorn.conf.py app.wsgi:application
+
+Requests spend most of their time waiting on the database and upstream
+APIs (an LLM call takes seconds; the Python work around it tens of
+milliseconds), so each worker process runs many threads. There is one
+worker per CPU for the CPU-bound part (the GIL limits a process to one
+core), plus one spare. Thread counts follow threads = cores * (1 + wait / compute),
+split across the workers and capped at the database pool size, since a
+request holds a pooled connection for as long as it runs.
+
+Environment overrides:
+    GUNICORN_WORKER_CLASS       gthread (default) or gevent (pip install gevent)
+    GUNICORN_WORKERS            worker processes (default: CPUs + 1)
+    GUNICORN_THREADS            threads per gthread worker (default: derived, see above)
+    GUNICORN_IO_WAIT_RATIO      wait / compute time of a typical request (default 15)
+    GUNICORN_MAX_THREADS        cap on derived threads (default DB_POOL_SIZE + DB_MAX_OVERFLOW, 15)
+    GUNICORN_WORKER_CONNECTIONS concurrent requests per gevent worker (default 100)
+    GUNICORN_TIMEOUT            silent worker timeout in seconds (default 120)
+    GUNICORN_GRACEFUL_TIMEOUT   seconds a stopping worker gets to finish requests (default 90)
+    LLM_DRAIN_TIMEOUT           of those, seconds spent waiting for background upstream calls (default 15)
+    GUNICORN_ACCESS_LOG         access log path, "-" for stdout (default), empty to disable
+
+The scheduler does not run in web workers; run `python -m app.scheduler_main`
+as its own process.
+"""
+import math
+import os
+
+# Must be set before the app (and its Config) is imported
+os.environ.setdefault("RUN_SCHEDULER", "false")
+
+
+def _cpu_count() -> int:
+    # CPUs this process may run on (container CPU sets), not the host total
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+cpus = _cpu_count()
+io_wait_ratio = float(os.getenv("GUNICORN_IO_WAIT_RATIO", 15))
+
+bind = f"0.0.0.0:{os.getenv('FLASK_PORT', os.getenv('PORT', 5000))}"
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+workers = int(os.getenv("GUNICORN_WORKERS", cpus + 1))
+threads = int(os.getenv("GUNICORN_THREADS", min(
+    int(os.getenv("GUNICORN_MAX_THREADS", int(os.getenv("DB_POOL_SIZE", 5)) + int(os.getenv("DB_MAX_OVERFLOW", 10)))),
+    math.ceil(cpus * (1 + io_wait_ratio) / workers)
+)))
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", 100))
+
+# Load the app once in the master and fork it: workers share its memory and
+# a broken app fails at startup instead of in every worker. gevent has to
+# monkey-patch before the app is imported, so it loads per worker.
+preload_app = worker_class != "gevent"
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 120))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 90))
+keepalive = 5
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-") or None  # empty: no access log
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    # Connections opened in the master (create_all) must not be shared by workers
+    if not server.cfg.preload_app:
+        return
+    app = server.app.wsgi()
+    if hasattr(app, "app_context"):
+        from app.extensions import db
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose(close=False)
+
+
+def worker_exit(server, worker):
+    # Requests have finished (or graceful_timeout ran out); hedged and batched
+    # LLM calls may still be running on background threads
+    from app.utils.telemetry import wait_for_upstreams
+    remaining = wait_for_upstreams(float(os.getenv("LLM_DRAIN_TIMEOUT", 15)))
+    if remaining:
+        server.log.warning("Worker %s exiting with %s upstream calls in flight", worker.pid, remaining)
@@ -0,0 +1,57 @@
+import os
+import sys
+
+# Add the current directory to sys.path so we can import 'app'
+sys.path.append(os.getcwd())
+
+# One-off script: no background jobs
+os.environ.setdefault("RUN_SCHEDULER", "false")
+
+print("Creating app...")
+from app.main import create_app
+from app.extensions import db
+from app.models.sql.creator_profile import CreatorProfile
+from sqlalchemy import text
+
+JSON_COLUMNS = ["sub_niches", "platforms", "collab_interests"]
+BATCH_SIZE = 500
+
+app = create_app()
+print("App created. Entering app context...")
+with app.app_context():
+    dialect = db.engine.dialect.name
+    print(f"In app context ({dialect}). Converting creator_profiles JSON columns...")
+    try:
+        for column in JSON_COLUMNS:
+            if dialect == "mysql":
+                result = db.session.execute(text(f"SHOW COLUMNS FROM creator_profiles LIKE '{column}'")).fetchone()
+                if result and result[1].lower() == "json":
+                    print(f"Column '{column}' is already JSON.")
+                    continue
+                # Values that are not valid JSON would make the ALTER fail
+                db.session.execute(text(
+                    f"UPDATE creator_profiles SET {column} = NULL WHERE {column} IS NOT NULL AND NOT JSON_VALID({column})"
+                ))
+                db.session.execute(text(f"ALTER TABLE creator_profiles MODIFY COLUMN {column} JSON NULL"))
+                print(f"Successfully converted '{column}' to JSON")
+            elif dialect == "sqlite":
+                # SQLite stores JSON as text; only clear values the JSON type can't decode
+                db.session.execute(text(
+                    f"UPDATE creator_profiles SET {column} = NULL WHERE {column} IS NOT NULL AND NOT json_valid({column})"
+                ))
+                print(f"Checked '{column}' values")
+        db.session.commit()
+
+        # creator_sub_niches / creator_platforms are created by create_app; fill them in
+        print("Backfilling creator_sub_niches and creator_platforms...")
+        profile_ids = [row[0] for row in db.session.query(CreatorProfile.id).order_by(CreatorProfile.id)]
+        for start in range(0, len(profile_ids), BATCH_SIZE):
+            batch = CreatorProfile.query.filter(CreatorProfile.id.in_(profile_ids[start:start + BATCH_SIZE])).all()
+            for profile in batch:
+                profile.sync_lookup_tables()
+            db.session.commit()
+        print(f"Successfully backfilled {len(profile_ids)} profiles")
+    except Exception as e:
+        print(f'Error: {e}')
+        db.session.rollback()
+print("Done.")
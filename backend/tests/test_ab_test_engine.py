@@ -0,0 +1,132 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from scipy import integrate, stats
+
+from app.services.ab_test_engine import ABTestEngine
+
+
+def make_test(test_id: int, variants: list):
+    """An ABTest stand-in from [(views, engagements), ...], labelled A, B, C..."""
+    contents = [
+        (chr(ord("A") + index), SimpleNamespace(views=views, likes=engagements, comments=0, shares=0))
+        for index, (views, engagements) in enumerate(variants)
+    ]
+    return SimpleNamespace(id=test_id, get_variant_contents=lambda: contents)
+
+
+def scipy_p_value(views_a, engaged_a, views_b, engaged_b) -> float:
+    """Pooled two-proportion z-test p-value (the uncorrected 2x2 chi-squared test)."""
+    table = [[engaged_a, views_a - engaged_a], [engaged_b, views_b - engaged_b]]
+    return stats.chi2_contingency(table, correction=False)[1]
+
+
+def exact_probability_b_beats_a(views_a, engaged_a, views_b, engaged_b) -> float:
+    """P(rate_B > rate_A) under the engine's Beta(1 + s, 1 + n - s) posteriors, by quadrature."""
+    a = stats.beta(1 + engaged_a, 1 + views_a - engaged_a)
+    b = stats.beta(1 + engaged_b, 1 + views_b - engaged_b)
+    return integrate.quad(lambda x: b.pdf(x) * a.cdf(x), 0, 1, limit=200, points=[a.mean(), b.mean()])[0]
+
+
+@pytest.mark.parametrize("views_a, engaged_a, views_b, engaged_b", [
+    (1000, 50, 1000, 50),
+    (1000, 50, 1000, 65),
+    (5000, 400, 4200, 390),
+    (120, 3, 300, 21),
+    (20000, 1000, 20000, 1100),
+])
+def test_z_test_p_values_match_scipy(views_a, engaged_a, views_b, engaged_b):
+    engine = ABTestEngine()
+    _, p_values = engine._z_test_against_control(
+        np.array([[views_a, views_b]]), np.array([[engaged_a, engaged_b]])
+    )
+
+    assert p_values[0, 0] == pytest.approx(1.0)
+    assert p_values[0, 1] == pytest.approx(scipy_p_value(views_a, engaged_a, views_b, engaged_b), rel=1e-9, abs=1e-12)
+
+
+def test_z_test_without_views_is_not_significant():
+    _, p_values = ABTestEngine()._z_test_against_control(np.array([[0, 0]]), np.array([[0, 0]]))
+
+    assert p_values.tolist() == [[1.0, 1.0]]
+
+
+@pytest.mark.parametrize("views_a, engaged_a, views_b, engaged_b", [
+    (1000, 50, 1000, 50),
+    (1000, 50, 1000, 65),
+    (400, 30, 350, 20),
+])
+def test_posterior_probability_matches_exact_value(views_a, engaged_a, views_b, engaged_b):
+    engine = ABTestEngine()
+    prob_best, prob_beat_control = engine._posterior_win_probabilities(
+        np.array([[views_a, views_b]]), np.array([[engaged_a, engaged_b]]), np.ones((1, 2), dtype=bool)
+    )
+    exact = exact_probability_b_beats_a(views_a, engaged_a, views_b, engaged_b)
+
+    # 20,000 draws: the Monte Carlo standard error is at most 0.0036
+    assert prob_beat_control[0, 1] == pytest.approx(exact, abs=0.015)
+    assert prob_best[0, 1] == pytest.approx(exact, abs=0.015)
+    assert prob_best[0].sum() == pytest.approx(1.0)
+
+
+def test_posterior_is_reproducible_with_the_fixed_seed():
+    views = np.array([[1000, 1000, 1000]])
+    engagements = np.array([[50, 55, 60]])
+    present = np.ones((1, 3), dtype=bool)
+
+    first = ABTestEngine()._posterior_win_probabilities(views, engagements, present)
+    second = ABTestEngine()._posterior_win_probabilities(views, engagements, present)
+
+    np.testing.assert_array_equal(first[0], second[0])
+    np.testing.assert_array_equal(first[1], second[1])
+
+
+@pytest.mark.parametrize("count", [0, 1])
+def test_fewer_than_two_variants_is_insufficient_data(count):
+    result = ABTestEngine().evaluate([make_test(7, [(1000, 50)] * count)])[7]
+
+    assert result["winner"] is None
+    assert result["confidence_level"] is None
+    assert result["is_complete"] is False
+    assert result["results_summary"]["status"] == "insufficient_data"
+    assert result["results_summary"]["variants"] == ["A"][:count]
+
+
+@pytest.mark.parametrize("count", [2, 3, 5])
+def test_every_variant_count_is_summarized(count):
+    variants = [(2000, 100 + 10 * index) for index in range(count)]
+    result = ABTestEngine().evaluate([make_test(1, variants)])[1]
+    summary = result["results_summary"]
+
+    assert list(summary["variants"]) == [chr(ord("A") + index) for index in range(count)]
+    assert sum(v["probability_to_be_best"] for v in summary["variants"].values()) == pytest.approx(1.0, abs=1e-3)
+    assert summary["variants"]["A"]["p_value"] is None
+    assert result["is_complete"] is True
+
+
+def test_mixed_batch_pads_smaller_tests():
+    two = make_test(1, [(1000, 50), (1000, 65)])
+    three = make_test(2, [(1000, 50), (1000, 52), (1000, 80)])
+    short = make_test(3, [(1000, 50)])
+
+    results = ABTestEngine().evaluate([two, three, short])
+    alone = ABTestEngine().evaluate([two])[1]
+
+    assert set(results) == {1, 2, 3}
+    assert list(results[1]["results_summary"]["variants"]) == ["A", "B"]
+    assert results[1]["results_summary"]["variants"]["B"]["p_value"] == alone["results_summary"]["variants"]["B"]["p_value"]
+    assert results[3]["results_summary"]["status"] == "insufficient_data"
+
+
+def test_clear_winner_and_not_enough_data():
+    engine = ABTestEngine()
+    results = engine.evaluate([
+        make_test(1, [(5000, 100), (5000, 300)]),
+        make_test(2, [(100, 5), (100, 6)])
+    ])
+
+    assert results[1]["winner"] == "B"
+    assert results[1]["results_summary"]["significant"] is True
+    assert results[2]["winner"] is None
+    assert results[2]["is_complete"] is False